@@ -2,91 +2,250 @@
 文章 API 路由
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, undefer_group
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_async_read_db
+from app.core.pagination import InvalidCursor, keyset_page
 from app.models.database import Article, Feed
-from app.models.schemas import ArticleCreate, ArticleUpdate, ArticleResponse
+from app.models.schemas import (
+    ArticleBatchRequest, ArticleBatchResult, ArticleCreate, ArticleUpdate, ArticleListItem, ArticleResponse,
+    ArticleSearchHit,
+)
+from app.services.article_service import ArticleService
+from app.services.search_service import InvalidSearchQuery, SearchService
+from app.services.feed_cache import feed_meta_cache
+from app.services.stats_service import StatsService
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ArticleResponse])
+@router.get("/", response_model=List[ArticleResponse], response_model_exclude_unset=True)
 async def list_articles(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 中的游标"),
+    skip: int = Query(0, ge=0, deprecated=True, description="偏移分页，请改用 cursor"),
     limit: int = Query(100, ge=1, le=500),
     feed_id: Optional[int] = None,
     read_status: Optional[bool] = None,
     processed_status: Optional[bool] = None,
-    db: Session = Depends(get_db)
+    include_content: bool = Query(False, description="同时返回正文和摘要"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取文章列表
-    """
-    query = db.query(Article)
     
+    按发布时间倒序，使用游标分页：下一页的游标在响应头 X-Next-Cursor 中，
+    没有该响应头表示已是最后一页。第一页的响应头 X-Total-Count 为符合条件的文章总数。
+    默认只返回元数据，正文和摘要通过文章详情或 include_content=true 获取。
+    """
+    filters = []
     if feed_id:
-        query = query.filter(Article.feed_id == feed_id)
+        filters.append(Article.feed_id == feed_id)
     if read_status is not None:
-        query = query.filter(Article.read_status == read_status)
+        filters.append(Article.read_status == read_status)
     if processed_status is not None:
-        query = query.filter(Article.processed_status == processed_status)
+        filters.append(Article.processed_status == processed_status)
     
-    articles = query.offset(skip).limit(limit).all()
+    if not cursor:
+        response.headers["X-Total-Count"] = str(
+            await _count_articles(db, filters, feed_id, read_status, processed_status)
+        )
     
-    # 添加 feed_name 到响应
+    # 订阅源名称随文章一起 JOIN 读取
+    stmt = select(Article).where(*filters).options(_with_feed_name())
+    if include_content:
+        stmt = stmt.options(undefer_group("body"))
+    if skip and not cursor:
+        stmt = stmt.order_by(Article.published_at.desc(), Article.id.desc()).offset(skip).limit(limit)
+        articles = (await db.execute(stmt)).scalars().all()
+    else:
+        try:
+            articles, next_cursor = await keyset_page(db, stmt, Article.published_at, Article.id, cursor, limit)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    
+    _attach_feed_names(articles)
+    # 未设置的 content / summary 不出现在响应中，也不会触发延迟加载
+    schema = ArticleResponse if include_content else ArticleListItem
+    return [schema.model_validate(article) for article in articles]
+
+def _with_feed_name():
+    """JOIN 加载文章所属订阅源的名称和分类"""
+    return joinedload(Article.feed).load_only(Feed.name, Feed.category)
+
+def _attach_feed_names(articles: List[Article]):
+    """把 JOIN 加载的订阅源名称填入响应的 feed_name"""
     for article in articles:
-        feed = db.query(Feed).filter(Feed.id == article.feed_id).first()
-        if feed:
-            article.feed_name = feed.name
+        article.feed_name = article.feed.name if article.feed else None
+
+async def _count_articles(
+    db: AsyncSession,
+    filters: list,
+    feed_id: Optional[int],
+    read_status: Optional[bool],
+    processed_status: Optional[bool]
+) -> int:
+    """
+    符合条件的文章总数
+
+    只按订阅源过滤时使用订阅源的 article_count；不过滤或只按已读、处理状态之一过滤时
+    使用 stats_counters 中维护的计数器；其他组合才用索引计数。
+    """
+    if feed_id:
+        if read_status is None and processed_status is None:
+            count = await db.scalar(select(Feed.article_count).where(Feed.id == feed_id))
+            return count or 0
+    elif read_status is None or processed_status is None:
+        stats = await db.run_sync(StatsService.article_stats)
+        if read_status is not None:
+            return stats["read" if read_status else "unread"]
+        if processed_status is not None:
+            return stats["processed" if processed_status else "unprocessed"]
+        return stats["total"]
+    return await db.scalar(select(func.count(Article.id)).where(*filters))
+
+async def _get_article(db: AsyncSession, article_id: int, refresh: bool = False) -> Optional[Article]:
+    """
+    读取包含正文和摘要的文章
+    
+    异步会话中不能在事件循环外延迟加载，响应需要的列在这里一次读取；
+    refresh 为 True 时覆盖会话中已有的对象，用于读取提交后数据库生成的 updated_at。
+    """
+    stmt = select(Article).options(undefer_group("body")).where(Article.id == article_id)
+    if refresh:
+        stmt = stmt.execution_options(populate_existing=True)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+# 搜索和批量接口需要注册在 /{article_id} 路由之前，否则 "search"、"batch" 会被当作文章 ID
+@router.get("/search")
+async def search_articles(
+    q: str = Query(..., min_length=1, max_length=500, description="搜索词，多个词同时命中，词尾 * 为前缀匹配"),
+    feed_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    全文搜索文章
     
-    return articles
+    在标题、摘要、正文和关键词中搜索，按 BM25 相关度排序（标题和关键词权重更高），
+    每条结果带命中片段；next_cursor 为 None 表示已是最后一页。
+    """
+    try:
+        articles, next_cursor = await db.run_sync(
+            SearchService.search, q, feed_id=feed_id, cursor=cursor, limit=limit
+        )
+    except (InvalidSearchQuery, InvalidCursor) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except OperationalError as e:
+        if "no such table" in str(e):
+            raise HTTPException(status_code=503, detail="全文索引不可用")
+        raise
+    
+    return {
+        "query": q,
+        "next_cursor": next_cursor,
+        "articles": [ArticleSearchHit.model_validate(article) for article in articles],
+    }
+
+@router.post("/batch/mark-read", response_model=ArticleBatchResult)
+async def batch_mark_read(
+    batch: ArticleBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    批量标记文章为已读
+    
+    按 ids 和/或 feed_id、published_before 选择文章，一条 UPDATE 完成；
+    affected 为状态实际发生变化的文章数。
+    """
+    affected = await db.run_sync(
+        ArticleService.set_read_status, True,
+        ids=batch.ids, feed_id=batch.feed_id, published_before=batch.published_before
+    )
+    await db.commit()
+    return ArticleBatchResult(affected=affected)
+
+@router.post("/batch/mark-unread", response_model=ArticleBatchResult)
+async def batch_mark_unread(
+    batch: ArticleBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    批量标记文章为未读
+    """
+    affected = await db.run_sync(
+        ArticleService.set_read_status, False,
+        ids=batch.ids, feed_id=batch.feed_id, published_before=batch.published_before
+    )
+    await db.commit()
+    return ArticleBatchResult(affected=affected)
+
+@router.post("/batch/delete", response_model=ArticleBatchResult)
+async def batch_delete(
+    batch: ArticleBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    批量删除文章
+    
+    一条 DELETE 完成，订阅源的文章计数按删除数增量扣减。
+    """
+    affected = await db.run_sync(
+        ArticleService.delete_articles,
+        ids=batch.ids, feed_id=batch.feed_id, published_before=batch.published_before
+    )
+    await db.commit()
+    return ArticleBatchResult(affected=affected)
 
 @router.get("/{article_id}", response_model=ArticleResponse)
 async def get_article(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取单个文章
     """
-    article = db.query(Article).filter(Article.id == article_id).first()
+    stmt = select(Article).options(_with_feed_name(), undefer_group("body")).where(Article.id == article_id)
+    article = (await db.execute(stmt)).scalar_one_or_none()
     if not article:
         raise HTTPException(status_code=404, detail="文章未找到")
     
-    # 添加 feed_name 到响应
-    feed = db.query(Feed).filter(Feed.id == article.feed_id).first()
-    if feed:
-        article.feed_name = feed.name
-    
+    _attach_feed_names([article])
     return article
 
 @router.post("/", response_model=ArticleResponse, status_code=201)
 async def create_article(
     article_data: ArticleCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     创建新文章
     """
     # 检查 feed 是否存在
-    feed = db.query(Feed).filter(Feed.id == article_data.feed_id).first()
+    feed = await db.get(Feed, article_data.feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="订阅源未找到")
     
     # 检查 URL 是否已存在
-    existing = db.query(Article).filter(Article.url == article_data.url).first()
+    existing = await db.scalar(select(Article.id).where(Article.url == article_data.url))
     if existing:
         raise HTTPException(status_code=400, detail="该 URL 已存在")
     
     article = Article(**article_data.model_dump())
     db.add(article)
-    db.commit()
-    db.refresh(article)
+    await db.flush()
     
-    # 更新订阅源的文章计数
-    feed.article_count = db.query(Article).filter(Article.feed_id == feed.id).count()
-    db.commit()
+    # 订阅源的文章计数在数据库中原子递增，不重新 COUNT
+    feed.article_count = func.coalesce(Feed.article_count, 0) + 1
+    await db.commit()
+    
+    article = await _get_article(db, article.id, refresh=True)
     
     # 添加 feed_name 到响应
     article.feed_name = feed.name
@@ -97,111 +256,79 @@ async def create_article(
 async def update_article(
     article_id: int,
     article_data: ArticleUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     更新文章
     """
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = await _get_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="文章未找到")
     
     for key, value in article_data.model_dump(exclude_unset=True).items():
         setattr(article, key, value)
     
-    db.commit()
-    db.refresh(article)
+    await db.commit()
+    article = await _get_article(db, article_id, refresh=True)
     
     # 添加 feed_name 到响应
-    feed = db.query(Feed).filter(Feed.id == article.feed_id).first()
-    if feed:
-        article.feed_name = feed.name
+    article.feed_name = await db.run_sync(feed_meta_cache.name, article.feed_id)
     
     return article
 
 @router.delete("/{article_id}", status_code=204)
 async def delete_article(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     删除文章
     """
-    article = db.query(Article).filter(Article.id == article_id).first()
+    # 订阅源的文章计数随删除增量更新
+    if not await db.run_sync(ArticleService.delete_articles, ids=[article_id]):
+        raise HTTPException(status_code=404, detail="文章未找到")
+    await db.commit()
+
+async def _set_read_status(db: AsyncSession, article_id: int, read_status: bool) -> Article:
+    """修改文章的阅读状态并返回带 feed_name 的文章"""
+    article = await _get_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="文章未找到")
     
-    # 更新订阅源的文章计数
-    feed = db.query(Feed).filter(Feed.id == article.feed_id).first()
+    article.read_status = read_status
+    await db.commit()
+    article = await _get_article(db, article_id, refresh=True)
     
-    db.delete(article)
-    db.commit()
+    # 添加 feed_name 到响应
+    article.feed_name = await db.run_sync(feed_meta_cache.name, article.feed_id)
     
-    if feed:
-        feed.article_count = db.query(Article).filter(Article.feed_id == feed.id).count()
-        db.commit()
+    return article
 
 @router.post("/{article_id}/mark-read", response_model=ArticleResponse)
 async def mark_article_read(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     标记文章为已读
     """
-    article = db.query(Article).filter(Article.id == article_id).first()
-    if not article:
-        raise HTTPException(status_code=404, detail="文章未找到")
-    
-    article.read_status = True
-    db.commit()
-    db.refresh(article)
-    
-    # 添加 feed_name 到响应
-    feed = db.query(Feed).filter(Feed.id == article.feed_id).first()
-    if feed:
-        article.feed_name = feed.name
-    
-    return article
+    return await _set_read_status(db, article_id, True)
 
 @router.post("/{article_id}/mark-unread", response_model=ArticleResponse)
 async def mark_article_unread(
     article_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     标记文章为未读
     """
-    article = db.query(Article).filter(Article.id == article_id).first()
-    if not article:
-        raise HTTPException(status_code=404, detail="文章未找到")
-    
-    article.read_status = False
-    db.commit()
-    db.refresh(article)
-    
-    # 添加 feed_name 到响应
-    feed = db.query(Feed).filter(Feed.id == article.feed_id).first()
-    if feed:
-        article.feed_name = feed.name
-    
-    return article
+    return await _set_read_status(db, article_id, False)
 
 @router.get("/stats/summary")
 async def get_article_stats(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取文章统计摘要
     """
-    total = db.query(Article).count()
-    unread = db.query(Article).filter(Article.read_status == False).count()
-    processed = db.query(Article).filter(Article.processed_status == True).count()
-    
-    return {
-        "total": total,
-        "unread": unread,
-        "read": total - unread,
-        "processed": processed,
-        "unprocessed": total - processed
-    }
\ No newline at end of file
+    return await db.run_sync(StatsService.article_stats)
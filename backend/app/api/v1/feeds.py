@@ -1,14 +1,25 @@
 """
 订阅源 API 路由
 """
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer_group
 
-from app.core.database import get_db
-from app.models.database import Feed
-from app.models.schemas import FeedCreate, FeedUpdate, FeedResponse
+from app.core.config import settings
+from app.core.database import ReadSessionLocal, get_async_db, get_async_read_db
+from app.core.pagination import InvalidCursor, keyset_page
+from app.models.database import Article, Feed
+from app.models.schemas import (
+    ArticleBatchResult, ArticleListItem, ArticleResponse, FeedCreate, FeedUpdate, FeedResponse,
+)
+from app.services.article_service import ArticleService
+from app.services.feed_cache import feed_meta_cache
 from app.services.feed_service import FeedService
+from app.services.opml_service import OPMLParseError, OPMLService, OPMLStreamParser, import_jobs
 
 router = APIRouter()
 
@@ -18,30 +29,87 @@ async def list_feeds(
     limit: int = Query(100, ge=1, le=500),
     status: Optional[str] = None,
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取订阅源列表
     """
-    query = db.query(Feed)
+    stmt = select(Feed)
     
     if status:
-        query = query.filter(Feed.status == status)
+        stmt = stmt.where(Feed.status == status)
     if category:
-        query = query.filter(Feed.category == category)
+        stmt = stmt.where(Feed.category == category)
     
-    feeds = query.offset(skip).limit(limit).all()
+    feeds = (await db.execute(stmt.offset(skip).limit(limit))).scalars().all()
     return feeds
 
+@router.post("/opml/import", status_code=202)
+async def import_opml(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    validate: bool = Query(True, description="是否下载验证每个订阅源")
+):
+    """
+    导入 OPML 订阅列表
+    
+    请求体为 OPML 文档，边接收边解析。导入在后台执行，立即返回任务 ID，
+    通过 GET /opml/import/{job_id} 查询进度。
+    """
+    parser = OPMLStreamParser()
+    entries = []
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.OPML_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="OPML 文件过大")
+            entries.extend(parser.feed(chunk))
+        entries.extend(parser.close())
+    except OPMLParseError as e:
+        raise HTTPException(status_code=400, detail=f"OPML 格式错误: {e}")
+    
+    job = import_jobs.create(total=len(entries))
+    background_tasks.add_task(OPMLService.run_import, job["job_id"], entries, validate)
+    return job
+
+@router.get("/opml/import/{job_id}")
+async def get_opml_import(job_id: str):
+    """
+    查询 OPML 导入任务进度
+    """
+    job = import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="导入任务未找到")
+    return job
+
+@router.get("/opml/export")
+def export_opml():
+    """
+    导出所有订阅源为 OPML
+    """
+    def generate():
+        db = ReadSessionLocal()
+        try:
+            yield from OPMLService.iter_export(db)
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        generate(),
+        media_type="text/x-opml; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="castmind.opml"'},
+    )
+
 @router.get("/{feed_id}", response_model=FeedResponse)
 async def get_feed(
     feed_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取单个订阅源
     """
-    feed = db.query(Feed).filter(Feed.id == feed_id).first()
+    feed = await db.get(Feed, feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="订阅源未找到")
     return feed
@@ -49,96 +117,133 @@ async def get_feed(
 @router.post("/", response_model=FeedResponse, status_code=201)
 async def create_feed(
     feed_data: FeedCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     创建新订阅源
     """
     # 检查 URL 是否已存在
-    existing = db.query(Feed).filter(Feed.url == feed_data.url).first()
+    existing = await db.scalar(select(Feed.id).where(Feed.url == feed_data.url))
     if existing:
         raise HTTPException(status_code=400, detail="该 URL 已存在")
     
     feed = Feed(**feed_data.model_dump())
     db.add(feed)
-    db.commit()
-    db.refresh(feed)
+    await db.commit()
+    await db.refresh(feed)
+    feed_meta_cache.invalidate(feed.id)
     return feed
 
 @router.put("/{feed_id}", response_model=FeedResponse)
 async def update_feed(
     feed_id: int,
     feed_data: FeedUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     更新订阅源
     """
-    feed = db.query(Feed).filter(Feed.id == feed_id).first()
+    feed = await db.get(Feed, feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="订阅源未找到")
     
     for key, value in feed_data.model_dump(exclude_unset=True).items():
         setattr(feed, key, value)
     
-    db.commit()
-    db.refresh(feed)
+    await db.commit()
+    await db.refresh(feed)
+    feed_meta_cache.invalidate(feed_id)
     return feed
 
 @router.delete("/{feed_id}", status_code=204)
 async def delete_feed(
     feed_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     删除订阅源
     """
-    feed = db.query(Feed).filter(Feed.id == feed_id).first()
+    feed = await db.get(Feed, feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="订阅源未找到")
     
-    db.delete(feed)
-    db.commit()
+    await db.delete(feed)
+    await db.commit()
+    feed_meta_cache.invalidate(feed_id)
 
 @router.post("/{feed_id}/fetch", response_model=FeedResponse)
 async def fetch_feed(
     feed_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     手动抓取订阅源
     """
-    feed = db.query(Feed).filter(Feed.id == feed_id).first()
+    feed = await db.get(Feed, feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="订阅源未找到")
     
     # 这里应该调用实际的抓取逻辑
     # 暂时只是更新最后抓取时间
-    from datetime import datetime
     feed.last_fetch = datetime.now()
-    db.commit()
-    db.refresh(feed)
+    await db.commit()
+    await db.refresh(feed)
     
     return feed
 
+@router.post("/{feed_id}/mark-read", response_model=ArticleBatchResult)
+async def mark_feed_read(
+    feed_id: int,
+    before: Optional[datetime] = Query(None, description="只标记发布时间早于该时间的文章"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    把订阅源的文章全部标记为已读
+    """
+    if not await db.get(Feed, feed_id):
+        raise HTTPException(status_code=404, detail="订阅源未找到")
+    
+    affected = await db.run_sync(ArticleService.set_read_status, True, feed_id=feed_id, published_before=before)
+    await db.commit()
+    return ArticleBatchResult(affected=affected)
+
 @router.get("/{feed_id}/articles")
 async def get_feed_articles(
     feed_id: int,
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    skip: int = Query(0, ge=0, deprecated=True, description="偏移分页，请改用 cursor"),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db)
+    include_content: bool = Query(False, description="同时返回正文和摘要"),
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取订阅源的文章列表
+    
+    按发布时间倒序，使用游标分页；next_cursor 为 None 表示已是最后一页。
+    total 为订阅源维护的文章计数。默认只返回元数据，include_content=true 时包含正文和摘要。
     """
-    feed = db.query(Feed).filter(Feed.id == feed_id).first()
+    feed = await db.get(Feed, feed_id)
     if not feed:
         raise HTTPException(status_code=404, detail="订阅源未找到")
     
-    articles = feed.articles
+    stmt = select(Article).where(Article.feed_id == feed_id)
+    if include_content:
+        stmt = stmt.options(undefer_group("body"))
+    next_cursor = None
+    if skip and not cursor:
+        stmt = stmt.order_by(Article.published_at.desc(), Article.id.desc()).offset(skip).limit(limit)
+        articles = (await db.execute(stmt)).scalars().all()
+    else:
+        try:
+            articles, next_cursor = await keyset_page(db, stmt, Article.published_at, Article.id, cursor, limit)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    schema = ArticleResponse if include_content else ArticleListItem
     return {
         "feed_id": feed_id,
         "feed_name": feed.name,
-        "total": len(articles),
-        "articles": articles[skip:skip+limit]
-    }
\ No newline at end of file
+        "total": feed.article_count or 0,
+        "next_cursor": next_cursor,
+        "articles": [schema.model_validate(article) for article in articles]
+    }
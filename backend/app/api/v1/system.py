@@ -4,13 +4,15 @@
 import psutil
 import platform
 from datetime import datetime
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_read_db
 from app.core.config import settings
-from app.models.database import Feed, Article
 from app.models.schemas import HealthResponse, StatsResponse
+from app.scheduler.tasks import get_task_scheduler, stop_task_scheduler
+from app.services.stats_service import StatsService
 
 router = APIRouter()
 
@@ -29,38 +31,28 @@ async def health_check():
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_system_stats(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     获取系统统计信息
     """
-    # 订阅源统计
-    total_feeds = db.query(Feed).count()
-    active_feeds = db.query(Feed).filter(Feed.status == "active").count()
-    error_feeds = db.query(Feed).filter(Feed.status == "error").count()
+    # 订阅源和文章统计（触发器维护的计数器，一次主键查询）
+    counters = await db.run_sync(StatsService.get_counters)
+    feed_stats = StatsService.feed_stats(db, counters)
+    article_stats = StatsService.article_stats(db, counters)
     
-    # 文章统计
-    total_articles = db.query(Article).count()
-    unread_articles = db.query(Article).filter(Article.read_status == False).count()
-    processed_articles = db.query(Article).filter(Article.processed_status == True).count()
-    
-    # 系统资源统计
-    cpu_percent = psutil.cpu_percent(interval=0.1)
+    # 系统资源统计（cpu_percent 采样期间会阻塞，放到线程池执行）
+    cpu_percent = await run_in_threadpool(psutil.cpu_percent, interval=0.1)
     memory = psutil.virtual_memory()
     disk = psutil.disk_usage('/')
     
     return StatsResponse(
-        feeds={
-            "total": total_feeds,
-            "active": active_feeds,
-            "error": error_feeds,
-            "paused": total_feeds - active_feeds - error_feeds
-        },
+        feeds=feed_stats,
         articles={
-            "total": total_articles,
-            "unread": unread_articles,
-            "read": total_articles - unread_articles,
-            "processed": processed_articles
+            "total": article_stats["total"],
+            "unread": article_stats["unread"],
+            "read": article_stats["read"],
+            "processed": article_stats["processed"]
         },
         system={
             "cpu_percent": cpu_percent,
@@ -134,15 +126,42 @@ async def start_scheduler():
 async def stop_scheduler():
     """
     停止任务调度器
+    
+    关闭调度器的解析和分析进程池。
     """
-    # 这里应该停止实际的调度器
-    # 暂时返回成功响应
+    await run_in_threadpool(stop_task_scheduler)
     return {
         "status": "success",
         "message": "调度器已停止",
         "timestamp": datetime.now().isoformat()
     }
 
+@router.get("/scheduler/queue")
+async def get_scheduler_queue(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    查看订阅源到期队列
+    
+    只读：返回调度器最近一次同步后的队列状态，不在 API 请求中修改队列。
+    """
+    scheduler = get_task_scheduler()
+    return await db.run_sync(scheduler.describe_due_queue, limit)
+
+@router.get("/scheduler/analysis")
+async def get_analysis_status(db: AsyncSession = Depends(get_async_read_db)):
+    """
+    查看文章分析积压和各分析工作进程的吞吐量
+    """
+    scheduler = get_task_scheduler()
+    articles = await db.run_sync(StatsService.article_stats)
+    return {
+        "backlog": articles["unprocessed"],
+        "workers": scheduler.analysis_pool.describe(),
+        "last_run": scheduler.last_analysis,
+    }
+
 @router.post("/process/all")
 async def process_all_articles():
     """
@@ -20,6 +20,22 @@ class Settings(BaseSettings):
     # 数据库配置
     DATABASE_URL: str = "sqlite:///data/castmind.db"
     DATABASE_ECHO: bool = False
+    DATABASE_READ_POOL_SIZE: int = 8  # 只读连接池大小
+    DATABASE_WRITE_POOL_SIZE: int = 1  # 同步、异步写引擎各自的连接池大小
+    DATABASE_WRITE_TIMEOUT_SECONDS: float = 30.0  # 等待写连接的超时
+    FEED_META_CACHE_TTL_SECONDS: float = 300.0  # 订阅源名称/分类进程内缓存的有效期
+    # 全文索引分词器：trigram 按任意子串匹配，中文无需分词，但每个搜索词至少 3 个字符；
+    # 纯西文内容可改用 "unicode61 remove_diacritics 2"（索引更小）。修改后启动时自动重建索引
+    SEARCH_TOKENIZER: str = "trigram"
+    SEARCH_MAX_CANDIDATES: int = 0  # 大于 0 时高频词只在最新的这么多篇命中文章中按相关度排序，0 不限
+
+    # SQLite 性能配置（每个连接建立时应用）
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL 模式下读不阻塞写、写不阻塞读
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL 模式下 NORMAL 只在检查点时同步，断电不会损坏数据库
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 内存映射读取的字节数
+    SQLITE_CACHE_SIZE_KB: int = 64 * 1024  # 每个连接的页缓存大小
+    SQLITE_TEMP_STORE: str = "MEMORY"  # 临时表和排序使用内存
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000  # 遇到写锁时的等待时间，同步和异步两个写引擎之间靠它排队
     
     # CORS 配置
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
@@ -31,12 +47,68 @@ class Settings(BaseSettings):
     AI_SERVICE_ENABLED: bool = True
     AI_MODEL: str = "gpt-3.5-turbo"
     AI_MAX_TOKENS: int = 1000
+    AI_LLM_ENABLED: bool = False  # 用 OpenAI 兼容的接口生成摘要，关闭时使用规则摘要
+    OPENAI_API_KEY: Optional[str] = None
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    AI_CONCURRENCY: int = 8  # 同时在途的请求数（每个分析进程）
+    AI_REQUESTS_PER_MINUTE: int = 500  # 请求数限流，0 不限（所有分析进程合计，各进程平分）
+    AI_TOKENS_PER_MINUTE: int = 200000  # token 数限流，按估计量预扣、按实际用量修正，0 不限（所有分析进程合计，各进程平分）
+    AI_MAX_RETRIES: int = 4  # 429、5xx 和连接错误的重试次数
+    AI_RETRY_BASE_SECONDS: float = 1.0  # 第 n 次重试等待 0 到 base * 2^(n-1) 秒的随机时间
+    AI_RETRY_MAX_SECONDS: float = 60.0
+    AI_TIMEOUT_SECONDS: float = 60.0  # 单请求超时
+    AI_RUN_TOKEN_BUDGET: int = 0  # 每轮分析最多消耗的 token 数，0 不限
+    AI_MAX_INPUT_CHARS: int = 8000  # 提交给模型的正文字符数上限
+    KEYWORD_IDF_PATH: str = "data/keyword_idf.json"  # 关键词引擎的语料文档频率表，跨运行累积
+    KEYWORD_TOP_K: int = 10  # 每篇文章提取的关键词数
+    KEYWORD_MAX_TERMS: int = 200000  # 文档频率表保留的词数上限
+    ANALYSIS_WORKERS: int = -1  # 分析进程数，-1 按 CPU 核数，0 在调度器进程内分析
+    ANALYSIS_CHUNK_SIZE: int = 200  # 每次认领并交给一个工作进程的文章数
+    ANALYSIS_CACHE_ENABLED: bool = True  # 按内容摘要缓存分析结果
+    ANALYSIS_CACHE_MEMORY_ENTRIES: int = 2048  # 每个进程内 LRU 缓存的条目数
+    ANALYSIS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # SQLite 缓存表中结果的总字节数上限
     
     # 任务调度配置
     SCHEDULER_ENABLED: bool = True
     FETCH_INTERVAL_MINUTES: int = 10
     CLEANUP_DAYS: int = 30
-    
+    CLEANUP_HOUR: int = 2  # 每天运行保留期清理的时刻（本地时间，0-23）
+    STATS_RECONCILE_HOUR: int = 3  # 每天校对统计计数器的时刻（本地时间，0-23），需要全表扫描
+    RETENTION_CHUNK_SIZE: int = 500  # 每个删除事务的文章数
+    RETENTION_PAUSE_SECONDS: float = 0.05  # 两块之间让出写锁的时间
+    RETENTION_ARCHIVE_ENABLED: bool = False  # 删除前把文章追加写入 gzip 归档
+    RETENTION_ARCHIVE_DIR: str = "data/archive"
+
+    # 抓取引擎配置
+    FETCH_CONCURRENCY: int = 50  # 全局并发请求上限
+    FETCH_PER_HOST_LIMIT: int = 4  # 单主机并发请求上限
+    FETCH_TIMEOUT_SECONDS: float = 30.0  # 单请求超时
+    FETCH_USER_AGENT: str = "CastMind/1.0 (+https://github.com/YearsAlso/castmind)"
+    FEED_MAX_ENTRIES: int = 50  # 每次抓取最多解析的条目数
+    PARSE_WORKERS: int = -1  # 解析进程数，-1 按 CPU 核数，0 在调度器进程内解析
+    FEED_MIN_INTERVAL_SECONDS: int = 300  # 自适应抓取间隔下限
+    FEED_MAX_INTERVAL_SECONDS: int = 86400  # 自适应抓取间隔上限（安静或失败的订阅源）
+    FEED_RETRY_BASE_SECONDS: int = 300  # 出错订阅源首次重试的退避时间
+    FEED_RETRY_MAX_SECONDS: int = 86400  # 出错订阅源重试退避上限
+    FEED_CIRCUIT_BREAKER_THRESHOLD: int = 10  # 连续失败达到该次数后熔断，只按退避上限探测
+    OPML_VALIDATE_CONCURRENCY: int = 20  # OPML 导入时并发验证的订阅源数
+    OPML_MAX_BYTES: int = 10 * 1024 * 1024  # OPML 导入文件大小上限
+    OPML_ALLOW_PRIVATE_HOSTS: bool = False  # 导入验证时是否允许请求回环、私有网段等非公网地址
+
+    # 音频附件下载配置
+    ENCLOSURE_DOWNLOAD_ENABLED: bool = False
+    DOWNLOAD_DIR: str = "data/audio"
+    DOWNLOAD_CONCURRENCY: int = 4  # 全局并发下载数
+    DOWNLOAD_PER_HOST_LIMIT: int = 2  # 单主机并发下载数
+    DOWNLOAD_BANDWIDTH_BPS: int = 0  # 全局带宽上限（字节/秒），0 不限
+    DOWNLOAD_PER_HOST_BANDWIDTH_BPS: int = 0  # 单主机带宽上限（字节/秒），0 不限
+    DOWNLOAD_CHUNK_SIZE: int = 65536
+    DOWNLOAD_TIMEOUT_SECONDS: float = 60.0  # 单次读取超时
+    DOWNLOAD_BATCH_SIZE: int = 20  # 每次任务最多下载的附件数
+    DOWNLOAD_RETRY_BASE_SECONDS: int = 600  # 下载失败的附件首次重试的退避时间
+    DOWNLOAD_RETRY_MAX_SECONDS: int = 86400  # 下载失败的附件重试退避上限
+    DOWNLOAD_MAX_ATTEMPTS: int = 10  # 连续失败达到该次数后不再下载
+
     # 日志配置
     LOG_LEVEL: str = "INFO"
     LOG_FILE: Optional[str] = "data/logs/castmind.log"
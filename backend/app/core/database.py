@@ -1,31 +1,191 @@
 """
 数据库连接和模型管理
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker
 import logging
 
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
-# 创建数据库引擎
-engine = create_engine(
+def _is_file_sqlite(url: str) -> bool:
+    """是否为文件型 SQLite 数据库（内存数据库不能使用 WAL 和只读连接）"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+def apply_sqlite_pragmas(dbapi_connection, read_only: bool = False):
+    """
+    为 SQLite 连接应用性能配置
+    
+    Args:
+        dbapi_connection: sqlite3 连接
+        read_only: 是否为只读连接（只读连接不能修改日志模式）
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        # 最先设置，后续修改日志模式等需要加锁的语句也会等待而不是立即报 SQLITE_BUSY
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        else:
+            cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}")
+        # 负数表示以 KiB 为单位
+        cursor.execute(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}")
+    finally:
+        cursor.close()
+
+def create_db_engine(url: str, read_only: bool = False, pool_size: int = 5, pool_timeout: float = 30.0) -> Engine:
+    """
+    创建数据库引擎
+    
+    文件型 SQLite 的每个连接都会应用 apply_sqlite_pragmas；只读引擎以 mode=ro 打开数据库文件。
+    其他数据库只按 URL 创建引擎。
+    
+    Args:
+        url: 数据库 URL
+        read_only: 是否创建只读引擎
+        pool_size: 连接池大小
+        pool_timeout: 等待连接的超时（秒）
+        
+    Returns:
+        数据库引擎
+    """
+    if not _is_file_sqlite(url):
+        connect_args = {"check_same_thread": False, "timeout": 30} if "sqlite" in url else {}
+        return create_engine(url, echo=settings.DATABASE_ECHO, connect_args=connect_args)
+    
+    connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if read_only:
+        url = f"sqlite:///file:{make_url(url).database}?mode=ro&uri=true"
+    
+    new_engine = create_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+    )
+    
+    @event.listens_for(new_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, read_only=read_only)
+    
+    return new_engine
+
+# 同步驱动到异步驱动的映射，异步引擎使用同一个数据库
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """
+    把同步数据库 URL 转换为对应异步驱动的 URL
+    
+    已指定驱动（如 sqlite+aiosqlite）或没有已知异步驱动的 URL 原样返回。
+    """
+    parsed = make_url(url)
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg"):
+        return url
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if not driver:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+def create_async_db_engine(
+    url: str,
+    read_only: bool = False,
+    pool_size: int = 5,
+    pool_timeout: float = 30.0,
+) -> AsyncEngine:
+    """
+    创建异步数据库引擎（SQLite 使用 aiosqlite，PostgreSQL 使用 asyncpg）
+    
+    连接配置与 create_db_engine 相同：文件型 SQLite 的每个连接都会应用 apply_sqlite_pragmas，
+    只读引擎以 mode=ro 打开数据库文件。
+    
+    Args:
+        url: 同步或异步数据库 URL
+        read_only: 是否创建只读引擎
+        pool_size: 连接池大小
+        pool_timeout: 等待连接的超时（秒）
+        
+    Returns:
+        异步数据库引擎
+    """
+    async_url = to_async_url(url)
+    if not _is_file_sqlite(url):
+        return create_async_engine(async_url, echo=settings.DATABASE_ECHO)
+    
+    connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if read_only:
+        async_url = f"sqlite+aiosqlite:///file:{make_url(url).database}?mode=ro&uri=true"
+    
+    new_engine = create_async_engine(
+        async_url,
+        echo=settings.DATABASE_ECHO,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+    )
+    
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, read_only=read_only)
+    
+    return new_engine
+
+# 写引擎：调度器等同步代码的写入经过这里，连接池大小默认为 1。
+# 下面的异步写引擎（API 的写接口）是另一个独立的写入方；SQLite 同一时刻只允许一个写事务，
+# 两个写入方之间的锁冲突由每个连接的 busy_timeout（SQLITE_BUSY_TIMEOUT_MS）等待解决。
+engine = create_db_engine(
     settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    connect_args={"check_same_thread": False, "timeout": 30} if "sqlite" in settings.DATABASE_URL else {}
+    pool_size=settings.DATABASE_WRITE_POOL_SIZE,
+    pool_timeout=settings.DATABASE_WRITE_TIMEOUT_SECONDS,
 )
 
+# 只读引擎：API 查询使用，WAL 模式下不会等待调度器的写事务
+if _is_file_sqlite(settings.DATABASE_URL):
+    read_engine = create_db_engine(settings.DATABASE_URL, read_only=True, pool_size=settings.DATABASE_READ_POOL_SIZE)
+else:
+    read_engine = engine
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# 异步引擎：API 请求使用，查询期间让出事件循环；调度器等后台任务继续使用同步引擎
+async_engine = create_async_db_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DATABASE_WRITE_POOL_SIZE,
+    pool_timeout=settings.DATABASE_WRITE_TIMEOUT_SECONDS,
+)
+if _is_file_sqlite(settings.DATABASE_URL):
+    async_read_engine = create_async_db_engine(
+        settings.DATABASE_URL, read_only=True, pool_size=settings.DATABASE_READ_POOL_SIZE
+    )
+else:
+    async_read_engine = async_engine
+
+# 提交后不过期对象，响应序列化时不会在事件循环外触发延迟加载
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, expire_on_commit=False, autoflush=False)
 
 # 声明基类
 Base = declarative_base()
 
 def get_db():
     """
-    获取数据库会话依赖
+    获取数据库会话依赖（写连接）
     """
     db = SessionLocal()
     try:
@@ -33,13 +193,24 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """
+    获取只读数据库会话依赖
+    
+    只用于不写入的接口；会话中执行写入会因 query_only 报错。
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def init_db():
     """
     初始化数据库，创建所有表
     """
     try:
         # 确保数据目录存在
-        import os
         from pathlib import Path
         
         # 从数据库 URL 中提取路径
@@ -53,16 +224,14 @@ def init_db():
                 logger.info(f"创建数据库目录: {db_dir}")
                 db_dir.mkdir(parents=True, exist_ok=True)
         
-        # 导入所有模型以确保它们被注册
-        from app.models.database import Feed, Article
-        
-        # 创建所有表
-        Base.metadata.create_all(bind=engine)
+        # 创建缺失的表并执行未应用的结构迁移
+        from app.core.migrations import run_migrations
+        run_migrations(engine)
         logger.info("数据库表创建完成")
         
         # 验证表是否创建成功
         with engine.connect() as conn:
-            result = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
             tables = [row[0] for row in result]
             logger.info(f"数据库中的表: {tables}")
             
@@ -92,7 +261,15 @@ def init_db():
                         interval INTEGER DEFAULT 3600,
                         status TEXT DEFAULT 'active',
                         last_fetch TIMESTAMP,
+                        next_fetch TIMESTAMP,
+                        effective_interval INTEGER,
                         article_count INTEGER DEFAULT 0,
+                        etag TEXT,
+                        last_modified TEXT,
+                        content_hash TEXT,
+                        failure_count INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        next_retry_at TIMESTAMP,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
@@ -112,12 +289,39 @@ def init_db():
                         processed_status BOOLEAN DEFAULT 0,
                         keywords TEXT,
                         sentiment TEXT,
+                        enclosure_url TEXT,
+                        enclosure_type TEXT,
+                        enclosure_length INTEGER,
+                        audio_path TEXT,
+                        audio_size INTEGER,
+                        audio_sha256 TEXT,
+                        audio_downloaded_at TIMESTAMP,
+                        enclosure_failure_count INTEGER DEFAULT 0,
+                        enclosure_error TEXT,
+                        enclosure_retry_at TIMESTAMP,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         FOREIGN KEY (feed_id) REFERENCES feeds(id) ON DELETE CASCADE
                     )
                 """)
                 
+                # 统计计数器表，触发器由下次正常启动时的迁移安装，之前统计接口实时计数
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS stats_counters (
+                        name TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                
+                # 创建索引（与 app.core.migrations 中的一致，未记录版本，下次正常启动时迁移会重新确认）
+                cursor.executescript("""
+                    CREATE INDEX IF NOT EXISTS ix_feeds_updated_at ON feeds (updated_at);
+                    CREATE INDEX IF NOT EXISTS ix_articles_feed_published ON articles (feed_id, published_at);
+                    CREATE INDEX IF NOT EXISTS ix_articles_published ON articles (published_at);
+                    CREATE INDEX IF NOT EXISTS ix_articles_processed_id ON articles (processed_status, id);
+                    CREATE INDEX IF NOT EXISTS ix_articles_read_created ON articles (read_status, created_at);
+                """)
+                
                 conn.commit()
                 cursor.close()
                 conn.close()
@@ -129,4 +333,20 @@ def init_db():
             logger.error(f"备用方法也失败: {e2}")
         
         # 返回 False 但不抛出异常，让应用可以继续启动
-        return False
\ No newline at end of file
+        return False
+
+async def get_async_db():
+    """
+    获取异步数据库会话依赖（写连接）
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """
+    获取异步只读数据库会话依赖
+    
+    只用于不写入的接口；会话中执行写入会因 query_only 报错。
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,139 @@
+"""
+数据库结构版本迁移
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from .database import Base, engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+class Migration(NamedTuple):
+    """一个结构迁移：版本号、说明和在事务中执行的升级函数"""
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+# 按版本号排列的迁移列表，新迁移只能追加在末尾
+MIGRATIONS: List[Migration] = []
+
+def migration(version: int, name: str):
+    """注册迁移的装饰器"""
+    def register(func: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(version, name, func))
+        return func
+    return register
+
+@migration(1, "补齐旧表缺少的列")
+def _add_missing_columns(conn: Connection):
+    """
+    create_all 不会修改已存在的表，这里对比模型和实际表结构，
+    用 ALTER TABLE ADD COLUMN 添加缺失的可空列。
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            logger.info(f"已添加列: {table.name}.{column.name}")
+
+@migration(2, "文章和订阅源热点查询索引")
+def _add_hot_path_indexes(conn: Connection):
+    """
+    - (feed_id, published_at): 按订阅源列出文章、每个订阅源最近的文章
+    - (processed_status, id): 按顺序取未处理的文章
+    - (read_status, created_at): 按阅读状态过滤和清理旧文章
+    - feeds.updated_at: 到期队列的增量同步
+    """
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_articles_feed_published ON articles (feed_id, published_at)",
+        "CREATE INDEX IF NOT EXISTS ix_articles_processed_id ON articles (processed_status, id)",
+        "CREATE INDEX IF NOT EXISTS ix_articles_read_created ON articles (read_status, created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_feeds_updated_at ON feeds (updated_at)",
+    ):
+        conn.execute(text(statement))
+
+@migration(3, "文章按发布时间排序的索引")
+def _add_published_index(conn: Connection):
+    """文章列表按 (published_at, id) 倒序做游标分页，SQLite 索引隐含 rowid，单列索引即可覆盖排序"""
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_articles_published ON articles (published_at)"))
+
+@migration(4, "统计计数器触发器")
+def _add_stats_counters(conn: Connection):
+    """stats_counters 表由 create_all 创建，这里安装触发器并按现有数据初始化计数"""
+    from app.models.database import install_counters
+    install_counters(conn)
+
+@migration(5, "文章全文索引")
+def _add_search_index(conn: Connection):
+    """创建 FTS5 全文索引和同步触发器，并按现有文章建立索引"""
+    from app.models.database import install_search_index
+    install_search_index(conn)
+
+@migration(6, "附件下载失败记录")
+def _add_enclosure_failure_columns(conn: Connection):
+    """文章表增加附件下载的失败次数、失败原因和下次重试时间"""
+    _add_missing_columns(conn)
+
+def current_version(conn: Connection) -> int:
+    """数据库当前的结构版本，没有版本表时为 0"""
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+def run_migrations(engine: Optional[Engine] = None) -> int:
+    """
+    创建缺失的表并执行未应用的迁移
+
+    可以重复执行：已应用的版本会被跳过，每个迁移在独立事务中执行并记录版本号。
+    迁移本身也必须是幂等的，多个进程同时启动时可能重复执行同一个迁移。
+
+    Args:
+        engine: 数据库引擎，默认使用写引擎
+
+    Returns:
+        执行后的结构版本
+    """
+    engine = engine or default_engine
+
+    # 导入所有模型以确保它们被注册
+    from app.models import database  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+    version = 0
+    for item in sorted(MIGRATIONS, key=lambda m: m.version):
+        with engine.begin() as conn:
+            version = current_version(conn)
+            if item.version <= version:
+                continue
+
+            logger.info(f"执行数据库迁移 {item.version}: {item.name}")
+            item.upgrade(conn)
+            conn.execute(
+                text("INSERT OR IGNORE INTO schema_version (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": item.version, "n": item.name, "t": datetime.now()},
+            )
+            version = item.version
+
+    logger.info(f"数据库结构版本: {version}")
+    return version
@@ -0,0 +1,129 @@
+"""
+游标（keyset）分页
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# 游标位置：(排序列的值, 主键)，排序列为 NULL 的行排在最后
+Position = Tuple[Optional[datetime], int]
+
+class InvalidCursor(ValueError):
+    """游标无法解码"""
+
+def _encode_payload(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_payload(cursor: str) -> dict:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    return json.loads(raw)
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """把最后一行的位置编码为不透明的游标"""
+    return _encode_payload({"p": sort_value.isoformat() if sort_value else None, "i": row_id})
+
+def decode_cursor(cursor: str) -> Position:
+    """
+    解码游标
+
+    Raises:
+        InvalidCursor: 游标格式错误
+    """
+    try:
+        payload = _decode_payload(cursor)
+        sort_value = datetime.fromisoformat(payload["p"]) if payload["p"] is not None else None
+        return sort_value, int(payload["i"])
+    except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"无效的游标: {cursor}") from e
+
+def encode_score_cursor(score: float, row_id: int, floor: Optional[int] = None) -> str:
+    """
+    把按分数升序排列的最后一行编码为游标（JSON 中的浮点数可以无损往返）
+
+    floor 为第一页确定的候选范围下界，后续页沿用同一下界，不会因新增命中而跳过旧的候选。
+    """
+    payload = {"s": score, "i": row_id}
+    if floor is not None:
+        payload["f"] = floor
+    return _encode_payload(payload)
+
+def decode_score_cursor(cursor: str) -> Tuple[float, int, Optional[int]]:
+    """
+    解码分数游标
+
+    Returns:
+        (分数, 主键, 候选范围下界或 None)
+
+    Raises:
+        InvalidCursor: 游标格式错误
+    """
+    try:
+        payload = _decode_payload(cursor)
+        floor = payload.get("f")
+        return float(payload["s"]), int(payload["i"]), int(floor) if floor is not None else None
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"无效的游标: {cursor}") from e
+
+async def keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    sort_column,
+    id_column,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    按 (sort_column DESC, id DESC) 取一页
+
+    用行值比较 (sort_column, id) < (游标位置) 定位，不使用 OFFSET，
+    配合以 sort_column 开头的索引，任意深度的页都只读取 limit + 1 行。
+    sort_column 为 NULL 的行排在最后，单独按 id 倒序读取。
+
+    Args:
+        db: 异步会话
+        stmt: 已应用过滤条件的查询语句（如 select(Article).where(...)）
+        sort_column: 排序列（如 Article.published_at）
+        id_column: 主键列
+        cursor: 上一页返回的游标，None 表示第一页
+        limit: 每页行数
+
+    Returns:
+        (本页的行, 下一页的游标或 None)
+
+    Raises:
+        InvalidCursor: 游标格式错误
+    """
+    position = decode_cursor(cursor) if cursor else None
+    rows: List[Any] = []
+
+    # 非 NULL 段
+    if position is None or position[0] is not None:
+        page = stmt.where(sort_column.isnot(None))
+        if position is not None:
+            sort_value, row_id = position
+            page = page.where(
+                tuple_(sort_column, id_column) < tuple_(literal(sort_value, sort_column.type), literal(row_id))
+            )
+        page = page.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+        rows = list((await db.execute(page)).scalars().all())
+
+    # NULL 段
+    if len(rows) <= limit:
+        page = stmt.where(sort_column.is_(None))
+        if position is not None and position[0] is None:
+            page = page.where(id_column < position[1])
+        page = page.order_by(id_column.desc()).limit(limit + 1 - len(rows))
+        rows += (await db.execute(page)).scalars().all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
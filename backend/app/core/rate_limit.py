@@ -0,0 +1,82 @@
+"""
+异步令牌桶限流
+"""
+import asyncio
+import time
+from typing import Optional
+
+class TokenBucket:
+    """
+    异步令牌桶
+
+    以 rate 个/秒的速度补充令牌，最多积累 capacity 个。请求量大于桶容量时
+    等到桶满后扣除并记为欠账，后续请求需要先还清，长期速率仍不超过 rate。
+    rate 小于等于 0 表示不限流。
+
+    令牌数只是普通数值，同一个桶可以在先后多个事件循环（多次 asyncio.run）中使用，
+    限流状态跨循环保留；排队用的锁在每个事件循环中重新创建。
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    async def acquire(self, amount: float = 1) -> float:
+        """
+        获取令牌，不足时等待
+
+        Args:
+            amount: 需要的令牌数
+
+        Returns:
+            等待的秒数
+        """
+        if self.unlimited:
+            return 0.0
+
+        waited = 0.0
+        async with self._loop_lock():
+            needed = min(amount, self.capacity)
+            while True:
+                self._refill()
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def refund(self, amount: float):
+        """
+        按实际用量修正已扣除的令牌
+
+        用于先按估计量获取、完成后才知道实际用量的场景（例如 LLM 的 token 数）。
+
+        Args:
+            amount: 多扣的令牌数，负数表示少扣、需要补扣（记为欠账）
+        """
+        if self.unlimited:
+            return
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _loop_lock(self) -> asyncio.Lock:
+        """当前事件循环的排队锁，asyncio.Lock 不能跨事件循环使用"""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
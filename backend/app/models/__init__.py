@@ -2,7 +2,10 @@
 数据模型包
 """
 from .database import Feed, Article
-from .schemas import FeedCreate, FeedUpdate, FeedResponse, ArticleCreate, ArticleUpdate, ArticleResponse
+from .schemas import (
+    FeedCreate, FeedUpdate, FeedResponse, ArticleCreate, ArticleUpdate, ArticleListItem, ArticleResponse,
+    ArticleSearchHit, ArticleBatchRequest, ArticleBatchResult,
+)
 
 __all__ = [
     "Feed",
@@ -12,5 +15,9 @@ __all__ = [
     "FeedResponse",
     "ArticleCreate",
     "ArticleUpdate",
+    "ArticleListItem",
     "ArticleResponse",
+    "ArticleSearchHit",
+    "ArticleBatchRequest",
+    "ArticleBatchResult",
 ]
\ No newline at end of file
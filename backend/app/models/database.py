@@ -1,11 +1,17 @@
 """
 SQLAlchemy 数据库模型
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
-from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+import logging
+from typing import List
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, event
+from sqlalchemy.sql import column, func, table
+from sqlalchemy.orm import deferred, relationship
 
 from app.core.database import Base
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 class Feed(Base):
     """订阅源模型"""
@@ -18,12 +24,25 @@ class Feed(Base):
     interval = Column(Integer, default=3600)  # 抓取间隔（秒）
     status = Column(String(50), default="active")  # active, paused, error
     last_fetch = Column(DateTime, nullable=True)
+    next_fetch = Column(DateTime, nullable=True)  # 下次到期抓取时间
+    effective_interval = Column(Integer, nullable=True)  # 自适应抓取间隔（秒）
     article_count = Column(Integer, default=0)
+    etag = Column(String(255), nullable=True)  # 上次响应的 ETag
+    last_modified = Column(String(100), nullable=True)  # 上次响应的 Last-Modified
+    content_hash = Column(String(64), nullable=True)  # 上次响应体的 SHA-256
+    failure_count = Column(Integer, default=0)  # 连续失败次数
+    last_error = Column(Text, nullable=True)  # 最近一次失败原因
+    next_retry_at = Column(DateTime, nullable=True)  # 出错订阅源的下次重试时间
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # 关系
     articles = relationship("Article", back_populates="feed", cascade="all, delete-orphan")
+    
+    # 索引（已有数据库通过 app.core.migrations 添加）
+    __table_args__ = (
+        Index("ix_feeds_updated_at", "updated_at"),
+    )
 
 class Article(Base):
     """文章模型"""
@@ -33,15 +52,194 @@ class Article(Base):
     feed_id = Column(Integer, ForeignKey("feeds.id", ondelete="CASCADE"))
     title = Column(String(500), nullable=False)
     url = Column(String(500), nullable=False, unique=True)
-    content = Column(Text, nullable=True)
-    summary = Column(Text, nullable=True)
+    # 正文和摘要延迟加载：列表查询只读取元数据，首次访问时一次加载整组
+    content = deferred(Column(Text, nullable=True), group="body")
+    summary = deferred(Column(Text, nullable=True), group="body")
     published_at = Column(DateTime, nullable=True)
     read_status = Column(Boolean, default=False)
     processed_status = Column(Boolean, default=False)
     keywords = Column(Text, nullable=True)
     sentiment = Column(String(50), nullable=True)
+    enclosure_url = Column(String(1000), nullable=True)  # 音频附件 URL
+    enclosure_type = Column(String(100), nullable=True)
+    enclosure_length = Column(Integer, nullable=True)  # 订阅源声明的大小（字节）
+    audio_path = Column(String(500), nullable=True)  # 已下载音频的本地路径
+    audio_size = Column(Integer, nullable=True)  # 已下载音频的实际大小（字节）
+    audio_sha256 = Column(String(64), nullable=True)
+    audio_downloaded_at = Column(DateTime, nullable=True)
+    enclosure_failure_count = Column(Integer, default=0)  # 附件连续下载失败次数
+    enclosure_error = Column(Text, nullable=True)  # 最近一次下载失败原因
+    enclosure_retry_at = Column(DateTime, nullable=True)  # 失败后的下次重试时间
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # 关系
-    feed = relationship("Feed", back_populates="articles")
\ No newline at end of file
+    feed = relationship("Feed", back_populates="articles")
+    
+    # 索引（已有数据库通过 app.core.migrations 添加）
+    __table_args__ = (
+        Index("ix_articles_feed_published", "feed_id", "published_at"),
+        Index("ix_articles_published", "published_at"),
+        Index("ix_articles_processed_id", "processed_status", "id"),
+        Index("ix_articles_read_created", "read_status", "created_at"),
+    )
+
+class StatsCounter(Base):
+    """统计计数器，由 SQLite 触发器在写入订阅源和文章的同一事务中维护"""
+    __tablename__ = "stats_counters"
+    
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class AnalysisCacheEntry(Base):
+    """文章分析结果缓存，按规范化内容摘要和分析器版本索引（见 app.services.analysis_cache）"""
+    __tablename__ = "analysis_cache"
+    
+    content_hash = Column(String(64), primary_key=True)
+    version = Column(String(100), primary_key=True)
+    result = Column(Text, nullable=False)  # 分析结果 JSON
+    size = Column(Integer, nullable=False)  # result 的字节数，用于按总大小淘汰
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    last_used_at = Column(DateTime, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_analysis_cache_last_used", "last_used_at"),
+    )
+
+# 计数器名称 -> (表名, 计入条件)，条件中的 {row} 由触发器替换为 NEW 或 OLD
+COUNTERS = {
+    "feeds_total": ("feeds", "1"),
+    "feeds_active": ("feeds", "{row}.status = 'active'"),
+    "feeds_error": ("feeds", "{row}.status = 'error'"),
+    "articles_total": ("articles", "1"),
+    "articles_unread": ("articles", "{row}.read_status = 0"),
+    "articles_processed": ("articles", "{row}.processed_status = 1"),
+}
+
+# 会改变计数条件的列，其他列的更新不触发计数器
+COUNTER_COLUMNS = {
+    "feeds": ["status"],
+    "articles": ["read_status", "processed_status"],
+}
+
+def _counter_delta(table: str, sign: str, row: str) -> str:
+    """计数器增量表达式：按行是否满足各计数器的条件加减 1"""
+    cases = " ".join(
+        f"WHEN '{name}' THEN CASE WHEN {condition.format(row=row)} THEN {sign}1 ELSE 0 END"
+        for name, (counter_table, condition) in COUNTERS.items()
+        if counter_table == table
+    )
+    return f"CASE name {cases} ELSE 0 END"
+
+def counter_trigger_ddl() -> List[str]:
+    """维护 stats_counters 的触发器语句"""
+    statements = []
+    for table_name, columns in COUNTER_COLUMNS.items():
+        names = ", ".join(f"'{name}'" for name, (t, _) in COUNTERS.items() if t == table_name)
+        where = f"WHERE name IN ({names})"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table_name}_count_insert AFTER INSERT ON {table_name} BEGIN "
+            f"UPDATE stats_counters SET value = value + {_counter_delta(table_name, '', 'NEW')} {where}; END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table_name}_count_delete AFTER DELETE ON {table_name} BEGIN "
+            f"UPDATE stats_counters SET value = value + {_counter_delta(table_name, '-', 'OLD')} {where}; END",
+            f"CREATE TRIGGER IF NOT EXISTS trg_{table_name}_count_update AFTER UPDATE OF {', '.join(columns)} ON {table_name} BEGIN "
+            f"UPDATE stats_counters SET value = value + {_counter_delta(table_name, '', 'NEW')} "
+            f"+ {_counter_delta(table_name, '-', 'OLD')} {where}; END",
+        ]
+    return statements
+
+def install_counters(conn):
+    """
+    创建计数器触发器并补齐缺失的计数器行
+
+    缺失的计数器按当前数据初始化，已有的计数器保持不变；可以重复执行。
+    只支持 SQLite，其他数据库上 stats_counters 保持为空，由 StatsService 实时统计。
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    for statement in counter_trigger_ddl():
+        conn.exec_driver_sql(statement)
+    for name, (table_name, condition) in COUNTERS.items():
+        conn.exec_driver_sql(
+            f"INSERT OR IGNORE INTO stats_counters (name, value) "
+            f"SELECT '{name}', COUNT(*) FROM {table_name} WHERE {condition.format(row=table_name)}"
+        )
+
+# 全文索引的列及其 BM25 权重：标题和关键词命中比正文命中更相关
+SEARCH_COLUMNS = {
+    "title": 10.0,
+    "summary": 2.0,
+    "content": 1.0,
+    "keywords": 5.0,
+}
+
+# FTS5 虚拟表不属于 ORM 模型，查询时通过轻量表对象引用；rank 为按权重计算的 bm25 分数（越小越相关）
+articles_fts = table("articles_fts", column("rowid"), column("rank"), column("articles_fts"))
+
+def search_index_ddl() -> List[str]:
+    """
+    文章全文索引的虚拟表和同步触发器语句
+
+    articles_fts 是以 articles 为外部内容表的 FTS5 索引，只保存倒排索引，不重复存储正文。
+    外部内容表的删除和更新需要把旧值交给 FTS5 的 'delete' 命令。
+    """
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"NEW.{name}" for name in SEARCH_COLUMNS)
+    old_values = ", ".join(f"OLD.{name}" for name in SEARCH_COLUMNS)
+    delete_old = (
+        f"INSERT INTO articles_fts (articles_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});"
+    )
+    insert_new = f"INSERT INTO articles_fts (rowid, {columns}) VALUES (NEW.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5({columns}, "
+        f"content='articles', content_rowid='id', tokenize='{settings.SEARCH_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS trg_articles_fts_insert AFTER INSERT ON articles BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_articles_fts_delete AFTER DELETE ON articles BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS trg_articles_fts_update AFTER UPDATE OF {columns} ON articles BEGIN "
+        f"{delete_old} {insert_new} END",
+    ]
+
+def install_search_index(conn):
+    """
+    创建文章全文索引和同步触发器
+
+    触发器不存在时（新建数据库、重建 articles 表、首次迁移或修改了分词器）按现有文章重建索引；可以重复执行。
+    只支持带 FTS5 的 SQLite，其他情况下记录警告，搜索接口返回 503。
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    existing = conn.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).scalar()
+    if existing and f"tokenize='{settings.SEARCH_TOKENIZER}'" not in existing:
+        # 分词器配置已修改，删除旧索引后按新分词器重建
+        logger.info(f"全文索引分词器改为 {settings.SEARCH_TOKENIZER!r}，重建索引")
+        for name in ("insert", "delete", "update"):
+            conn.exec_driver_sql(f"DROP TRIGGER IF EXISTS trg_articles_fts_{name}")
+        conn.exec_driver_sql("DROP TABLE articles_fts")
+    installed = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_articles_fts_insert'"
+    ).first()
+    try:
+        for statement in search_index_ddl():
+            conn.exec_driver_sql(statement)
+    except Exception as e:
+        logger.warning(f"无法创建文章全文索引（SQLite 可能未编译 FTS5）: {e}")
+        return
+    weights = ", ".join(str(weight) for weight in SEARCH_COLUMNS.values())
+    conn.exec_driver_sql(f"INSERT INTO articles_fts (articles_fts, rank) VALUES ('rank', 'bm25({weights})')")
+    if not installed:
+        conn.exec_driver_sql("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_counters_after_create(target, connection, **kw):
+    # drop_all 会连同表删除触发器，create_all 之后重新安装
+    install_counters(connection)
+    install_search_index(connection)
+
+@event.listens_for(Base.metadata, "after_drop")
+def _drop_search_index_after_drop(target, connection, **kw):
+    # 全文索引不在 metadata 中，随 articles 表一起删除
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS articles_fts")
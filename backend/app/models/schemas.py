@@ -3,7 +3,7 @@ Pydantic 数据模式
 """
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 
 class FeedBase(BaseModel):
     """订阅源基础模式"""
@@ -30,6 +30,9 @@ class FeedResponse(FeedBase):
     status: str
     last_fetch: Optional[datetime]
     article_count: int
+    failure_count: Optional[int] = 0
+    last_error: Optional[str] = None
+    next_retry_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
@@ -58,21 +61,56 @@ class ArticleUpdate(BaseModel):
     keywords: Optional[str] = None
     sentiment: Optional[str] = None
 
-class ArticleResponse(ArticleBase):
-    """文章响应模式"""
+class ArticleListItem(BaseModel):
+    """文章列表项模式（不含正文和摘要）"""
     id: int
     feed_id: int
     feed_name: Optional[str] = None
+    title: str
+    url: str
+    published_at: Optional[datetime] = None
     read_status: bool
     processed_status: bool
     keywords: Optional[str] = None
     sentiment: Optional[str] = None
+    enclosure_url: Optional[str] = None
+    enclosure_type: Optional[str] = None
+    audio_size: Optional[int] = None
+    audio_sha256: Optional[str] = None
+    audio_downloaded_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+class ArticleResponse(ArticleListItem):
+    """文章响应模式"""
+    content: Optional[str] = None
+    summary: Optional[str] = None
+
+class ArticleSearchHit(ArticleListItem):
+    """搜索结果模式：文章元数据、bm25 分数（越小越相关）和命中片段"""
+    score: float
+    snippet: Optional[str] = None
+
+class ArticleBatchRequest(BaseModel):
+    """批量操作文章模式：按 ID 列表和/或过滤条件选择文章，多个条件同时满足"""
+    ids: Optional[List[int]] = Field(None, max_length=10000)
+    feed_id: Optional[int] = None
+    published_before: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        """至少指定一个条件，避免误操作全部文章"""
+        if self.ids is None and self.feed_id is None and self.published_before is None:
+            raise ValueError("需要指定 ids、feed_id 或 published_before")
+        return self
+
+class ArticleBatchResult(BaseModel):
+    """批量操作结果模式"""
+    affected: int
+
 class StatsResponse(BaseModel):
     """统计响应模式"""
     feeds: dict
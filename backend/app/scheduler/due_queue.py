@@ -0,0 +1,186 @@
+"""
+订阅源到期队列和自适应抓取间隔
+"""
+import heapq
+import random
+import threading
+from datetime import datetime, timedelta
+from statistics import median
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+# 没有新文章时间隔的增长倍数
+QUIET_GROWTH_FACTOR = 1.5
+# 抓取失败时间隔的增长倍数
+FAILURE_BACKOFF_FACTOR = 2.0
+# 重试退避的随机抖动比例，避免同时失败的订阅源在同一时刻重试
+RETRY_JITTER = 0.1
+
+class DueQueue:
+    """
+    订阅源到期队列
+
+    以下次抓取时间为键的最小堆。更新或移除订阅源时不在堆中查找旧条目，
+    而是记录每个订阅源当前有效的到期时间，弹出时丢弃过期条目（惰性删除）。
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._due: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, feed_id: int) -> bool:
+        return feed_id in self._due
+
+    def push(self, feed_id: int, due_at: datetime):
+        """加入或更新订阅源的到期时间"""
+        with self._lock:
+            self._due[feed_id] = due_at
+            heapq.heappush(self._heap, (due_at, feed_id))
+            self._compact()
+
+    def remove(self, feed_id: int):
+        """从队列中移除订阅源"""
+        with self._lock:
+            self._due.pop(feed_id, None)
+
+    def pop_due(self, now: datetime, limit: Optional[int] = None) -> List[int]:
+        """
+        弹出所有已到期的订阅源
+
+        Args:
+            now: 当前时间
+            limit: 最多弹出数量
+
+        Returns:
+            到期的订阅源 ID 列表，按到期时间排序
+        """
+        due_ids = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                if limit is not None and len(due_ids) >= limit:
+                    break
+                due_at, feed_id = heapq.heappop(self._heap)
+                if self._due.get(feed_id) != due_at:
+                    continue
+                del self._due[feed_id]
+                due_ids.append(feed_id)
+        return due_ids
+
+    def snapshot(self, limit: int = 50) -> List[Tuple[int, datetime]]:
+        """
+        按到期时间返回队列前若干项（不修改队列）
+
+        Args:
+            limit: 返回数量
+
+        Returns:
+            (订阅源 ID, 到期时间) 列表
+        """
+        with self._lock:
+            return sorted(
+                ((feed_id, due_at) for feed_id, due_at in self._due.items()),
+                key=lambda item: (item[1], item[0]),
+            )[:limit]
+
+    def count_due(self, now: datetime) -> int:
+        """统计已到期的订阅源数量"""
+        with self._lock:
+            return sum(1 for due_at in self._due.values() if due_at <= now)
+
+    def _compact(self):
+        """过期条目过多时重建堆"""
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(due_at, feed_id) for feed_id, due_at in self._due.items()]
+            heapq.heapify(self._heap)
+
+def estimate_publish_interval(published: Iterable[Optional[datetime]]) -> Optional[float]:
+    """
+    根据文章发布时间估计订阅源的发布周期
+
+    Args:
+        published: 文章发布时间
+
+    Returns:
+        相邻两篇文章发布时间间隔的中位数（秒），数据不足时返回 None
+    """
+    times = sorted({dt.replace(tzinfo=None) for dt in published if dt is not None})
+    gaps = [
+        (later - earlier).total_seconds()
+        for earlier, later in zip(times, times[1:])
+        if later > earlier
+    ]
+    if not gaps:
+        return None
+    return median(gaps)
+
+def adapt_interval(
+    base: Optional[int],
+    current: Optional[int],
+    new_articles: int = 0,
+    publish_interval: Optional[float] = None,
+    failed: bool = False,
+) -> int:
+    """
+    计算订阅源的有效抓取间隔
+
+    有效间隔不小于订阅源配置的 interval，也不大于 FEED_MAX_INTERVAL_SECONDS：
+    - 抓取失败：间隔翻倍
+    - 有新文章：按发布周期的一半轮询，没有足够的发布时间时回到配置间隔
+    - 没有新文章：间隔按 1.5 倍增长
+
+    Args:
+        base: 订阅源配置的抓取间隔（秒）
+        current: 当前有效间隔（秒）
+        new_articles: 本次新增文章数
+        publish_interval: 估计的发布周期（秒）
+        failed: 本次抓取是否失败
+
+    Returns:
+        新的有效间隔（秒）
+    """
+    lower = max(settings.FEED_MIN_INTERVAL_SECONDS, base or 3600)
+    upper = max(lower, settings.FEED_MAX_INTERVAL_SECONDS)
+    current = current or lower
+
+    if failed:
+        interval = current * FAILURE_BACKOFF_FACTOR
+    elif new_articles:
+        interval = publish_interval / 2 if publish_interval else lower
+    else:
+        interval = current * QUIET_GROWTH_FACTOR
+
+    return int(min(upper, max(lower, interval)))
+
+def next_due(now: datetime, interval: int) -> datetime:
+    """计算下次到期时间"""
+    return now + timedelta(seconds=interval)
+
+def is_circuit_open(failure_count: Optional[int]) -> bool:
+    """连续失败次数是否达到熔断阈值"""
+    return (failure_count or 0) >= settings.FEED_CIRCUIT_BREAKER_THRESHOLD
+
+def retry_delay(failure_count: int) -> int:
+    """
+    计算出错订阅源的重试退避时间
+
+    第 n 次连续失败后等待 FEED_RETRY_BASE_SECONDS * 2^(n-1) 秒，不超过 FEED_RETRY_MAX_SECONDS，
+    并加入 ±10% 的随机抖动。熔断后固定按退避上限探测。
+
+    Args:
+        failure_count: 连续失败次数（包括本次）
+
+    Returns:
+        退避时间（秒）
+    """
+    upper = max(settings.FEED_RETRY_BASE_SECONDS, settings.FEED_RETRY_MAX_SECONDS)
+    if is_circuit_open(failure_count):
+        delay = upper
+    else:
+        exponent = max(0, failure_count - 1)
+        delay = min(upper, settings.FEED_RETRY_BASE_SECONDS * 2 ** exponent)
+    return int(delay * random.uniform(1 - RETRY_JITTER, 1 + RETRY_JITTER))
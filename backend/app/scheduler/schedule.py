@@ -0,0 +1,51 @@
+"""
+每日定时任务的运行计划
+"""
+import threading
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+class DailySchedule:
+    """
+    每天在固定时刻运行一次的计划
+
+    调度循环可以任意频率调用 claim()：到达计划时刻之后的第一次调用返回 True，
+    并把下次运行时间推到下一天的同一时刻，同一天内无论调用多少次都只运行一次。
+    计划时刻恰好没有调度轮次（轮次间隔较长或调度器繁忙）时，在之后的第一轮补跑。
+    """
+
+    def __init__(self, hour: int, minute: int = 0, now: Optional[datetime] = None):
+        if not 0 <= hour < 24 or not 0 <= minute < 60:
+            raise ValueError(f"无效的计划时刻: {hour}:{minute}")
+        self.at = time(hour, minute)
+        self.last_run: Optional[datetime] = None
+        self.next_run = self._next_after(now or datetime.now())
+        self._lock = threading.Lock()
+
+    def _next_after(self, moment: datetime) -> datetime:
+        """moment 之后（不含）的第一个计划时刻"""
+        candidate = datetime.combine(moment.date(), self.at)
+        if candidate <= moment:
+            candidate += timedelta(days=1)
+        return candidate
+
+    def due(self, now: Optional[datetime] = None) -> bool:
+        """是否已到运行时间"""
+        return (now or datetime.now()) >= self.next_run
+
+    def claim(self, now: Optional[datetime] = None) -> bool:
+        """
+        到期时占用本次运行
+
+        检查和推进下次运行时间在同一把锁内完成，并发的调度循环不会重复运行。
+
+        Returns:
+            是否应当运行
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if now < self.next_run:
+                return False
+            self.last_run = now
+            self.next_run = self._next_after(now)
+            return True
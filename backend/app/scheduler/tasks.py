@@ -2,14 +2,29 @@
 定时任务定义
 """
 import logging
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, wait
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.models.database import Feed, Article
-from app.services.rss_service import RSSService
+from app.services.stats_service import StatsService
 from app.services.ai_service import AIService
+from app.services.analysis_pool import AnalysisPool
+from app.services.article_service import ArticleService
+from app.services.enclosure_service import EnclosureDownloader, download_retry_delay
+from app.services.fetch_service import FeedFetcher
+from app.services.parse_pool import ParsePool, parse_fetched
+from app.services.retention_service import RetentionEngine
+from app.scheduler.due_queue import (
+    DueQueue, adapt_interval, estimate_publish_interval, next_due, retry_delay,
+)
+from app.scheduler.schedule import DailySchedule
 
 logger = logging.getLogger(__name__)
 
@@ -17,44 +32,54 @@ class TaskScheduler:
     """任务调度器"""
     
     def __init__(self):
-        self.rss_service = RSSService()
         self.ai_service = AIService()
+        self.fetcher = FeedFetcher()
+        self.downloader = EnclosureDownloader()
+        self.parse_pool = ParsePool()
+        self.analysis_pool = AnalysisPool()
+        self.due_queue = DueQueue()
+        self.cleanup_schedule = DailySchedule(settings.CLEANUP_HOUR)
+        self.reconcile_schedule = DailySchedule(settings.STATS_RECONCILE_HOUR)
+        self._queue_watermark = None
+        self.last_analysis: Optional[dict] = None
         logger.info("任务调度器初始化完成")
     
-    def fetch_all_feeds(self) -> dict:
+    def stop(self):
+        """关闭解析和分析进程池，避免工作进程在调度器退出后残留（再次使用时按需重新创建）"""
+        self.parse_pool.shutdown()
+        self.analysis_pool.shutdown()
+        logger.info("任务调度器已停止")
+    
+    def fetch_all_feeds(self, force: bool = False) -> dict:
         """
-        抓取所有订阅源
+        抓取到期的订阅源
+        
+        从到期队列中弹出已到期的活跃订阅源，通过 FeedFetcher 并发下载，
+        每个响应下载完成后立即解析入库，并按发布频率重新计算下次抓取时间。
+        请求携带上次的 ETag / Last-Modified；服务器返回 304 或响应体摘要未变化时，
+        跳过解析和文章入库。
+        
+        Args:
+            force: 是否忽略到期时间，抓取所有活跃订阅源
         
         Returns:
             抓取结果统计
         """
-        logger.info("开始抓取所有订阅源...")
+        logger.info("开始抓取到期的订阅源..." if not force else "开始抓取所有订阅源...")
         
         db = SessionLocal()
         try:
-            feeds = db.query(Feed).filter(Feed.status == "active").all()
-            total_feeds = len(feeds)
-            success_count = 0
-            error_count = 0
-            
-            for feed in feeds:
+            if force:
+                result = self._fetch_feeds(db, db.query(Feed).filter(Feed.status == "active").all())
+            else:
+                self.sync_due_queue(db)
+                due_ids = self.due_queue.pop_due(datetime.now())
                 try:
-                    self._fetch_single_feed(db, feed)
-                    success_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"抓取订阅源失败 (ID: {feed.id}, URL: {feed.url}): {e}")
-                    feed.status = "error"
-                    db.commit()
-                    error_count += 1
-            
-            result = {
-                "timestamp": datetime.now().isoformat(),
-                "total_feeds": total_feeds,
-                "success": success_count,
-                "error": error_count,
-                "skipped": total_feeds - success_count - error_count
-            }
+                    result = self._fetch_feeds(db, self._load_active_feeds(db, due_ids))
+                except BaseException:
+                    self._requeue(due_ids)
+                    raise
+            result["queued"] = len(self.due_queue)
             
             logger.info(f"订阅源抓取完成: {result}")
             return result
@@ -62,193 +87,653 @@ class TaskScheduler:
         finally:
             db.close()
     
-    def _fetch_single_feed(self, db: Session, feed: Feed):
-        """抓取单个订阅源"""
-        logger.info(f"抓取订阅源: {feed.name} (ID: {feed.id})")
+    def _requeue(self, feed_ids: List[int]):
+        """
+        把弹出后未能完成抓取的订阅源放回队列，下一轮立即到期
+
+        已经处理并重新安排了下次抓取时间的订阅源仍在队列中，保留它们新的到期时间。
+        同步水位之后未变更的订阅源不会被 sync_due_queue 重新加入，因此必须在这里放回。
+        """
+        now = datetime.now()
+        requeued = [feed_id for feed_id in feed_ids if feed_id not in self.due_queue]
+        for feed_id in requeued:
+            self.due_queue.push(feed_id, now)
+        if requeued:
+            logger.warning(f"抓取中断，{len(requeued)} 个订阅源已放回到期队列")
+    
+    def _fetch_feeds(self, db: Session, feeds: List[Feed]) -> dict:
+        """
+        并发下载并入库一组订阅源
         
-        # 解析 RSS 订阅源
-        feed_info = self.rss_service.parse_feed(feed.url)
-        if not feed_info:
-            raise ValueError("RSS 解析失败")
+        成功的订阅源清零失败计数并恢复为 active；失败的记录错误并按指数退避安排重试。
+        
+        Returns:
+            抓取结果统计
+        """
+        feeds_by_id = {feed.id: feed for feed in feeds}
+        total_feeds = len(feeds)
+        success_count = 0
+        error_count = 0
+        not_modified_count = 0
+        unchanged_count = 0
+        date_failures = 0
+        
+        def handle(fetch_result: dict):
+            nonlocal success_count, error_count, not_modified_count, unchanged_count, date_failures
+            feed = feeds_by_id[fetch_result["feed_id"]]
+            try:
+                if fetch_result["error"]:
+                    raise ValueError(fetch_result["error"])
+                
+                outcome = self._store_fetch_result(db, feed, fetch_result)
+                if outcome == "not_modified":
+                    not_modified_count += 1
+                elif outcome == "unchanged":
+                    unchanged_count += 1
+                success_count += 1
+                date_failures += (fetch_result["processed"] or {}).get("date_parse_failures", 0)
+                
+            except Exception as e:
+                logger.error(f"抓取订阅源失败 (ID: {feed.id}, URL: {feed.url}): {e}")
+                db.rollback()
+                self._record_failure(feed, str(e))
+                db.commit()
+                error_count += 1
+        
+        # 流式解析到已入库的条目即停止；已入库的链接一次批量查出
+        known = ArticleService.recent_urls_by_feed(db, feeds_by_id.keys(), settings.FEED_MAX_ENTRIES)
+        
+        targets = [
+            {
+                "feed_id": feed.id,
+                "url": feed.url,
+                "headers": FeedFetcher.conditional_headers(feed.etag, feed.last_modified),
+                "context": {
+                    "content_hash": feed.content_hash,
+                    "known": known[feed.id],
+                    "limit": settings.FEED_MAX_ENTRIES,
+                },
+            }
+            for feed in feeds
+        ]
+        # 结束读事务，下载期间不占用写连接
+        db.commit()
+        
+        # 下载完成的响应体在解析进程池中并发解析，入库仍在当前会话中串行进行
+        fetch_results = self.fetcher.fetch_all(
+            targets,
+            handler=handle,
+            process=parse_fetched,
+            executor=self.parse_pool.executor,
+        )
+        
+        skipped_parse = not_modified_count + unchanged_count
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "total_feeds": total_feeds,
+            "success": success_count,
+            "error": error_count,
+            "skipped": total_feeds - success_count - error_count,
+            "not_modified": not_modified_count,
+            "unchanged": unchanged_count,
+            "parsed": success_count - skipped_parse,
+            "skip_ratio": round(skipped_parse / success_count, 4) if success_count else 0.0,
+            "date_parse_failures": date_failures,
+            "latency": FeedFetcher.summarize_latency(fetch_results),
+        }
+    
+    def sync_due_queue(self, db: Session) -> int:
+        """
+        把新增或变更的订阅源同步到到期队列
+        
+        首次调用时加载所有订阅源；之后只读取 updated_at 不早于上次同步水位的订阅源，
+        活跃的按持久化的 next_fetch 入队，其余状态的出队。已删除的订阅源在弹出时丢弃。
+        
+        Returns:
+            本次同步的订阅源数量
+        """
+        watermark = db.query(func.max(Feed.updated_at)).scalar()
+        query = db.query(Feed.id, Feed.status, Feed.next_fetch)
+        if self._queue_watermark is not None:
+            query = query.filter(Feed.updated_at >= self._queue_watermark)
+        
+        now = datetime.now()
+        synced = 0
+        for feed_id, status, next_fetch in query:
+            if status == "active":
+                self.due_queue.push(feed_id, next_fetch or now)
+            else:
+                self.due_queue.remove(feed_id)
+            synced += 1
         
-        # 提取文章
-        articles = self.rss_service.extract_articles(feed_info)
+        self._queue_watermark = watermark
+        return synced
+    
+    def describe_due_queue(self, db: Session, limit: int = 50) -> dict:
+        """
+        描述到期队列的当前状态
         
-        # 保存文章到数据库
-        new_articles = 0
-        for article_data in articles:
-            # 检查文章是否已存在
-            existing = db.query(Article).filter(Article.url == article_data["url"]).first()
-            if existing:
-                continue
+        Args:
+            limit: 返回的队首条目数
             
-            # 创建新文章
-            article = Article(
-                feed_id=feed.id,
-                title=article_data["title"],
-                url=article_data["url"],
-                content=article_data["content"],
-                summary=article_data["summary"],
-                published_at=article_data["published_at"]
+        Returns:
+            队列大小、已到期数量和按到期时间排序的队首条目
+        """
+        now = datetime.now()
+        head = self.due_queue.snapshot(limit)
+        feeds = {feed.id: feed for feed in self._load_active_feeds(db, [feed_id for feed_id, _ in head])}
+        
+        items = []
+        for feed_id, due_at in head:
+            feed = feeds.get(feed_id)
+            items.append({
+                "feed_id": feed_id,
+                "name": feed.name if feed else None,
+                "interval": feed.interval if feed else None,
+                "effective_interval": feed.effective_interval if feed else None,
+                "due_at": due_at.isoformat(),
+                "due_in_seconds": round((due_at - now).total_seconds(), 1),
+            })
+        
+        return {
+            "timestamp": now.isoformat(),
+            "size": len(self.due_queue),
+            "due_now": self.due_queue.count_due(now),
+            "items": items,
+        }
+    
+    @staticmethod
+    def _load_active_feeds(db: Session, feed_ids: List[int], chunk_size: int = 500) -> List[Feed]:
+        """按 ID 分批加载活跃订阅源"""
+        feeds = []
+        for i in range(0, len(feed_ids), chunk_size):
+            chunk = feed_ids[i:i + chunk_size]
+            feeds.extend(
+                db.query(Feed).filter(Feed.id.in_(chunk), Feed.status == "active").all()
             )
-            
-            db.add(article)
-            new_articles += 1
+        return feeds
+    
+    def _reschedule(
+        self,
+        feed: Feed,
+        new_articles: int = 0,
+        publish_interval: Optional[float] = None,
+        failed: bool = False
+    ):
+        """更新订阅源的有效抓取间隔和下次抓取时间"""
+        feed.effective_interval = adapt_interval(
+            feed.interval,
+            feed.effective_interval,
+            new_articles=new_articles,
+            publish_interval=publish_interval,
+            failed=failed,
+        )
+        feed.next_fetch = next_due(datetime.now(), feed.effective_interval)
+        
+        if feed.status == "active":
+            self.due_queue.push(feed.id, feed.next_fetch)
+        else:
+            self.due_queue.remove(feed.id)
+    
+    @staticmethod
+    def _record_success(feed: Feed):
+        """抓取成功：清零失败计数并恢复为活跃状态"""
+        if feed.failure_count:
+            logger.info(f"订阅源已恢复: {feed.name}, 此前连续失败 {feed.failure_count} 次")
+        feed.status = "active"
+        feed.failure_count = 0
+        feed.last_error = None
+        feed.next_retry_at = None
+    
+    def _record_failure(self, feed: Feed, error: str):
+        """抓取失败：累计失败次数，按指数退避安排下次重试，达到阈值后熔断"""
+        feed.status = "error"
+        feed.failure_count = (feed.failure_count or 0) + 1
+        feed.last_error = error[:1000]
+        feed.next_retry_at = datetime.now() + timedelta(seconds=retry_delay(feed.failure_count))
+        self._reschedule(feed, failed=True)
+        
+        if feed.failure_count == settings.FEED_CIRCUIT_BREAKER_THRESHOLD:
+            logger.warning(
+                f"订阅源连续失败 {feed.failure_count} 次，已熔断: {feed.name}, "
+                f"此后每 {settings.FEED_RETRY_MAX_SECONDS} 秒探测一次"
+            )
+    
+    def _store_fetch_result(self, db: Session, feed: Feed, fetch_result: dict) -> str:
+        """
+        处理单个抓取结果
+        
+        Returns:
+            "not_modified"（304）、"unchanged"（响应体摘要未变）或 "parsed"
+        """
+        if fetch_result["not_modified"]:
+            self._mark_fetched(db, feed)
+            return "not_modified"
+        
+        record = fetch_result.get("processed")
+        if record is None:
+            record = parse_fetched(fetch_result["content"], feed.url, {
+                "content_hash": feed.content_hash,
+                "known": ArticleService.recent_urls(db, feed.id, settings.FEED_MAX_ENTRIES),
+            })
+        
+        if record["unchanged"]:
+            feed.etag = fetch_result["etag"]
+            feed.last_modified = fetch_result["last_modified"]
+            self._mark_fetched(db, feed)
+            return "unchanged"
+        
+        if not record["parsed_ok"]:
+            raise ValueError("RSS 解析失败")
+        
+        # 校验信息与文章在同一事务中提交，避免失败的文档在下次抓取时被当作未变化而跳过
+        feed.etag = fetch_result["etag"]
+        feed.last_modified = fetch_result["last_modified"]
+        feed.content_hash = record["content_hash"]
+        
+        self._store_articles(db, feed, record["articles"])
+        return "parsed"
+    
+    def _mark_fetched(self, db: Session, feed: Feed):
+        """记录一次无需解析的成功抓取"""
+        feed.last_fetch = datetime.now()
+        self._record_success(feed)
+        self._reschedule(feed)
+        db.commit()
+        logger.info(f"订阅源未变化，跳过解析: {feed.name}")
+    
+    def _store_articles(self, db: Session, feed: Feed, articles: List[dict]):
+        """保存提取出的文章并更新订阅源信息"""
+        # 批量去重并插入新文章，文章计数增量更新
+        new_articles = ArticleService.bulk_insert(db, feed, articles)
         
         # 更新订阅源信息
         feed.last_fetch = datetime.now()
-        feed.article_count = db.query(Article).filter(Article.feed_id == feed.id).count()
-        feed.status = "active"
+        self._record_success(feed)
+        self._reschedule(
+            feed,
+            new_articles=new_articles,
+            publish_interval=estimate_publish_interval(a["published_at"] for a in articles),
+        )
         
         db.commit()
         
-        logger.info(f"订阅源抓取完成: {feed.name}, 新增 {new_articles} 篇文章")
+        logger.info(
+            f"订阅源抓取完成: {feed.name}, 新增 {new_articles} 篇文章, "
+            f"下次抓取间隔 {feed.effective_interval} 秒"
+        )
     
-    def cleanup_old_data(self, days: int = 30) -> dict:
+    def cleanup_old_data(self, days: Optional[int] = None, archive: Optional[bool] = None) -> dict:
         """
         清理旧数据
         
+        删除早于保留期、已读且已处理的文章。通过 RetentionEngine 按主键分块删除，
+        每块一个短事务，块之间让出写锁；开启归档时删除前先写入 gzip 归档文件。
+        
         Args:
-            days: 保留天数
+            days: 保留天数，默认使用 CLEANUP_DAYS
+            archive: 是否归档，默认使用 RETENTION_ARCHIVE_ENABLED
             
         Returns:
             清理结果统计
         """
+        days = settings.CLEANUP_DAYS if days is None else days
+        archive = settings.RETENTION_ARCHIVE_ENABLED if archive is None else archive
         logger.info(f"开始清理 {days} 天前的数据...")
         
+        cutoff_date = datetime.now() - timedelta(days=days)
+        engine = RetentionEngine(archive_dir=settings.RETENTION_ARCHIVE_DIR if archive else None)
+        result = {
+            "timestamp": datetime.now().isoformat(),
+            "cutoff_date": cutoff_date.isoformat(),
+            "retention_days": days,
+            **engine.run(cutoff_date),
+        }
+        
+        logger.info(f"数据清理完成: {result}")
+        return result
+    
+    def update_feed_status(self) -> dict:
+        """
+        更新订阅源状态
+        
+        到了重试时间的出错订阅源通过抓取引擎并发重新抓取，抓取结果直接入库，
+        成功即恢复为 active，失败则继续指数退避；未到重试时间的订阅源不发出请求。
+        文章计数随写入增量维护，偏差由 reconcile_stats 校正，这里不再重新统计。
+        
+        Returns:
+            状态更新结果
+        """
+        logger.info("开始更新订阅源状态...")
+        
         db = SessionLocal()
         try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            
-            # 清理旧文章
-            old_articles = db.query(Article).filter(
-                Article.created_at < cutoff_date,
-                Article.read_status == True,
-                Article.processed_status == True
+            now = datetime.now()
+            retry_feeds = db.query(Feed).filter(
+                Feed.status == "error",
+                (Feed.next_retry_at.is_(None)) | (Feed.next_retry_at <= now),
             ).all()
             
-            deleted_count = 0
-            for article in old_articles:
-                db.delete(article)
-                deleted_count += 1
-            
+            retry_result = self._fetch_feeds(db, retry_feeds) if retry_feeds else None
+            recovered = retry_result["success"] if retry_result else 0
             db.commit()
             
+            feed_stats = StatsService.feed_stats(db)
+            circuit_open = db.scalar(
+                select(func.count(Feed.id)).where(
+                    Feed.status == "error",
+                    Feed.failure_count >= settings.FEED_CIRCUIT_BREAKER_THRESHOLD,
+                )
+            )
+            db.commit()
             result = {
                 "timestamp": datetime.now().isoformat(),
-                "cutoff_date": cutoff_date.isoformat(),
-                "deleted_articles": deleted_count,
-                "retention_days": days
+                "total_feeds": feed_stats["total"],
+                "updated": recovered,
+                "retried": len(retry_feeds),
+                "recovered": recovered,
+                "still_failing": feed_stats["error"],
+                "circuit_open": circuit_open,
             }
             
-            logger.info(f"数据清理完成: {result}")
+            logger.info(f"订阅源状态更新完成: {result}")
             return result
             
         finally:
             db.close()
     
-    def update_feed_status(self) -> dict:
+    def reconcile_stats(self) -> dict:
         """
-        更新订阅源状态
+        校对统计计数器
+        
+        触发器在写入的同一事务中维护计数器，文章写入时增量维护订阅源的 article_count，
+        正常情况下都不会出现偏差；绕过它们的写入（手工修改数据库、恢复备份）造成的偏差在这里修复。
+        校对需要全表扫描，由 run_all_tasks 每天 STATS_RECONCILE_HOUR 点运行一次。
         
         Returns:
-            状态更新结果
+            校对结果
         """
-        logger.info("开始更新订阅源状态...")
+        db = SessionLocal()
+        try:
+            drift = StatsService.reconcile(db)
+            article_counts = StatsService.reconcile_article_counts(db)
+            return {
+                "timestamp": datetime.now().isoformat(),
+                "drifted": len(drift),
+                "drift": drift,
+                "article_count_drifted": len(article_counts),
+            }
+        finally:
+            db.close()
+    
+    def process_unprocessed_articles(self, limit: Optional[int] = None, chunk_size: Optional[int] = None) -> dict:
+        """
+        处理未处理的文章，直到积压清空
+        
+        按 ID 顺序分块读取未处理的文章（键集游标，一轮内不会重复读取），
+        在调度器进程中用关键词引擎提取整块的关键词后交给分析进程池，
+        每块的结果用一条 executemany UPDATE 写回。进程池中最多同时有
+        工作进程数的两倍个块，分析和读取、写回重叠进行。
+        分析失败的块不标记为已处理，下一轮重新读取。定时任务在 AI_SERVICE_ENABLED 关闭时不调用本方法。
+        
+        启用 LLM 摘要且设置了 AI_RUN_TOKEN_BUDGET 时，每块提交时从本轮剩余预算中
+        平分出一份（剩余预算 = 总预算 - 已完成块的用量 - 在途块的份额），块内请求
+        不超过这份预算，块完成后未用完的部分归还。剩余预算用完或某块出现超出预算
+        而未发送的请求后不再读取新的块，剩下的文章留到下一轮；超出预算的文章使用规则摘要。
+        
+        Args:
+            limit: 本轮最多处理的文章数，默认处理全部积压
+            chunk_size: 每块的文章数，默认使用 ANALYSIS_CHUNK_SIZE
+            
+        Returns:
+            处理结果统计，包括开始时的积压数、剩余积压数、分析缓存命中率、LLM 请求统计和每个工作进程的吞吐量
+        """
+        chunk_size = chunk_size or settings.ANALYSIS_CHUNK_SIZE
+        started = time.perf_counter()
+        logger.info(f"开始处理未处理的文章 (限制: {limit or '无'})...")
         
         db = SessionLocal()
         try:
-            feeds = db.query(Feed).all()
-            updated_count = 0
+            backlog = StatsService.article_stats(db)["unprocessed"]
+            db.commit()
             
-            for feed in feeds:
-                # 检查是否需要更新状态
-                if feed.status == "error":
-                    # 尝试重新验证
-                    if self.rss_service.validate_feed_url(feed.url):
-                        feed.status = "active"
-                        updated_count += 1
+            last_id, claimed, processed, chunks = 0, 0, 0, 0
+            cache_hits, cache_misses = 0, 0
+            llm = Counter()
+            in_flight = set()
+            max_in_flight = max(1, self.analysis_pool.workers) * 2
+            budget = settings.AI_RUN_TOKEN_BUDGET if self.ai_service.llm_client is not None else 0
+            granted = {}
+            # 每块的关键词文档频率增量，分析结果保存成功后才计入
+            pending_frequency = {}
+            committed_frequency = False
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    grant = None
+                    if budget > 0:
+                        available = budget - llm["total_tokens"] - sum(granted.values())
+                        if available <= 0 or llm["budget_rejected"]:
+                            logger.warning(f"本轮 token 预算 {budget} 已用完，停止读取文章")
+                            exhausted = True
+                            break
+                        grant = max(1, available // (max_in_flight - len(in_flight)))
+                    size = chunk_size if limit is None else min(chunk_size, limit - claimed)
+                    articles = self._next_unprocessed_chunk(db, last_id, size) if size > 0 else []
+                    if not articles:
+                        exhausted = True
+                        break
+                    last_id = articles[-1]["id"]
+                    claimed += len(articles)
+                    chunks += 1
+                    keywords, frequency = (
+                        self._extract_keywords(articles) if self.ai_service.enabled else (None, None)
+                    )
+                    future = self.analysis_pool.submit(articles, keywords, grant)
+                    granted[future] = grant or 0
+                    pending_frequency[future] = frequency
+                    in_flight.add(future)
                 
-                # 更新文章计数
-                current_count = db.query(Article).filter(Article.feed_id == feed.id).count()
-                if current_count != feed.article_count:
-                    feed.article_count = current_count
-                    updated_count += 1
-            
+                if not in_flight:
+                    break
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    grant = granted.pop(future)
+                    frequency = pending_frequency.pop(future)
+                    try:
+                        chunk = future.result()
+                    except Exception as e:
+                        logger.error(f"文章分析失败: {e}")
+                        # 不知道失败前用了多少，按整份预算计
+                        llm["total_tokens"] += grant
+                        continue
+                    self.analysis_pool.record(chunk)
+                    cache_hits += chunk["cache_hits"]
+                    cache_misses += chunk["cache_misses"]
+                    llm.update(chunk["llm"])
+                    processed += self._store_analysis(db, chunk["results"])
+                    if frequency is not None:
+                        self.ai_service.keyword_engine.commit(frequency)
+                        committed_frequency = True
+            
+            if committed_frequency:
+                self.ai_service.keyword_engine.save()
+            
+            remaining = StatsService.article_stats(db)["unprocessed"]
             db.commit()
-            
+            elapsed = time.perf_counter() - started
+            llm_stats = None
+            if self.ai_service.llm_client is not None:
+                llm_stats = {**{key: round(value, 3) for key, value in llm.items()}, "token_budget": budget}
             result = {
                 "timestamp": datetime.now().isoformat(),
-                "total_feeds": len(feeds),
-                "updated": updated_count
+                "backlog": backlog,
+                "total": claimed,
+                "processed": processed,
+                "failed": claimed - processed,
+                "remaining": remaining,
+                "chunks": chunks,
+                "elapsed_seconds": round(elapsed, 3),
+                "articles_per_second": round(processed / elapsed, 1) if elapsed > 0 else None,
+                "cache": {
+                    "hits": cache_hits,
+                    "misses": cache_misses,
+                    "hit_rate": round(cache_hits / (cache_hits + cache_misses), 4) if cache_hits + cache_misses else None,
+                },
+                "llm": llm_stats,
+                "workers": self.analysis_pool.describe(),
             }
+            self.last_analysis = result
             
-            logger.info(f"订阅源状态更新完成: {result}")
+            logger.info(
+                f"文章处理完成: {processed}/{claimed} 篇, {chunks} 块, 剩余积压 {remaining}, "
+                f"耗时 {elapsed:.1f}s"
+            )
             return result
             
         finally:
             db.close()
     
-    def process_unprocessed_articles(self, limit: int = 100) -> dict:
+    def _extract_keywords(self, articles: List[dict]) -> Tuple[Optional[List[List[str]]], Optional[dict]]:
+        """
+        在调度器进程中提取一块文章的关键词
+
+        只打分，不修改文档频率表；返回的增量在这块的分析结果保存后由调用方提交。
+
+        Returns:
+            (关键词列表, 文档频率增量)，失败时都为 None（工作进程按词频提取）
         """
-        处理未处理的文章
+        try:
+            return self.ai_service.keyword_engine.score([article["content"] for article in articles])
+        except Exception as e:
+            logger.error(f"批量关键词提取失败: {e}")
+            return None, None
+    
+    @staticmethod
+    def _next_unprocessed_chunk(db: Session, last_id: int, size: int) -> List[dict]:
+        """
+        读取 ID 大于 last_id 的下一块未处理文章，读事务随即结束
+
+        文章不做认领标记，同一轮内靠 last_id 游标避免重复读取；分析失败的块保持未处理，下一轮重新读取。
+        """
+        rows = db.execute(
+            select(Article.id, Article.title, Article.content)
+            .where(Article.processed_status.is_(False), Article.id > last_id)
+            .order_by(Article.id)
+            .limit(size)
+        ).all()
+        db.commit()
+        return [{"id": row.id, "title": row.title, "content": row.content or ""} for row in rows]
+    
+    @staticmethod
+    def _store_analysis(db: Session, results: List[dict]) -> int:
+        """用一条 executemany UPDATE 写回一块分析结果，返回更新的文章数"""
+        if not results:
+            return 0
+        articles = Article.__table__
+        stmt = (
+            update(articles)
+            .where(articles.c.id == bindparam("article_id"))
+            .values(
+                summary=bindparam("summary"),
+                keywords=bindparam("keywords"),
+                sentiment=bindparam("sentiment"),
+                processed_status=True,
+            )
+        )
+        updated = db.execute(stmt, [
+            {
+                "article_id": result["id"],
+                "summary": result["summary"],
+                "keywords": result["keywords"],
+                "sentiment": result["sentiment"],
+            }
+            for result in results
+        ]).rowcount
+        db.commit()
+        return updated
+    
+    def download_enclosures(self, limit: Optional[int] = None) -> dict:
+        """
+        下载尚未下载的音频附件
+        
+        下载失败的附件记录失败次数和原因，按指数退避推迟下次重试，连续失败
+        DOWNLOAD_MAX_ATTEMPTS 次后不再下载，失效的附件不会一直占用每轮的名额。
         
         Args:
-            limit: 处理数量限制
+            limit: 本轮最多下载的附件数，默认使用 DOWNLOAD_BATCH_SIZE
             
         Returns:
-            处理结果统计
+            下载结果统计
         """
-        logger.info(f"开始处理未处理的文章 (限制: {limit})...")
-        
+        limit = limit or settings.DOWNLOAD_BATCH_SIZE
         db = SessionLocal()
         try:
-            # 获取未处理的文章
-            unprocessed = db.query(Article).filter(
-                Article.processed_status == False
-            ).limit(limit).all()
-            
-            if not unprocessed:
-                logger.info("没有未处理的文章")
-                return {
-                    "timestamp": datetime.now().isoformat(),
-                    "processed": 0,
-                    "total": 0
-                }
-            
-            # 准备分析数据
-            articles_data = []
-            for article in unprocessed:
-                articles_data.append({
-                    "id": article.id,
-                    "title": article.title,
-                    "content": article.content or "",
-                })
-            
-            # 批量分析
-            analysis_results = self.ai_service.batch_analyze(articles_data)
-            
-            # 更新文章
-            processed_count = 0
-            for result in analysis_results:
-                article = db.query(Article).filter(Article.id == result["id"]).first()
-                if article:
-                    article.summary = result.get("summary", article.summary)
-                    article.keywords = ", ".join(result.get("keywords", []))
-                    article.sentiment = result.get("sentiment", "neutral")
-                    article.processed_status = True
-                    processed_count += 1
+            now = datetime.now()
+            pending = db.query(
+                Article.id, Article.enclosure_url, Article.enclosure_type, Article.enclosure_failure_count
+            ).filter(
+                Article.enclosure_url.isnot(None),
+                Article.audio_sha256.is_(None),
+                Article.enclosure_retry_at.is_(None) | (Article.enclosure_retry_at <= now),
+                Article.enclosure_failure_count.is_(None)
+                | (Article.enclosure_failure_count < settings.DOWNLOAD_MAX_ATTEMPTS),
+            ).order_by(Article.id).limit(limit).all()
+            
+            if not pending:
+                return {"timestamp": now.isoformat(), "total": 0, "downloaded": 0, "failed": 0}
+            
+            # 结束读事务，下载期间不占用写连接
+            db.commit()
+            results = self.downloader.download_all(
+                {"article_id": row.id, "url": row.enclosure_url, "type": row.enclosure_type}
+                for row in pending
+            )
             
+            now = datetime.now()
+            failure_counts = {row.id: row.enclosure_failure_count or 0 for row in pending}
+            updates = []
+            for r in results:
+                if r["error"]:
+                    failures = failure_counts[r["article_id"]] + 1
+                    updates.append({
+                        "id": r["article_id"],
+                        "enclosure_failure_count": failures,
+                        "enclosure_error": r["error"][:1000],
+                        "enclosure_retry_at": now + timedelta(seconds=download_retry_delay(failures)),
+                    })
+                    if failures == settings.DOWNLOAD_MAX_ATTEMPTS:
+                        logger.warning(f"附件连续下载失败 {failures} 次，不再重试: {r['url']}")
+                else:
+                    updates.append({
+                        "id": r["article_id"],
+                        "audio_path": r["path"],
+                        "audio_size": r["size"],
+                        "audio_sha256": r["sha256"],
+                        "audio_downloaded_at": now,
+                        "enclosure_failure_count": 0,
+                        "enclosure_error": None,
+                        "enclosure_retry_at": None,
+                    })
+            # 成功和失败的行更新的列不同，分两批执行
+            for batch in (
+                [row for row in updates if "audio_sha256" in row],
+                [row for row in updates if "audio_sha256" not in row],
+            ):
+                if batch:
+                    db.execute(update(Article), batch)
             db.commit()
             
+            downloaded = sum(1 for r in results if not r["error"])
             result = {
-                "timestamp": datetime.now().isoformat(),
-                "total": len(unprocessed),
-                "processed": processed_count,
-                "failed": len(unprocessed) - processed_count
+                "timestamp": now.isoformat(),
+                "total": len(results),
+                "downloaded": downloaded,
+                "failed": len(results) - downloaded,
+                "resumed": sum(1 for r in results if r["resumed_from"]),
+                "bytes": sum(r["size"] or 0 for r in results),
             }
-            
-            logger.info(f"文章处理完成: {result}")
+            logger.info(f"附件下载完成: {result}")
             return result
             
         finally:
@@ -272,20 +757,44 @@ class TaskScheduler:
             # 1. 抓取订阅源
             results["tasks"]["fetch_feeds"] = self.fetch_all_feeds()
             
-            # 2. 处理文章
-            results["tasks"]["process_articles"] = self.process_unprocessed_articles()
+            # 2. 处理文章（AI_SERVICE_ENABLED 关闭时跳过）
+            if self.ai_service.enabled:
+                results["tasks"]["process_articles"] = self.process_unprocessed_articles()
             
             # 3. 更新状态
             results["tasks"]["update_status"] = self.update_feed_status()
             
-            # 4. 清理数据（每天运行一次）
-            if datetime.now().hour == 2:  # 凌晨2点运行
+            # 下载音频附件
+            if settings.ENCLOSURE_DOWNLOAD_ENABLED:
+                results["tasks"]["download_enclosures"] = self.download_enclosures()
+            
+            # 4. 清理数据（每天 CLEANUP_HOUR 点之后的第一轮运行一次）
+            if self.cleanup_schedule.claim():
                 results["tasks"]["cleanup"] = self.cleanup_old_data()
             
+            # 5. 校对统计计数器（每天 STATS_RECONCILE_HOUR 点之后的第一轮运行一次）
+            if self.reconcile_schedule.claim():
+                results["tasks"]["reconcile_stats"] = self.reconcile_stats()
+            
             logger.info("所有定时任务运行完成")
             return results
             
         except Exception as e:
             logger.error(f"运行定时任务失败: {e}")
             results["error"] = str(e)
-            return results
\ No newline at end of file
+            return results
+
+# 进程内共享的调度器实例
+_task_scheduler: Optional[TaskScheduler] = None
+
+def get_task_scheduler() -> TaskScheduler:
+    """获取进程内共享的任务调度器"""
+    global _task_scheduler
+    if _task_scheduler is None:
+        _task_scheduler = TaskScheduler()
+    return _task_scheduler
+
+def stop_task_scheduler():
+    """停止已创建的任务调度器实例（未创建时不做任何事）"""
+    if _task_scheduler is not None:
+        _task_scheduler.stop()
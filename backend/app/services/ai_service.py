@@ -3,25 +3,95 @@ AI 分析服务
 """
 import logging
 import json
+from collections import Counter
 from typing import Dict, Optional, List
 import re
 
+from app.core.config import settings
+from app.services.analysis_cache import AnalysisCache
+from app.services.keyword_engine import KeywordEngine
+from app.services.llm_client import LLMClient
+from app.services.text_features import PatternSet, TextScan
+
 logger = logging.getLogger(__name__)
 
+# 分析器版本，是分析结果缓存键的一部分，分析逻辑变化时必须修改
+ANALYZER_VERSION = "rules-1"
+# LLM 摘要提示的版本，提示词变化时必须修改
+SUMMARY_PROMPT_VERSION = "summary-1"
+SUMMARY_PROMPT = (
+    "You summarize podcast episodes and articles. Reply with a concise summary of at most "
+    "three sentences in the same language as the text, without any preamble."
+)
+
+# 规则分析使用的词表，逐项检查的方法和单遍匹配共用
+STOP_WORDS = {'the', 'and', 'for', 'that', 'with', 'this', 'from', 'have', 'what', 'when'}
+POSITIVE_WORDS = ('good', 'great', 'excellent', 'amazing', 'wonderful', 'best', 'love', 'happy')
+NEGATIVE_WORDS = ('bad', 'terrible', 'awful', 'worst', 'hate', 'sad', 'angry', 'problem')
+CODE_PATTERNS = ('def ', 'class ', 'import ', 'function ', 'var ', 'const ', 'console.', 'print(')
+TOPICS = {
+    'technology': ('python', 'javascript', 'java', 'programming', 'code', 'software', 'tech'),
+    'business': ('business', 'startup', 'company', 'market', 'money', 'finance', 'investment'),
+    'news': ('news', 'update', 'announcement', 'report', 'latest'),
+    'tutorial': ('tutorial', 'guide', 'how to', 'step by step', 'learn'),
+    'review': ('review', 'comparison', 'vs', 'versus', 'better', 'best'),
+}
+_LINK = re.compile(r'https?://\S+')
+
+# 编译后的模式集合
+_POSITIVE = PatternSet(POSITIVE_WORDS)
+_NEGATIVE = PatternSet(NEGATIVE_WORDS)
+_CODE = PatternSet(CODE_PATTERNS, case_sensitive=True)
+_TOPICS = {topic: PatternSet(keywords) for topic, keywords in TOPICS.items()}
+
 class AIService:
     """AI 分析服务类"""
     
-    def __init__(self, enabled: bool = True):
-        self.enabled = enabled
-        logger.info(f"AI 服务初始化: {'已启用' if enabled else '已禁用'}")
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        keyword_engine: Optional[KeywordEngine] = None,
+        cache: Optional[AnalysisCache] = None,
+        llm_client: Optional[LLMClient] = None,
+        use_keyword_engine: bool = True,
+    ):
+        self.enabled = settings.AI_SERVICE_ENABLED if enabled is None else enabled
+        self._keyword_engine = keyword_engine
+        # 分析工作进程不使用关键词引擎：文档频率表只由调度器进程更新和保存
+        self.use_keyword_engine = use_keyword_engine
+        if cache is None and settings.ANALYSIS_CACHE_ENABLED:
+            cache = AnalysisCache()
+        self.cache = cache
+        if llm_client is None and settings.AI_LLM_ENABLED:
+            llm_client = LLMClient()
+        self.llm_client = llm_client
+        logger.info(f"AI 服务初始化: {'已启用' if self.enabled else '已禁用'}")
+    
+    @property
+    def keyword_engine(self) -> KeywordEngine:
+        """关键词引擎，首次使用时读取文档频率表（分析工作进程不需要）"""
+        if self._keyword_engine is None:
+            self._keyword_engine = KeywordEngine()
+        return self._keyword_engine
+    
+    @property
+    def version(self) -> str:
+        """分析器版本，缓存的分析结果只在版本相同时复用（使用 LLM 摘要时包含提示版本和模型）"""
+        if self.llm_client is None:
+            return ANALYZER_VERSION
+        return f"{ANALYZER_VERSION}+{SUMMARY_PROMPT_VERSION}:{self.llm_client.model}"
     
-    def analyze_article(self, content: str, title: str = "") -> Dict:
+    def analyze_article(self, content: str, title: str = "", keywords: Optional[List[str]] = None) -> Dict:
         """
         分析文章内容
         
+        先按规范化内容摘要查分析结果缓存，未命中时分析并写入缓存。
+        配置了 LLM 客户端时用 LLM 生成摘要，请求失败时退回规则摘要，这样的结果不写入缓存。
+        
         Args:
             content: 文章内容
             title: 文章标题
+            keywords: 已由关键词引擎提取的关键词，为空时按词频提取
             
         Returns:
             分析结果
@@ -30,19 +100,35 @@ class AIService:
             logger.warning("AI 服务已禁用，返回默认分析结果")
             return self._get_default_analysis(content, title)
         
+        content_hash = None
+        if self.cache is not None:
+            content_hash = AnalysisCache.content_hash(content, title)
+            cached = self.cache.get(content_hash, self.version)
+            if cached is not None:
+                return self._with_keywords(cached, keywords)
+        
+        summary = self._llm_summaries([(content, title)])[0] if self.llm_client is not None else None
+        analysis = self._analyze(content, title, keywords, summary)
+        if analysis is None:
+            return self._get_default_analysis(content, title)
+        if content_hash is not None and (self.llm_client is None or summary is not None):
+            self.cache.put(content_hash, self.version, analysis)
+        return analysis
+    
+    def _analyze(
+        self,
+        content: str,
+        title: str = "",
+        keywords: Optional[List[str]] = None,
+        summary: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """分析文章内容（不经过缓存），失败时返回 None；没有传入 LLM 摘要时使用规则摘要"""
         try:
-            # 这里应该调用实际的 AI 服务
-            # 暂时使用基于规则的分析
-            
             analysis = {
-                "summary": self._generate_summary(content),
-                "keywords": self._extract_keywords(content),
-                "sentiment": self._analyze_sentiment(content),
+                "summary": summary or self._generate_summary(content),
                 "length": len(content),
                 "read_time_minutes": self._calculate_read_time(content),
-                "has_code": self._check_has_code(content),
-                "has_links": self._check_has_links(content),
-                "topic": self._identify_topic(content, title),
+                **self._match_features(content, title, keywords),
             }
             
             logger.info(f"文章分析完成: {title}, 长度: {len(content)} 字符")
@@ -50,7 +136,75 @@ class AIService:
             
         except Exception as e:
             logger.error(f"文章分析失败: {e}")
-            return self._get_default_analysis(content, title)
+            return None
+    
+    def _llm_summaries(self, items: List[tuple], token_budget: Optional[int] = None) -> List[Optional[str]]:
+        """
+        用 LLM 客户端在一轮中并发生成一批摘要
+
+        Args:
+            items: (正文, 标题) 列表
+            token_budget: 本轮的 token 预算，默认使用客户端的预算
+
+        Returns:
+            与 items 一一对应的摘要，请求失败或超出预算时为 None
+        """
+        prompts = [
+            [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"{title}\n\n{(content or '')[:settings.AI_MAX_INPUT_CHARS]}".strip()},
+            ]
+            for content, title in items
+        ]
+        try:
+            results = self.llm_client.complete_many(prompts, token_budget)
+        except Exception as e:
+            logger.error(f"LLM 摘要生成失败: {e}")
+            return [None] * len(items)
+        return [(result or {}).get("content") or None for result in results]
+    
+    @staticmethod
+    def _with_keywords(analysis: Dict, keywords: Optional[List[str]]) -> Dict:
+        """缓存命中时用本次提取的关键词替换缓存中的关键词"""
+        if keywords is not None:
+            analysis["keywords"] = keywords
+        return analysis
+    
+    def _match_features(self, content: str, title: str = "", keywords: Optional[List[str]] = None) -> Dict:
+        """
+        单遍提取关键词、情感、代码、链接和主题
+
+        正文只转小写和分词一次，所有词表在 TextScan 的词表缓冲区上匹配，
+        结果与 _extract_keywords、_analyze_sentiment、_check_has_code、
+        _check_has_links、_identify_topic 逐项计算的结果一致。传入 keywords 时直接使用。
+        """
+        scan = TextScan(content)
+        
+        if keywords is None:
+            counts = Counter({
+                word: count for word, count in scan.words.items() if len(word) >= 3 and word not in STOP_WORDS
+            })
+            keywords = [word for word, _ in counts.most_common(10)]
+        
+        positive_count = _POSITIVE.count(scan)
+        negative_count = _NEGATIVE.count(scan)
+        if positive_count > negative_count:
+            sentiment = "positive"
+        elif negative_count > positive_count:
+            sentiment = "negative"
+        else:
+            sentiment = "neutral"
+        
+        topic_scan = TextScan(title).merge(scan)
+        topic = next((name for name, patterns in _TOPICS.items() if patterns.any(topic_scan)), "general")
+        
+        return {
+            "keywords": keywords,
+            "sentiment": sentiment,
+            "has_code": _CODE.any(scan),
+            "has_links": bool(_LINK.search(content)),
+            "topic": topic,
+        }
     
     def _generate_summary(self, content: str, max_length: int = 300) -> str:
         """生成文章摘要"""
@@ -75,11 +229,9 @@ class AIService:
         words = re.findall(r'\b\w{3,}\b', content.lower())
         
         # 过滤常见停用词
-        stop_words = {'the', 'and', 'for', 'that', 'with', 'this', 'from', 'have', 'what', 'when'}
-        filtered_words = [word for word in words if word not in stop_words]
+        filtered_words = [word for word in words if word not in STOP_WORDS]
         
         # 统计词频
-        from collections import Counter
         word_counts = Counter(filtered_words)
         
         # 返回最常见的词
@@ -92,13 +244,10 @@ class AIService:
             return "neutral"
         
         # 简单的情感分析：基于关键词
-        positive_words = {'good', 'great', 'excellent', 'amazing', 'wonderful', 'best', 'love', 'happy'}
-        negative_words = {'bad', 'terrible', 'awful', 'worst', 'hate', 'sad', 'angry', 'problem'}
-        
         content_lower = content.lower()
         
-        positive_count = sum(1 for word in positive_words if word in content_lower)
-        negative_count = sum(1 for word in negative_words if word in content_lower)
+        positive_count = sum(1 for word in POSITIVE_WORDS if word in content_lower)
+        negative_count = sum(1 for word in NEGATIVE_WORDS if word in content_lower)
         
         if positive_count > negative_count:
             return "positive"
@@ -118,27 +267,17 @@ class AIService:
     
     def _check_has_code(self, content: str) -> bool:
         """检查是否包含代码"""
-        code_patterns = ['def ', 'class ', 'import ', 'function ', 'var ', 'const ', 'console.', 'print(']
-        return any(pattern in content for pattern in code_patterns)
+        return any(pattern in content for pattern in CODE_PATTERNS)
     
     def _check_has_links(self, content: str) -> bool:
         """检查是否包含链接"""
-        url_pattern = r'https?://\S+'
-        return bool(re.search(url_pattern, content))
+        return bool(_LINK.search(content))
     
     def _identify_topic(self, content: str, title: str = "") -> str:
         """识别主题"""
-        topics = {
-            'technology': ['python', 'javascript', 'java', 'programming', 'code', 'software', 'tech'],
-            'business': ['business', 'startup', 'company', 'market', 'money', 'finance', 'investment'],
-            'news': ['news', 'update', 'announcement', 'report', 'latest'],
-            'tutorial': ['tutorial', 'guide', 'how to', 'step by step', 'learn'],
-            'review': ['review', 'comparison', 'vs', 'versus', 'better', 'best'],
-        }
-        
         text = (title + " " + content).lower()
         
-        for topic, keywords in topics.items():
+        for topic, keywords in TOPICS.items():
             if any(keyword in text for keyword in keywords):
                 return topic
         
@@ -157,24 +296,76 @@ class AIService:
             "topic": "general",
         }
     
-    def batch_analyze(self, articles: List[Dict]) -> List[Dict]:
+    def batch_analyze(
+        self,
+        articles: List[Dict],
+        keywords: Optional[List[List[str]]] = None,
+        token_budget: Optional[int] = None,
+    ) -> List[Dict]:
         """
         批量分析文章
         
+        整批文章的关键词由关键词引擎按语料 TF-IDF 一次提取，并更新持久化的文档频率表；
+        引擎失败或不使用关键词引擎（分析工作进程）时按单篇词频提取。分析结果缓存用一次批量查询检查整批文章，
+        同一批中内容相同的文章只分析一次，新的结果在最后一次写入缓存。
+        配置了 LLM 客户端时，缓存未命中的文章的摘要在一轮中并发请求，而不是逐篇阻塞调用。
+        
         Args:
             articles: 文章列表，每个元素包含 'content' 和 'title'
+            keywords: 已提取的关键词（与 articles 一一对应），传入时不再调用关键词引擎
+            token_budget: 本批 LLM 请求的 token 预算，默认使用 LLM 客户端的预算
             
         Returns:
             分析结果列表
         """
         results = []
         
+        batch_keywords = keywords
+        if batch_keywords is None and self.enabled and self.use_keyword_engine and articles:
+            try:
+                batch_keywords = self.keyword_engine.extract([article.get('content') or '' for article in articles])
+                self.keyword_engine.save()
+            except Exception as e:
+                logger.error(f"批量关键词提取失败: {e}")
+        
+        hashes = None
+        cached, fresh = {}, {}
+        if self.enabled and self.cache is not None and articles:
+            hashes = [
+                AnalysisCache.content_hash(article.get('content') or '', article.get('title') or '')
+                for article in articles
+            ]
+            cached = self.cache.get_many(hashes, self.version)
+        
+        # 需要分析的文章（同一内容只取第一篇）的 LLM 摘要，键为内容摘要或文章下标
+        summaries = {}
+        use_llm = self.enabled and self.llm_client is not None and bool(articles)
+        if use_llm:
+            pending = {}
+            for i, article in enumerate(articles):
+                key = hashes[i] if hashes is not None else i
+                if key not in cached:
+                    pending.setdefault(key, (article.get('content') or '', article.get('title') or ''))
+            summaries = dict(zip(pending, self._llm_summaries(list(pending.values()), token_budget)))
+        
         for i, article in enumerate(articles):
             try:
-                analysis = self.analyze_article(
-                    article.get('content', ''),
-                    article.get('title', '')
-                )
+                content = article.get('content', '')
+                title = article.get('title', '')
+                article_keywords = batch_keywords[i] if batch_keywords is not None else None
+                if hashes is None and not use_llm:
+                    analysis = self.analyze_article(content, title, article_keywords)
+                elif hashes is not None and (hashes[i] in cached or hashes[i] in fresh):
+                    known = cached.get(hashes[i]) or fresh[hashes[i]]
+                    analysis = self._with_keywords(dict(known), article_keywords)
+                else:
+                    summary = summaries.get(hashes[i] if hashes is not None else i)
+                    analysis = self._analyze(content, title, article_keywords, summary)
+                    if analysis is None:
+                        analysis = self._get_default_analysis(content, title)
+                    elif hashes is not None and (not use_llm or summary is not None):
+                        # LLM 请求失败时的规则摘要不缓存，下次重新请求
+                        fresh[hashes[i]] = analysis
                 results.append({
                     **article,
                     **analysis
@@ -191,5 +382,8 @@ class AIService:
                     **self._get_default_analysis(article.get('content', ''), article.get('title', ''))
                 })
         
+        if fresh:
+            self.cache.put_many(fresh, self.version)
+        
         logger.info(f"批量分析完成: {len(results)}/{len(articles)} 篇文章")
         return results
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+文章分析结果缓存
+"""
+import hashlib
+import json
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, func, insert, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import AnalysisCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# IN 列表的分块大小，保证绑定参数数量低于 SQLite 的默认上限
+CHUNK_SIZE = 400
+
+class AnalysisCache:
+    """
+    分析结果缓存：进程内 LRU + SQLite 持久化存储
+
+    同一段正文经常出现在多个订阅源和 URL 下（镜像、转载），按规范化后的标题和正文摘要
+    加分析器版本作为键，命中时直接返回之前的分析结果。先查进程内 LRU，未命中再查
+    analysis_cache 表；存储的结果总字节数超过 max_bytes 时按最近使用时间淘汰到 90%。
+    存储读写失败只记录日志并按未命中处理，不影响分析本身。
+    """
+
+    # 每写入多少条结果检查一次存储大小
+    EVICT_INTERVAL = 100
+    # 命中时只刷新超过这么久没有刷新的条目的最近使用时间，多数命中不产生写入
+    TOUCH_INTERVAL = timedelta(minutes=10)
+
+    def __init__(
+        self,
+        memory_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        session_factory=SessionLocal,
+    ):
+        self.memory_entries = settings.ANALYSIS_CACHE_MEMORY_ENTRIES if memory_entries is None else memory_entries
+        self.max_bytes = max_bytes or settings.ANALYSIS_CACHE_MAX_BYTES
+        self.session_factory = session_factory
+        self._memory: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evicted = 0
+
+    @staticmethod
+    def content_hash(content: str, title: str = "") -> str:
+        """
+        规范化内容的 SHA-256
+
+        NFKC 规范化并把连续空白合并为一个空格，排版上的差异（换行、缩进、全角字符）
+        不影响摘要。标题参与摘要，因为主题识别会用到标题。
+        """
+        def normalize(text: str) -> str:
+            return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+        return hashlib.sha256(f"{normalize(title)}\x00{normalize(content)}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: tuple, analysis: Dict):
+        """写入进程内 LRU，超出容量时丢弃最久未使用的条目"""
+        if self.memory_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = analysis
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, hashes: Iterable[str], version: str) -> Dict[str, Dict]:
+        """
+        批量查找分析结果
+
+        Args:
+            hashes: 内容摘要，重复的摘要只查一次
+            version: 分析器版本
+
+        Returns:
+            命中的内容摘要到分析结果（副本）的映射
+        """
+        found: Dict[str, Dict] = {}
+        missing = []
+        with self._lock:
+            for content_hash in dict.fromkeys(hashes):
+                analysis = self._memory.get((content_hash, version))
+                if analysis is None:
+                    missing.append(content_hash)
+                else:
+                    self._memory.move_to_end((content_hash, version))
+                    found[content_hash] = dict(analysis)
+            self.memory_hits += len(found)
+
+        if missing:
+            loaded = self._load(missing, version)
+            for content_hash, analysis in loaded.items():
+                self._remember((content_hash, version), analysis)
+                found[content_hash] = dict(analysis)
+            with self._lock:
+                self.store_hits += len(loaded)
+                self.misses += len(missing) - len(loaded)
+        return found
+
+    def get(self, content_hash: str, version: str) -> Optional[Dict]:
+        """查找单个分析结果"""
+        return self.get_many([content_hash], version).get(content_hash)
+
+    def _load(self, hashes: list, version: str) -> Dict[str, Dict]:
+        """
+        从存储读取分析结果，并刷新其中较久未刷新的条目的最近使用时间
+
+        多个分析进程同时命中时每次刷新都要争用写锁；最近使用时间只用于按大小淘汰，
+        精确到 TOUCH_INTERVAL 即可，因此只有超过这个时间没有刷新的命中才写回，
+        hit_count 相应地记录刷新次数。
+        """
+        loaded = {}
+        stale = []
+        now = datetime.now()
+        touch_before = now - self.TOUCH_INTERVAL
+        db = self.session_factory()
+        try:
+            for i in range(0, len(hashes), CHUNK_SIZE):
+                chunk = hashes[i:i + CHUNK_SIZE]
+                rows = db.execute(
+                    select(
+                        AnalysisCacheEntry.content_hash, AnalysisCacheEntry.result, AnalysisCacheEntry.last_used_at
+                    ).where(AnalysisCacheEntry.version == version, AnalysisCacheEntry.content_hash.in_(chunk))
+                ).all()
+                for content_hash, result, last_used_at in rows:
+                    loaded[content_hash] = json.loads(result)
+                    if last_used_at is None or last_used_at < touch_before:
+                        stale.append(content_hash)
+            for i in range(0, len(stale), CHUNK_SIZE):
+                db.execute(
+                    update(AnalysisCacheEntry)
+                    .where(
+                        AnalysisCacheEntry.version == version,
+                        AnalysisCacheEntry.content_hash.in_(stale[i:i + CHUNK_SIZE]),
+                        # 其他进程可能刚刚刷新过
+                        (AnalysisCacheEntry.last_used_at < touch_before) | AnalysisCacheEntry.last_used_at.is_(None),
+                    )
+                    .values(last_used_at=now, hit_count=AnalysisCacheEntry.hit_count + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            db.rollback()
+            logger.warning(f"读取分析缓存失败: {e}")
+        finally:
+            db.close()
+        return loaded
+
+    @staticmethod
+    def _upsert(db: Session):
+        """构建按 (content_hash, version) 覆盖已有结果的插入语句"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return insert(AnalysisCacheEntry)
+        stmt = dialect_insert(AnalysisCacheEntry)
+        return stmt.on_conflict_do_update(
+            index_elements=["content_hash", "version"],
+            set_={"result": stmt.excluded.result, "size": stmt.excluded.size, "last_used_at": stmt.excluded.last_used_at},
+        )
+
+    def put_many(self, analyses: Dict[str, Dict], version: str):
+        """
+        写入分析结果（已存在的键覆盖）
+
+        Args:
+            analyses: 内容摘要到分析结果的映射
+            version: 分析器版本
+        """
+        if not analyses:
+            return
+        now = datetime.now()
+        rows = []
+        for content_hash, analysis in analyses.items():
+            self._remember((content_hash, version), dict(analysis))
+            result = json.dumps(analysis, ensure_ascii=False)
+            rows.append({
+                "content_hash": content_hash,
+                "version": version,
+                "result": result,
+                "size": len(result.encode("utf-8")),
+                "hit_count": 0,
+                "created_at": now,
+                "last_used_at": now,
+            })
+
+        db = self.session_factory()
+        try:
+            stmt = self._upsert(db)
+            for i in range(0, len(rows), CHUNK_SIZE):
+                db.execute(stmt, rows[i:i + CHUNK_SIZE])
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"写入分析缓存失败: {e}")
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            self.puts += len(rows)
+            self._puts_since_evict += len(rows)
+            due = self._puts_since_evict >= self.EVICT_INTERVAL
+            if due:
+                self._puts_since_evict = 0
+        if due:
+            self.evict()
+
+    def put(self, content_hash: str, version: str, analysis: Dict):
+        """写入单个分析结果"""
+        self.put_many({content_hash: analysis}, version)
+
+    def evict(self) -> int:
+        """
+        存储超过 max_bytes 时按最近使用时间从旧到新淘汰，直到不超过 max_bytes 的 90%
+
+        Returns:
+            淘汰的条目数
+        """
+        removed = 0
+        db = self.session_factory()
+        try:
+            total = db.scalar(select(func.coalesce(func.sum(AnalysisCacheEntry.size), 0)))
+            if total <= self.max_bytes:
+                return 0
+            target = int(self.max_bytes * 0.9)
+            while total > target:
+                rows = db.execute(
+                    select(AnalysisCacheEntry.content_hash, AnalysisCacheEntry.version, AnalysisCacheEntry.size)
+                    .order_by(AnalysisCacheEntry.last_used_at)
+                    .limit(CHUNK_SIZE)
+                ).all()
+                if not rows:
+                    break
+                victims = []
+                for content_hash, version, size in rows:
+                    victims.append((content_hash, version))
+                    total -= size
+                    if total <= target:
+                        break
+                db.execute(
+                    delete(AnalysisCacheEntry).where(
+                        tuple_(AnalysisCacheEntry.content_hash, AnalysisCacheEntry.version).in_(victims)
+                    )
+                )
+                db.commit()
+                removed += len(victims)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.warning(f"淘汰分析缓存失败: {e}")
+        finally:
+            db.close()
+
+        if removed:
+            with self._lock:
+                self.evicted += removed
+            logger.info(f"分析缓存淘汰 {removed} 条")
+        return removed
+
+    def stats(self) -> Dict:
+        """命中统计：进程内命中、存储命中、未命中、命中率和淘汰数"""
+        with self._lock:
+            hits = self.memory_hits + self.store_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "store_hits": self.store_hits,
+                "hits": hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "memory_entries": len(self._memory),
+                "puts": self.puts,
+                "evicted": self.evicted,
+            }
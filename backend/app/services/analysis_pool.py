@@ -0,0 +1,173 @@
+"""
+文章分析进程池
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 工作进程内的分析服务，首次使用时创建
+_service = None
+# 本进程分得 LLM 限流的 1/_llm_share，由进程池的 initializer 设置为工作进程数
+_llm_share = 1
+
+def _init_worker(workers: int):
+    """工作进程初始化：记录工作进程数，LLM 的请求数和 token 数限流在各工作进程间平分"""
+    global _llm_share
+    _llm_share = max(1, workers)
+
+def _create_service():
+    """创建工作进程内的分析服务，LLM 客户端使用本进程分得的限流份额"""
+    from app.services.ai_service import AIService
+    from app.services.llm_client import LLMClient
+
+    llm_client = None
+    if settings.AI_LLM_ENABLED:
+        llm_client = LLMClient(
+            requests_per_minute=settings.AI_REQUESTS_PER_MINUTE / _llm_share,
+            tokens_per_minute=settings.AI_TOKENS_PER_MINUTE / _llm_share,
+        )
+    return AIService(use_keyword_engine=False, llm_client=llm_client)
+
+def analyze_chunk(
+    articles: List[Dict],
+    keywords: Optional[List[List[str]]] = None,
+    token_budget: Optional[int] = None,
+) -> Dict:
+    """
+    分析一块文章（进程池工作函数）
+
+    关键词由调度器进程的关键词引擎提取后传入（文档频率表只在一个进程中维护和保存），
+    未传入时按单篇词频提取；摘要、情感等逐篇规则分析在工作进程中完成，只把需要写回数据库的字段返回。
+
+    Args:
+        articles: 文章列表，每个元素包含 'id'、'title' 和 'content'
+        keywords: 与 articles 一一对应的关键词
+        token_budget: 本块 LLM 摘要请求的 token 预算，由调度器从本轮预算中分配
+
+    Returns:
+        包含 worker（进程号）、elapsed（分析耗时秒数）、cache_hits / cache_misses
+        （本块的分析缓存命中和未命中数）、llm（本块的 LLM 请求统计，未启用时为空）和 results 的字典
+    """
+    global _service
+    if _service is None:
+        _service = _create_service()
+
+    before = _service.cache.stats() if _service.cache is not None else None
+    llm_before = _service.llm_client.stats() if _service.llm_client is not None else {}
+    started = time.perf_counter()
+    analyzed = _service.batch_analyze(articles, keywords=keywords, token_budget=token_budget)
+    elapsed = time.perf_counter() - started
+    after = _service.cache.stats() if _service.cache is not None else None
+    llm_after = _service.llm_client.stats() if _service.llm_client is not None else {}
+    return {
+        "worker": os.getpid(),
+        "elapsed": elapsed,
+        "cache_hits": after["hits"] - before["hits"] if before else 0,
+        "cache_misses": after["misses"] - before["misses"] if before else 0,
+        "llm": {key: llm_after[key] - llm_before[key] for key in llm_after},
+        "results": [
+            {
+                "id": result["id"],
+                "summary": result.get("summary"),
+                "keywords": ", ".join(result.get("keywords", [])),
+                "sentiment": result.get("sentiment", "neutral"),
+            }
+            for result in analyzed
+        ],
+    }
+
+def _rate(hits: int, misses: int) -> Optional[float]:
+    """命中率，没有查找时为 None"""
+    return round(hits / (hits + misses), 4) if hits + misses else None
+
+class AnalysisPool:
+    """
+    文章分析进程池
+
+    workers 为 0 时在调度器进程内同步分析；为 -1 时按 CPU 核数创建工作进程。
+    进程池在首次使用时创建并在调度器生命周期内复用，同时按工作进程累计吞吐量。
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        workers = settings.ANALYSIS_WORKERS if workers is None else workers
+        if workers < 0:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._worker_stats: Dict[int, Dict] = {}
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """分析进程池，workers 为 0 时返回 None"""
+        if self.workers == 0:
+            return None
+        if self._executor is None:
+            # 与解析进程池相同，使用 spawn 避免 fork 调度器进程中的锁和数据库连接
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.workers,),
+            )
+            logger.info(f"分析进程池已启动: {self.workers} 个工作进程")
+        return self._executor
+
+    def submit(
+        self,
+        articles: List[Dict],
+        keywords: Optional[List[List[str]]] = None,
+        token_budget: Optional[int] = None,
+    ) -> Future:
+        """提交一块文章，workers 为 0 时同步分析并返回已完成的 Future"""
+        executor = self.executor
+        if executor is not None:
+            return executor.submit(analyze_chunk, articles, keywords, token_budget)
+        future = Future()
+        try:
+            future.set_result(analyze_chunk(articles, keywords, token_budget))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def record(self, chunk: Dict):
+        """累计一块分析结果的工作进程吞吐量"""
+        with self._lock:
+            stats = self._worker_stats.setdefault(
+                chunk["worker"], {"chunks": 0, "articles": 0, "busy_seconds": 0.0, "cache_hits": 0, "cache_misses": 0}
+            )
+            stats["chunks"] += 1
+            stats["articles"] += len(chunk["results"])
+            stats["busy_seconds"] += chunk["elapsed"]
+            stats["cache_hits"] += chunk["cache_hits"]
+            stats["cache_misses"] += chunk["cache_misses"]
+
+    def describe(self) -> List[Dict]:
+        """每个工作进程累计的块数、文章数、分析耗时、吞吐量（篇/秒）和分析缓存命中率"""
+        with self._lock:
+            return [
+                {
+                    "worker": worker,
+                    "chunks": stats["chunks"],
+                    "articles": stats["articles"],
+                    "busy_seconds": round(stats["busy_seconds"], 3),
+                    "articles_per_second": round(stats["articles"] / stats["busy_seconds"], 1)
+                    if stats["busy_seconds"] > 0 else None,
+                    "cache_hit_rate": _rate(stats["cache_hits"], stats["cache_misses"]),
+                }
+                for worker, stats in sorted(self._worker_stats.items())
+            ]
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,262 @@
+"""
+文章服务
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.database import Article, Feed
+
+logger = logging.getLogger(__name__)
+
+# IN 列表和多行插入的分块大小，保证绑定参数数量低于 SQLite 的默认上限
+CHUNK_SIZE = 500
+
+class ArticleService:
+    """文章服务类"""
+
+    @staticmethod
+    def existing_urls(db: Session, urls: Iterable[str]) -> Set[str]:
+        """
+        批量查询已存在的文章 URL
+
+        Args:
+            urls: 待检查的 URL
+
+        Returns:
+            数据库中已存在的 URL 集合
+        """
+        urls = list(urls)
+        existing = set()
+        for i in range(0, len(urls), CHUNK_SIZE):
+            chunk = urls[i:i + CHUNK_SIZE]
+            existing.update(db.execute(select(Article.url).where(Article.url.in_(chunk))).scalars())
+        return existing
+
+    @staticmethod
+    def recent_urls(db: Session, feed_id: int, limit: int) -> Set[str]:
+        """
+        获取订阅源最近入库的文章 URL
+
+        用作流式解析的停止条件：解析到其中任意一条即说明之后的条目都已入库。
+
+        Args:
+            feed_id: 订阅源 ID
+            limit: 返回数量
+
+        Returns:
+            URL 集合
+        """
+        return set(
+            db.execute(
+                select(Article.url)
+                .where(Article.feed_id == feed_id)
+                .order_by(Article.id.desc())
+                .limit(limit)
+            ).scalars()
+        )
+
+    @staticmethod
+    def recent_urls_by_feed(db: Session, feed_ids: Iterable[int], limit: int) -> Dict[int, Set[str]]:
+        """
+        批量获取多个订阅源最近入库的文章 URL
+
+        每块订阅源只执行一次按 feed_id 分区的窗口查询。
+
+        Args:
+            feed_ids: 订阅源 ID
+            limit: 每个订阅源返回的数量
+
+        Returns:
+            订阅源 ID -> URL 集合
+        """
+        feed_ids = list(feed_ids)
+        urls: Dict[int, Set[str]] = {feed_id: set() for feed_id in feed_ids}
+        for i in range(0, len(feed_ids), CHUNK_SIZE):
+            chunk = feed_ids[i:i + CHUNK_SIZE]
+            ranked = (
+                select(
+                    Article.feed_id,
+                    Article.url,
+                    func.row_number()
+                    .over(partition_by=Article.feed_id, order_by=Article.id.desc())
+                    .label("rank"),
+                )
+                .where(Article.feed_id.in_(chunk))
+                .subquery()
+            )
+            rows = db.execute(select(ranked.c.feed_id, ranked.c.url).where(ranked.c.rank <= limit))
+            for feed_id, url in rows:
+                urls[feed_id].add(url)
+        return urls
+
+    @staticmethod
+    def bulk_insert(db: Session, feed: Feed, articles: List[Dict]) -> int:
+        """
+        批量插入订阅源的新文章
+
+        每块执行一次集合查询过滤已存在的 URL，再用一条 executemany 插入剩余文章；
+        插入语句带 ON CONFLICT DO NOTHING（SQLite / PostgreSQL），并发写入同一 URL 时不会失败。
+        订阅源的 article_count 按实际插入行数增量更新。调用方负责提交事务。
+
+        Args:
+            feed: 所属订阅源
+            articles: RSSService.extract_articles 返回的文章列表
+
+        Returns:
+            新增文章数
+        """
+        rows = {}
+        for article_data in articles:
+            url = article_data.get("url")
+            if not url or url in rows:
+                continue
+            rows[url] = {
+                "feed_id": feed.id,
+                "title": article_data["title"],
+                "url": url,
+                "content": article_data["content"],
+                "summary": article_data["summary"],
+                "published_at": article_data["published_at"],
+                "enclosure_url": article_data.get("enclosure_url"),
+                "enclosure_type": article_data.get("enclosure_type"),
+                "enclosure_length": article_data.get("enclosure_length"),
+            }
+
+        if not rows:
+            return 0
+
+        existing = ArticleService.existing_urls(db, rows.keys())
+        new_rows = [row for url, row in rows.items() if url not in existing]
+        if not new_rows:
+            return 0
+
+        result = db.execute(ArticleService._insert_ignore(db), new_rows)
+        inserted = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(new_rows)
+
+        feed.article_count = (feed.article_count or 0) + inserted
+        return inserted
+
+    @staticmethod
+    def _insert_ignore(db: Session, table=None):
+        """
+        构建忽略 URL 冲突的插入语句
+
+        Args:
+            table: 插入的表，默认是文章表，需要在 url 列上有唯一约束
+        """
+        table = Article.__table__ if table is None else table
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return insert(table)
+        return dialect_insert(table).on_conflict_do_nothing(index_elements=["url"])
+
+    @staticmethod
+    def _batch_filters(
+        ids: Optional[List[int]],
+        feed_id: Optional[int],
+        published_before: Optional[datetime]
+    ) -> List[list]:
+        """
+        把批量操作的选择条件拆成若干组过滤条件
+
+        ID 列表按 CHUNK_SIZE 分块，每块一组；没有 ID 列表时只有一组。
+        ids 为空列表表示不选择任何文章。
+        """
+        filters = []
+        if feed_id is not None:
+            filters.append(Article.feed_id == feed_id)
+        if published_before is not None:
+            filters.append(Article.published_at < published_before)
+        if ids is None:
+            return [filters]
+        ids = sorted(set(ids))
+        return [
+            filters + [Article.id.in_(ids[i:i + CHUNK_SIZE])]
+            for i in range(0, len(ids), CHUNK_SIZE)
+        ]
+
+    @staticmethod
+    def set_read_status(
+        db: Session,
+        read_status: bool,
+        ids: Optional[List[int]] = None,
+        feed_id: Optional[int] = None,
+        published_before: Optional[datetime] = None
+    ) -> int:
+        """
+        批量修改文章的阅读状态
+
+        每块执行一条 UPDATE，只改动状态不同的文章；统计计数器由触发器逐行增量维护。
+        调用方负责提交事务。
+
+        Args:
+            read_status: 目标状态
+            ids: 文章 ID 列表
+            feed_id: 只修改该订阅源的文章
+            published_before: 只修改发布时间早于该时间的文章
+
+        Returns:
+            状态发生变化的文章数
+        """
+        changed = 0
+        for filters in ArticleService._batch_filters(ids, feed_id, published_before):
+            result = db.execute(
+                update(Article)
+                .where(*filters, Article.read_status != read_status)
+                .values(read_status=read_status)
+                .execution_options(synchronize_session=False)
+            )
+            changed += result.rowcount
+        return changed
+
+    @staticmethod
+    def delete_articles(
+        db: Session,
+        ids: Optional[List[int]] = None,
+        feed_id: Optional[int] = None,
+        published_before: Optional[datetime] = None
+    ) -> int:
+        """
+        批量删除文章
+
+        每块执行一条 DELETE ... RETURNING feed_id（SQLite 3.35+ / PostgreSQL），
+        按返回的订阅源增量扣减 article_count，不再对每个订阅源重新 COUNT(*)。
+        调用方负责提交事务。
+
+        Args:
+            ids: 文章 ID 列表
+            feed_id: 只删除该订阅源的文章
+            published_before: 只删除发布时间早于该时间的文章
+
+        Returns:
+            删除的文章数
+        """
+        removed: Counter = Counter()
+        for filters in ArticleService._batch_filters(ids, feed_id, published_before):
+            result = db.execute(
+                delete(Article)
+                .where(*filters)
+                .returning(Article.feed_id)
+                .execution_options(synchronize_session=False)
+            )
+            removed.update(result.scalars())
+
+        params = [{"feed": feed, "removed": count} for feed, count in removed.items() if feed is not None]
+        if params:
+            feeds = Feed.__table__
+            db.execute(
+                update(feeds)
+                .where(feeds.c.id == bindparam("feed"))
+                .values(article_count=feeds.c.article_count - bindparam("removed")),
+                params
+            )
+        return sum(removed.values())
@@ -0,0 +1,175 @@
+"""
+订阅源日期规范化
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# RFC 822 / RFC 2822: "Mon, 01 Jan 2024 10:00:00 +0000"，星期和秒可省略
+RFC822_RE = re.compile(
+    r"^\s*(?:[A-Za-z]{3,9},?\s+)?(\d{1,2})\s+([A-Za-z]{3,9})\.?\s+(\d{2,4})"
+    r"\s+(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([+-]\d{2}:?\d{2}|[A-Za-z]{1,5})?\s*$"
+)
+# RFC 3339 / ISO 8601: "2024-01-01T10:00:00.123Z"
+RFC3339_RE = re.compile(
+    r"^\s*(\d{4})-(\d{2})-(\d{2})(?:[Tt ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d+))?)?)?"
+    r"\s*([Zz]|[+-]\d{2}(?::?\d{2})?)?\s*$"
+)
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+# RFC 822 定义的时区缩写（小时）
+ZONES = {
+    "ut": 0, "utc": 0, "gmt": 0, "z": 0,
+    "est": -5, "edt": -4, "cst": -6, "cdt": -5,
+    "mst": -7, "mdt": -6, "pst": -8, "pdt": -7,
+}
+UTC = timezone.utc
+
+def _offset(value: str) -> timezone:
+    """解析 +0800 / +08:00 / +08 形式的时区偏移"""
+    sign = -1 if value[0] == "-" else 1
+    digits = value[1:].replace(":", "")
+    hours = int(digits[:2])
+    minutes = int(digits[2:4] or 0)
+    if not hours and not minutes:
+        return UTC
+    return timezone(sign * timedelta(hours=hours, minutes=minutes))
+
+def parse_rfc822(value: str) -> Optional[datetime]:
+    """快速解析 RFC 822 日期，不匹配时返回 None"""
+    match = RFC822_RE.match(value)
+    if not match:
+        return None
+    day, month_name, year, hour, minute, second, zone = match.groups()
+
+    month = MONTHS.get(month_name[:3].lower())
+    if month is None:
+        return None
+
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 50 else 1900
+
+    if zone is None:
+        tzinfo = UTC
+    elif zone[0] in "+-":
+        tzinfo = _offset(zone)
+    else:
+        hours = ZONES.get(zone.lower())
+        if hours is None:
+            return None
+        tzinfo = timezone(timedelta(hours=hours)) if hours else UTC
+
+    try:
+        return datetime(year, month, int(day), int(hour), int(minute), int(second or 0), tzinfo=tzinfo)
+    except ValueError:
+        return None
+
+def parse_rfc3339(value: str) -> Optional[datetime]:
+    """快速解析 RFC 3339 / ISO 8601 日期，不匹配时返回 None"""
+    match = RFC3339_RE.match(value)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+
+    tzinfo = None
+    if zone:
+        tzinfo = UTC if zone in ("Z", "z") else _offset(zone)
+
+    microsecond = int((fraction or "0")[:6].ljust(6, "0"))
+    try:
+        return datetime(
+            int(year), int(month), int(day),
+            int(hour or 0), int(minute or 0), int(second or 0), microsecond,
+            tzinfo=tzinfo,
+        )
+    except ValueError:
+        return None
+
+def parse_generic(value: str) -> Optional[datetime]:
+    """使用 dateutil 解析任意格式，失败时返回 None"""
+    import dateutil.parser
+
+    try:
+        return dateutil.parser.parse(value)
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+class DateNormalizer:
+    """
+    日期规范化器
+
+    依次尝试预编译的 RFC 822 和 RFC 3339 快速解析器，最后才使用通用的 dateutil。
+    每个订阅源记住上次成功的格式，之后的条目直接从该格式开始尝试。
+    解析失败返回 None 并计数，不会用当前时间替代。
+    """
+
+    PARSERS: Dict[str, Callable[[str], Optional[datetime]]] = {
+        "rfc822": parse_rfc822,
+        "rfc3339": parse_rfc3339,
+        "generic": parse_generic,
+    }
+
+    def __init__(self, max_memo: int = 10000):
+        self.max_memo = max_memo
+        self.stats = Counter()
+        self._memo: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def parse(self, value: str, feed_key: Optional[str] = None) -> Optional[datetime]:
+        """
+        解析日期字符串
+
+        Args:
+            value: 日期字符串
+            feed_key: 订阅源标识，用于记住该订阅源的日期格式
+
+        Returns:
+            解析后的时间，失败时返回 None
+        """
+        remembered = self._memo.get(feed_key) if feed_key else None
+        if remembered:
+            parsed = self.PARSERS[remembered](value)
+            if parsed is not None:
+                self._count("memo_hits", remembered)
+                return parsed
+
+        for name, parser in self.PARSERS.items():
+            if name == remembered:
+                continue
+            parsed = parser(value)
+            if parsed is not None:
+                self._count(name)
+                if feed_key:
+                    self._remember(feed_key, name)
+                return parsed
+
+        self._count("failed")
+        logger.debug(f"日期解析失败: {value!r}")
+        return None
+
+    def snapshot(self) -> Dict[str, int]:
+        """各解析路径的计数"""
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self.stats[key] += 1
+
+    def _remember(self, feed_key: str, name: str):
+        if len(self._memo) >= self.max_memo and feed_key not in self._memo:
+            self._memo.clear()
+        self._memo[feed_key] = name
+
+# 进程内共享的日期规范化器
+date_normalizer = DateNormalizer()
@@ -0,0 +1,261 @@
+"""
+播客音频附件下载服务
+"""
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+def download_retry_delay(failure_count: int) -> int:
+    """
+    下载失败的附件的重试退避时间
+
+    第 n 次连续失败后等待 DOWNLOAD_RETRY_BASE_SECONDS * 2^(n-1) 秒，不超过 DOWNLOAD_RETRY_MAX_SECONDS。
+
+    Args:
+        failure_count: 连续失败次数（包括本次）
+
+    Returns:
+        退避时间（秒）
+    """
+    upper = max(settings.DOWNLOAD_RETRY_BASE_SECONDS, settings.DOWNLOAD_RETRY_MAX_SECONDS)
+    return min(upper, settings.DOWNLOAD_RETRY_BASE_SECONDS * 2 ** max(0, failure_count - 1))
+
+class EnclosureDownloader:
+    """
+    音频附件下载器
+
+    按块流式写入磁盘，不在内存中缓存整个文件；未完成的下载保存为 .part 文件，
+    下次通过 HTTP Range 续传。并发数和带宽都有全局和单主机两级上限。
+    完成后返回文件大小和 SHA-256。
+    """
+
+    def __init__(
+        self,
+        download_dir: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        bandwidth_bps: Optional[int] = None,
+        per_host_bandwidth_bps: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.download_dir = Path(download_dir or settings.DOWNLOAD_DIR)
+        self.concurrency = concurrency or settings.DOWNLOAD_CONCURRENCY
+        self.per_host_limit = per_host_limit or settings.DOWNLOAD_PER_HOST_LIMIT
+        self.bandwidth_bps = settings.DOWNLOAD_BANDWIDTH_BPS if bandwidth_bps is None else bandwidth_bps
+        self.per_host_bandwidth_bps = (
+            settings.DOWNLOAD_PER_HOST_BANDWIDTH_BPS if per_host_bandwidth_bps is None else per_host_bandwidth_bps
+        )
+        self.chunk_size = chunk_size or settings.DOWNLOAD_CHUNK_SIZE
+        self.timeout = timeout or settings.DOWNLOAD_TIMEOUT_SECONDS
+
+    def download_all(self, items: Iterable[Dict]) -> List[Dict]:
+        """
+        同步入口：下载所有附件
+
+        Args:
+            items: 下载项，每个元素包含 'article_id' 和 'url'
+
+        Returns:
+            下载结果列表
+        """
+        return asyncio.run(self.download_many(items))
+
+    async def download_many(self, items: Iterable[Dict]) -> List[Dict]:
+        """
+        并发下载所有附件
+
+        Args:
+            items: 下载项
+
+        Returns:
+            下载结果列表，每个元素包含 article_id、path、size、sha256、resumed_from、error
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        global_bucket = self._bucket(self.bandwidth_bps)
+        host_buckets: Dict[str, TokenBucket] = {}
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host_limit)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": settings.FETCH_USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout),
+        ) as session:
+            return await asyncio.gather(*(
+                self._download_one(session, semaphore, host_semaphores, global_bucket, host_buckets, item)
+                for item in items
+            ))
+
+    def _bucket(self, rate: int) -> TokenBucket:
+        """创建带宽令牌桶，容量为 0.1 秒的流量，至少一个块"""
+        return TokenBucket(rate, capacity=max(self.chunk_size, rate // 10))
+
+    def target_path(self, article_id: int, url: str, mime_type: Optional[str] = None) -> Path:
+        """附件在本地的保存路径"""
+        suffix = Path(urlsplit(url).path).suffix.lower()
+        if not suffix or len(suffix) > 6:
+            suffix = mimetypes.guess_extension(mime_type or "") or ".bin"
+        return self.download_dir / f"{article_id}{suffix}"
+
+    async def _download_one(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        host_semaphores: Dict[str, asyncio.Semaphore],
+        global_bucket: TokenBucket,
+        host_buckets: Dict[str, TokenBucket],
+        item: Dict,
+    ) -> Dict:
+        """下载单个附件"""
+        url = item["url"]
+        host = urlsplit(url).netloc.lower()
+        host_semaphore = host_semaphores.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+        host_bucket = host_buckets.setdefault(host, self._bucket(self.per_host_bandwidth_bps))
+
+        path = self.target_path(item["article_id"], url, item.get("type"))
+        part_path = path.with_name(path.name + ".part")
+        result = {
+            "article_id": item["article_id"],
+            "url": url,
+            "path": None,
+            "size": None,
+            "sha256": None,
+            "resumed_from": 0,
+            "error": None,
+            "elapsed_ms": None,
+        }
+
+        async with semaphore, host_semaphore:
+            started = time.perf_counter()
+            try:
+                size, digest, resumed_from = await self._stream_to_file(
+                    session, url, part_path, global_bucket, host_bucket
+                )
+                await asyncio.to_thread(os.replace, part_path, path)
+                result.update(path=str(path), size=size, sha256=digest, resumed_from=resumed_from)
+                logger.info(f"附件下载完成: {url}, {size} 字节, 续传起点 {resumed_from}")
+            except asyncio.TimeoutError:
+                result["error"] = f"下载超时 ({self.timeout}s 无数据)"
+            except (aiohttp.ClientError, OSError, ValueError) as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        if result["error"]:
+            logger.warning(f"附件下载失败: {url}, 错误: {result['error']}")
+        return result
+
+    async def _stream_to_file(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        part_path: Path,
+        global_bucket: TokenBucket,
+        host_bucket: TokenBucket,
+    ):
+        """
+        把附件流式写入 .part 文件，已有部分时用 Range 续传
+
+        Returns:
+            (文件大小, SHA-256, 续传起点)
+        """
+        # 文件读写和续传前的摘要计算（可能有数百 MB）放到线程中，不阻塞事件循环
+        offset = await asyncio.to_thread(_file_size, part_path)
+        hasher = await asyncio.to_thread(_hash_file, part_path) if offset else hashlib.sha256()
+
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        async with session.get(url, headers=headers) as response:
+            if response.status == 416 and offset:
+                # 已下载部分就是完整文件
+                total = _total_from_content_range(response.headers.get("Content-Range"))
+                if total == offset:
+                    return offset, hasher.hexdigest(), offset
+                raise ValueError(f"Range 请求无法满足: {response.headers.get('Content-Range')}")
+            if response.status >= 400:
+                raise ValueError(f"HTTP {response.status}")
+
+            restart = False
+            if offset and response.status == 206:
+                start = _start_from_content_range(response.headers.get("Content-Range"))
+                if start != offset:
+                    logger.info(f"续传响应的起点 {start} 与本地 {offset} 字节不符，重新下载: {url}")
+                    # 从 0 开始的响应可以直接使用，其他起点需要不带 Range 重新请求
+                    restart = start != 0
+                    offset = 0
+                    hasher = hashlib.sha256()
+            elif offset and response.status != 206:
+                # 服务器不支持 Range，从头开始
+                logger.info(f"服务器不支持续传，重新下载: {url}")
+                offset = 0
+                hasher = hashlib.sha256()
+
+            if not restart:
+                resumed_from = offset
+                f = await asyncio.to_thread(open, part_path, "ab" if offset else "wb")
+                try:
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        await global_bucket.acquire(len(chunk))
+                        await host_bucket.acquire(len(chunk))
+                        await asyncio.to_thread(_write_chunk, f, hasher, chunk)
+                        offset += len(chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+
+                expected = response.content_length
+                if expected is not None and offset - resumed_from != expected:
+                    raise ValueError(f"下载不完整: 期望 {expected} 字节, 实际 {offset - resumed_from} 字节")
+
+        if restart:
+            await asyncio.to_thread(part_path.unlink)
+            return await self._stream_to_file(session, url, part_path, global_bucket, host_bucket)
+        return offset, hasher.hexdigest(), resumed_from
+
+def _file_size(path: Path) -> int:
+    """文件大小，不存在时为 0"""
+    return path.stat().st_size if path.exists() else 0
+
+def _hash_file(path: Path):
+    """对已下载部分计算 SHA-256，返回可继续更新的摘要对象"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(block)
+    return hasher
+
+def _write_chunk(f, hasher, chunk: bytes):
+    """写入一个数据块并更新摘要"""
+    f.write(chunk)
+    hasher.update(chunk)
+
+def _start_from_content_range(value: Optional[str]) -> Optional[int]:
+    """从 Content-Range（bytes 100-1233/1234）中取出起点"""
+    if not value or not value.startswith("bytes "):
+        return None
+    start = value[len("bytes "):].split("-", 1)[0].strip()
+    return int(start) if start.isdigit() else None
+
+def _total_from_content_range(value: Optional[str]) -> Optional[int]:
+    """从 Content-Range（bytes */1234）中取出总大小"""
+    if not value or "/" not in value:
+        return None
+    total = value.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
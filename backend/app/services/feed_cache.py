@@ -0,0 +1,90 @@
+"""
+订阅源元数据缓存
+"""
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.database import Feed
+
+# IN 列表的分块大小，保证绑定参数数量低于 SQLite 的默认上限
+CHUNK_SIZE = 500
+
+class FeedMetaCache:
+    """
+    进程内的订阅源元数据缓存（id -> name / category）
+
+    文章接口用它补充 feed_name，缺失的订阅源用一次 IN 查询批量加载。
+    订阅源的创建、更新和删除接口负责失效对应条目；其他进程的修改在 ttl 秒后生效。
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_size: int = 10000):
+        self.ttl = settings.FEED_META_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_size = max_size
+        self._entries: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, db: Session, feed_ids: Iterable[int]) -> Dict[int, Dict]:
+        """
+        批量获取订阅源元数据
+
+        Args:
+            feed_ids: 订阅源 ID
+
+        Returns:
+            订阅源 ID 到 {'name', 'category'} 的映射，不存在的订阅源不包含在内
+        """
+        now = time.monotonic()
+        result: Dict[int, Dict] = {}
+        missing = []
+        with self._lock:
+            for feed_id in set(feed_ids):
+                if feed_id is None:
+                    continue
+                entry = self._entries.get(feed_id)
+                if entry is not None and entry[0] > now:
+                    result[feed_id] = entry[1]
+                else:
+                    missing.append(feed_id)
+
+        if missing:
+            loaded = {}
+            for i in range(0, len(missing), CHUNK_SIZE):
+                chunk = missing[i:i + CHUNK_SIZE]
+                for feed_id, name, category in db.query(Feed.id, Feed.name, Feed.category).filter(Feed.id.in_(chunk)):
+                    loaded[feed_id] = {"name": name, "category": category}
+            self._store(loaded, now)
+            result.update(loaded)
+
+        return result
+
+    def get(self, db: Session, feed_id: int) -> Optional[Dict]:
+        """获取单个订阅源的元数据"""
+        return self.get_many(db, [feed_id]).get(feed_id)
+
+    def name(self, db: Session, feed_id: int) -> Optional[str]:
+        """订阅源名称"""
+        meta = self.get(db, feed_id)
+        return meta["name"] if meta else None
+
+    def invalidate(self, feed_id: Optional[int] = None):
+        """失效单个订阅源，feed_id 为 None 时清空缓存"""
+        with self._lock:
+            if feed_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(feed_id, None)
+
+    def _store(self, loaded: Dict[int, Dict], now: float):
+        expires = now + self.ttl
+        with self._lock:
+            if len(self._entries) + len(loaded) > self.max_size:
+                self._entries.clear()
+            for feed_id, meta in loaded.items():
+                self._entries[feed_id] = (expires, meta)
+
+# 进程内共享的订阅源元数据缓存
+feed_meta_cache = FeedMetaCache()
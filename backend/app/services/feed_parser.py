@@ -0,0 +1,188 @@
+"""
+流式 RSS/Atom 解析器
+"""
+import io
+import logging
+from typing import Dict, Iterator, Optional, Set
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "http://www.w3.org/2005/Atom"
+RSS1_NS = "http://purl.org/rss/1.0/"
+CONTENT_NS = "http://purl.org/rss/1.0/modules/content/"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+# 条目元素
+ENTRY_TAGS = {"item", f"{{{RSS1_NS}}}item", f"{{{ATOM_NS}}}entry"}
+# 订阅源元素（条目之外的元数据所在的父元素）
+CHANNEL_TAGS = {"channel", f"{{{RSS1_NS}}}channel", f"{{{ATOM_NS}}}feed"}
+# 标准字段所在的命名空间（空字符串为 RSS 2.0 的无命名空间元素），
+# 扩展命名空间中的同名元素（如 itunes:title、itunes:summary）不覆盖标准字段
+STANDARD_NS = {"", ATOM_NS, RSS1_NS}
+
+class StreamParseError(Exception):
+    """流式解析失败，调用方应回退到 feedparser"""
+
+class StreamingFeedParser:
+    """
+    增量 RSS/Atom 解析器
+
+    基于 ElementTree.iterparse 逐个产出条目，每个条目处理完后立即从树中移除，
+    峰值内存与单个条目大小相关，而不是与整个文档大小相关。
+    遇到已入库的条目（GUID 或链接命中 known）或达到数量上限时停止读取，
+    解析时间只与新条目数量相关。停止条件假设订阅源按从新到旧排列，这是 RSS/播客订阅源的惯例。
+    """
+
+    def __init__(self, content: bytes, known: Optional[Set[str]] = None, limit: int = 50):
+        self.content = content
+        self.known = known or set()
+        self.limit = limit
+        self.feed: Dict = {}
+        self.stopped_at_known = False
+
+    def entries(self) -> Iterator[Dict]:
+        """
+        逐个产出条目
+
+        Yields:
+            与 RSSService 条目格式一致的字典
+
+        Raises:
+            StreamParseError: 文档不是格式良好的 XML 或不是 RSS/Atom
+        """
+        stack = []
+        count = 0
+        found_channel = False
+        try:
+            for event, elem in ElementTree.iterparse(io.BytesIO(self.content), events=("start", "end")):
+                if event == "start":
+                    stack.append(elem)
+                    if elem.tag in CHANNEL_TAGS:
+                        found_channel = True
+                    continue
+
+                stack.pop()
+                parent = stack[-1] if stack else None
+
+                if elem.tag in ENTRY_TAGS:
+                    entry = self._parse_entry(elem)
+                    # 条目处理完立即从树中移除，释放内存
+                    elem.clear()
+                    if parent is not None:
+                        parent.remove(elem)
+
+                    if entry["guid"] in self.known or entry["link"] in self.known:
+                        self.stopped_at_known = True
+                        return
+
+                    yield entry
+                    count += 1
+                    if count >= self.limit:
+                        return
+
+                elif parent is not None and parent.tag in CHANNEL_TAGS:
+                    self._parse_channel_field(elem)
+
+        except ElementTree.ParseError as e:
+            raise StreamParseError(str(e)) from e
+
+        if not found_channel:
+            raise StreamParseError("未找到 RSS channel 或 Atom feed 元素")
+
+    def _parse_channel_field(self, elem):
+        """记录订阅源级别的元数据"""
+        name = _standard_name(elem.tag)
+        if name == "title":
+            self.feed.setdefault("title", _text(elem))
+        elif name == "link":
+            link = elem.get("href") if elem.tag.startswith(f"{{{ATOM_NS}}}") else _text(elem)
+            if link and elem.get("rel", "alternate") == "alternate":
+                self.feed.setdefault("link", link)
+        elif name in ("description", "subtitle"):
+            self.feed.setdefault("description", _text(elem))
+        elif name == "language":
+            self.feed.setdefault("language", _text(elem))
+        elif name in ("lastBuildDate", "updated", "pubDate"):
+            self.feed.setdefault("updated", _text(elem))
+
+    @staticmethod
+    def _parse_entry(elem) -> Dict:
+        """把条目元素转换为字典"""
+        entry = {
+            "title": "",
+            "link": "",
+            "guid": "",
+            "description": "",
+            "content": "",
+            "published": "",
+            "updated": "",
+            "author": "",
+            "categories": [],
+            "enclosure": None,
+        }
+
+        for child in elem:
+            tag = child.tag
+            name = _standard_name(tag)
+            if name == "title":
+                entry["title"] = _text(child)
+            elif name == "link":
+                if tag.startswith(f"{{{ATOM_NS}}}"):
+                    rel = child.get("rel", "alternate")
+                    if rel == "alternate" and not entry["link"]:
+                        entry["link"] = child.get("href", "")
+                    elif rel == "enclosure" and entry["enclosure"] is None:
+                        entry["enclosure"] = _enclosure(child.get("href"), child.get("type"), child.get("length"))
+                else:
+                    entry["link"] = _text(child)
+            elif name == "enclosure" and entry["enclosure"] is None:
+                entry["enclosure"] = _enclosure(child.get("url"), child.get("type"), child.get("length"))
+            elif name in ("guid", "id"):
+                entry["guid"] = _text(child)
+            elif name in ("description", "summary"):
+                entry["description"] = _text(child)
+            elif tag == f"{{{CONTENT_NS}}}encoded" or tag == f"{{{ATOM_NS}}}content":
+                entry["content"] = _text(child)
+            elif name in ("pubDate", "published") or tag == f"{{{DC_NS}}}date":
+                entry["published"] = _text(child)
+            elif name == "updated":
+                entry["updated"] = _text(child)
+            elif name == "author" or tag == f"{{{DC_NS}}}creator":
+                atom_name = child.find(f"{{{ATOM_NS}}}name")
+                entry["author"] = _text(atom_name if atom_name is not None else child)
+            elif name == "category":
+                term = child.get("term") or _text(child)
+                if term:
+                    entry["categories"].append({"term": term})
+
+        if not entry["title"]:
+            entry["title"] = "无标题"
+        if not entry["published"]:
+            entry["published"] = entry["updated"]
+        if not entry["link"] and entry["guid"].startswith(("http://", "https://")):
+            entry["link"] = entry["guid"]
+        return entry
+
+def _enclosure(url: Optional[str], mime_type: Optional[str], length: Optional[str]) -> Optional[Dict]:
+    """构建附件（音频）信息"""
+    if not url:
+        return None
+    try:
+        size = int(length) if length else None
+    except ValueError:
+        size = None
+    return {"url": url.strip(), "type": mime_type or "", "length": size}
+
+def _standard_name(tag: str) -> Optional[str]:
+    """
+    RSS 2.0、RSS 1.0 或 Atom 元素去掉命名空间后的名字，其他命名空间的元素返回 None
+
+    扩展元素（content:encoded、dc:creator 等）按完整的带命名空间标签匹配。
+    """
+    namespace, _, name = tag[1:].partition("}") if tag.startswith("{") else ("", "", tag)
+    return name if namespace in STANDARD_NS else None
+
+def _text(elem) -> str:
+    """元素的全部文本（包括 XHTML 子元素）"""
+    return "".join(elem.itertext()).strip()
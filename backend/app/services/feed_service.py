@@ -90,13 +90,5 @@ class FeedService:
     @staticmethod
     def get_feed_stats(db: Session) -> dict:
         """获取订阅源统计"""
-        total = db.query(Feed).count()
-        active = db.query(Feed).filter(Feed.status == "active").count()
-        error = db.query(Feed).filter(Feed.status == "error").count()
-        
-        return {
-            "total": total,
-            "active": active,
-            "error": error,
-            "paused": total - active - error
-        }
\ No newline at end of file
+        from app.services.stats_service import StatsService
+        return StatsService.feed_stats(db)
\ No newline at end of file
@@ -0,0 +1,287 @@
+"""
+异步订阅源抓取引擎
+"""
+import asyncio
+import ipaddress
+import logging
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+def _is_public_address(address: str) -> bool:
+    """是否为公网 IP 地址（回环、私有、链路本地、保留等地址都不是）"""
+    try:
+        return ipaddress.ip_address(address.split("%", 1)[0]).is_global
+    except ValueError:
+        return False
+
+class UnsafeAddressError(aiohttp.ClientError):
+    """目标地址不是公网地址，连接没有建立"""
+
+class PublicAddressConnector(aiohttp.TCPConnector):
+    """
+    只连接公网地址的连接器
+
+    检查的是解析后实际要连接的地址：IP 字面量和主机名都经过这里，
+    重定向后的每一跳也会重新检查，解析结果中有非公网地址时拒绝整个主机。
+    """
+
+    async def _resolve_host(self, host: str, port: int, *args, **kwargs):
+        addresses = await super()._resolve_host(host, port, *args, **kwargs)
+        for address in addresses:
+            if not _is_public_address(address["host"]):
+                raise UnsafeAddressError(f"不允许访问非公网地址: {host} -> {address['host']}")
+        return addresses
+
+class FeedFetcher:
+    """
+    并发订阅源抓取器
+
+    所有请求共享同一个 aiohttp 连接池，并受全局并发上限、单主机并发上限
+    和单请求超时约束。超时从请求真正开始时计算，排队等待并发名额的时间不计入。
+    public_only 为 True 时只连接公网地址，检查在连接时进行，覆盖重定向后的每一跳，
+    用于抓取用户提交的 URL（例如 OPML 导入验证），避免借请求访问内网服务。
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+        user_agent: Optional[str] = None,
+        public_only: bool = False,
+    ):
+        self.concurrency = concurrency or settings.FETCH_CONCURRENCY
+        self.per_host_limit = per_host_limit or settings.FETCH_PER_HOST_LIMIT
+        self.timeout = timeout or settings.FETCH_TIMEOUT_SECONDS
+        self.user_agent = user_agent or settings.FETCH_USER_AGENT
+        self.public_only = public_only
+
+    def fetch_all(
+        self,
+        targets: Iterable[Dict],
+        handler: Optional[Callable[[Dict], None]] = None,
+        process: Optional[Callable[[bytes, str, Optional[Dict]], Any]] = None,
+        executor: Optional[Executor] = None,
+    ) -> List[Dict]:
+        """
+        同步入口：并发抓取所有目标
+
+        Args:
+            targets: 抓取目标列表，每个元素至少包含 'url'，可带 'feed_id'、'headers' 和 'context'
+            handler: 每个抓取结果完成后调用的处理函数（在工作线程中串行执行）
+            process: 下载完成后并发执行的处理函数，参数为 (响应体, URL, context)
+            executor: 执行 process 的执行器，默认使用事件循环的线程池
+
+        Returns:
+            抓取结果列表（不含响应体）
+        """
+        return asyncio.run(self.fetch_many(targets, handler, process, executor))
+
+    async def fetch_many(
+        self,
+        targets: Iterable[Dict],
+        handler: Optional[Callable[[Dict], None]] = None,
+        process: Optional[Callable[[bytes, str, Optional[Dict]], Any]] = None,
+        executor: Optional[Executor] = None,
+    ) -> List[Dict]:
+        """
+        并发抓取所有目标
+
+        下载并行进行；响应体下载完成后先在 executor 中执行 process（例如在进程池中解析），
+        结果存入 'processed'，再交给 handler 处理（入库）。处理完成后释放响应体，
+        内存占用与同时在途的请求数成正比，而不是与订阅源总数成正比。
+        handler 在线程池中串行执行，不会阻塞事件循环上的其他下载。
+
+        Args:
+            targets: 抓取目标列表
+            handler: 结果处理函数
+            process: 并发处理函数，必须可被 pickle（使用进程池时）
+            executor: 执行 process 的执行器
+
+        Returns:
+            抓取结果列表（不含响应体）
+        """
+        targets = list(targets)
+        if not targets:
+            return []
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        results = []
+
+        async with self._create_session() as session:
+            tasks = [
+                asyncio.ensure_future(
+                    self._fetch_and_process(
+                        session, semaphore, host_semaphores, target, process, executor
+                    )
+                )
+                for target in targets
+            ]
+            for future in asyncio.as_completed(tasks):
+                result = await future
+                if handler is not None:
+                    try:
+                        await asyncio.to_thread(handler, result)
+                    except Exception as e:
+                        logger.error(f"抓取结果处理失败 ({result['url']}): {e}")
+                        result["error"] = result["error"] or str(e)
+                result.pop("content", None)
+                results.append(result)
+
+        return results
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """创建共享连接池的 HTTP 会话"""
+        connector_class = PublicAddressConnector if self.public_only else aiohttp.TCPConnector
+        connector = connector_class(
+            limit=self.concurrency,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": self.user_agent},
+        )
+
+    async def _fetch_and_process(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        host_semaphores: Dict[str, asyncio.Semaphore],
+        target: Dict,
+        process: Optional[Callable[[bytes, str, Optional[Dict]], Any]],
+        executor: Optional[Executor],
+    ) -> Dict:
+        """抓取单个目标，并在下载完成后执行处理函数"""
+        result = await self._fetch_one(session, semaphore, host_semaphores, target)
+        result["processed"] = None
+        if process is None or result["content"] is None:
+            return result
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result["processed"] = await loop.run_in_executor(
+                executor, process, result["content"], result["url"], target.get("context")
+            )
+        except Exception as e:
+            logger.error(f"抓取结果处理失败 ({result['url']}): {e}")
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            result["process_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return result
+
+    async def _fetch_one(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        host_semaphores: Dict[str, asyncio.Semaphore],
+        target: Dict,
+    ) -> Dict:
+        """抓取单个目标"""
+        url = target["url"]
+        host = urlsplit(url).netloc.lower()
+        host_semaphore = host_semaphores.setdefault(
+            host, asyncio.Semaphore(self.per_host_limit)
+        )
+
+        result = {
+            "feed_id": target.get("feed_id"),
+            "url": url,
+            "status": None,
+            "content": None,
+            "headers": {},
+            "etag": None,
+            "last_modified": None,
+            "not_modified": False,
+            "error": None,
+            "latency_ms": None,
+        }
+
+        async with semaphore, host_semaphore:
+            started = time.perf_counter()
+            try:
+                async with session.get(
+                    url,
+                    headers=target.get("headers"),
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                ) as response:
+                    result["status"] = response.status
+                    result["headers"] = dict(response.headers)
+                    result["etag"] = response.headers.get("ETag")
+                    result["last_modified"] = response.headers.get("Last-Modified")
+                    if response.status == 304:
+                        result["not_modified"] = True
+                    elif response.status >= 400:
+                        result["error"] = f"HTTP {response.status}"
+                    else:
+                        result["content"] = await response.read()
+            except asyncio.TimeoutError:
+                result["error"] = f"请求超时 ({self.timeout}s)"
+            except aiohttp.ClientError as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            finally:
+                result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        logger.debug(
+            f"抓取完成: {url}, 状态: {result['status']}, 耗时: {result['latency_ms']}ms"
+        )
+        return result
+
+    @staticmethod
+    def conditional_headers(etag: Optional[str], last_modified: Optional[str]) -> Dict:
+        """
+        构建条件请求头
+
+        Args:
+            etag: 上次响应的 ETag
+            last_modified: 上次响应的 Last-Modified
+
+        Returns:
+            If-None-Match / If-Modified-Since 请求头
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    @staticmethod
+    def summarize_latency(results: List[Dict]) -> Dict:
+        """
+        汇总抓取延迟
+
+        Args:
+            results: 抓取结果列表
+
+        Returns:
+            平均、P50、P95、最大延迟（毫秒）及最慢的订阅源
+        """
+        latencies = sorted(r["latency_ms"] for r in results if r.get("latency_ms") is not None)
+        if not latencies:
+            return {"avg_ms": 0, "p50_ms": 0, "p95_ms": 0, "max_ms": 0, "slowest": []}
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        slowest = sorted(results, key=lambda r: r.get("latency_ms") or 0, reverse=True)[:5]
+        return {
+            "avg_ms": round(sum(latencies) / len(latencies), 2),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": latencies[-1],
+            "slowest": [
+                {"feed_id": r["feed_id"], "url": r["url"], "latency_ms": r["latency_ms"]}
+                for r in slowest
+            ],
+        }
@@ -0,0 +1,244 @@
+"""
+基于语料 TF-IDF 的批量关键词提取
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 以字母开头、至少 3 个字符的单词，纯数字和版本号不作为关键词
+_TOKEN = re.compile(r"\b[^\W\d_]\w{2,}\b")
+
+ENGLISH_STOP_WORDS = frozenset("""
+about above after again against all also although among and another any are around because been before
+being below between both but can cannot could did does doing done down during each either else even ever
+every few for from further get gets got had has have having her here hers herself him himself his how
+however into its itself just least less let like made make many may might more most much must myself
+near neither never new nor not now off often once one only onto other others our ours ourselves out over
+own per perhaps put rather really said same say says see seen several shall she should since some still
+such than that the their theirs them themselves then there these they thing things this those though
+three through thus too two under until upon use used using very via was way well were what whatever when
+where whether which while who whom whose why will with within without would yet you your yours yourself
+yourselves
+""".split())
+
+class KeywordEngine:
+    """
+    批量 TF-IDF 关键词引擎
+
+    一批文章分词后构成稀疏的词-文档矩阵，文档频率表随每批文章增量累积并持久化到 JSON，
+    跨运行保留。每篇文章的词按 (1 + log tf) × idf 打分，前 k 个词用 NumPy 一次排序选出，
+    不在 Python 中逐篇排序。在整个语料中都很常见的词 idf 接近 1，不会再排在前面。
+
+    score 只打分并返回这批文章的文档频率增量，commit 才把增量计入文档频率表；
+    调用方可以等文章的分析结果保存成功后再提交，失败重试的文章不会被重复计数。
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        idf_path: Optional[str] = None,
+        top_k: Optional[int] = None,
+        max_terms: Optional[int] = None,
+        stop_words: Iterable[str] = ENGLISH_STOP_WORDS,
+    ):
+        self.idf_path = idf_path or settings.KEYWORD_IDF_PATH
+        self.top_k = top_k or settings.KEYWORD_TOP_K
+        self.max_terms = max_terms or settings.KEYWORD_MAX_TERMS
+        self.stop_words = frozenset(stop_words)
+        self.documents = 0
+        self.terms: List[str] = []
+        self.vocabulary = {}
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """从 idf_path 读取文档频率表，文件不存在或损坏时从空语料开始"""
+        if not os.path.exists(self.idf_path):
+            return
+        try:
+            with open(self.idf_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION:
+                raise ValueError(f"不支持的版本: {data.get('version')}")
+            terms = list(data["terms"])
+            frequency = np.asarray(data["document_frequency"], dtype=np.int64)
+            if len(terms) != len(frequency):
+                raise ValueError("词表与文档频率长度不一致")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"读取关键词文档频率表失败，从空语料开始: {self.idf_path}: {e}")
+            return
+        self.documents = int(data.get("documents", 0))
+        self.terms = terms
+        self.vocabulary = {term: column for column, term in enumerate(terms)}
+        self.document_frequency = frequency
+
+    def save(self):
+        """把文档频率表写入 idf_path（先写临时文件再替换，不会留下写了一半的文件）"""
+        with self._lock:
+            data = {
+                "version": self.VERSION,
+                "documents": self.documents,
+                "terms": self.terms,
+                "document_frequency": self.document_frequency.tolist(),
+            }
+        directory = os.path.dirname(self.idf_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 临时文件名唯一，同时保存的多个引擎不会写到同一个临时文件
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=os.path.basename(self.idf_path) + ".", suffix=".tmp", dir=directory or None
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.idf_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def tokenize(self, text: str) -> List[str]:
+        """小写分词并去掉停用词"""
+        return [token for token in _TOKEN.findall(text.lower()) if token not in self.stop_words]
+
+    def idf(self) -> np.ndarray:
+        """平滑的逆文档频率: ln((1 + N) / (1 + df)) + 1"""
+        return self._smooth_idf(self.documents, self.document_frequency)
+
+    @staticmethod
+    def _smooth_idf(documents: int, document_frequency: np.ndarray) -> np.ndarray:
+        return np.log((1 + documents) / (1 + document_frequency)) + 1
+
+    def _columns(self, tokens: List[str]) -> Dict[str, int]:
+        """这批文章中每个不同的词在词表中的列号，停用词为 -1；新词追加到词表末尾"""
+        vocabulary, terms, stop_words = self.vocabulary, self.terms, self.stop_words
+        columns = {}
+        for term in dict.fromkeys(tokens):
+            if term in stop_words:
+                columns[term] = -1
+                continue
+            column = vocabulary.get(term)
+            if column is None:
+                column = vocabulary[term] = len(terms)
+                terms.append(term)
+            columns[term] = column
+        if len(terms) > len(self.document_frequency):
+            self.document_frequency = np.concatenate(
+                [self.document_frequency, np.zeros(len(terms) - len(self.document_frequency), dtype=np.int64)]
+            )
+        return columns
+
+    def _matrix(self, texts: List[str]) -> csr_matrix:
+        """
+        构建词频矩阵（行是文章，列是词表中的词）
+
+        Python 中只做逐篇的正则分词和计数（都在 C 中完成）以及逐个不同词的词表查找，
+        停用词过滤和矩阵组装在 NumPy 中完成。每行的词按在文章中首次出现的先后排列。
+        """
+        documents = [Counter(_TOKEN.findall((text or "").lower())) for text in texts]
+        terms = list(chain.from_iterable(documents))
+        columns = self._columns(terms)
+        ids = np.fromiter(map(columns.__getitem__, terms), dtype=np.int64, count=len(terms))
+        counts = np.fromiter(
+            chain.from_iterable(tf.values() for tf in documents), dtype=np.float64, count=len(terms)
+        )
+        rows = np.repeat(
+            np.arange(len(texts), dtype=np.int64),
+            np.fromiter(map(len, documents), dtype=np.int64, count=len(documents)),
+        )
+        keep = ids >= 0
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=len(texts)))])
+        return csr_matrix((counts[keep], ids[keep], indptr), shape=(len(texts), len(self.terms)))
+
+    def _prune(self):
+        """词表超过 max_terms 时只保留文档频率最高的词，被丢弃的词再次出现时重新计数"""
+        if len(self.terms) <= self.max_terms:
+            return
+        keep = np.sort(np.argsort(-self.document_frequency, kind="stable")[:self.max_terms])
+        self.terms = [self.terms[column] for column in keep]
+        self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+        self.document_frequency = self.document_frequency[keep]
+
+    def extract(self, texts: List[str]) -> List[List[str]]:
+        """
+        提取一批文章的关键词，并立即把这批文章计入文档频率表
+
+        Args:
+            texts: 文章正文列表
+
+        Returns:
+            与 texts 一一对应的关键词列表，按 TF-IDF 分数降序
+        """
+        keywords, update = self.score(texts)
+        self.commit(update)
+        return keywords
+
+    def score(self, texts: List[str]) -> Tuple[List[List[str]], Dict]:
+        """
+        为一批文章打分，不修改文档频率表
+
+        idf 按计入这批文章之后的文档频率计算，结果与 extract 相同。
+
+        Args:
+            texts: 文章正文列表
+
+        Returns:
+            (与 texts 一一对应的关键词列表, 文档频率增量)，增量交给 commit 计入
+        """
+        if not texts:
+            return [], {"terms": [], "document_frequency": np.zeros(0, dtype=np.int64), "documents": 0}
+        with self._lock:
+            matrix = self._matrix(texts)
+            # 每行的列号互不相同，按列计数即为文档频率的增量
+            counts = np.bincount(matrix.indices, minlength=matrix.shape[1])
+            idf = self._smooth_idf(self.documents + len(texts), self.document_frequency + counts)
+
+            rows = np.repeat(np.arange(len(texts)), np.diff(matrix.indptr))
+            scores = (1 + np.log(matrix.data)) * idf[matrix.indices]
+            # 行号加上 [0, 1) 内随分数递减的小数作为单一排序键：按行、分数降序排列，
+            # 稳定排序使同分的词保持在文章中首次出现的先后顺序。每行取前 top_k 个
+            key = rows + (1 - scores / (scores.max(initial=0) * 2 + 1))
+            order = np.argsort(key, kind="stable")
+            rank = np.arange(matrix.nnz) - matrix.indptr[rows[order]]
+            selected = order[rank < self.top_k]
+            columns = matrix.indices[selected].tolist()
+            bounds = np.cumsum(np.bincount(rows[selected], minlength=len(texts))).tolist()
+            terms = self.terms
+            keywords, start = [], 0
+            for end in bounds:
+                keywords.append([terms[column] for column in columns[start:end]])
+                start = end
+
+            # 增量按词记录，提交前词表被裁剪也能正确计入
+            present = np.flatnonzero(counts)
+            update = {
+                "terms": [terms[column] for column in present.tolist()],
+                "document_frequency": counts[present],
+                "documents": len(texts),
+            }
+        return keywords, update
+
+    def commit(self, update: Dict):
+        """把 score 返回的文档频率增量计入文档频率表，词表超过上限时裁剪"""
+        if not update["documents"]:
+            return
+        with self._lock:
+            columns = self._columns(update["terms"])
+            ids = np.fromiter(map(columns.__getitem__, update["terms"]), dtype=np.int64, count=len(update["terms"]))
+            self.document_frequency[ids] += update["document_frequency"]
+            self.documents += update["documents"]
+            self._prune()
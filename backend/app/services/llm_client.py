@@ -0,0 +1,303 @@
+"""
+OpenAI 兼容接口的异步 LLM 客户端
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+import aiohttp
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# 可以重试的 HTTP 状态码，其他错误状态直接失败
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+# 客户端累计的统计项
+STAT_KEYS = (
+    "requests", "retries", "coalesced", "failed", "budget_rejected",
+    "prompt_tokens", "completion_tokens", "total_tokens", "rate_limited_seconds",
+)
+
+class LLMError(Exception):
+    """LLM 请求失败"""
+
+class TokenBudgetExceeded(LLMError):
+    """本轮 token 预算不足，请求没有发送"""
+
+def estimate_tokens(messages: Iterable[Dict]) -> int:
+    """
+    粗略估计提示的 token 数
+
+    按 UTF-8 字节数的四分之一计算（英文约 4 个字符一个 token，中文约一个字一个 token），
+    每条消息另加 4 个 token 的格式开销。只用于限流预扣和预算检查，完成后按接口返回的用量修正。
+    """
+    return sum(len((message.get("content") or "").encode("utf-8")) // 4 + 4 for message in messages)
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期）"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class LLMClient:
+    """
+    OpenAI 兼容 /chat/completions 接口的异步客户端
+
+    一批请求在一轮（LLMRun）内并发发送，共享一个连接池，并受以下约束:
+
+    - 并发上限：同时在途的请求数不超过 concurrency
+    - 限流：请求数和 token 数两个令牌桶，token 按估计量预扣、完成后按实际用量修正
+    - 重试：429、5xx、超时和连接错误按指数退避加全抖动重试，优先遵守 Retry-After
+    - 合并：同一轮中模型、消息和 max_tokens 都相同的请求只发送一次，结果共享
+    - 预算：一轮预扣加已用的 token 数超过 token_budget 时不再发送，抛出 TokenBudgetExceeded
+
+    限流令牌桶属于客户端，在进程生命周期内跨轮保留，连续的多轮合计不超过限流速率。
+    限流只在一个进程内生效，多个分析进程各自使用 1/N 的限额（见 analysis_pool）。
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        retry_base: Optional[float] = None,
+        retry_max: Optional[float] = None,
+        timeout: Optional[float] = None,
+        token_budget: Optional[int] = None,
+    ):
+        self.base_url = base_url or settings.OPENAI_BASE_URL
+        self.api_key = api_key if api_key is not None else settings.OPENAI_API_KEY
+        self.model = model or settings.AI_MODEL
+        self.max_tokens = max_tokens or settings.AI_MAX_TOKENS
+        self.concurrency = concurrency or settings.AI_CONCURRENCY
+        self.requests_per_minute = (
+            settings.AI_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        )
+        self.tokens_per_minute = settings.AI_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.max_retries = settings.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base = settings.AI_RETRY_BASE_SECONDS if retry_base is None else retry_base
+        self.retry_max = settings.AI_RETRY_MAX_SECONDS if retry_max is None else retry_max
+        self.timeout = timeout or settings.AI_TIMEOUT_SECONDS
+        self.token_budget = settings.AI_RUN_TOKEN_BUDGET if token_budget is None else token_budget
+        requests_rate = self.requests_per_minute / 60
+        self._request_bucket = TokenBucket(requests_rate, capacity=max(1.0, requests_rate))
+        self._token_bucket = TokenBucket(self.tokens_per_minute / 60)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = dict.fromkeys(STAT_KEYS, 0)
+
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url.rstrip('/')}/chat/completions"
+
+    def complete_many(
+        self, prompts: List[List[Dict]], token_budget: Optional[int] = None
+    ) -> List[Optional[Dict]]:
+        """
+        同步入口：在一轮中并发完成一批请求
+
+        Args:
+            prompts: 每个请求的消息列表
+            token_budget: 本轮的 token 预算，默认使用客户端的 token_budget，0 不限
+
+        Returns:
+            与 prompts 一一对应的结果，失败或超出预算的请求为 None
+        """
+        return asyncio.run(self.complete_all(prompts, token_budget))
+
+    async def complete_all(
+        self, prompts: List[List[Dict]], token_budget: Optional[int] = None
+    ) -> List[Optional[Dict]]:
+        """在一轮中并发完成一批请求，失败的请求记录日志并返回 None"""
+        if not prompts:
+            return []
+        async with self.run(token_budget) as run:
+            return await asyncio.gather(*(run.complete_or_none(messages) for messages in prompts))
+
+    def run(self, token_budget: Optional[int] = None) -> "LLMRun":
+        """
+        开始一轮请求，需要在事件循环中以 `async with` 使用
+
+        Args:
+            token_budget: 本轮的 token 预算，默认使用客户端的 token_budget，0 不限
+        """
+        return LLMRun(self, self.token_budget if token_budget is None else token_budget)
+
+    def stats(self) -> Dict:
+        """累计的请求数、重试数、合并数、失败数、超预算数、token 用量和限流等待秒数"""
+        with self._lock:
+            return {key: round(value, 3) if isinstance(value, float) else value for key, value in self._stats.items()}
+
+    def _record(self, stats: Dict):
+        with self._lock:
+            for key, value in stats.items():
+                self._stats[key] += value
+
+class LLMRun:
+    """
+    LLMClient 的一轮请求
+
+    持有本轮的 HTTP 会话、并发信号量、合并表和预算计数，这些对象都绑定在创建它们的
+    事件循环上，因此每轮（每次 asyncio.run）重新创建；限流令牌桶使用客户端上跨轮保留的。
+    """
+
+    def __init__(self, client: LLMClient, token_budget: int):
+        self.client = client
+        self.token_budget = token_budget
+        self.spent = 0
+        self.reserved = 0
+        self.stats: Dict[str, float] = dict.fromkeys(STAT_KEYS, 0)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(client.concurrency)
+        self._request_bucket = client._request_bucket
+        self._token_bucket = client._token_bucket
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    async def __aenter__(self) -> "LLMRun":
+        headers = {"Content-Type": "application/json"}
+        if self.client.api_key:
+            headers["Authorization"] = f"Bearer {self.client.api_key}"
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.client.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.client.timeout),
+            headers=headers,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        await self._session.close()
+        if self.stats["budget_rejected"]:
+            logger.warning(
+                f"本轮 token 预算 {self.token_budget} 已用完，{self.stats['budget_rejected']} 个请求未发送"
+            )
+        self.client._record(self.stats)
+
+    async def complete(self, messages: List[Dict], max_tokens: Optional[int] = None) -> Dict:
+        """
+        完成一个请求，本轮中相同的请求只发送一次
+
+        Args:
+            messages: 消息列表
+            max_tokens: 回复的最大 token 数，默认使用客户端的 max_tokens
+
+        Returns:
+            包含 content（回复文本）、usage（接口返回的用量）和 total_tokens 的字典
+
+        Raises:
+            TokenBudgetExceeded: 本轮预算不足
+            LLMError: 请求失败（已用完重试次数或不可重试的错误）
+        """
+        max_tokens = max_tokens or self.client.max_tokens
+        key = hashlib.sha256(
+            json.dumps([self.client.model, messages, max_tokens], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(messages, max_tokens))
+            self._tasks[key] = task
+        else:
+            self.stats["coalesced"] += 1
+        return dict(await asyncio.shield(task))
+
+    async def complete_or_none(self, messages: List[Dict], max_tokens: Optional[int] = None) -> Optional[Dict]:
+        """完成一个请求，失败或超出预算时返回 None"""
+        try:
+            return await self.complete(messages, max_tokens)
+        except TokenBudgetExceeded:
+            return None
+        except LLMError as e:
+            logger.warning(f"LLM 请求失败: {e}")
+            return None
+
+    async def _request(self, messages: List[Dict], max_tokens: int) -> Dict:
+        """检查预算后发送请求，完成后按实际用量结算"""
+        estimate = estimate_tokens(messages) + max_tokens
+        if self.token_budget > 0 and self.spent + self.reserved + estimate > self.token_budget:
+            self.stats["budget_rejected"] += 1
+            raise TokenBudgetExceeded(
+                f"token 预算不足: 已用 {self.spent}, 预扣 {self.reserved}, 本次估计 {estimate}, 预算 {self.token_budget}"
+            )
+
+        self.reserved += estimate
+        try:
+            data = await self._send(
+                {"model": self.client.model, "messages": messages, "max_tokens": max_tokens, "temperature": 0},
+                estimate,
+            )
+        except BaseException:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            self.reserved -= estimate
+
+        usage = data.get("usage") or {}
+        total = usage.get("total_tokens") or estimate
+        self.spent += total
+        self.stats["prompt_tokens"] += usage.get("prompt_tokens") or 0
+        self.stats["completion_tokens"] += usage.get("completion_tokens") or 0
+        self.stats["total_tokens"] += total
+        self._token_bucket.refund(estimate - total)
+
+        try:
+            content = data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            self.stats["failed"] += 1
+            raise LLMError(f"响应格式错误: {e!r}") from e
+        return {"content": (content or "").strip(), "usage": usage, "total_tokens": total}
+
+    async def _send(self, payload: Dict, estimate: int) -> Dict:
+        """发送请求，可重试的错误按退避时间重试"""
+        for attempt in range(self.client.max_retries + 1):
+            self.stats["rate_limited_seconds"] += await self._request_bucket.acquire()
+            self.stats["rate_limited_seconds"] += await self._token_bucket.acquire(estimate)
+
+            retry_after = None
+            async with self._semaphore:
+                self.stats["requests"] += 1
+                try:
+                    async with self._session.post(self.client.endpoint, json=payload) as response:
+                        if response.status == 200:
+                            return await response.json(content_type=None)
+                        text = await response.text()
+                        error = LLMError(f"HTTP {response.status}: {text[:200]}")
+                        retryable = response.status in RETRY_STATUSES
+                        retry_after = _retry_after(response.headers.get("Retry-After"))
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    error = LLMError(f"{type(e).__name__}: {e}")
+                    retryable = True
+
+            # 失败的请求不计 token 用量
+            self._token_bucket.refund(estimate)
+            if not retryable or attempt == self.client.max_retries:
+                raise error
+
+            delay = random.uniform(0, min(self.client.retry_max, self.client.retry_base * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.client.retry_max))
+            self.stats["retries"] += 1
+            logger.info(f"LLM 请求失败，{delay:.2f}s 后重试 ({attempt + 1}/{self.client.max_retries}): {error}")
+            await asyncio.sleep(delay)
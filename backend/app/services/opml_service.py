@@ -0,0 +1,341 @@
+"""
+OPML 导入导出服务
+"""
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Feed
+from app.services.article_service import ArticleService
+from app.services.fetch_service import FeedFetcher
+from app.services.rss_service import RSSService
+
+logger = logging.getLogger(__name__)
+
+# IN 列表的分块大小，保证绑定参数数量低于 SQLite 的默认上限
+CHUNK_SIZE = 500
+DEFAULT_CATEGORY = "未分类"
+
+class OPMLParseError(Exception):
+    """OPML 文档格式错误"""
+
+class OPMLStreamParser:
+    """
+    增量 OPML 解析器
+
+    基于 XMLPullParser，请求体按块送入，每个 outline 处理完后立即从树中移除，
+    不需要把整个文档读入内存。嵌套在无 xmlUrl 的 outline 下的订阅源使用父节点的标题作为分类。
+    """
+
+    def __init__(self):
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._stack: List = []
+        self._categories: List[Optional[str]] = []
+        self._found_opml = False
+
+    def feed(self, chunk: bytes) -> Iterator[Dict]:
+        """
+        送入一块数据，产出其中已完整解析的订阅源
+
+        Yields:
+            包含 name、url、category 的字典
+        """
+        try:
+            self._parser.feed(chunk)
+            yield from self._drain()
+        except ElementTree.ParseError as e:
+            raise OPMLParseError(str(e)) from e
+
+    def close(self) -> Iterator[Dict]:
+        """结束解析，产出剩余的订阅源"""
+        try:
+            self._parser.close()
+            yield from self._drain()
+        except ElementTree.ParseError as e:
+            raise OPMLParseError(str(e)) from e
+        if not self._found_opml:
+            raise OPMLParseError("未找到 opml 根元素")
+
+    def _drain(self) -> Iterator[Dict]:
+        for event, elem in self._parser.read_events():
+            if event == "start":
+                if not self._stack and elem.tag == "opml":
+                    self._found_opml = True
+                self._stack.append(elem)
+                if elem.tag == "outline":
+                    url = elem.get("xmlUrl")
+                    # 没有 xmlUrl 的 outline 是分类节点
+                    category = None if url else (elem.get("title") or elem.get("text"))
+                    self._categories.append(category)
+                continue
+
+            self._stack.pop()
+            if elem.tag != "outline":
+                continue
+
+            self._categories.pop()
+            url = (elem.get("xmlUrl") or "").strip()
+            if url:
+                yield {
+                    "name": (elem.get("title") or elem.get("text") or url).strip(),
+                    "url": url,
+                    "category": elem.get("category") or self._current_category(),
+                }
+            # outline 处理完立即从树中移除
+            elem.clear()
+            if self._stack:
+                self._stack[-1].remove(elem)
+
+    def _current_category(self) -> str:
+        for category in reversed(self._categories):
+            if category:
+                return category
+        return DEFAULT_CATEGORY
+
+class ImportJobRegistry:
+    """
+    OPML 导入任务登记表
+
+    保存在进程内存中，只保留最近 max_jobs 个任务。
+    """
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, total: int) -> Dict:
+        """创建导入任务"""
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "pending",
+            "total": total,
+            "duplicates": 0,
+            "validated": 0,
+            "invalid": 0,
+            "created": 0,
+            "errors": [],
+            "created_at": datetime.now().isoformat(),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """获取任务进度的快照"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return {**job, "errors": list(job["errors"])} if job else None
+
+    def update(self, job_id: str, **fields):
+        """更新任务字段"""
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def increment(self, job_id: str, field: str, amount: int = 1):
+        """累加任务计数"""
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id][field] += amount
+
+    def add_error(self, job_id: str, url: str, error: str, limit: int = 100):
+        """记录单个订阅源的错误，最多保留 limit 条"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and len(job["errors"]) < limit:
+                job["errors"].append({"url": url, "error": error})
+
+# 进程内共享的导入任务登记表
+import_jobs = ImportJobRegistry()
+
+def _looks_like_feed(content: bytes, url: str, context: Optional[Dict] = None) -> bool:
+    """验证响应体是有效的 RSS/Atom 订阅源（抓取引擎的处理函数）"""
+    return RSSService.validate_feed_content(content, url)
+
+def _unsupported_url_reason(url: str) -> Optional[str]:
+    """
+    检查导入的订阅源 URL 的协议和主机名
+
+    只允许 http/https。目标地址是否为公网地址在验证请求连接时检查（见 FeedFetcher 的 public_only），
+    不在这里逐个解析主机名。
+
+    Returns:
+        拒绝原因，可以导入时为 None
+    """
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https"):
+        return f"不支持的协议: {parts.scheme or '无'}"
+    if not parts.hostname:
+        return "缺少主机名"
+    return None
+
+class OPMLService:
+    """OPML 导入导出服务类"""
+
+    @staticmethod
+    def existing_feed_urls(db: Session, urls: Iterable[str]) -> Set[str]:
+        """
+        批量查询已存在的订阅源 URL
+
+        Args:
+            urls: 待检查的 URL
+
+        Returns:
+            数据库中已存在的 URL 集合
+        """
+        urls = list(urls)
+        existing = set()
+        for i in range(0, len(urls), CHUNK_SIZE):
+            chunk = urls[i:i + CHUNK_SIZE]
+            existing.update(db.execute(select(Feed.url).where(Feed.url.in_(chunk))).scalars())
+        return existing
+
+    @staticmethod
+    def run_import(job_id: str, entries: List[Dict], validate: bool = True, fetcher: Optional[FeedFetcher] = None):
+        """
+        执行导入任务（在后台线程中运行）
+
+        文件内和数据库中重复的 URL 先用集合去重，剩余的订阅源并发验证，
+        验证通过的在一个事务中批量插入。
+
+        Args:
+            job_id: 导入任务 ID
+            entries: 解析出的订阅源
+            validate: 是否下载验证订阅源
+            fetcher: 验证使用的抓取器
+        """
+        db = SessionLocal()
+        try:
+            # 文件内去重，保留第一次出现的条目
+            unique: Dict[str, Dict] = {}
+            for entry in entries:
+                unique.setdefault(entry["url"], entry)
+
+            existing = OPMLService.existing_feed_urls(db, unique.keys())
+            # 结束读事务，验证期间不占用写连接
+            db.commit()
+            candidates = [entry for url, entry in unique.items() if url not in existing]
+            import_jobs.update(job_id, duplicates=len(entries) - len(candidates))
+
+            candidates = OPMLService._reject_unsupported(job_id, candidates)
+            if validate and candidates:
+                import_jobs.update(job_id, status="validating")
+                candidates = OPMLService._validate(job_id, candidates, fetcher)
+
+            import_jobs.update(job_id, status="inserting")
+            created = 0
+            if candidates:
+                rows = [
+                    {
+                        "name": entry["name"][:255],
+                        "url": entry["url"],
+                        "category": (entry["category"] or DEFAULT_CATEGORY)[:100],
+                    }
+                    for entry in candidates
+                ]
+                result = db.execute(ArticleService._insert_ignore(db, Feed.__table__), rows)
+                created = result.rowcount if result.rowcount is not None and result.rowcount >= 0 else len(rows)
+                db.commit()
+
+            import_jobs.update(job_id, status="completed", created=created, finished_at=datetime.now().isoformat())
+            logger.info(f"OPML 导入完成: {import_jobs.get(job_id)}")
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"OPML 导入失败 (任务 {job_id}): {e}")
+            import_jobs.update(job_id, status="failed", finished_at=datetime.now().isoformat())
+            import_jobs.add_error(job_id, "", str(e))
+        finally:
+            db.close()
+
+    @staticmethod
+    def _reject_unsupported(job_id: str, candidates: List[Dict]) -> List[Dict]:
+        """剔除协议不支持或缺少主机名的订阅源，计入无效数"""
+        supported = []
+        for entry in candidates:
+            reason = _unsupported_url_reason(entry["url"])
+            if reason is None:
+                supported.append(entry)
+                continue
+            import_jobs.increment(job_id, "invalid")
+            import_jobs.add_error(job_id, entry["url"], reason)
+        return supported
+
+    @staticmethod
+    def _validate(job_id: str, candidates: List[Dict], fetcher: Optional[FeedFetcher] = None) -> List[Dict]:
+        """并发下载并验证订阅源，返回验证通过的条目"""
+        fetcher = fetcher or FeedFetcher(
+            concurrency=settings.OPML_VALIDATE_CONCURRENCY,
+            public_only=not settings.OPML_ALLOW_PRIVATE_HOSTS,
+        )
+        valid_urls = set()
+
+        def handle(fetch_result: Dict):
+            url = fetch_result["url"]
+            if fetch_result["error"] is None and fetch_result["processed"]:
+                valid_urls.add(url)
+            else:
+                import_jobs.increment(job_id, "invalid")
+                import_jobs.add_error(job_id, url, fetch_result["error"] or "不是有效的 RSS/Atom 订阅源")
+            import_jobs.increment(job_id, "validated")
+
+        fetcher.fetch_all(
+            ({"url": entry["url"]} for entry in candidates),
+            handler=handle,
+            process=_looks_like_feed,
+        )
+        return [entry for entry in candidates if entry["url"] in valid_urls]
+
+    @staticmethod
+    def iter_export(db: Session, title: str = "CastMind Subscriptions", batch_size: int = 500) -> Iterator[str]:
+        """
+        按分类分组逐块生成 OPML 文档
+
+        Args:
+            title: OPML 标题
+            batch_size: 每次从数据库读取的订阅源数量
+
+        Yields:
+            OPML 文本片段
+        """
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n<opml version="2.0">\n'
+        yield f"  <head>\n    <title>{escape(title)}</title>\n"
+        yield f"    <dateCreated>{datetime.now().strftime('%a, %d %b %Y %H:%M:%S')}</dateCreated>\n  </head>\n  <body>\n"
+
+        query = db.query(Feed.name, Feed.url, Feed.category).order_by(Feed.category, Feed.id)
+        current = None
+        buffer = []
+        for name, url, category in query.yield_per(batch_size):
+            category = category or DEFAULT_CATEGORY
+            if category != current:
+                if current is not None:
+                    buffer.append("    </outline>\n")
+                buffer.append(f"    <outline text={quoteattr(category)} title={quoteattr(category)}>\n")
+                current = category
+            buffer.append(
+                f'      <outline type="rss" text={quoteattr(name)} title={quoteattr(name)} '
+                f"xmlUrl={quoteattr(url)}/>\n"
+            )
+            if len(buffer) >= batch_size:
+                yield "".join(buffer)
+                buffer = []
+        if current is not None:
+            buffer.append("    </outline>\n")
+
+        buffer.append("  </body>\n</opml>\n")
+        yield "".join(buffer)
@@ -0,0 +1,99 @@
+"""
+订阅源解析进程池
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.rss_service import RSSService
+
+logger = logging.getLogger(__name__)
+
+# 解析结果中每篇文章保留的字段
+RECORD_FIELDS = (
+    "title", "url", "content", "summary", "published_at",
+    "enclosure_url", "enclosure_type", "enclosure_length",
+)
+
+def parse_fetched(content: bytes, url: str, context: Optional[Dict] = None) -> Dict:
+    """
+    解析已下载的订阅源（进程池工作函数）
+
+    在工作进程中完成响应体摘要、XML 解析、清洗和日期规范化等 CPU 密集的工作，
+    只把入库需要的字段以紧凑的可 pickle 记录返回给调度器进程。
+
+    Args:
+        content: 订阅源响应体
+        url: 订阅源 URL
+        context: 解析上下文，可包含 'content_hash'（上次的响应体摘要）、
+            'known'（已入库的条目链接）和 'limit'（条目上限）
+
+    Returns:
+        包含 content_hash、unchanged、parsed_ok、stopped_at_known、
+        date_parse_failures 和 articles 的字典
+    """
+    context = context or {}
+    content_hash = RSSService.content_hash(content)
+    record = {
+        "content_hash": content_hash,
+        "unchanged": content_hash == context.get("content_hash"),
+        "parsed_ok": True,
+        "stopped_at_known": False,
+        "date_parse_failures": 0,
+        "articles": [],
+    }
+    if record["unchanged"]:
+        return record
+
+    feed_info = RSSService.parse_feed_content(
+        content, url, known=context.get("known"), limit=context.get("limit")
+    )
+    if feed_info is None:
+        record["parsed_ok"] = False
+        return record
+
+    record["stopped_at_known"] = feed_info.get("stopped_at_known", False)
+    record["articles"] = [
+        {field: article[field] for field in RECORD_FIELDS}
+        for article in RSSService.extract_articles(feed_info)
+    ]
+    record["date_parse_failures"] = feed_info["date_parse_failures"]
+    return record
+
+class ParsePool:
+    """
+    订阅源解析进程池
+
+    workers 为 0 时不创建进程池，解析在调度器进程的线程池中执行；
+    为 -1 时按 CPU 核数创建工作进程。进程池在首次使用时创建并在调度器生命周期内复用。
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        workers = settings.PARSE_WORKERS if workers is None else workers
+        if workers < 0:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> Optional[Executor]:
+        """解析执行器，workers 为 0 时返回 None（使用默认线程池）"""
+        if self.workers == 0:
+            return None
+        if self._executor is None:
+            # 调度器进程中有事件循环线程和数据库连接，使用 spawn 避免 fork 带来的锁状态问题
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"解析进程池已启动: {self.workers} 个工作进程")
+        return self._executor
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,135 @@
+"""
+文章保留期清理服务
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.database import Article
+from app.services.article_service import ArticleService
+
+logger = logging.getLogger(__name__)
+
+class RetentionEngine:
+    """
+    过期文章清理引擎
+
+    按主键顺序分块删除：每块先用 id > 上一块末尾的键集查询取出至多 chunk_size 篇过期文章，
+    在独立的短事务中删除并提交，块之间暂停 pause 秒释放写锁，API 的写请求可以穿插执行。
+    开启归档时，每块在删除前先以 JSON Lines 追加写入 gzip 归档文件（每块一个 gzip 成员，
+    多成员文件可直接用 gzip 读取）。归档先于删除提交落盘，删除失败时下次运行会重复归档，
+    不会丢失数据。
+    """
+
+    def __init__(
+        self,
+        chunk_size: Optional[int] = None,
+        pause: Optional[float] = None,
+        archive_dir: Optional[str] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+        self.pause = settings.RETENTION_PAUSE_SECONDS if pause is None else pause
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.session_factory = session_factory
+
+    @staticmethod
+    def expired_filters(cutoff: datetime) -> list:
+        """过期文章的条件：早于 cutoff 入库、已读且已处理"""
+        return [
+            Article.created_at < cutoff,
+            Article.read_status == True,
+            Article.processed_status == True,
+        ]
+
+    def archive_path(self, moment: datetime) -> Path:
+        """归档文件路径，按清理所在月份分文件"""
+        return self.archive_dir / f"articles-{moment:%Y%m}.jsonl.gz"
+
+    def run(self, cutoff: datetime) -> Dict:
+        """
+        删除 cutoff 之前的过期文章
+
+        Args:
+            cutoff: 截止时间
+
+        Returns:
+            删除数、归档数、块数、耗时和每秒删除行数
+        """
+        started = time.perf_counter()
+        archive = self.archive_path(datetime.now()) if self.archive_dir else None
+        deleted = archived = chunks = 0
+        last_id = 0
+
+        while True:
+            db = self.session_factory()
+            try:
+                rows = self._next_chunk(db, cutoff, last_id, with_body=archive is not None)
+                if not rows:
+                    break
+                ids = [row["id"] for row in rows]
+                if archive is not None:
+                    self._append_archive(archive, rows)
+                    archived += len(rows)
+                deleted += ArticleService.delete_articles(db, ids=ids)
+                db.commit()
+            finally:
+                db.close()
+
+            chunks += 1
+            last_id = ids[-1]
+            logger.debug(f"保留期清理: 第 {chunks} 块删除 {len(ids)} 篇文章，ID 至 {last_id}")
+            if len(rows) < self.chunk_size:
+                break
+            # 块之间让出写锁
+            if self.pause:
+                time.sleep(self.pause)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "deleted_articles": deleted,
+            "archived_articles": archived,
+            "archive_file": str(archive) if archive else None,
+            "chunks": chunks,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(deleted / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+    def _next_chunk(self, db: Session, cutoff: datetime, last_id: int, with_body: bool) -> List[Dict]:
+        """按主键顺序读取 last_id 之后的一块过期文章；归档时读取整行，否则只读取 ID"""
+        columns = list(Article.__table__.columns) if with_body else [Article.id]
+        stmt = (
+            select(*columns)
+            .where(Article.id > last_id, *self.expired_filters(cutoff))
+            .order_by(Article.id)
+            .limit(self.chunk_size)
+        )
+        return [dict(row) for row in db.execute(stmt).mappings()]
+
+    @staticmethod
+    def _append_archive(path: Path, rows: List[Dict]):
+        """以一个 gzip 成员追加写入一块文章"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+                for row in rows:
+                    archive.write(json.dumps(row, ensure_ascii=False, default=_json_default).encode("utf-8"))
+                    archive.write(b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+def _json_default(value):
+    """序列化日期时间列"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化 {type(value).__name__}")
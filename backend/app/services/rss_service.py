@@ -1,23 +1,37 @@
 """
 RSS 解析服务
 """
+import hashlib
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 import feedparser
 from datetime import datetime
 
+from app.core.config import settings
+from app.services.date_parser import date_normalizer
+from app.services.feed_parser import StreamingFeedParser, StreamParseError
+
 logger = logging.getLogger(__name__)
 
 class RSSService:
     """RSS 解析服务类"""
     
     @staticmethod
-    def parse_feed(url: str) -> Optional[Dict]:
+    def parse_feed(
+        url: str,
+        etag: Optional[str] = None,
+        modified: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         解析 RSS/Atom 订阅源
         
+        传入上次响应的 ETag / Last-Modified 时发送条件请求，
+        服务器返回 304 时不解析，返回的信息中 not_modified 为 True。
+        
         Args:
             url: RSS/Atom 订阅源 URL
+            etag: 上次响应的 ETag
+            modified: 上次响应的 Last-Modified
             
         Returns:
             解析后的订阅源信息，或 None 如果解析失败
@@ -26,46 +40,150 @@ class RSSService:
             logger.info(f"开始解析 RSS 订阅源: {url}")
             
             # 解析 RSS 订阅源
-            feed = feedparser.parse(url)
+            feed = feedparser.parse(url, etag=etag, modified=modified)
             
-            if feed.bozo:
-                logger.warning(f"RSS 解析警告: {feed.bozo_exception}")
-            
-            # 提取订阅源信息
-            feed_info = {
-                "title": feed.feed.get("title", "未知标题"),
-                "description": feed.feed.get("description", ""),
-                "link": feed.feed.get("link", url),
-                "language": feed.feed.get("language", ""),
-                "updated": feed.feed.get("updated", ""),
-                "entries": []
-            }
-            
-            # 提取文章条目
-            for entry in feed.entries[:50]:  # 限制最多50条
-                article = {
-                    "title": entry.get("title", "无标题"),
-                    "link": entry.get("link", ""),
-                    "description": entry.get("description", ""),
-                    "content": entry.get("content", [{}])[0].get("value", "") if entry.get("content") else "",
-                    "published": entry.get("published", entry.get("updated", "")),
-                    "author": entry.get("author", ""),
-                    "categories": entry.get("tags", []),
+            if feed.get("status") == 304:
+                logger.info(f"RSS 订阅源未修改: {url}")
+                return {
+                    "not_modified": True,
+                    "etag": feed.get("etag", etag),
+                    "modified": feed.get("modified", modified),
+                    "entries": []
                 }
-                feed_info["entries"].append(article)
             
-            logger.info(f"成功解析 RSS 订阅源: {feed_info['title']}, 找到 {len(feed_info['entries'])} 篇文章")
+            feed_info = RSSService._build_feed_info(feed, url)
+            feed_info["etag"] = feed.get("etag")
+            feed_info["modified"] = feed.get("modified")
             return feed_info
             
         except Exception as e:
             logger.error(f"RSS 解析失败: {url}, 错误: {e}")
             return None
     
+    @staticmethod
+    def parse_feed_content(
+        content: bytes,
+        url: str,
+        known: Optional[Set[str]] = None,
+        limit: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        解析已下载的 RSS/Atom 文档
+        
+        优先使用流式解析：遇到已入库的条目（GUID 或链接在 known 中）或达到数量上限即停止，
+        不必为只保留前几十条而构建整个文档树。文档不是格式良好的 XML 时回退到 feedparser。
+        
+        Args:
+            content: 订阅源响应体
+            url: 订阅源 URL（用于日志和默认链接）
+            known: 已入库条目的 GUID / 链接
+            limit: 最多提取的条目数，默认 FEED_MAX_ENTRIES
+            
+        Returns:
+            解析后的订阅源信息，或 None 如果解析失败
+        """
+        limit = limit or settings.FEED_MAX_ENTRIES
+        try:
+            parser = StreamingFeedParser(content, known=known, limit=limit)
+            try:
+                entries = list(parser.entries())
+            except StreamParseError as e:
+                logger.info(f"流式解析失败，回退到 feedparser: {url}, 原因: {e}")
+            else:
+                feed_info = {
+                    "not_modified": False,
+                    "title": parser.feed.get("title") or "未知标题",
+                    "description": parser.feed.get("description", ""),
+                    "link": parser.feed.get("link", url),
+                    "language": parser.feed.get("language", ""),
+                    "updated": parser.feed.get("updated", ""),
+                    "stopped_at_known": parser.stopped_at_known,
+                    "entries": entries
+                }
+                logger.info(f"成功解析 RSS 订阅源: {feed_info['title']}, 找到 {len(entries)} 篇新文章")
+                return feed_info
+            
+            feed = feedparser.parse(content)
+            return RSSService._build_feed_info(feed, url, known=known, limit=limit)
+            
+        except Exception as e:
+            logger.error(f"RSS 解析失败: {url}, 错误: {e}")
+            return None
+    
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        """计算响应体的 SHA-256 摘要"""
+        return hashlib.sha256(content).hexdigest()
+    
+    @staticmethod
+    def _build_feed_info(
+        feed,
+        url: str,
+        known: Optional[Set[str]] = None,
+        limit: Optional[int] = None
+    ) -> Dict:
+        """从 feedparser 结果构建订阅源信息"""
+        if feed.bozo:
+            logger.warning(f"RSS 解析警告: {feed.bozo_exception}")
+        
+        known = known or set()
+        limit = limit or settings.FEED_MAX_ENTRIES
+        
+        # 提取订阅源信息
+        feed_info = {
+            "not_modified": False,
+            "title": feed.feed.get("title", "未知标题"),
+            "description": feed.feed.get("description", ""),
+            "link": feed.feed.get("link", url),
+            "language": feed.feed.get("language", ""),
+            "updated": feed.feed.get("updated", ""),
+            "stopped_at_known": False,
+            "entries": []
+        }
+        
+        # 提取文章条目
+        for entry in feed.entries[:limit]:
+            if entry.get("id") in known or entry.get("link") in known:
+                feed_info["stopped_at_known"] = True
+                break
+            
+            article = {
+                "title": entry.get("title", "无标题"),
+                "link": entry.get("link", ""),
+                "guid": entry.get("id", ""),
+                "description": entry.get("description", ""),
+                "content": entry.get("content", [{}])[0].get("value", "") if entry.get("content") else "",
+                "published": entry.get("published", entry.get("updated", "")),
+                "author": entry.get("author", ""),
+                "categories": entry.get("tags", []),
+                "enclosure": RSSService._feedparser_enclosure(entry),
+            }
+            feed_info["entries"].append(article)
+        
+        logger.info(f"成功解析 RSS 订阅源: {feed_info['title']}, 找到 {len(feed_info['entries'])} 篇文章")
+        return feed_info
+    
+    @staticmethod
+    def _feedparser_enclosure(entry) -> Optional[Dict]:
+        """从 feedparser 条目中提取第一个附件"""
+        for enclosure in entry.get("enclosures", []):
+            href = enclosure.get("href")
+            if not href:
+                continue
+            try:
+                length = int(enclosure.get("length") or 0) or None
+            except ValueError:
+                length = None
+            return {"url": href, "type": enclosure.get("type", ""), "length": length}
+        return None
+    
     @staticmethod
     def extract_articles(feed_info: Dict) -> List[Dict]:
         """
         从解析的订阅源中提取文章信息
         
+        无法解析的发布时间记为 None，失败数量写入 feed_info["date_parse_failures"]。
+        
         Args:
             feed_info: 解析后的订阅源信息
             
@@ -73,24 +191,18 @@ class RSSService:
             文章信息列表
         """
         articles = []
+        date_failures = 0
+        feed_key = feed_info.get("link")
         
         for entry in feed_info.get("entries", []):
             try:
-                # 解析发布时间
+                # 解析发布时间：快速解析器 + 按订阅源记住的格式，失败时为 None 并计数
                 published_str = entry.get("published", "")
-                published_at = None
                 
                 if published_str:
-                    try:
-                        # 尝试解析各种时间格式
-                        published_at = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
-                    except ValueError:
-                        try:
-                            # 尝试其他格式
-                            import dateutil.parser
-                            published_at = dateutil.parser.parse(published_str)
-                        except:
-                            published_at = datetime.now()
+                    published_at = date_normalizer.parse(published_str, feed_key)
+                    if published_at is None:
+                        date_failures += 1
                 else:
                     published_at = datetime.now()
                 
@@ -102,6 +214,9 @@ class RSSService:
                     "published_at": published_at,
                     "author": entry.get("author", ""),
                     "categories": ", ".join([tag.get("term", "") for tag in entry.get("categories", [])]),
+                    "enclosure_url": (entry.get("enclosure") or {}).get("url"),
+                    "enclosure_type": (entry.get("enclosure") or {}).get("type"),
+                    "enclosure_length": (entry.get("enclosure") or {}).get("length"),
                 }
                 articles.append(article)
                 
@@ -109,6 +224,10 @@ class RSSService:
                 logger.error(f"提取文章信息失败: {e}")
                 continue
         
+        if date_failures:
+            logger.warning(f"{date_failures} 篇文章的发布时间无法解析: {feed_key}")
+        feed_info["date_parse_failures"] = date_failures
+        
         return articles
     
     @staticmethod
@@ -147,4 +266,25 @@ class RSSService:
             
         except Exception as e:
             logger.error(f"RSS 验证失败: {url}, 错误: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    @staticmethod
+    def validate_feed_content(content: bytes, url: str) -> bool:
+        """
+        验证已下载的响应体是否为有效的 RSS/Atom 订阅源
+        
+        与 validate_feed_url 的判断标准相同（可以解析且至少有一个条目），
+        但不再发出请求，只解析第一个条目。
+        
+        Args:
+            content: 订阅源响应体
+            url: 订阅源 URL（用于日志）
+            
+        Returns:
+            是否有效
+        """
+        feed_info = RSSService.parse_feed_content(content, url, limit=1)
+        if not feed_info or not feed_info["entries"]:
+            logger.warning(f"RSS 验证失败: {url}, 无文章条目")
+            return False
+        return True
@@ -0,0 +1,138 @@
+"""
+文章全文搜索服务
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.orm import Session, contains_eager
+
+from app.core.config import settings
+from app.core.pagination import decode_score_cursor, encode_score_cursor
+from app.models.database import Article, Feed, articles_fts
+
+# 用户输入中的词：不含空白和双引号的连续字符，结尾的 * 表示前缀匹配
+_TERM = re.compile(r'[^\s"*]+\*?')
+
+# trigram 分词器能检索的最短子串
+TRIGRAM_MIN_CHARS = 3
+
+class InvalidSearchQuery(ValueError):
+    """搜索语句中没有可检索的词"""
+
+class SearchService:
+    """文章全文搜索服务类"""
+
+    SNIPPET_TOKENS = 16
+
+    @staticmethod
+    def build_match(query: str) -> str:
+        """
+        把用户输入转换为 FTS5 MATCH 表达式
+
+        每个词作为带引号的短语，避免 AND / OR / NEAR / 列过滤等语法被误解析；
+        多个词之间是隐式 AND，词尾的 * 保留为前缀匹配。
+
+        Raises:
+            InvalidSearchQuery: 没有可检索的词，或使用 trigram 分词器时有少于 3 个字符的词
+        """
+        min_length = TRIGRAM_MIN_CHARS if settings.SEARCH_TOKENIZER.split()[0] == "trigram" else 1
+        terms = []
+        for term in _TERM.findall(query):
+            prefix = term.endswith("*")
+            term = term.rstrip("*")
+            if not term:
+                continue
+            if len(term) < min_length:
+                # trigram 索引中少于 3 个字符的词没有任何命中
+                raise InvalidSearchQuery(f"每个搜索词至少 {min_length} 个字符: {term!r}")
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+        if not terms:
+            raise InvalidSearchQuery(f"搜索语句中没有可检索的词: {query!r}")
+        return " ".join(terms)
+
+    @staticmethod
+    def candidate_floor(db: Session, match: str, feed_id: Optional[int], max_candidates: int) -> Optional[int]:
+        """
+        最新的 max_candidates 篇命中文章中最小的 ID
+
+        FTS5 需要为每个命中计算 bm25 再排序，高频词命中数十万篇时按相关度排序耗时随命中数增长；
+        按 rowid 倒序跳过命中只读取倒排列表，代价很小。命中数不超过上限时返回 None，全部参与排序。
+        """
+        if max_candidates <= 0:
+            return None
+        stmt = select(articles_fts.c.rowid).where(articles_fts.c.articles_fts.match(match))
+        if feed_id:
+            stmt = stmt.join(Article, Article.id == articles_fts.c.rowid).where(Article.feed_id == feed_id)
+        stmt = stmt.order_by(articles_fts.c.rowid.desc()).offset(max_candidates - 1).limit(1)
+        return db.scalar(stmt)
+
+    @staticmethod
+    def search(
+        db: Session,
+        query: str,
+        feed_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        max_candidates: Optional[int] = None,
+    ) -> Tuple[List[Article], Optional[str]]:
+        """
+        按 BM25 相关度搜索文章
+
+        结果按 (rank, id) 升序排列，用行值比较做游标分页。命中数超过 max_candidates 时，
+        只在最新的 max_candidates 篇命中文章中排序，候选范围在第一页确定并写入游标。
+        返回的文章带有 score（bm25 分数，越小越相关）、snippet（命中片段，<mark> 标记）
+        和 feed_name 属性。
+
+        Args:
+            query: 用户输入的搜索语句
+            feed_id: 只搜索该订阅源的文章
+            cursor: 上一页返回的游标
+            limit: 每页数量
+            max_candidates: 参与排序的命中数上限，默认使用 SEARCH_MAX_CANDIDATES
+
+        Returns:
+            (本页文章, 下一页的游标或 None)
+
+        Raises:
+            InvalidSearchQuery: 没有可检索的词
+            InvalidCursor: 游标格式错误
+        """
+        match = SearchService.build_match(query)
+        if max_candidates is None:
+            max_candidates = settings.SEARCH_MAX_CANDIDATES
+        rank = articles_fts.c.rank
+        snippet = func.snippet(
+            articles_fts.c.articles_fts, -1, "<mark>", "</mark>", "…", SearchService.SNIPPET_TOKENS
+        )
+
+        stmt = (
+            select(Article, rank, snippet)
+            .select_from(articles_fts)
+            .join(Article, Article.id == articles_fts.c.rowid)
+            .outerjoin(Article.feed)
+            .options(contains_eager(Article.feed).load_only(Feed.name))
+            .where(articles_fts.c.articles_fts.match(match))
+        )
+        if feed_id:
+            stmt = stmt.where(Article.feed_id == feed_id)
+        if cursor:
+            score, row_id, floor = decode_score_cursor(cursor)
+            stmt = stmt.where(tuple_(rank, articles_fts.c.rowid) > tuple_(literal(score), literal(row_id)))
+        else:
+            floor = SearchService.candidate_floor(db, match, feed_id, max_candidates)
+        if floor is not None:
+            stmt = stmt.where(articles_fts.c.rowid >= floor)
+        stmt = stmt.order_by(rank, articles_fts.c.rowid).limit(limit + 1)
+
+        articles = []
+        for article, score, fragment in db.execute(stmt):
+            article.score = score
+            article.snippet = fragment
+            article.feed_name = article.feed.name if article.feed else None
+            articles.append(article)
+
+        if len(articles) <= limit:
+            return articles, None
+        articles = articles[:limit]
+        return articles, encode_score_cursor(articles[-1].score, articles[-1].id, floor)
@@ -0,0 +1,162 @@
+"""
+统计计数服务
+"""
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.database import COUNTERS, Article, Feed, StatsCounter
+
+logger = logging.getLogger(__name__)
+
+class StatsService:
+    """
+    统计计数服务类
+
+    订阅源和文章的计数保存在 stats_counters 表中，由触发器在写入的同一事务中维护，
+    读取只需一次主键查询。reconcile 定期用聚合查询校对并修复偏差。
+    """
+
+    @staticmethod
+    def get_counters(db: Session) -> Dict[str, int]:
+        """
+        获取所有计数器
+
+        计数器缺失时（非 SQLite 数据库或尚未迁移）实时统计。
+
+        Returns:
+            计数器名称到值的映射
+        """
+        counters = dict(db.query(StatsCounter.name, StatsCounter.value).all())
+        if len(counters) < len(COUNTERS):
+            return StatsService.count_live(db)
+        return counters
+
+    @staticmethod
+    def count_live(db: Session) -> Dict[str, int]:
+        """用聚合查询实时统计所有计数器，每张表扫描一次"""
+        counters = {}
+        for table in sorted({table for table, _ in COUNTERS.values()}):
+            names = [name for name, (t, _) in COUNTERS.items() if t == table]
+            columns = ", ".join(
+                f"COALESCE(SUM(CASE WHEN {COUNTERS[name][1].format(row=table)} THEN 1 ELSE 0 END), 0)"
+                for name in names
+            )
+            row = db.execute(text(f"SELECT {columns} FROM {table}")).one()
+            counters.update(zip(names, (int(value) for value in row)))
+        return counters
+
+    @staticmethod
+    def feed_stats(db: Session, counters: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """订阅源统计，counters 为已读取的计数器"""
+        counters = counters or StatsService.get_counters(db)
+        total = counters["feeds_total"]
+        active = counters["feeds_active"]
+        error = counters["feeds_error"]
+        return {
+            "total": total,
+            "active": active,
+            "error": error,
+            "paused": total - active - error
+        }
+
+    @staticmethod
+    def article_stats(db: Session, counters: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """文章统计，counters 为已读取的计数器"""
+        counters = counters or StatsService.get_counters(db)
+        total = counters["articles_total"]
+        unread = counters["articles_unread"]
+        processed = counters["articles_processed"]
+        return {
+            "total": total,
+            "unread": unread,
+            "read": total - unread,
+            "processed": processed,
+            "unprocessed": total - processed
+        }
+
+    @staticmethod
+    def reconcile(db: Session) -> Dict[str, Dict[str, int]]:
+        """
+        校对计数器并修复偏差
+
+        实时统计需要全表扫描，不在写事务中进行：先读取计数器再统计，然后在一个短事务中
+        只覆盖统计期间没有变化的计数器（值仍等于统计前读到的值）。统计期间有写入的计数器
+        留给下次校对，不会覆盖触发器刚维护的值。只支持 SQLite。会提交事务。
+
+        Returns:
+            已修复的计数器：名称 -> {'stored', 'actual'}
+        """
+        if db.get_bind().dialect.name != "sqlite":
+            return {}
+
+        stored = dict(db.query(StatsCounter.name, StatsCounter.value).all())
+        actual = StatsService.count_live(db)
+        db.commit()
+
+        drift = {}
+        counters = StatsCounter.__table__
+        for name, value in actual.items():
+            if stored.get(name) == value:
+                continue
+            if name in stored:
+                updated = db.execute(
+                    update(counters)
+                    .where(counters.c.name == name, counters.c.value == stored[name])
+                    .values(value=value)
+                ).rowcount
+            else:
+                updated = db.execute(
+                    sqlite_insert(counters).values(name=name, value=value).on_conflict_do_nothing()
+                ).rowcount
+            if updated:
+                drift[name] = {"stored": stored.get(name), "actual": value}
+        db.commit()
+
+        skipped = len([name for name, value in actual.items() if stored.get(name) != value]) - len(drift)
+        if skipped:
+            logger.info(f"{skipped} 个计数器在统计期间有写入，留待下次校对")
+        if drift:
+            logger.warning(f"统计计数器存在偏差，已修复: {drift}")
+        return drift
+
+    @staticmethod
+    def reconcile_article_counts(db: Session) -> Dict[int, Dict[str, int]]:
+        """
+        校对订阅源的 article_count 并修复偏差
+
+        文章写入时在同一事务中增量维护 article_count，这里用一次分组统计找出偏差。
+        和 reconcile 一样在写事务之外统计，只覆盖统计期间没有变化的订阅源。会提交事务。
+
+        Returns:
+            发现偏差的订阅源：ID -> {'stored', 'actual'}
+        """
+        stored = dict(db.execute(select(Feed.id, Feed.article_count)).all())
+        counts = dict(db.execute(select(Article.feed_id, func.count(Article.id)).group_by(Article.feed_id)).all())
+        db.commit()
+
+        drift = {
+            feed_id: {"stored": value, "actual": counts.get(feed_id, 0)}
+            for feed_id, value in stored.items()
+            if value != counts.get(feed_id, 0)
+        }
+        if drift:
+            feeds = Feed.__table__
+            result = db.execute(
+                update(feeds)
+                .where(
+                    feeds.c.id == bindparam("feed_id"),
+                    feeds.c.article_count.is_not_distinct_from(bindparam("stored")),
+                )
+                .values(article_count=bindparam("actual")),
+                [
+                    {"feed_id": feed_id, "stored": values["stored"], "actual": values["actual"]}
+                    for feed_id, values in drift.items()
+                ],
+            )
+            db.commit()
+            logger.warning(f"订阅源文章计数存在偏差，已修复: {result.rowcount} 个订阅源")
+        return drift
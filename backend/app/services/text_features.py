@@ -0,0 +1,76 @@
+"""
+文本特征的单遍匹配
+"""
+import re
+from collections import Counter
+from typing import Iterable, List
+
+# 与 AIService 关键词提取使用的 \b\w{3,}\b 一致：单词即最长的连续单词字符
+_WORD = re.compile(r"\w+")
+
+class TextScan:
+    """
+    一段文本的单遍扫描结果
+
+    只转小写一次、分词一次：words 为按首次出现顺序计数的小写单词，
+    vocabulary 为去重后的单词用换行连接的缓冲区，长度远小于原文。
+    """
+
+    __slots__ = ("text", "lower", "words", "vocabulary")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.words = Counter(_WORD.findall(self.lower))
+        self.vocabulary = "\n".join(self.words)
+
+    def merge(self, other: "TextScan", separator: str = " ") -> "TextScan":
+        """拼接两段文本的扫描结果（用于标题 + 正文），不重新分词"""
+        merged = TextScan.__new__(TextScan)
+        merged.text = self.text + separator + other.text
+        merged.lower = self.lower + separator.lower() + other.lower
+        merged.words = self.words + other.words
+        merged.vocabulary = self.vocabulary + "\n" + other.vocabulary
+        return merged
+
+class PatternSet:
+    """
+    编译后的一组子串模式
+
+    只由单词字符组成的模式如果出现在文本中，必然完整地落在某一个单词内，
+    因此只需在去重后的词表缓冲区中查找；含空格或标点的模式在全文中查找。
+    结果与逐个模式在全文上执行 `pattern in text` 完全一致。
+    case_sensitive 为 True 时在原文上匹配，词表只用于预先排除不可能出现的模式。
+    """
+
+    def __init__(self, patterns: Iterable[str], case_sensitive: bool = False):
+        self.patterns = tuple(dict.fromkeys(patterns))
+        self.case_sensitive = case_sensitive
+        self._word_patterns = tuple(p for p in self.patterns if _WORD.fullmatch(p.lower()))
+        self._phrase_patterns = tuple(p for p in self.patterns if not _WORD.fullmatch(p.lower()))
+        # 每个模式中的单词部分，小写后必须出现在词表中
+        self._stems = {p: _WORD.findall(p.lower()) for p in self.patterns}
+
+    def _possible(self, pattern: str, scan: TextScan) -> bool:
+        return all(stem in scan.vocabulary for stem in self._stems[pattern])
+
+    def matches(self, scan: TextScan) -> List[str]:
+        """出现在文本中的模式，按定义顺序"""
+        if self.case_sensitive:
+            return [p for p in self.patterns if self._possible(p, scan) and p in scan.text]
+        found = set(p for p in self._word_patterns if p in scan.vocabulary)
+        found.update(p for p in self._phrase_patterns if self._possible(p, scan) and p in scan.lower)
+        return [p for p in self.patterns if p in found]
+
+    def count(self, scan: TextScan) -> int:
+        """出现在文本中的不同模式数"""
+        return len(self.matches(scan))
+
+    def any(self, scan: TextScan) -> bool:
+        """是否有任一模式出现在文本中"""
+        if self.case_sensitive:
+            return any(self._possible(p, scan) and p in scan.text for p in self.patterns)
+        return (
+            any(p in scan.vocabulary for p in self._word_patterns)
+            or any(self._possible(p, scan) and p in scan.lower for p in self._phrase_patterns)
+        )
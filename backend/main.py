@@ -10,8 +10,9 @@ import logging
 from typing import Optional
 
 from app.core.config import settings
-from app.core.database import init_db, get_db
+from app.core.database import async_engine, async_read_engine, init_db, get_db
 from app.api.v1 import api_router
+from app.scheduler.tasks import stop_task_scheduler
 
 # 配置日志
 logging.basicConfig(
@@ -56,6 +57,9 @@ async def lifespan(app: FastAPI):
     
     # 关闭时
     logger.info("关闭 CastMind 后端服务...")
+    stop_task_scheduler()
+    await async_read_engine.dispose()
+    await async_engine.dispose()
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -75,6 +79,7 @@ if settings.CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Total-Count"],
     )
 
 # 注册 API 路由
@@ -0,0 +1,90 @@
+"""
+AIService 规则分析基准测试
+
+生成 --articles 篇约 --size 字节的英文文章（混有代码片段、链接和各类词表中的词），
+分别用逐项计算（每个特征各自扫描一遍正文）和单遍匹配（TextScan + PatternSet）
+提取关键词、情感、代码、链接和主题，比较每篇的平均耗时并校验两者结果一致。
+
+用法:
+    python benchmarks/bench_ai_heuristics.py [--articles 10000] [--size 50000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.ai_service import AIService, CODE_PATTERNS, NEGATIVE_WORDS, POSITIVE_WORDS, TOPICS
+
+FILLER = (
+    "the quick brown fox jumps over lazy dog while engineers discuss caching layers "
+    "queues databases latency throughput and deployment pipelines across regions"
+).split()
+
+def make_article(rng: random.Random, size: int) -> tuple:
+    """生成一篇约 size 字节的文章，返回 (标题, 正文)"""
+    special = [w for words in TOPICS.values() for w in words] + list(POSITIVE_WORDS) + list(NEGATIVE_WORDS)
+    parts, length = [], 0
+    while length < size:
+        roll = rng.random()
+        if roll < 0.002:
+            part = rng.choice(CODE_PATTERNS) + "x"
+        elif roll < 0.003:
+            part = f"https://example.com/{rng.randint(0, 10 ** 6)}"
+        elif roll < 0.02:
+            part = rng.choice(special).capitalize()
+        else:
+            part = rng.choice(FILLER)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(rng.choice(FILLER) for _ in range(6)), " ".join(parts)
+
+def legacy(service: AIService, content: str, title: str) -> dict:
+    """改造前 analyze_article 的逐项计算"""
+    return {
+        "keywords": service._extract_keywords(content),
+        "sentiment": service._analyze_sentiment(content),
+        "has_code": service._check_has_code(content),
+        "has_links": service._check_has_links(content),
+        "topic": service._identify_topic(content, title),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="AIService 规则分析基准测试")
+    parser.add_argument("--articles", type=int, default=10000, help="文章数")
+    parser.add_argument("--size", type=int, default=50000, help="每篇文章的字节数")
+    parser.add_argument("--distinct", type=int, default=200, help="不同文章的数量，其余重复使用")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    corpus = [make_article(rng, args.size) for _ in range(min(args.distinct, args.articles))]
+    service = AIService()
+
+    for title, content in corpus:
+        assert service._match_features(content, title) == legacy(service, content, title)
+
+    results = {}
+    for name, analyze in (
+        ("逐项计算", lambda content, title: legacy(service, content, title)),
+        ("单遍匹配", service._match_features),
+    ):
+        timings = []
+        started = time.perf_counter()
+        for i in range(args.articles):
+            title, content = corpus[i % len(corpus)]
+            t0 = time.perf_counter()
+            analyze(content, title)
+            timings.append((time.perf_counter() - t0) * 1000)
+        total = time.perf_counter() - started
+        results[name] = total
+        print(
+            f"{name}: {args.articles} 篇 × {args.size} 字节, 总计 {total:.1f}s, "
+            f"每篇 p50 {statistics.median(timings):.2f}ms, 平均 {statistics.mean(timings):.2f}ms"
+        )
+    print(f"加速比: {results['逐项计算'] / results['单遍匹配']:.2f}x（结果一致）")
+
+if __name__ == "__main__":
+    main()
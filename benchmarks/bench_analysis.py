@@ -0,0 +1,143 @@
+"""
+文章分析阶段基准测试
+
+在临时数据库中写入 --articles 篇未处理的文章（正文约 --size 字节），比较:
+
+- legacy: 改造前的写法，每轮最多取 100 篇，在调度器进程内串行 batch_analyze，
+          再逐篇按 ID 重新查询并写回（每篇一次查询），循环直到积压清空
+- pool:   process_unprocessed_articles，分块认领、分析进程池并行分析、每块一条 executemany UPDATE
+
+每种方式都从全部未处理开始，报告总耗时、吞吐量、SQL 语句数和各工作进程的吞吐量。
+
+用法:
+    python benchmarks/bench_analysis.py [--articles 5000] [--size 5000] [--workers 0,-1]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# 必须在导入 app 之前指定数据库和关键词文档频率表
+_TMP = tempfile.mkdtemp(prefix="castmind-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/bench.db"
+os.environ["KEYWORD_IDF_PATH"] = f"{_TMP}/keyword_idf.json"
+
+from sqlalchemy import event, update
+
+from app.core.database import SessionLocal, engine, init_db
+from app.models.database import Article, Feed
+from app.scheduler.tasks import TaskScheduler
+from app.services.analysis_pool import AnalysisPool
+from app.services.article_service import ArticleService
+
+WORDS = (
+    "podcast episode guest interview python javascript startup market great problem tutorial guide "
+    "review latest news kubernetes database latency deploy release feature community"
+).split()
+
+def seed(articles: int, size: int):
+    """写入 articles 篇未处理的文章"""
+    rng = random.Random(42)
+    db = SessionLocal()
+    feed = Feed(name="bench", url="https://example.com/bench")
+    db.add(feed)
+    db.commit()
+    for start in range(0, articles, 1000):
+        rows = []
+        for i in range(start, min(start + 1000, articles)):
+            words = [rng.choice(WORDS) for _ in range(size // 8)] + [f"topic{i % 500}"] * 3
+            rows.append({
+                "title": f"episode {i}",
+                "url": f"https://example.com/bench/{i}",
+                "content": " ".join(words),
+                "summary": "",
+                "published_at": None,
+            })
+        ArticleService.bulk_insert(db, feed, rows)
+        db.commit()
+    db.close()
+
+def reset():
+    """把全部文章恢复为未处理"""
+    db = SessionLocal()
+    db.execute(update(Article).values(processed_status=False, keywords=None, sentiment=None))
+    db.commit()
+    db.close()
+    if os.path.exists(os.environ["KEYWORD_IDF_PATH"]):
+        os.remove(os.environ["KEYWORD_IDF_PATH"])
+
+def legacy(scheduler: TaskScheduler) -> int:
+    """改造前的处理方式，循环调用直到积压清空"""
+    processed = 0
+    while True:
+        db = SessionLocal()
+        try:
+            unprocessed = db.query(Article).filter(
+                Article.processed_status == False  # noqa: E712
+            ).order_by(Article.id).limit(100).all()
+            if not unprocessed:
+                return processed
+            articles_data = [{"id": a.id, "title": a.title, "content": a.content or ""} for a in unprocessed]
+            db.commit()
+            for result in scheduler.ai_service.batch_analyze(articles_data):
+                article = db.query(Article).filter(Article.id == result["id"]).first()
+                article.summary = result["summary"]
+                article.keywords = ", ".join(result.get("keywords", []))
+                article.sentiment = result.get("sentiment", "neutral")
+                article.processed_status = True
+                processed += 1
+            db.commit()
+        finally:
+            db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="文章分析阶段基准测试")
+    parser.add_argument("--articles", type=int, default=5000, help="文章数")
+    parser.add_argument("--size", type=int, default=5000, help="每篇文章正文的字节数")
+    parser.add_argument("--chunk-size", type=int, default=200, help="每块的文章数")
+    parser.add_argument("--workers", default="0,-1", help="逗号分隔的分析进程数，-1 按 CPU 核数")
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.articles, args.size)
+    print(f"文章分析基准: {args.articles} 篇文章, 每篇约 {args.size} 字节, CPU 核数 {os.cpu_count()}")
+
+    statements = [0]
+
+    def count(*_):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    scheduler = TaskScheduler()
+
+    reset()
+    statements[0] = 0
+    started = time.perf_counter()
+    processed = legacy(scheduler)
+    elapsed = time.perf_counter() - started
+    print(f"legacy:          {processed} 篇, {elapsed:6.1f}s, {processed / elapsed:7.0f} 篇/秒, SQL {statements[0]} 条")
+
+    for workers in (int(value) for value in args.workers.split(",")):
+        reset()
+        scheduler.analysis_pool = AnalysisPool(workers=workers)
+        statements[0] = 0
+        try:
+            result = scheduler.process_unprocessed_articles(chunk_size=args.chunk_size)
+        finally:
+            scheduler.analysis_pool.shutdown()
+        print(
+            f"pool workers={scheduler.analysis_pool.workers:2d}: {result['processed']} 篇, "
+            f"{result['elapsed_seconds']:6.1f}s, {result['articles_per_second']:7.0f} 篇/秒, SQL {statements[0]} 条"
+        )
+        for worker in result["workers"]:
+            print(
+                f"    进程 {worker['worker']}: {worker['chunks']} 块, {worker['articles']} 篇, "
+                f"分析 {worker['articles_per_second']} 篇/秒"
+            )
+
+if __name__ == "__main__":
+    main()
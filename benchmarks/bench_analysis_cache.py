@@ -0,0 +1,108 @@
+"""
+分析结果缓存基准测试
+
+生成 --articles 篇文章，其中 --duplicate-ratio 比例是其他文章的镜像（正文相同、空白不同），
+按 --batch 篇一批调用 AIService.batch_analyze，比较:
+
+- 不使用缓存
+- 冷缓存（首次处理，只有镜像命中）
+- 热缓存（新的 AIService 实例重新处理同一批文章，进程内缓存为空，全部从 SQLite 存储命中）
+
+--latency-ms 为每次实际分析额外等待的毫秒数，用于模拟接入 LLM 后每次分析的耗时。
+
+用法:
+    python benchmarks/bench_analysis_cache.py [--articles 5000] [--duplicate-ratio 0.3] [--latency-ms 0]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# 必须在导入 app 之前指定数据库和关键词文档频率表
+_TMP = tempfile.mkdtemp(prefix="castmind-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/bench.db"
+os.environ["KEYWORD_IDF_PATH"] = f"{_TMP}/keyword_idf.json"
+
+from app.core.database import init_db
+from app.services.ai_service import AIService
+from app.services.analysis_cache import AnalysisCache
+
+WORDS = (
+    "podcast episode guest interview python javascript startup market great problem tutorial guide "
+    "review latest news kubernetes database latency deploy release feature community"
+).split()
+
+def corpus(articles: int, duplicate_ratio: float, size: int) -> list:
+    """生成文章列表，镜像文章复制之前某篇的标题和正文并改变空白"""
+    rng = random.Random(42)
+    items = []
+    for i in range(articles):
+        if items and rng.random() < duplicate_ratio:
+            original = rng.choice(items)
+            items.append({"id": i, "title": original["title"], "content": original["content"].replace(" ", "  ", 5)})
+        else:
+            items.append({
+                "id": i,
+                "title": f"episode {i}",
+                "content": " ".join(rng.choice(WORDS) for _ in range(size // 8)),
+            })
+    return items
+
+def run(service: AIService, articles: list, batch: int, latency: float) -> tuple:
+    """分批分析，返回 (耗时, 实际分析次数)"""
+    calls = [0]
+    analyze = service._analyze
+
+    def counted(*args):
+        calls[0] += 1
+        if latency:
+            time.sleep(latency)
+        return analyze(*args)
+
+    service._analyze = counted
+    keywords = [[] for _ in range(batch)]
+    started = time.perf_counter()
+    for start in range(0, len(articles), batch):
+        chunk = articles[start:start + batch]
+        service.batch_analyze(chunk, keywords=keywords[:len(chunk)])
+    return time.perf_counter() - started, calls[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="分析结果缓存基准测试")
+    parser.add_argument("--articles", type=int, default=5000, help="文章数")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3, help="镜像文章的比例")
+    parser.add_argument("--size", type=int, default=5000, help="每篇文章正文的字节数")
+    parser.add_argument("--batch", type=int, default=200, help="每批文章数")
+    parser.add_argument("--latency-ms", type=float, default=0, help="每次实际分析额外等待的毫秒数")
+    args = parser.parse_args()
+
+    init_db()
+    articles = corpus(args.articles, args.duplicate_ratio, args.size)
+    latency = args.latency_ms / 1000
+    print(
+        f"分析缓存基准: {args.articles} 篇文章, 镜像比例 {args.duplicate_ratio:.0%}, "
+        f"每篇约 {args.size} 字节, 每批 {args.batch} 篇, 模拟分析耗时 {args.latency_ms}ms"
+    )
+
+    # 关键词由调用方传入，三种情况都不调用关键词引擎
+    uncached = AIService()
+    uncached.cache = None
+    scenarios = (
+        ("不使用缓存", uncached),
+        ("冷缓存", AIService(cache=AnalysisCache())),
+        ("热缓存", AIService(cache=AnalysisCache())),
+    )
+    for name, service in scenarios:
+        elapsed, calls = run(service, articles, args.batch, latency)
+        stats = service.cache.stats() if service.cache else None
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats and stats["hit_rate"] is not None else "-"
+        print(
+            f"{name:>6}: {elapsed:6.2f}s, {args.articles / elapsed:7.0f} 篇/秒, 实际分析 {calls} 次, 命中率 {hit_rate}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+API 并发负载测试
+
+在临时数据库中写入文章，在子进程中启动 uvicorn（避免和负载生成器争用 GIL），
+用 httpx 模拟 N 个并发客户端。
+客户端循环请求 50 条的文章列表，每隔 --mix-every 个请求混入一次 "慢" 请求，
+对比两种数据库访问方式下文章列表请求的延迟分布：
+
+- sync:  async def 接口中直接调用同步会话（改造前的写法），数据库调用期间阻塞事件循环
+- async: aiosqlite 异步会话（/api/v1/articles/ 等接口）
+
+慢请求有两种场景（--scenario）：
+
+- lock:  后台线程模拟调度器入库，周期性持有写锁；慢请求为标记已读，需要等待写锁
+- query: 慢请求为无索引的自连接聚合，模拟仪表盘的统计查询（纯 CPU，单核机器上 async 无法并行）
+
+用法:
+    python benchmarks/bench_api_concurrency.py [--scenario lock] [--clients 200] [--requests 10]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# 必须在导入 app 之前指定数据库，服务器子进程通过环境变量使用同一个文件
+_DB_PATH = os.environ.setdefault(
+    "CASTMIND_BENCH_DB", os.path.join(tempfile.mkdtemp(prefix="castmind-bench-"), "bench.db")
+)
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+
+import httpx
+import uvicorn
+from sqlalchemy import func, text
+from sqlalchemy.orm import joinedload
+
+from app.core.database import AsyncReadSessionLocal, ReadSessionLocal, SessionLocal, init_db
+from app.models.database import Article, Feed
+from app.models.schemas import ArticleListItem
+from app.services.article_service import ArticleService
+
+# 无索引的自连接聚合，模拟慢统计查询
+SLOW_QUERY = (
+    "SELECT COUNT(*), MAX(a.id) FROM articles a JOIN articles b ON a.feed_id = b.feed_id "
+    "WHERE a.id % 7 = 0 AND b.title LIKE '%9%'"
+)
+
+def seed(articles: int):
+    """写入 20 个订阅源和 articles 篇文章"""
+    base = datetime(2024, 1, 1)
+    db = SessionLocal()
+    feeds = [Feed(name=f"feed {i}", url=f"https://example.com/feed/{i}") for i in range(20)]
+    db.add_all(feeds)
+    db.commit()
+    for start in range(0, articles, 1000):
+        feed = feeds[(start // 1000) % len(feeds)]
+        ArticleService.bulk_insert(db, feed, [
+            {
+                "title": f"episode {i}",
+                "url": f"https://example.com/bench/{i}",
+                "content": "lorem ipsum " * 200,
+                "summary": "lorem ipsum",
+                "published_at": base + timedelta(minutes=i),
+            }
+            for i in range(start, min(start + 1000, articles))
+        ])
+        db.commit()
+    db.close()
+
+def lock_holder(stop: threading.Event, hold: float, interval: float):
+    """模拟调度器入库：每 interval 秒开启一次写事务并持有 hold 秒"""
+    conn = sqlite3.connect(_DB_PATH, isolation_level=None, timeout=30)
+    n = 0
+    while not stop.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE feeds SET last_error = ? WHERE id = 1", (f"tick {n}",))
+        time.sleep(hold)
+        conn.execute("COMMIT")
+        n += 1
+        stop.wait(interval)
+    conn.close()
+
+def add_benchmark_routes(app):
+    """注册改造前写法的对比接口和慢查询接口"""
+
+    @app.get("/bench/sync/articles")
+    async def sync_articles(limit: int = 50):
+        db = ReadSessionLocal()
+        try:
+            articles = db.query(Article).options(joinedload(Article.feed)).order_by(
+                Article.published_at.desc(), Article.id.desc()
+            ).limit(limit).all()
+            db.query(func.count(Article.id)).scalar()
+            for article in articles:
+                article.feed_name = article.feed.name
+            return [ArticleListItem.model_validate(article) for article in articles]
+        finally:
+            db.close()
+
+    @app.post("/bench/sync/mark-read/{article_id}")
+    async def sync_mark_read(article_id: int):
+        db = SessionLocal()
+        try:
+            article = db.query(Article).filter(Article.id == article_id).first()
+            article.read_status = not article.read_status
+            db.commit()
+            return {"id": article_id}
+        finally:
+            db.close()
+
+    @app.get("/bench/sync/slow")
+    async def sync_slow():
+        db = ReadSessionLocal()
+        try:
+            return list(db.execute(text(SLOW_QUERY)).one())
+        finally:
+            db.close()
+
+    @app.get("/bench/async/slow")
+    async def async_slow():
+        async with AsyncReadSessionLocal() as db:
+            return list((await db.execute(text(SLOW_QUERY))).one())
+
+def serve(port: int):
+    """服务器子进程：注册对比接口并运行 uvicorn"""
+    from main import app
+    add_benchmark_routes(app)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096, timeout_keep_alive=300)
+
+def start_server():
+    """启动服务器子进程，返回进程和基础 URL"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(port)])
+    base_url = f"http://127.0.0.1:{port}"
+    while True:
+        try:
+            httpx.get(f"{base_url}/api/v1/system/health")
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+def slow_request(client: httpx.AsyncClient, scenario: str, mode: str, n: int):
+    """按场景构造慢请求"""
+    if scenario == "lock":
+        url = f"/bench/sync/mark-read/{n % 1000 + 1}" if mode == "sync" else f"/api/v1/articles/{n % 1000 + 1}/mark-read"
+        return client.post(url)
+    return client.get(f"/bench/{mode}/slow")
+
+async def load(base_url: str, scenario: str, mode: str, clients: int, requests: int, mix_every: int) -> list:
+    """运行一轮负载，返回文章列表请求的延迟（毫秒）"""
+    list_url = "/bench/sync/articles" if mode == "sync" else "/api/v1/articles/"
+    latencies = []
+    counter = {"n": 0}
+
+    async def client_loop(client: httpx.AsyncClient):
+        for _ in range(requests):
+            counter["n"] += 1
+            if mix_every and counter["n"] % mix_every == 0:
+                response = await slow_request(client, scenario, mode, counter["n"])
+                assert response.status_code == 200, response.text
+                continue
+            started = time.perf_counter()
+            response = await client.get(list_url, params={"limit": 50})
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, response.text
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+    return latencies
+
+def report(mode: str, latencies: list, elapsed: float):
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{mode:>5}: {len(latencies) / elapsed:7.0f} 次/秒, p50 {p50:8.2f}ms, p95 {p95:8.2f}ms, "
+        f"p99 {p99:8.2f}ms, 最大 {latencies[-1]:8.2f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="API 并发负载测试")
+    parser.add_argument("--scenario", choices=["lock", "query"], default="lock", help="慢请求场景")
+    parser.add_argument("--clients", type=int, default=200, help="并发客户端数")
+    parser.add_argument("--requests", type=int, default=10, help="每个客户端的请求数")
+    parser.add_argument("--articles", type=int, default=20000, help="文章数")
+    parser.add_argument("--mix-every", type=int, default=20, help="每隔多少个请求混入一次慢请求，0 不混入")
+    parser.add_argument("--hold", type=float, default=0.3, help="lock 场景下每次持有写锁的秒数")
+    parser.add_argument("--interval", type=float, default=0.7, help="lock 场景下两次写事务的间隔秒数")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    init_db()
+    seed(args.articles)
+    process, base_url = start_server()
+
+    stop = threading.Event()
+    if args.scenario == "lock":
+        threading.Thread(target=lock_holder, args=(stop, args.hold, args.interval), daemon=True).start()
+
+    print(
+        f"API 负载测试（{args.scenario}）: {args.clients} 个并发客户端 x {args.requests} 次请求, "
+        f"{args.articles} 篇文章, 每 {args.mix_every} 个请求一次慢请求"
+    )
+    for mode in ("sync", "async"):
+        started = time.perf_counter()
+        latencies = asyncio.run(load(base_url, args.scenario, mode, args.clients, args.requests, args.mix_every))
+        report(mode, latencies, time.perf_counter() - started)
+
+    stop.set()
+    process.terminate()
+    process.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+文章列表响应基准测试
+
+在临时数据库中写入带完整 HTML 正文的文章，通过 TestClient 请求 500 条的文章列表，
+对比两种方式的响应大小、峰值内存（tracemalloc）和延迟：
+
+- full:     include_content=true，读取并序列化正文和摘要（改造前列表接口的行为）
+- metadata: 默认请求，正文和摘要延迟加载，列表只读取元数据
+
+用法:
+    python benchmarks/bench_article_list.py [--articles 5000] [--body-kb 20] [--limit 500] [--rounds 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# 必须在导入 app 之前指定数据库
+_TMP = tempfile.mkdtemp(prefix="castmind-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/bench.db"
+
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal, init_db
+from app.models.database import Feed
+from app.services.article_service import ArticleService
+
+def seed(articles: int, body_kb: int):
+    """写入一个订阅源和 articles 篇正文约 body_kb KB 的文章"""
+    paragraph = "<p>" + "lorem ipsum dolor sit amet " * 36 + "</p>\n"
+    body = paragraph * max(1, body_kb * 1024 // len(paragraph))
+    base = datetime(2024, 1, 1)
+
+    db = SessionLocal()
+    feed = Feed(name="bench", url="https://example.com/bench")
+    db.add(feed)
+    db.commit()
+    for start in range(0, articles, 1000):
+        ArticleService.bulk_insert(db, feed, [
+            {
+                "title": f"episode {i}",
+                "url": f"https://example.com/bench/{i}",
+                "content": body,
+                "summary": body[:500],
+                "published_at": base + timedelta(minutes=i),
+            }
+            for i in range(start, min(start + 1000, articles))
+        ])
+        db.commit()
+    db.close()
+
+def measure(client: TestClient, params: dict, rounds: int) -> dict:
+    """请求 rounds 次，返回响应大小、延迟中位数和单次请求的峰值内存"""
+    client.get("/api/v1/articles/", params=params)  # 预热
+
+    latencies = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        response = client.get("/api/v1/articles/", params=params)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    client.get("/api/v1/articles/", params=params)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "bytes": len(response.content),
+        "p50": statistics.median(latencies),
+        "max": max(latencies),
+        "peak_mb": peak / 1024 / 1024,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="文章列表响应基准测试")
+    parser.add_argument("--articles", type=int, default=5000, help="文章数")
+    parser.add_argument("--body-kb", type=int, default=20, help="每篇文章正文大小（KB）")
+    parser.add_argument("--limit", type=int, default=500, help="每页文章数")
+    parser.add_argument("--rounds", type=int, default=20, help="每种方式的请求次数")
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.articles, args.body_kb)
+
+    from main import app
+    client = TestClient(app)
+
+    print(f"文章列表基准: {args.articles} 篇文章, 正文 {args.body_kb}KB, 每页 {args.limit} 条, 各请求 {args.rounds} 次")
+    for name, params in (
+        ("full", {"limit": args.limit, "include_content": "true"}),
+        ("metadata", {"limit": args.limit}),
+    ):
+        result = measure(client, params, args.rounds)
+        print(
+            f"{name:>8}: 响应 {result['bytes'] / 1024:9.1f}KB, "
+            f"p50 {result['p50']:8.2f}ms, 最大 {result['max']:8.2f}ms, 峰值内存 {result['peak_mb']:7.1f}MB"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+日期解析微基准
+
+在 10 万条真实格式的日期字符串上比较原实现（fromisoformat 失败后回退 dateutil）
+和 DateNormalizer（预编译快速解析器 + 按订阅源记住格式）的吞吐量，并核对结果一致。
+
+样本按订阅源生成：大多数订阅源使用 RFC 822（各种时区写法），
+部分使用 RFC 3339，少量使用其他格式。
+
+用法:
+    python benchmarks/bench_date_parser.py [--count 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.date_parser import DateNormalizer
+
+RFC822_FORMATS = [
+    "%a, %d %b %Y %H:%M:%S +0000",
+    "%a, %d %b %Y %H:%M:%S GMT",
+    "%a, %d %b %Y %H:%M:%S -0500",
+    "%a, %d %b %Y %H:%M:%S PST",
+    "%d %b %Y %H:%M:%S +0800",
+    "%a, %d %b %Y %H:%M +0100",
+]
+RFC3339_FORMATS = [
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S+08:00",
+    "%Y-%m-%dT%H:%M:%S.%f-05:00",
+]
+OTHER_FORMATS = [
+    "%B %d, %Y %I:%M %p",
+    "%Y/%m/%d %H:%M",
+]
+
+def make_samples(count: int, feeds: int = 500, seed: int = 42) -> list:
+    """生成 (订阅源, 日期字符串) 样本"""
+    rng = random.Random(seed)
+    feed_formats = []
+    for _ in range(feeds):
+        roll = rng.random()
+        if roll < 0.85:
+            feed_formats.append(rng.choice(RFC822_FORMATS))
+        elif roll < 0.97:
+            feed_formats.append(rng.choice(RFC3339_FORMATS))
+        else:
+            feed_formats.append(rng.choice(OTHER_FORMATS))
+
+    start = datetime(2015, 1, 1)
+    samples = []
+    for _ in range(count):
+        feed = rng.randrange(feeds)
+        moment = start + timedelta(seconds=rng.randrange(10 * 365 * 86400))
+        samples.append((f"https://example.com/{feed}", moment.strftime(feed_formats[feed])))
+    return samples
+
+def legacy_parse(value: str):
+    """原 extract_articles 中的解析逻辑（失败时返回 None 以便比较）"""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            import dateutil.parser
+            return dateutil.parser.parse(value)
+        except Exception:
+            return None
+
+def main():
+    parser = argparse.ArgumentParser(description="日期解析微基准")
+    parser.add_argument("--count", type=int, default=100000, help="样本数量")
+    args = parser.parse_args()
+
+    samples = make_samples(args.count)
+
+    started = time.perf_counter()
+    legacy = [legacy_parse(value) for _, value in samples]
+    legacy_time = time.perf_counter() - started
+
+    normalizer = DateNormalizer()
+    started = time.perf_counter()
+    fast = [normalizer.parse(value, feed) for feed, value in samples]
+    fast_time = time.perf_counter() - started
+
+    # 带时区缩写的样本 dateutil 返回无时区时间，只比较本地时间部分
+    mismatches = sum(
+        1 for a, b in zip(legacy, fast)
+        if a is not None and (b is None or a.replace(tzinfo=None) != b.replace(tzinfo=None))
+    )
+
+    print(f"样本: {args.count} 条")
+    print(f"  原实现: {legacy_time:6.2f}s, {args.count / legacy_time:9.0f} 条/秒")
+    print(f"  快速路径: {fast_time:6.2f}s, {args.count / fast_time:9.0f} 条/秒, 加速比 {legacy_time / fast_time:.1f}x")
+    print(f"  结果不一致: {mismatches}")
+    print(f"  解析路径计数: {normalizer.snapshot()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+SQLite 读写并发基准测试
+
+一个写线程持续批量入库文章（模拟调度器），同时多个读线程执行 API 的典型查询
+（文章列表、统计计数），对比两种连接配置下的读延迟分布和 "database is locked" 错误数：
+
+- legacy: 改造前的单一引擎（回滚日志模式，读写共用连接池）
+- tuned:  WAL + 调优的 pragma，只读引擎和单连接写引擎分离
+
+用法:
+    python benchmarks/bench_db_concurrency.py [--seconds 10] [--readers 8] [--batch 500]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, create_db_engine
+from app.models.database import Article, Feed
+from app.services.article_service import ArticleService
+
+def make_engines(profile: str, url: str, readers: int):
+    """按配置创建 (写引擎, 读引擎)"""
+    if profile == "legacy":
+        engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+        return engine, engine
+    writer = create_db_engine(url, pool_size=1)
+    reader = create_db_engine(url, read_only=True, pool_size=readers)
+    return writer, reader
+
+def writer_loop(Session, stop: threading.Event, batch: int, stats: dict):
+    """持续入库：每个事务插入 batch 篇文章"""
+    db = Session()
+    feed = db.query(Feed).first()
+    round_no = 0
+    now = datetime(2024, 1, 1)
+    while not stop.is_set():
+        articles = [
+            {
+                "title": f"episode {round_no}-{i}",
+                "url": f"https://example.com/{round_no}/{i}",
+                "content": "lorem ipsum " * 100,
+                "summary": "lorem ipsum",
+                "published_at": now + timedelta(minutes=round_no * batch + i),
+            }
+            for i in range(batch)
+        ]
+        try:
+            stats["rows"] += ArticleService.bulk_insert(db, feed, articles)
+            db.commit()
+        except OperationalError:
+            db.rollback()
+            stats["errors"] += 1
+        round_no += 1
+    db.close()
+
+def reader_loop(Session, stop: threading.Event, latencies: list, stats: dict):
+    """持续执行 API 的典型只读查询"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        db = Session()
+        try:
+            db.query(Article.id, Article.title, Article.published_at).order_by(
+                Article.published_at.desc()
+            ).limit(50).all()
+            db.query(func.count(Article.id)).filter(Article.read_status == False).scalar()  # noqa: E712
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            stats["errors"] += 1
+        finally:
+            db.close()
+
+def run(profile: str, seconds: float, readers: int, batch: int):
+    """运行一种配置并打印结果"""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        writer, reader = make_engines(profile, url, readers)
+        Base.metadata.create_all(writer)
+        WriteSession = sessionmaker(bind=writer)
+        ReadSession = sessionmaker(bind=reader)
+
+        db = WriteSession()
+        db.add(Feed(name="bench", url="https://example.com/bench"))
+        db.commit()
+        db.close()
+
+        stop = threading.Event()
+        write_stats = {"rows": 0, "errors": 0}
+        read_stats = {"errors": 0}
+        latencies = []
+        threads = [threading.Thread(target=writer_loop, args=(WriteSession, stop, batch, write_stats))]
+        threads += [
+            threading.Thread(target=reader_loop, args=(ReadSession, stop, latencies, read_stats))
+            for _ in range(readers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        writer.dispose()
+        if reader is not writer:
+            reader.dispose()
+
+    latencies.sort()
+    if latencies:
+        p50 = statistics.median(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(
+            f"{profile:>7}: 读 {len(latencies) / seconds:8.0f} 次/秒, "
+            f"p50 {p50:7.2f}ms, p95 {p95:7.2f}ms, p99 {p99:7.2f}ms, 最大 {latencies[-1]:8.2f}ms, "
+            f"读错误 {read_stats['errors']}; 写 {write_stats['rows'] / seconds:8.0f} 行/秒, 写错误 {write_stats['errors']}"
+        )
+    else:
+        print(f"{profile:>7}: 没有完成的读请求, 读错误 {read_stats['errors']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 读写并发基准测试")
+    parser.add_argument("--seconds", type=float, default=10, help="每种配置的运行时间")
+    parser.add_argument("--readers", type=int, default=8, help="读线程数")
+    parser.add_argument("--batch", type=int, default=500, help="每个写事务插入的文章数")
+    args = parser.parse_args()
+
+    print(f"SQLite 并发基准: {args.readers} 个读线程 + 1 个写线程, 每个写事务 {args.batch} 行, 各运行 {args.seconds}s")
+    run("legacy", args.seconds, args.readers, args.batch)
+    run("tuned", args.seconds, args.readers, args.batch)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+文章入库基准测试
+
+对比逐条入库（每篇文章一次 SELECT + ORM add + COUNT(*)）和批量入库
+（集合查询 + executemany 插入 + 增量计数）在 SQLite 上的每订阅源语句数和吞吐量。
+
+用法:
+    python benchmarks/bench_ingest.py [--items 1000] [--rounds 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.database import Article, Feed
+from app.services.article_service import ArticleService
+
+def make_articles(prefix: str, count: int) -> list:
+    """生成合成文章"""
+    now = datetime(2024, 1, 1)
+    return [
+        {
+            "title": f"{prefix} episode {i}",
+            "url": f"https://example.com/{prefix}/{i}",
+            "content": "lorem ipsum " * 50,
+            "summary": "lorem ipsum",
+            "published_at": now - timedelta(hours=i),
+        }
+        for i in range(count)
+    ]
+
+def legacy_ingest(db, feed, articles) -> int:
+    """改造前的逐条入库路径"""
+    new_articles = 0
+    for article_data in articles:
+        existing = db.query(Article).filter(Article.url == article_data["url"]).first()
+        if existing:
+            continue
+        db.add(Article(feed_id=feed.id, **article_data))
+        new_articles += 1
+    feed.article_count = db.query(Article).filter(Article.feed_id == feed.id).count()
+    db.commit()
+    return new_articles
+
+def bulk_ingest(db, feed, articles) -> int:
+    """批量入库路径"""
+    inserted = ArticleService.bulk_insert(db, feed, articles)
+    db.commit()
+    return inserted
+
+def run(name, ingest, items: int, rounds: int):
+    """运行一种入库方式并打印结果"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        statements = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_statements(conn, cursor, statement, parameters, context, executemany):
+            nonlocal statements
+            statements += 1
+
+        db = Session()
+        feed = Feed(name=name, url=f"https://example.com/{name}")
+        db.add(feed)
+        db.commit()
+
+        # 第一轮插入全部新文章，之后各轮只有一半是新文章
+        total_rows = 0
+        total_time = 0.0
+        total_statements = 0
+        for round_no in range(rounds):
+            articles = make_articles(name, items + round_no * items // 2)[-items:]
+            statements = 0
+            started = time.perf_counter()
+            total_rows += ingest(db, feed, articles)
+            total_time += time.perf_counter() - started
+            total_statements += statements
+
+        db.close()
+        engine.dispose()
+
+    print(
+        f"{name:>8}: {total_statements / rounds:8.1f} 条语句/订阅源, "
+        f"{total_rows / total_time:10.0f} 行/秒, 共插入 {total_rows} 行, 耗时 {total_time:.3f}s"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="文章入库基准测试")
+    parser.add_argument("--items", type=int, default=1000, help="每个订阅源的条目数")
+    parser.add_argument("--rounds", type=int, default=3, help="抓取轮数")
+    args = parser.parse_args()
+
+    print(f"SQLite 入库基准: 每个订阅源 {args.items} 条, {args.rounds} 轮")
+    run("legacy", legacy_ingest, args.items, args.rounds)
+    run("bulk", bulk_ingest, args.items, args.rounds)
+
+if __name__ == "__main__":
+    main()
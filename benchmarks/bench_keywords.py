@@ -0,0 +1,71 @@
+"""
+关键词提取基准测试
+
+生成 --articles 篇文章（词频服从 Zipf 分布，每篇约 --words 个词），比较:
+- 改造前: AIService._extract_keywords 逐篇按词频排序
+- 关键词引擎: KeywordEngine.extract 按不同批大小处理，整批构建稀疏矩阵并用 NumPy 选出前 k 个词
+
+吞吐量以每秒文章数计。引擎每批都会更新文档频率表，每个批大小使用新的引擎实例。
+
+用法:
+    python benchmarks/bench_keywords.py [--articles 20000] [--words 400] [--batches 1,10,100,1000]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.ai_service import AIService
+from app.services.keyword_engine import KeywordEngine
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "te", "vi", "zo", "pa", "qu", "xe", "di", "fo", "gu", "ha"]
+
+def corpus(articles: int, words: int, vocabulary: int) -> list:
+    """生成文章正文列表"""
+    rng = random.Random(42)
+    vocab = set()
+    while len(vocab) < vocabulary:
+        vocab.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    vocab = sorted(vocab, key=lambda w: rng.random())
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    return [" ".join(rng.choices(vocab, cum_weights=cum_weights, k=words)) for _ in range(articles)]
+
+def main():
+    parser = argparse.ArgumentParser(description="关键词提取基准测试")
+    parser.add_argument("--articles", type=int, default=20000, help="文章数")
+    parser.add_argument("--words", type=int, default=400, help="每篇文章的词数")
+    parser.add_argument("--vocabulary", type=int, default=30000, help="词表大小")
+    parser.add_argument("--batches", default="1,10,100,1000", help="逗号分隔的批大小")
+    args = parser.parse_args()
+
+    texts = corpus(args.articles, args.words, args.vocabulary)
+    print(f"关键词提取基准: {args.articles} 篇文章, 每篇 {args.words} 个词, 词表 {args.vocabulary}")
+
+    tmp = tempfile.mkdtemp(prefix="castmind-bench-")
+    service = AIService(keyword_engine=KeywordEngine(idf_path=os.path.join(tmp, "unused.json")))
+    started = time.perf_counter()
+    for text in texts:
+        service._extract_keywords(text)
+    elapsed = time.perf_counter() - started
+    print(f"逐篇词频排序:        {args.articles / elapsed:9.0f} 篇/秒")
+
+    for batch in (int(size) for size in args.batches.split(",")):
+        engine = KeywordEngine(idf_path=os.path.join(tmp, f"idf-{batch}.json"))
+        started = time.perf_counter()
+        for start in range(0, len(texts), batch):
+            engine.extract(texts[start:start + batch])
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        engine.save()
+        print(
+            f"TF-IDF 批大小 {batch:5d}: {args.articles / elapsed:9.0f} 篇/秒, "
+            f"词表 {len(engine.terms)} 个词, 保存文档频率表 {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+LLM 摘要客户端基准测试
+
+启动本地模拟的 OpenAI 兼容接口（每个请求等待 --latency-ms 毫秒），为 --articles 篇文章
+生成摘要，其中 --duplicate-ratio 比例的提示与之前某篇相同，比较:
+
+- serial:     并发 1，相当于改造前逐篇阻塞调用
+- concurrent: 并发 --concurrency，相同的提示合并为一个请求
+
+用法:
+    python benchmarks/bench_llm_client.py [--articles 200] [--latency-ms 100] [--concurrency 16]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.llm_client import LLMClient
+
+def serve(latency: float) -> ThreadingHTTPServer:
+    """启动模拟接口，返回服务器对象"""
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            payload = json.loads(raw)
+            time.sleep(latency)
+            body = json.dumps({
+                "choices": [{"message": {"role": "assistant", "content": payload["messages"][-1]["content"][:80]}}],
+                "usage": {"prompt_tokens": len(raw) // 4, "completion_tokens": 60, "total_tokens": len(raw) // 4 + 60},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM 摘要客户端基准测试")
+    parser.add_argument("--articles", type=int, default=200, help="文章数")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2, help="与之前某篇提示相同的比例")
+    parser.add_argument("--latency-ms", type=float, default=100, help="模拟接口每个请求的耗时（毫秒）")
+    parser.add_argument("--concurrency", type=int, default=16, help="并发请求数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    prompts = []
+    for i in range(args.articles):
+        if prompts and rng.random() < args.duplicate_ratio:
+            prompts.append(rng.choice(prompts))
+        else:
+            prompts.append([{"role": "user", "content": f"episode {i} " + "podcast transcript " * 200}])
+
+    server = serve(args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    print(
+        f"LLM 客户端基准: {args.articles} 篇文章, 重复比例 {args.duplicate_ratio:.0%}, "
+        f"模拟耗时 {args.latency_ms}ms/请求"
+    )
+    try:
+        for name, concurrency in (("serial", 1), ("concurrent", args.concurrency)):
+            client = LLMClient(
+                base_url=base_url, api_key="bench", concurrency=concurrency,
+                requests_per_minute=0, tokens_per_minute=0, token_budget=0,
+            )
+            started = time.perf_counter()
+            results = client.complete_many(prompts)
+            elapsed = time.perf_counter() - started
+            stats = client.stats()
+            print(
+                f"{name:>10}: {elapsed:6.2f}s, {args.articles / elapsed:7.1f} 篇/秒, "
+                f"请求 {stats['requests']} 个, 合并 {stats['coalesced']} 个, token {stats['total_tokens']}, "
+                f"失败 {sum(result is None for result in results)}"
+            )
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
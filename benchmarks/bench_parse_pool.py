@@ -0,0 +1,85 @@
+"""
+解析进程池基准测试
+
+在合成订阅源语料上比较 1、2、4 和 N（CPU 核数）个解析进程的吞吐量。
+每个订阅源都完整解析并提取全部条目（包括日期规范化）。
+
+用法:
+    python benchmarks/bench_parse_pool.py [--feeds 200] [--items 300]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from app.services.parse_pool import ParsePool, parse_fetched
+
+def make_feed(index: int, items: int) -> bytes:
+    """生成带 HTML 正文和 RFC 822 日期的合成订阅源"""
+    start = datetime(2024, 1, 1)
+    entries = []
+    for i in range(items):
+        published = (start - timedelta(hours=i * 7)).strftime("%a, %d %b %Y %H:%M:%S +0000")
+        entries.append(f"""
+        <item>
+            <title>Feed {index} episode {i}</title>
+            <link>https://example.com/{index}/{i}</link>
+            <guid>https://example.com/{index}/{i}</guid>
+            <description><![CDATA[<p>Episode {i} show notes with <a href="https://example.com">links</a>.</p>]]></description>
+            <pubDate>{published}</pubDate>
+        </item>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed {index}</title><link>https://example.com/{index}</link>
+{''.join(entries)}
+</channel></rss>""".encode("utf-8")
+
+def run(workers: int, corpus: list, items: int) -> float:
+    """用指定进程数解析整个语料，返回耗时"""
+    pool = ParsePool(workers=workers)
+    executor = pool.executor
+    # 预热：启动工作进程并完成导入，不计入耗时
+    list(executor.map(parse_fetched, corpus[:workers], ["warmup"] * workers))
+
+    context = {"limit": items}
+    started = time.perf_counter()
+    parsed = sum(
+        len(record["articles"])
+        for record in executor.map(
+            parse_fetched,
+            corpus,
+            [f"https://example.com/{i}" for i in range(len(corpus))],
+            [context] * len(corpus),
+            chunksize=4,
+        )
+    )
+    elapsed = time.perf_counter() - started
+    pool.shutdown()
+
+    assert parsed == len(corpus) * items
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="解析进程池基准测试")
+    parser.add_argument("--feeds", type=int, default=200, help="订阅源数量")
+    parser.add_argument("--items", type=int, default=300, help="每个订阅源的条目数")
+    args = parser.parse_args()
+
+    corpus = [make_feed(i, args.items) for i in range(args.feeds)]
+    size_mb = sum(len(c) for c in corpus) / 1024 / 1024
+    cpu_count = os.cpu_count() or 1
+    print(f"语料: {args.feeds} 个订阅源, 每个 {args.items} 条, 共 {size_mb:.1f} MB, CPU 核数 {cpu_count}")
+
+    baseline = None
+    for workers in sorted({1, 2, 4, cpu_count}):
+        elapsed = run(workers, corpus, args.items)
+        baseline = baseline or elapsed
+        print(
+            f"{workers:>3} 进程: {elapsed:7.2f}s, {args.feeds / elapsed:7.1f} 订阅源/秒, "
+            f"{args.feeds * args.items / elapsed:9.0f} 条目/秒, 加速比 {baseline / elapsed:.2f}x"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+保留期清理基准测试
+
+在临时数据库中写入文章，其中一部分已过期（已读、已处理、60 天前入库），
+清理期间一个写线程每 20ms 修改一次文章状态（模拟 API 的标记已读），
+对比两种清理方式的吞吐量和写请求等待写锁的延迟：
+
+- legacy:  改造前的写法，把过期文章全部加载为 ORM 对象逐条删除，一个事务提交
+- chunked: RetentionEngine，按主键分块删除，每块一个短事务，块之间让出写锁
+
+用法:
+    python benchmarks/bench_retention.py [--articles 50000] [--expired-ratio 0.5] [--chunk-size 500]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# 必须在导入 app 之前指定数据库
+_TMP = tempfile.mkdtemp(prefix="castmind-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP}/bench.db"
+
+from sqlalchemy import update
+
+from app.core.database import SessionLocal, init_db
+from app.models.database import Article, Feed
+from app.services.article_service import ArticleService
+from app.services.retention_service import RetentionEngine
+
+def seed(articles: int, expired_ratio: float):
+    """写入 articles 篇文章，按比例均匀标记为过期"""
+    db = SessionLocal()
+    db.query(Article).delete()
+    db.query(Feed).delete()
+    feed = Feed(name="bench", url="https://example.com/bench")
+    db.add(feed)
+    db.commit()
+    for start in range(0, articles, 1000):
+        ArticleService.bulk_insert(db, feed, [
+            {
+                "title": f"episode {i}",
+                "url": f"https://example.com/bench/{i}",
+                "content": "lorem ipsum " * 200,
+                "summary": "lorem ipsum",
+                "published_at": None,
+            }
+            for i in range(start, min(start + 1000, articles))
+        ])
+        db.commit()
+    step = max(1, round(1 / expired_ratio)) if expired_ratio else articles + 1
+    db.execute(
+        update(Article)
+        .where(Article.id % step == 0)
+        .values(read_status=True, processed_status=True, created_at=datetime.now() - timedelta(days=60))
+    )
+    db.commit()
+    db.close()
+
+def legacy_cleanup(cutoff: datetime) -> int:
+    """改造前的清理：加载全部过期文章逐条删除"""
+    db = SessionLocal()
+    try:
+        old_articles = db.query(Article).filter(*RetentionEngine.expired_filters(cutoff)).all()
+        for article in old_articles:
+            db.delete(article)
+        db.commit()
+        return len(old_articles)
+    finally:
+        db.close()
+
+def writer(stop: threading.Event, waits: list):
+    """每 20ms 执行一次短写事务，记录等待写锁的时间"""
+    conn = sqlite3.connect(f"{_TMP}/bench.db", isolation_level=None, timeout=120)
+    n = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        waits.append((time.perf_counter() - started) * 1000)
+        conn.execute("UPDATE feeds SET last_error = ? WHERE id = (SELECT MIN(id) FROM feeds)", (f"tick {n}",))
+        conn.execute("COMMIT")
+        n += 1
+        stop.wait(0.02)
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="保留期清理基准测试")
+    parser.add_argument("--articles", type=int, default=50000, help="文章数")
+    parser.add_argument("--expired-ratio", type=float, default=0.5, help="过期文章比例")
+    parser.add_argument("--chunk-size", type=int, default=500, help="chunked 方式每块的文章数")
+    args = parser.parse_args()
+
+    init_db()
+    cutoff = datetime.now() - timedelta(days=30)
+    print(f"保留期清理基准: {args.articles} 篇文章, 过期比例 {args.expired_ratio}, 每块 {args.chunk_size} 篇")
+
+    for name in ("legacy", "chunked"):
+        seed(args.articles, args.expired_ratio)
+        stop = threading.Event()
+        waits: list = []
+        thread = threading.Thread(target=writer, args=(stop, waits))
+        thread.start()
+        time.sleep(0.1)
+
+        started = time.perf_counter()
+        if name == "legacy":
+            deleted = legacy_cleanup(cutoff)
+        else:
+            deleted = RetentionEngine(chunk_size=args.chunk_size).run(cutoff)["deleted_articles"]
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        thread.join()
+        waits.sort()
+        print(
+            f"{name:>7}: 删除 {deleted} 篇, {elapsed:6.2f}s, {deleted / elapsed:9.0f} 行/秒, "
+            f"写请求 {len(waits)} 次, 等锁 p50 {statistics.median(waits):8.2f}ms, "
+            f"p99 {waits[int(len(waits) * 0.99) - 1]:8.2f}ms, 最大 {waits[-1]:8.2f}ms"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+全文搜索基准测试
+
+在临时数据库中生成文章语料（词频服从 Zipf 分布，正文约 --words 个词），
+通过触发器建立 FTS5 索引，然后测量 SearchService.search 第一页和翻页的延迟，
+并与改造前唯一的办法（LIKE 全表扫描）对比一次。
+
+查询覆盖罕见词、中频词、高频词、两个词同时命中和前缀匹配。
+高频词命中大量文章时需要为所有命中计算 bm25 并排序，延迟随命中数增长；
+--max-candidates 0 可以对比不限制候选数时的延迟。
+
+用法:
+    python benchmarks/bench_search.py [--articles 1000000] [--words 60] [--rounds 20]
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+# 必须在导入 app 之前指定数据库
+_TMP = tempfile.mkdtemp(prefix="castmind-bench-")
+_DB_PATH = os.path.join(_TMP, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+
+from app.core.database import ReadSessionLocal, init_db
+from app.services.search_service import SearchService
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "te", "vi", "zo", "pa", "qu", "xe", "di", "fo", "gu", "ha"]
+
+def vocabulary(size: int, seed: int = 7) -> list:
+    """生成 size 个互不相同的伪词"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda w: rng.random())
+
+def seed(articles: int, words: int, vocab: list):
+    """用 executemany 写入文章，全文索引由触发器同步"""
+    rng = random.Random(42)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    conn = sqlite3.connect(_DB_PATH)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("INSERT INTO feeds (name, url, status, article_count) VALUES ('bench', 'https://example.com/bench', 'active', 0)")
+    batch = 10000
+    for start in range(0, articles, batch):
+        rows = []
+        for i in range(start, min(start + batch, articles)):
+            body = rng.choices(vocab, cum_weights=cum_weights, k=words)
+            rows.append((
+                1, " ".join(body[:6]), f"https://example.com/bench/{i}",
+                " ".join(body), " ".join(body[:20]), ", ".join(body[-3:]),
+            ))
+        conn.executemany(
+            "INSERT INTO articles (feed_id, title, url, content, summary, keywords, read_status, processed_status) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0, 0)",
+            rows,
+        )
+        conn.commit()
+    conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+
+def measure(query: str, rounds: int, max_candidates: int) -> dict:
+    """第一页和第二页的延迟中位数、p99 和命中的页大小"""
+    db = ReadSessionLocal()
+    try:
+        SearchService.search(db, query, max_candidates=max_candidates)  # 预热
+        first, second = [], []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            page, cursor = SearchService.search(db, query, max_candidates=max_candidates)
+            first.append((time.perf_counter() - started) * 1000)
+            if cursor:
+                started = time.perf_counter()
+                SearchService.search(db, query, cursor=cursor, max_candidates=max_candidates)
+                second.append((time.perf_counter() - started) * 1000)
+            db.expunge_all()
+        first.sort()
+        return {
+            "hits": len(page),
+            "p50": statistics.median(first),
+            "p99": first[max(0, int(len(first) * 0.99) - 1)],
+            "next_p50": statistics.median(second) if second else None,
+        }
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="全文搜索基准测试")
+    parser.add_argument("--articles", type=int, default=1000000, help="文章数")
+    parser.add_argument("--words", type=int, default=60, help="每篇文章的词数")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="词表大小")
+    parser.add_argument("--rounds", type=int, default=20, help="每个查询的请求次数")
+    parser.add_argument("--max-candidates", type=int, default=5000, help="参与排序的命中数上限，0 不限")
+    args = parser.parse_args()
+
+    init_db()
+    vocab = vocabulary(args.vocabulary)
+    started = time.perf_counter()
+    seed(args.articles, args.words, vocab)
+    print(
+        f"全文搜索基准: {args.articles} 篇文章, 每篇 {args.words} 个词, 词表 {args.vocabulary}, "
+        f"写入并建立索引 {time.perf_counter() - started:.1f}s, 数据库 {os.path.getsize(_DB_PATH) / 1024 / 1024:.0f}MB, "
+        f"候选上限 {args.max_candidates}"
+    )
+
+    queries = {
+        "罕见词": vocab[-1],
+        "中频词": vocab[2000],
+        "高频词": vocab[20],
+        "两个词": f"{vocab[50]} {vocab[300]}",
+        "前缀": vocab[500][:4] + "*",
+    }
+    for name, query in queries.items():
+        result = measure(query, args.rounds, args.max_candidates)
+        next_page = f"{result['next_p50']:8.2f}ms" if result["next_p50"] is not None else "       -"
+        print(
+            f"{name:>4} {query!r:>16}: 第一页 {result['hits']:3d} 条, p50 {result['p50']:8.2f}ms, "
+            f"p99 {result['p99']:8.2f}ms, 第二页 p50 {next_page}"
+        )
+
+    # 找出全部命中才能排序，LIKE 必须扫描整张表
+    conn = sqlite3.connect(_DB_PATH)
+    started = time.perf_counter()
+    conn.execute(
+        "SELECT COUNT(*) FROM articles WHERE title LIKE ? OR summary LIKE ? OR content LIKE ? OR keywords LIKE ?",
+        [f"%{vocab[-1]}%"] * 4,
+    ).fetchall()
+    print(f"LIKE 全表扫描（罕见词全部命中）: {(time.perf_counter() - started) * 1000:.2f}ms")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,26 @@ Pytest 配置和夹具
 import pytest
 import sys
 import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# 添加后端目录到 Python 路径，使 `app` 包可以被导入
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+# 测试使用独立的临时数据库，必须在导入 app 之前设置
+_TEST_DB_DIR = tempfile.mkdtemp(prefix="castmind-test-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_TEST_DB_DIR}/castmind-test.db")
+# 默认在测试进程内解析和分析，需要进程池的测试自行创建 ParsePool / AnalysisPool
+os.environ.setdefault("PARSE_WORKERS", "0")
+os.environ.setdefault("ANALYSIS_WORKERS", "0")
+# 测试夹具的会话和被测代码的会话会同时持有写连接
+os.environ.setdefault("DATABASE_WRITE_POOL_SIZE", "4")
+# 关键词文档频率表不写入工作目录
+os.environ.setdefault("KEYWORD_IDF_PATH", f"{_TEST_DB_DIR}/keyword_idf.json")
 
 @pytest.fixture
 def test_data_dir():
@@ -34,4 +51,271 @@ def sample_article_data():
         'content': '这是测试文章内容',
         'summary': '测试文章摘要',
         'feed_id': 1
-    }
\ No newline at end of file
+    }
+
+@pytest.fixture
+def db_session():
+    """
+    数据库会话夹具
+
+    在测试数据库上创建所有表，测试结束后删除。
+    """
+    import asyncio
+    from app.core.database import Base, SessionLocal, async_engine, async_read_engine, engine, read_engine
+    from app.models import database  # noqa: F401  注册模型
+
+    from app.services.feed_cache import feed_meta_cache
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        # 重建的表会复用订阅源 ID
+        feed_meta_cache.invalidate()
+        # 连接池中的连接缓存了被删除的 FTS5 虚拟表状态，下个测试使用新连接
+        for pooled in (engine, read_engine):
+            pooled.dispose()
+        for pooled in (async_engine, async_read_engine):
+            asyncio.run(pooled.dispose())
+
+class StatementCounter:
+    """记录同步和异步读写引擎上执行的 SQL 语句"""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@pytest.fixture
+def sql_counter():
+    """SQL 语句计数夹具，用于断言接口的查询次数不随数据量增长"""
+    from sqlalchemy import event
+    from app.core.database import async_engine, async_read_engine, engine, read_engine
+
+    counter = StatementCounter()
+    targets = {engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine}
+    for target in targets:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", counter)
+
+def make_rss(name: str, items: int = 5, base_url: str = "https://example.com") -> bytes:
+    """生成合成 RSS 文档"""
+    entries = "".join(
+        f"""
+        <item>
+            <title>{name} episode {i}</title>
+            <link>{base_url}/{name}/{i}</link>
+            <guid>{base_url}/{name}/{i}</guid>
+            <description>Episode {i} of {name}</description>
+            <pubDate>Mon, 0{1 + i % 9} Jan 2024 10:00:00 +0000</pubDate>
+        </item>"""
+        for i in range(items)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+    <channel>
+        <title>{name}</title>
+        <link>{base_url}/{name}</link>
+        <description>Synthetic feed {name}</description>{entries}
+    </channel>
+</rss>""".encode("utf-8")
+
+class FeedServer:
+    """
+    本地合成订阅源 HTTP 服务器
+
+    路由通过 `routes` 字典注册：路径 -> (状态码, 响应头, 响应体, 延迟秒数)。
+    服务器记录请求次数、请求头以及同时在处理的最大请求数。
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def add_feed(self, path: str, body: bytes, status: int = 200, headers=None, delay: float = 0.0):
+        self.routes[path] = (status, headers or {"Content-Type": "application/rss+xml"}, body, delay)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, dict(self.headers)))
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    route = server.routes.get(self.path)
+                    if route is None:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    if callable(route):
+                        status, headers, body, delay = route(self)
+                    else:
+                        status, headers, body, delay = route
+                    if delay:
+                        time.sleep(delay)
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    try:
+                        self.wfile.write(body)
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+        return Handler
+
+@pytest.fixture
+def feed_server():
+    """本地合成订阅源服务器夹具"""
+    server = FeedServer()
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+class LLMServer:
+    """
+    本地模拟的 OpenAI 兼容 /v1/chat/completions 服务器
+
+    回复内容为 "summary: " 加最后一条消息的前 40 个字符，用量按请求体字节数估算。
+    `failures` 中的 (状态码, 响应头) 依次作为前几个请求的响应，用于测试重试；
+    服务器记录每个请求体以及同时在处理的最大请求数。
+    """
+
+    def __init__(self, delay: float = 0.0, completion_tokens: int = 10):
+        self.delay = delay
+        self.completion_tokens = completion_tokens
+        self.failures = []
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        import json
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, headers: dict, body: bytes):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with server._lock:
+                    payload = json.loads(raw)
+                    server.requests.append(payload)
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    failure = server.failures.pop(0) if server.failures else None
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    if self.path != "/v1/chat/completions":
+                        self._reply(404, {}, b"not found")
+                    elif failure is not None:
+                        status, headers = failure
+                        self._reply(status, headers, b'{"error": {"message": "mock failure"}}')
+                    else:
+                        prompt_tokens = len(raw) // 4
+                        body = json.dumps({
+                            "id": f"chatcmpl-{len(server.requests)}",
+                            "object": "chat.completion",
+                            "model": payload["model"],
+                            "choices": [{
+                                "index": 0,
+                                "message": {"role": "assistant", "content": f"summary: {payload['messages'][-1]['content'][:40]}"},
+                                "finish_reason": "stop",
+                            }],
+                            "usage": {
+                                "prompt_tokens": prompt_tokens,
+                                "completion_tokens": server.completion_tokens,
+                                "total_tokens": prompt_tokens + server.completion_tokens,
+                            },
+                        }).encode("utf-8")
+                        self._reply(200, {"Content-Type": "application/json"}, body)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+        return Handler
+
+@pytest.fixture
+def llm_server():
+    """本地模拟 LLM 接口服务器夹具"""
+    server = LLMServer()
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
@@ -0,0 +1,109 @@
+"""
+文章分析结果缓存测试
+"""
+
+def test_content_hash_normalization():
+    """测试排版差异不影响内容摘要，标题不同时摘要不同"""
+    from app.services.analysis_cache import AnalysisCache
+
+    key = AnalysisCache.content_hash("Hello   world\n\n  again", "Title")
+    assert AnalysisCache.content_hash(" Hello world again ", "Title ") == key
+    assert AnalysisCache.content_hash("Ｈｅｌｌｏ world\tagain", "Title") == key
+    assert AnalysisCache.content_hash("Hello world again", "Other") != key
+    assert AnalysisCache.content_hash("hello world again", "Title") != key
+
+def test_analyze_article_uses_memory_and_store(db_session):
+    """测试进程内命中、跨实例的存储命中和分析器版本隔离"""
+    from app.services.ai_service import AIService
+    from app.services.analysis_cache import AnalysisCache
+
+    service = AIService(cache=AnalysisCache())
+    first = service.analyze_article("A great python tutorial.", "Mirror")
+    assert service.analyze_article("A  great python\ntutorial.", "Mirror") == first
+    assert service.cache.stats()["memory_hits"] == 1
+
+    # 新实例的进程内缓存为空，从存储命中；传入的关键词替换缓存中的关键词
+    other = AIService(cache=AnalysisCache())
+    assert other.analyze_article("A great python tutorial.", "Mirror", keywords=["python"]) == {
+        **first, "keywords": ["python"]
+    }
+    stats = other.cache.stats()
+    assert (stats["store_hits"], stats["misses"], stats["hit_rate"]) == (1, 0, 1.0)
+
+    # 分析器版本不同时不复用
+    assert other.cache.get(AnalysisCache.content_hash("A great python tutorial.", "Mirror"), "rules-0") is None
+    assert other.cache.stats()["misses"] == 1
+
+def test_batch_analyze_checks_cache_first(db_session):
+    """测试批量分析一次查询整批缓存，重复内容只分析一次"""
+    from app.services.ai_service import AIService
+    from app.services.analysis_cache import AnalysisCache
+
+    service = AIService(cache=AnalysisCache())
+    service.analyze_article("Syndicated episode notes", "Episode 1")
+
+    calls = []
+    analyze = service._analyze
+    service._analyze = lambda *args: calls.append(args) or analyze(*args)
+    results = service.batch_analyze([
+        {"id": 1, "title": "Episode 1", "content": "Syndicated  episode notes"},
+        {"id": 2, "title": "Episode 2", "content": "Brand new notes"},
+        {"id": 3, "title": "Episode 2", "content": "Brand new notes"},
+    ], keywords=[["a"], ["b"], ["c"]])
+
+    assert [args[1] for args in calls] == ["Episode 2"]
+    assert [result["keywords"] for result in results] == [["a"], ["b"], ["c"]]
+    assert results[1]["summary"] == results[2]["summary"] == "Brand new notes"
+    # 新结果写入存储
+    assert AIService(cache=AnalysisCache()).cache.get(
+        AnalysisCache.content_hash("Brand new notes", "Episode 2"), service.version
+    )["summary"] == "Brand new notes"
+
+def _age_entries(db_session, hours: int = 1):
+    """把存储中所有条目的最近使用时间提前"""
+    from datetime import datetime, timedelta
+    from app.models.database import AnalysisCacheEntry
+
+    db_session.query(AnalysisCacheEntry).update({"last_used_at": datetime.now() - timedelta(hours=hours)})
+    db_session.commit()
+
+def test_store_eviction_by_size(db_session):
+    """测试存储超过大小上限时按最近使用时间淘汰"""
+    from app.models.database import AnalysisCacheEntry
+    from app.services.analysis_cache import AnalysisCache
+
+    cache = AnalysisCache(memory_entries=0, max_bytes=1000)
+    for i in range(10):
+        cache.put(f"hash{i}", "v1", {"summary": "x" * 180, "index": i})
+    _age_entries(db_session)
+    cache.get("hash0", "v1")  # 最近使用，保留
+
+    assert cache.evict() > 0
+    sizes = dict(db_session.query(AnalysisCacheEntry.content_hash, AnalysisCacheEntry.size).all())
+    assert sum(sizes.values()) <= 900
+    assert "hash0" in sizes and "hash1" not in sizes
+    assert cache.stats()["evicted"] == 10 - len(sizes)
+
+def test_store_hits_touch_entries_at_most_once_per_interval(db_session, sql_counter):
+    """测试存储命中只在最近使用时间超过刷新间隔时写回"""
+    from app.models.database import AnalysisCacheEntry
+    from app.services.analysis_cache import AnalysisCache
+
+    cache = AnalysisCache(memory_entries=0)
+    cache.put_many({"hash0": {"summary": "a"}, "hash1": {"summary": "b"}}, "v1")
+
+    sql_counter.reset()
+    for _ in range(3):
+        assert set(cache.get_many(["hash0", "hash1"], "v1")) == {"hash0", "hash1"}
+    assert not [s for s in sql_counter.statements if s.lstrip().upper().startswith("UPDATE")]
+
+    _age_entries(db_session)
+    sql_counter.reset()
+    cache.get_many(["hash0", "hash1"], "v1")
+    cache.get_many(["hash0", "hash1"], "v1")
+    updates = [s for s in sql_counter.statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1, sql_counter.statements
+
+    db_session.expire_all()
+    entries = db_session.query(AnalysisCacheEntry).order_by(AnalysisCacheEntry.content_hash).all()
+    assert [entry.hit_count for entry in entries] == [1, 1]
@@ -0,0 +1,109 @@
+"""
+文章分析进程池测试
+"""
+
+def _seed(db_session, count: int):
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+
+    feed = Feed(name="analysis", url="https://example.com/analysis")
+    db_session.add(feed)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feed, [
+        {"title": f"episode {i}", "url": f"https://example.com/analysis/{i}",
+         "content": f"Kubernetes operator number{i} is a great tutorial about kubernetes.", "summary": "",
+         "published_at": None}
+        for i in range(count)
+    ])
+    db_session.commit()
+
+def test_process_drains_backlog_in_chunks(db_session, sql_counter):
+    """测试分块认领直到积压清空，每块结果用一条 UPDATE 写回"""
+    from app.models.database import Article
+    from app.scheduler.tasks import TaskScheduler
+
+    _seed(db_session, 25)
+    scheduler = TaskScheduler()
+
+    sql_counter.reset()
+    result = scheduler.process_unprocessed_articles(chunk_size=10)
+    updates = [s for s in sql_counter.statements if s.lstrip().upper().startswith("UPDATE ARTICLES")]
+    assert len(updates) == 3, updates
+
+    assert result["backlog"] == 25
+    assert result["processed"] == result["total"] == 25
+    assert result["chunks"] == 3
+    assert result["remaining"] == 0
+    [worker] = result["workers"]
+    assert worker["articles"] == 25 and worker["chunks"] == 3
+
+    db_session.expire_all()
+    articles = db_session.query(Article).order_by(Article.id).all()
+    assert all(article.processed_status for article in articles)
+    assert articles[3].keywords.split(", ")[0] == "number3"
+    assert articles[3].sentiment == "positive"
+    assert scheduler.process_unprocessed_articles()["total"] == 0
+
+def test_process_respects_limit(db_session):
+    """测试 limit 限制本轮处理的文章数，剩余的下一轮处理"""
+    from app.scheduler.tasks import TaskScheduler
+
+    _seed(db_session, 12)
+    scheduler = TaskScheduler()
+    result = scheduler.process_unprocessed_articles(limit=7, chunk_size=5)
+    assert (result["processed"], result["chunks"], result["remaining"]) == (7, 2, 5)
+    assert scheduler.process_unprocessed_articles()["processed"] == 5
+
+def test_analysis_skipped_when_ai_service_disabled(db_session, monkeypatch):
+    """测试关闭 AI_SERVICE_ENABLED 后定时任务不分析文章"""
+    from app.core.config import settings
+    from app.models.database import Article
+    from app.scheduler.tasks import TaskScheduler
+
+    _seed(db_session, 3)
+    monkeypatch.setattr(settings, "AI_SERVICE_ENABLED", False)
+    scheduler = TaskScheduler()
+    assert not scheduler.ai_service.enabled
+
+    results = scheduler.run_all_tasks()
+    assert "process_articles" not in results["tasks"]
+    db_session.expire_all()
+    assert db_session.query(Article).filter(Article.processed_status.is_(False)).count() == 3
+
+def test_process_in_worker_processes(db_session):
+    """测试在分析进程池中分析并汇总各工作进程的吞吐量"""
+    from fastapi.testclient import TestClient
+    from main import app
+    from app.scheduler.tasks import get_task_scheduler
+    from app.services.analysis_pool import AnalysisPool
+
+    _seed(db_session, 40)
+    scheduler = get_task_scheduler()
+    inline_pool, scheduler.analysis_pool = scheduler.analysis_pool, AnalysisPool(workers=2)
+    try:
+        result = scheduler.process_unprocessed_articles(chunk_size=5)
+        status = TestClient(app).get("/api/v1/system/scheduler/analysis").json()
+    finally:
+        scheduler.analysis_pool.shutdown()
+        scheduler.analysis_pool = inline_pool
+
+    assert result["processed"] == 40 and result["failed"] == 0
+    assert sum(worker["articles"] for worker in result["workers"]) == 40
+    assert status["backlog"] == 0
+    assert status["last_run"]["processed"] == 40
+    assert {worker["worker"] for worker in status["workers"]} == {worker["worker"] for worker in result["workers"]}
+
+def test_scheduler_stop_shuts_down_pools():
+    """测试停止调度器时关闭解析和分析进程池"""
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.analysis_pool import AnalysisPool
+    from app.services.parse_pool import ParsePool
+
+    scheduler = TaskScheduler()
+    scheduler.parse_pool = ParsePool(workers=1)
+    scheduler.analysis_pool = AnalysisPool(workers=1)
+    assert scheduler.parse_pool.executor is not None and scheduler.analysis_pool.executor is not None
+
+    scheduler.stop()
+    assert scheduler.parse_pool._executor is None
+    assert scheduler.analysis_pool._executor is None
@@ -0,0 +1,105 @@
+"""
+文章批量操作测试
+"""
+from datetime import datetime, timedelta
+
+def _seed(db_session, feeds: int = 2, per_feed: int = 30):
+    """写入订阅源和文章，第 i 篇文章发布于 2024-01-01 之后第 i 天"""
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+
+    base = datetime(2024, 1, 1)
+    created = [Feed(name=f"feed {i}", url=f"https://example.com/feed/{i}") for i in range(feeds)]
+    db_session.add_all(created)
+    db_session.commit()
+    for feed in created:
+        ArticleService.bulk_insert(db_session, feed, [
+            {"title": f"{feed.id}-{i}", "url": f"https://example.com/{feed.id}/{i}", "content": "", "summary": "",
+             "published_at": base + timedelta(days=i)}
+            for i in range(per_feed)
+        ])
+    db_session.commit()
+    return [feed.id for feed in created]
+
+def test_batch_mark_read_by_ids(db_session, sql_counter):
+    """测试按 ID 批量标记已读：一条 UPDATE，计数器随之变化"""
+    from fastapi.testclient import TestClient
+    from app.services.stats_service import StatsService
+    from main import app
+
+    _seed(db_session)
+    client = TestClient(app)
+
+    sql_counter.reset()
+    response = client.post("/api/v1/articles/batch/mark-read", json={"ids": list(range(1, 21))})
+    assert response.status_code == 200
+    assert response.json() == {"affected": 20}
+    updates = [s for s in sql_counter.statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1, sql_counter.statements
+
+    # 已经是已读的文章不计入
+    response = client.post("/api/v1/articles/batch/mark-read", json={"ids": list(range(11, 31))})
+    assert response.json() == {"affected": 10}
+
+    response = client.post("/api/v1/articles/batch/mark-unread", json={"ids": [1, 2, 3]})
+    assert response.json() == {"affected": 3}
+
+    db_session.expire_all()
+    assert StatsService.article_stats(db_session)["unread"] == 60 - 27
+    assert StatsService.get_counters(db_session) == StatsService.count_live(db_session)
+
+def test_mark_feed_read(db_session):
+    """测试按订阅源和发布时间标记已读"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Article
+    from main import app
+
+    feed_id, other_id = _seed(db_session)
+    client = TestClient(app)
+
+    response = client.post(f"/api/v1/feeds/{feed_id}/mark-read", params={"before": "2024-01-11T00:00:00"})
+    assert response.json() == {"affected": 10}
+    response = client.post(f"/api/v1/feeds/{feed_id}/mark-read")
+    assert response.json() == {"affected": 20}
+    assert client.post("/api/v1/feeds/9999/mark-read").status_code == 404
+
+    db_session.expire_all()
+    assert db_session.query(Article).filter(Article.feed_id == other_id, Article.read_status == True).count() == 0
+
+def test_batch_delete(db_session):
+    """测试批量删除增量扣减订阅源文章计数"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Article, Feed
+    from app.services.stats_service import StatsService
+    from main import app
+
+    feed_id, other_id = _seed(db_session)
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/v1/articles/batch/delete", json={"feed_id": feed_id, "published_before": "2024-01-06T00:00:00"}
+    )
+    assert response.json() == {"affected": 5}
+    # ID 列表跨两个订阅源
+    other_ids = [a.id for a in db_session.query(Article).filter(Article.feed_id == other_id).limit(4)]
+    response = client.post("/api/v1/articles/batch/delete", json={"ids": other_ids + [99999]})
+    assert response.json() == {"affected": 4}
+
+    assert client.delete(f"/api/v1/articles/{other_ids[0]}").status_code == 404
+    remaining = db_session.query(Article.id).filter(Article.feed_id == feed_id).first()[0]
+    assert client.delete(f"/api/v1/articles/{remaining}").status_code == 204
+
+    db_session.expire_all()
+    assert db_session.get(Feed, feed_id).article_count == 24
+    assert db_session.get(Feed, other_id).article_count == 26
+    assert StatsService.article_stats(db_session)["total"] == 50
+    assert StatsService.get_counters(db_session) == StatsService.count_live(db_session)
+
+def test_batch_requires_selection():
+    """测试未指定任何条件时拒绝请求"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    assert client.post("/api/v1/articles/batch/delete", json={}).status_code == 422
+    assert client.post("/api/v1/articles/batch/mark-read", json={"ids": []}).json() == {"affected": 0}
@@ -57,4 +57,125 @@ def test_data_operations():
     """测试数据操作"""
     # 这里可以测试 CRUD 操作
     # 示例：测试插入、查询、更新、删除操作
-    pass
\ No newline at end of file
+    pass
+
+
+def test_sqlite_engines_profile(tmp_path):
+    """测试写引擎的 WAL 配置，以及只读引擎不会等待写事务"""
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app.core.database import create_db_engine
+
+    url = f"sqlite:///{tmp_path}/profile.db"
+    writer = create_db_engine(url, pool_size=1)
+    with writer.begin() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a')"))
+
+    reader = create_db_engine(url, read_only=True, pool_size=2)
+    with writer.connect() as write_conn:
+        # 写事务未提交时读取已提交的数据，不会遇到锁
+        write_conn.execute(text("INSERT INTO items (name) VALUES ('b')"))
+        with reader.connect() as read_conn:
+            assert read_conn.execute(text("SELECT COUNT(*) FROM items")).scalar() == 1
+        write_conn.commit()
+
+    with reader.connect() as read_conn:
+        assert read_conn.execute(text("SELECT COUNT(*) FROM items")).scalar() == 2
+        with pytest.raises(OperationalError):
+            read_conn.execute(text("INSERT INTO items (name) VALUES ('c')"))
+
+    writer.dispose()
+    reader.dispose()
+
+
+def test_to_async_url():
+    """测试同步 URL 到异步驱动的转换"""
+    from app.core.database import to_async_url
+
+    assert to_async_url("sqlite:///data/castmind.db") == "sqlite+aiosqlite:///data/castmind.db"
+    assert to_async_url("sqlite+aiosqlite:///data/castmind.db") == "sqlite+aiosqlite:///data/castmind.db"
+    assert to_async_url("postgresql://u:p@db/castmind") == "postgresql+asyncpg://u:p@db/castmind"
+    assert to_async_url("postgresql+psycopg2://u:p@db/castmind") == "postgresql+asyncpg://u:p@db/castmind"
+
+
+def test_async_engines_profile(tmp_path):
+    """测试异步引擎应用相同的 SQLite 配置，只读引擎拒绝写入"""
+    import asyncio
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app.core.database import create_async_db_engine
+
+    url = f"sqlite:///{tmp_path}/async.db"
+
+    async def run():
+        writer = create_async_db_engine(url, pool_size=1)
+        reader = create_async_db_engine(url, read_only=True, pool_size=2)
+        try:
+            async with writer.begin() as conn:
+                assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+                assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 30000
+                await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+                await conn.execute(text("INSERT INTO items (name) VALUES ('a')"))
+
+            async with reader.connect() as conn:
+                assert (await conn.execute(text("SELECT COUNT(*) FROM items"))).scalar() == 1
+                with pytest.raises(OperationalError):
+                    await conn.execute(text("INSERT INTO items (name) VALUES ('b')"))
+        finally:
+            await reader.dispose()
+            await writer.dispose()
+
+    asyncio.run(run())
+
+
+def test_concurrent_requests_on_async_engine(db_session):
+    """测试并发请求通过异步引擎完成，处理期间事件循环继续调度其他任务"""
+    import asyncio
+    import time
+    import httpx
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+    from main import app
+
+    feed = Feed(name="loop", url="https://example.com/loop")
+    db_session.add(feed)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feed, [
+        {"title": f"loop {i}", "url": f"https://example.com/loop/{i}", "content": "x" * 2000, "summary": "",
+         "published_at": None}
+        for i in range(300)
+    ])
+    db_session.commit()
+
+    async def run():
+        gaps = []
+
+        async def ticker(stop: asyncio.Event):
+            last = time.perf_counter()
+            while not stop.is_set():
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            stop = asyncio.Event()
+            tick = asyncio.create_task(ticker(stop))
+            responses = await asyncio.gather(*(
+                client.get("/api/v1/articles/", params={"limit": 300, "include_content": "true"})
+                for _ in range(20)
+            ))
+            stop.set()
+            await tick
+        return responses, gaps
+
+    responses, gaps = asyncio.run(run())
+    assert all(response.status_code == 200 for response in responses)
+    assert all(len(response.json()) == 300 for response in responses)
+    # 事件循环在请求处理期间持续运行其他任务
+    assert len(gaps) > 20
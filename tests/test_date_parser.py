@@ -0,0 +1,80 @@
+"""
+日期规范化测试
+"""
+from datetime import datetime, timedelta, timezone
+
+import dateutil.parser
+import pytest
+
+RFC822_SAMPLES = [
+    "Mon, 01 Jan 2024 10:00:00 +0000",
+    "Mon, 1 Jan 2024 10:00:00 GMT",
+    "Tue, 02 Jan 2024 08:30:00 +0800",
+    "02 Jan 2024 08:30 -0500",
+    "Wed, 03 Jan 24 23:59:59 +0000",
+    "Thu, 04 January 2024 00:00:00 +0130",
+]
+
+RFC3339_SAMPLES = [
+    "2024-01-01T10:00:00Z",
+    "2024-01-01T10:00:00+08:00",
+    "2024-01-01T10:00:00.123456-05:00",
+    "2024-01-01T10:00:00",
+    "2024-01-01",
+]
+
+@pytest.mark.parametrize("value", RFC822_SAMPLES)
+def test_rfc822_matches_dateutil(value):
+    """测试 RFC 822 快速解析与 dateutil 结果一致"""
+    from app.services.date_parser import parse_rfc822
+
+    assert parse_rfc822(value) == dateutil.parser.parse(value)
+
+@pytest.mark.parametrize("value", RFC3339_SAMPLES)
+def test_rfc3339_matches_dateutil(value):
+    """测试 RFC 3339 快速解析与 dateutil 结果一致"""
+    from app.services.date_parser import parse_rfc3339
+
+    assert parse_rfc3339(value) == dateutil.parser.parse(value)
+
+def test_named_zones():
+    """测试 RFC 822 时区缩写"""
+    from app.services.date_parser import parse_rfc822
+
+    parsed = parse_rfc822("Mon, 01 Jan 2024 10:00:00 PST")
+    assert parsed.utcoffset() == timedelta(hours=-8)
+    assert parse_rfc822("Mon, 01 Jan 2024 10:00:00 XYZ") is None
+    assert parse_rfc822("Mon, 32 Jan 2024 10:00:00 GMT") is None
+
+def test_normalizer_memo_and_failures():
+    """测试按订阅源记住格式和失败计数"""
+    from app.services.date_parser import DateNormalizer
+
+    normalizer = DateNormalizer()
+    for i in range(1, 4):
+        assert normalizer.parse(f"2024-01-0{i}T10:00:00Z", "feed-a") == datetime(2024, 1, i, 10, tzinfo=timezone.utc)
+    assert normalizer.parse("January 5th, 2024 at 10am", "feed-a") is not None
+    assert normalizer.parse("not a date", "feed-a") is None
+
+    stats = normalizer.snapshot()
+    assert stats["rfc3339"] == 3
+    assert stats["memo_hits"] == 2
+    assert stats["generic"] == 1
+    assert stats["failed"] == 1
+
+def test_extract_articles_counts_failures():
+    """测试提取文章时解析失败计为 None 而不是当前时间"""
+    from app.services.rss_service import RSSService
+
+    feed_info = {
+        "link": "https://example.com/feed",
+        "entries": [
+            {"title": "ok", "link": "https://example.com/1", "published": "Mon, 01 Jan 2024 10:00:00 +0000"},
+            {"title": "bad", "link": "https://example.com/2", "published": "sometime last week"},
+        ],
+    }
+    articles = RSSService.extract_articles(feed_info)
+
+    assert articles[0]["published_at"] == datetime(2024, 1, 1, 10, tzinfo=timezone.utc)
+    assert articles[1]["published_at"] is None
+    assert feed_info["date_parse_failures"] == 1
@@ -0,0 +1,136 @@
+"""
+订阅源到期队列测试
+"""
+from datetime import datetime, timedelta
+
+from tests.conftest import make_rss
+
+def test_due_queue_pop_order_and_lazy_removal():
+    """测试按到期时间弹出，以及更新和移除"""
+    from app.scheduler.due_queue import DueQueue
+
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    queue = DueQueue()
+    queue.push(1, now - timedelta(minutes=5))
+    queue.push(2, now - timedelta(minutes=10))
+    queue.push(3, now + timedelta(minutes=10))
+    queue.push(4, now - timedelta(minutes=1))
+    queue.push(1, now + timedelta(minutes=1))  # 推迟
+    queue.remove(4)
+
+    assert len(queue) == 3
+    assert queue.count_due(now) == 1
+    assert queue.pop_due(now) == [2]
+    assert queue.pop_due(now + timedelta(minutes=30)) == [1, 3]
+    assert len(queue) == 0
+
+def test_adapt_interval_bounds():
+    """测试自适应间隔的上下限"""
+    from app.core.config import settings
+    from app.scheduler.due_queue import adapt_interval, estimate_publish_interval
+
+    # 不低于订阅源配置的间隔
+    assert adapt_interval(3600, None, new_articles=3, publish_interval=600) == 3600
+    # 按发布周期的一半轮询
+    assert adapt_interval(3600, None, new_articles=1, publish_interval=4 * 3600) == 2 * 3600
+    # 没有新文章时增长
+    assert adapt_interval(3600, 3600) == 5400
+    # 失败时翻倍，且有上限
+    assert adapt_interval(3600, 3600, failed=True) == 7200
+    assert adapt_interval(3600, settings.FEED_MAX_INTERVAL_SECONDS, failed=True) == settings.FEED_MAX_INTERVAL_SECONDS
+
+    day = datetime(2024, 1, 1)
+    assert estimate_publish_interval([day, day + timedelta(days=1), day + timedelta(days=2), None]) == 86400
+    assert estimate_publish_interval([day]) is None
+
+def test_retry_delay_backoff_and_circuit():
+    """测试出错订阅源的指数退避和熔断"""
+    from app.core.config import settings
+    from app.scheduler.due_queue import is_circuit_open, retry_delay
+
+    base = settings.FEED_RETRY_BASE_SECONDS
+    upper = settings.FEED_RETRY_MAX_SECONDS
+    threshold = settings.FEED_CIRCUIT_BREAKER_THRESHOLD
+
+    for failures, expected in [(1, base), (2, base * 2), (3, base * 4)]:
+        assert expected * 0.9 <= retry_delay(failures) <= expected * 1.1
+    # 退避不超过上限
+    assert retry_delay(threshold - 1) <= upper * 1.1
+    # 熔断后按上限探测
+    assert not is_circuit_open(threshold - 1)
+    assert is_circuit_open(threshold)
+    assert retry_delay(threshold) >= upper * 0.9
+
+def test_scheduler_only_fetches_due_feeds(feed_server, db_session):
+    """测试调度器只抓取到期的订阅源"""
+    from app.models.database import Feed
+    from app.scheduler.tasks import TaskScheduler
+
+    feed_server.add_feed("/due", make_rss("due"))
+    feed_server.add_feed("/later", make_rss("later"))
+    db_session.add_all([
+        Feed(name="due", url=feed_server.url("/due")),
+        Feed(name="later", url=feed_server.url("/later"), next_fetch=datetime.now() + timedelta(hours=1)),
+    ])
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    first = scheduler.fetch_all_feeds()
+    assert first["total_feeds"] == 1
+    assert first["queued"] == 2
+
+    # 刚抓取过的订阅源不会再次到期
+    second = scheduler.fetch_all_feeds()
+    assert second["total_feeds"] == 0
+    assert [path for path, _ in feed_server.requests] == ["/due"]
+
+    due = db_session.query(Feed).filter(Feed.name == "due").one()
+    db_session.refresh(due)
+    assert due.effective_interval >= due.interval
+    assert due.next_fetch > datetime.now()
+
+def test_scheduler_queue_endpoint(db_session):
+    """测试到期队列查看接口"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from app.scheduler.tasks import get_task_scheduler
+    from main import app
+
+    db_session.add_all([
+        Feed(name="first", url="https://example.com/first"),
+        Feed(name="paused", url="https://example.com/paused", status="paused"),
+    ])
+    db_session.commit()
+
+    # 接口只读，不同步队列
+    scheduler = get_task_scheduler()
+    before = len(scheduler.due_queue)
+    assert TestClient(app).get("/api/v1/system/scheduler/queue").json()["size"] == before
+
+    scheduler.sync_due_queue(db_session)
+    response = TestClient(app).get("/api/v1/system/scheduler/queue")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["due_now"] >= 1
+    assert "first" in [item["name"] for item in data["items"]]
+    assert "paused" not in [item["name"] for item in data["items"]]
+
+def test_fetch_failure_requeues_popped_feeds(db_session, monkeypatch):
+    """测试抓取中途异常时，已弹出的订阅源放回到期队列"""
+    import pytest
+    from app.models.database import Feed
+    from app.scheduler.tasks import TaskScheduler
+
+    db_session.add_all([Feed(name=f"feed{i}", url=f"https://example.com/requeue/{i}") for i in range(3)])
+    db_session.commit()
+    scheduler = TaskScheduler()
+
+    def explode(db, feeds):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(scheduler, "_fetch_feeds", explode)
+    with pytest.raises(RuntimeError):
+        scheduler.fetch_all_feeds()
+
+    assert len(scheduler.due_queue) == 3
+    assert scheduler.due_queue.count_due(datetime.now()) == 3
@@ -0,0 +1,237 @@
+"""
+音频附件下载测试
+"""
+import hashlib
+import os
+import time
+
+AUDIO = bytes(range(256)) * 1024  # 256 KB
+
+def range_route(body: bytes, delay: float = 0.0):
+    """支持 Range 请求的路由"""
+    def route(handler):
+        header = handler.headers.get("Range")
+        if header and header.startswith("bytes="):
+            start = int(header[len("bytes="):].split("-", 1)[0])
+            if start >= len(body):
+                return 416, {"Content-Range": f"bytes */{len(body)}"}, b"", delay
+            headers = {
+                "Content-Type": "audio/mpeg",
+                "Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}",
+            }
+            return 206, headers, body[start:], delay
+        return 200, {"Content-Type": "audio/mpeg"}, body, delay
+    return route
+
+def test_download_and_checksum(feed_server, tmp_path):
+    """测试完整下载并计算校验和"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    feed_server.routes["/ep1.mp3"] = range_route(AUDIO)
+    downloader = EnclosureDownloader(download_dir=str(tmp_path), chunk_size=8192, timeout=5)
+    [result] = downloader.download_all([{"article_id": 1, "url": feed_server.url("/ep1.mp3")}])
+
+    assert result["error"] is None
+    assert result["size"] == len(AUDIO)
+    assert result["sha256"] == hashlib.sha256(AUDIO).hexdigest()
+    assert result["resumed_from"] == 0
+    assert result["path"] == str(tmp_path / "1.mp3")
+    with open(result["path"], "rb") as f:
+        assert f.read() == AUDIO
+    assert not os.path.exists(str(tmp_path / "1.mp3.part"))
+
+def test_resume_partial_download(feed_server, tmp_path):
+    """测试从 .part 文件续传"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    feed_server.routes["/ep2.mp3"] = range_route(AUDIO)
+    (tmp_path / "2.mp3.part").write_bytes(AUDIO[:100000])
+
+    downloader = EnclosureDownloader(download_dir=str(tmp_path), chunk_size=8192, timeout=5)
+    [result] = downloader.download_all([{"article_id": 2, "url": feed_server.url("/ep2.mp3")}])
+
+    assert result["error"] is None
+    assert result["resumed_from"] == 100000
+    assert result["sha256"] == hashlib.sha256(AUDIO).hexdigest()
+    assert feed_server.requests[-1][1].get("Range") == "bytes=100000-"
+    assert (tmp_path / "2.mp3").read_bytes() == AUDIO
+
+def test_resume_without_range_support_restarts(feed_server, tmp_path):
+    """测试服务器不支持 Range 时从头下载"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    feed_server.add_feed("/ep3.mp3", AUDIO, headers={"Content-Type": "audio/mpeg"})
+    (tmp_path / "3.mp3.part").write_bytes(b"garbage")
+
+    downloader = EnclosureDownloader(download_dir=str(tmp_path), chunk_size=8192, timeout=5)
+    [result] = downloader.download_all([{"article_id": 3, "url": feed_server.url("/ep3.mp3")}])
+
+    assert result["error"] is None
+    assert result["resumed_from"] == 0
+    assert result["sha256"] == hashlib.sha256(AUDIO).hexdigest()
+
+def test_resume_with_mismatched_content_range_restarts(feed_server, tmp_path):
+    """测试 206 响应的起点与 .part 文件大小不符时从头下载"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    def route(handler):
+        # 无论请求从哪里开始，都从第 50000 字节返回
+        if handler.headers.get("Range"):
+            headers = {"Content-Range": f"bytes 50000-{len(AUDIO) - 1}/{len(AUDIO)}"}
+            return 206, headers, AUDIO[50000:], 0.0
+        return 200, {"Content-Type": "audio/mpeg"}, AUDIO, 0.0
+
+    feed_server.routes["/ep4.mp3"] = route
+    (tmp_path / "4.mp3.part").write_bytes(AUDIO[:100000])
+
+    downloader = EnclosureDownloader(download_dir=str(tmp_path), chunk_size=8192, timeout=5)
+    [result] = downloader.download_all([{"article_id": 4, "url": feed_server.url("/ep4.mp3")}])
+
+    assert result["error"] is None
+    assert result["resumed_from"] == 0
+    assert result["sha256"] == hashlib.sha256(AUDIO).hexdigest()
+    assert feed_server.requests[-1][1].get("Range") is None
+    assert (tmp_path / "4.mp3").read_bytes() == AUDIO
+
+def test_per_host_concurrency(feed_server, tmp_path):
+    """测试单主机并发上限"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    for i in range(6):
+        feed_server.routes[f"/ep{i}.mp3"] = range_route(AUDIO[:1024], delay=0.1)
+
+    downloader = EnclosureDownloader(download_dir=str(tmp_path), concurrency=10, per_host_limit=2, timeout=5)
+    results = downloader.download_all(
+        {"article_id": i, "url": feed_server.url(f"/ep{i}.mp3")} for i in range(6)
+    )
+
+    assert all(r["error"] is None for r in results)
+    assert feed_server.max_active <= 2
+
+def test_bandwidth_limit(feed_server, tmp_path):
+    """测试带宽上限"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    feed_server.routes["/big.mp3"] = range_route(AUDIO)
+    # 256 KB 以 512 KB/s 下载，至少需要约 0.4 秒（扣除初始桶容量）
+    downloader = EnclosureDownloader(
+        download_dir=str(tmp_path), bandwidth_bps=512 * 1024, chunk_size=16384, timeout=5
+    )
+    started = time.perf_counter()
+    [result] = downloader.download_all([{"article_id": 9, "url": feed_server.url("/big.mp3")}])
+    elapsed = time.perf_counter() - started
+
+    assert result["error"] is None
+    assert elapsed >= 0.35
+
+def test_download_error(feed_server, tmp_path):
+    """测试下载失败时返回错误"""
+    from app.services.enclosure_service import EnclosureDownloader
+
+    downloader = EnclosureDownloader(download_dir=str(tmp_path), timeout=5)
+    [result] = downloader.download_all([{"article_id": 5, "url": feed_server.url("/missing.mp3")}])
+
+    assert result["error"] == "ValueError: HTTP 404"
+    assert result["sha256"] is None
+
+def test_parse_enclosures():
+    """测试 RSS 和 Atom 附件解析"""
+    from app.services.feed_parser import StreamingFeedParser
+
+    rss = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Pod</title>
+<item><title>Ep</title><link>https://example.com/ep</link>
+<enclosure url="https://cdn.example.com/ep.mp3" type="audio/mpeg" length="1234"/></item>
+</channel></rss>"""
+    atom = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Pod</title>
+<entry><title>Ep</title><id>urn:1</id>
+<link rel="alternate" href="https://example.com/ep"/>
+<link rel="enclosure" href="https://cdn.example.com/ep.m4a" type="audio/mp4"/></entry>
+</feed>"""
+
+    [rss_entry] = list(StreamingFeedParser(rss).entries())
+    [atom_entry] = list(StreamingFeedParser(atom).entries())
+
+    assert rss_entry["enclosure"] == {"url": "https://cdn.example.com/ep.mp3", "type": "audio/mpeg", "length": 1234}
+    assert atom_entry["enclosure"] == {"url": "https://cdn.example.com/ep.m4a", "type": "audio/mp4", "length": None}
+    assert atom_entry["link"] == "https://example.com/ep"
+
+def test_scheduler_download_enclosures(db_session, feed_server, tmp_path):
+    """测试调度器下载附件并写回文章"""
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.enclosure_service import EnclosureDownloader
+
+    feed_server.routes["/a.mp3"] = range_route(AUDIO)
+    feed = Feed(name="Pod", url="https://example.com/pod")
+    db_session.add(feed)
+    db_session.flush()
+    db_session.add_all([
+        Article(feed_id=feed.id, title="with audio", url="https://example.com/1",
+                enclosure_url=feed_server.url("/a.mp3"), enclosure_type="audio/mpeg"),
+        Article(feed_id=feed.id, title="no audio", url="https://example.com/2"),
+    ])
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    scheduler.downloader = EnclosureDownloader(download_dir=str(tmp_path), timeout=5)
+    result = scheduler.download_enclosures()
+
+    assert result["total"] == 1
+    assert result["downloaded"] == 1
+    db_session.expire_all()
+    article = db_session.query(Article).filter(Article.title == "with audio").one()
+    assert article.audio_sha256 == hashlib.sha256(AUDIO).hexdigest()
+    assert article.audio_size == len(AUDIO)
+    assert article.audio_downloaded_at is not None
+
+    # 已下载的附件不会重复下载
+    assert scheduler.download_enclosures()["total"] == 0
+
+def test_failed_enclosures_back_off(db_session, feed_server, tmp_path, monkeypatch):
+    """测试下载失败的附件记录失败原因并退避，不会挡住较新的附件；连续失败达到上限后不再下载"""
+    from datetime import datetime, timedelta
+    from app.core.config import settings
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.enclosure_service import EnclosureDownloader
+
+    feed_server.routes["/new.mp3"] = range_route(AUDIO[:4096])
+    feed = Feed(name="Pod", url="https://example.com/pod")
+    db_session.add(feed)
+    db_session.flush()
+    # 最早的两篇附件已失效
+    db_session.add_all([
+        Article(feed_id=feed.id, title=f"dead {i}", url=f"https://example.com/dead/{i}",
+                enclosure_url=feed_server.url(f"/dead{i}.mp3"))
+        for i in range(2)
+    ] + [
+        Article(feed_id=feed.id, title=f"new {i}", url=f"https://example.com/new/{i}",
+                enclosure_url=feed_server.url("/new.mp3"))
+        for i in range(2)
+    ])
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    scheduler.downloader = EnclosureDownloader(download_dir=str(tmp_path), timeout=5)
+    assert scheduler.download_enclosures(limit=2)["failed"] == 2
+    result = scheduler.download_enclosures(limit=2)
+    assert (result["total"], result["downloaded"]) == (2, 2)
+    assert scheduler.download_enclosures(limit=2)["total"] == 0
+
+    db_session.expire_all()
+    dead = db_session.query(Article).filter(Article.title.like("dead%")).all()
+    assert all(article.enclosure_failure_count == 1 for article in dead)
+    assert all("404" in article.enclosure_error for article in dead)
+    assert all(article.enclosure_retry_at > datetime.now() for article in dead)
+    assert all(article.audio_sha256 for article in db_session.query(Article).filter(Article.title.like("new%")))
+
+    # 退避到期后重试；连续失败达到上限的不再下载
+    monkeypatch.setattr(settings, "DOWNLOAD_MAX_ATTEMPTS", 2)
+    db_session.query(Article).update({"enclosure_retry_at": datetime.now() - timedelta(seconds=1)})
+    db_session.commit()
+    assert scheduler.download_enclosures(limit=2)["failed"] == 2
+    db_session.query(Article).update({"enclosure_retry_at": datetime.now() - timedelta(seconds=1)})
+    db_session.commit()
+    assert scheduler.download_enclosures(limit=2)["total"] == 0
@@ -0,0 +1,180 @@
+"""
+流式订阅源解析器测试
+"""
+import tracemalloc
+
+import pytest
+
+from tests.conftest import make_rss
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>Atom podcast</title>
+    <link rel="alternate" href="https://example.com/atom"/>
+    <updated>2024-01-02T10:00:00Z</updated>
+    <entry>
+        <title>Second</title>
+        <link rel="enclosure" href="https://example.com/2.mp3"/>
+        <link rel="alternate" href="https://example.com/atom/2"/>
+        <id>urn:uuid:2</id>
+        <published>2024-01-02T10:00:00Z</published>
+        <author><name>Alice</name></author>
+        <summary>Second summary</summary>
+        <category term="tech"/>
+    </entry>
+    <entry>
+        <title>First</title>
+        <link href="https://example.com/atom/1"/>
+        <id>urn:uuid:1</id>
+        <updated>2024-01-01T10:00:00Z</updated>
+    </entry>
+</feed>"""
+
+def test_stream_parse_rss():
+    """测试解析 RSS 2.0"""
+    from app.services.feed_parser import StreamingFeedParser
+
+    parser = StreamingFeedParser(make_rss("show", items=3))
+    entries = list(parser.entries())
+
+    assert parser.feed["title"] == "show"
+    assert [e["link"] for e in entries] == [f"https://example.com/show/{i}" for i in range(3)]
+    assert entries[0]["published"] == "Mon, 01 Jan 2024 10:00:00 +0000"
+    assert entries[0]["description"] == "Episode 0 of show"
+
+def test_stream_parse_atom():
+    """测试解析 Atom"""
+    from app.services.feed_parser import StreamingFeedParser
+
+    parser = StreamingFeedParser(ATOM)
+    entries = list(parser.entries())
+
+    assert parser.feed["title"] == "Atom podcast"
+    assert parser.feed["link"] == "https://example.com/atom"
+    assert entries[0]["link"] == "https://example.com/atom/2"
+    assert entries[0]["author"] == "Alice"
+    assert entries[0]["categories"] == [{"term": "tech"}]
+    assert entries[1]["published"] == "2024-01-01T10:00:00Z"
+
+def test_stream_parse_ignores_itunes_duplicates():
+    """测试 itunes:* 元素不覆盖标准的 title/description/author，与 feedparser 的结果一致"""
+    import feedparser
+    from app.services.feed_parser import StreamingFeedParser
+
+    podcast = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+    <channel>
+        <itunes:summary>Channel iTunes summary</itunes:summary>
+        <title>Podcast</title>
+        <itunes:title>Podcast (iTunes)</itunes:title>
+        <description>Channel description</description>
+        <item>
+            <itunes:title>Short title</itunes:title>
+            <title>Episode 1: Full title</title>
+            <description>Show notes</description>
+            <itunes:summary>iTunes summary</itunes:summary>
+            <itunes:author>iTunes Author</itunes:author>
+            <author>host@example.com (Host)</author>
+            <guid>https://example.com/podcast/1</guid>
+        </item>
+    </channel>
+</rss>"""
+    parser = StreamingFeedParser(podcast)
+    [entry] = list(parser.entries())
+
+    assert entry["title"] == "Episode 1: Full title"
+    assert entry["description"] == "Show notes"
+    assert entry["author"] == "host@example.com (Host)"
+    assert parser.feed["title"] == "Podcast"
+    assert parser.feed["description"] == "Channel description"
+
+    expected = feedparser.parse(podcast)
+    assert entry["title"] == expected.entries[0].title
+    assert parser.feed["title"] == expected.feed.title
+
+def test_stream_parse_stops_at_known_and_limit():
+    """测试遇到已入库条目或达到上限时停止"""
+    from app.services.feed_parser import StreamingFeedParser
+
+    content = make_rss("show", items=100)
+
+    parser = StreamingFeedParser(content, known={"https://example.com/show/3"})
+    assert len(list(parser.entries())) == 3
+    assert parser.stopped_at_known
+
+    parser = StreamingFeedParser(content, limit=10)
+    assert len(list(parser.entries())) == 10
+    assert not parser.stopped_at_known
+
+def test_stream_parse_memory_bounded_by_new_items():
+    """测试峰值内存与新条目数相关，而不是与文档大小相关"""
+    from app.services.feed_parser import StreamingFeedParser
+
+    content = make_rss("backlog", items=20000)
+    assert len(content) > 5_000_000
+
+    tracemalloc.start()
+    try:
+        entries = list(StreamingFeedParser(content, limit=20).entries())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(entries) == 20
+    assert peak < 1_000_000
+
+def test_stream_parse_rejects_malformed_xml():
+    """测试格式错误的文档抛出 StreamParseError"""
+    from app.services.feed_parser import StreamingFeedParser, StreamParseError
+
+    with pytest.raises(StreamParseError):
+        list(StreamingFeedParser(b"<rss><channel><title>x &nbsp;</title></channel></rss>").entries())
+
+def test_parse_feed_content_falls_back_to_feedparser():
+    """测试格式错误的文档回退到 feedparser"""
+    from app.services.rss_service import RSSService
+
+    malformed = make_rss("loose", items=3).replace(b"Episode 0 of loose", b"Episode&nbsp;0")
+    feed_info = RSSService.parse_feed_content(malformed, "https://example.com/loose",
+                                              known={"https://example.com/loose/2"})
+
+    assert feed_info["title"] == "loose"
+    assert len(feed_info["entries"]) == 2
+    assert feed_info["stopped_at_known"]
+
+def test_parse_fetched_records():
+    """测试解析工作函数返回紧凑记录并识别未变化的响应体"""
+    import pickle
+    from app.services.parse_pool import RECORD_FIELDS, parse_fetched
+
+    content = make_rss("pool", items=4)
+    record = parse_fetched(content, "https://example.com/pool", {"known": {"https://example.com/pool/3"}})
+
+    assert record["parsed_ok"] and not record["unchanged"]
+    assert len(record["articles"]) == 3
+    assert set(record["articles"][0]) == set(RECORD_FIELDS)
+    assert pickle.loads(pickle.dumps(record)) == record
+
+    again = parse_fetched(content, "https://example.com/pool", {"content_hash": record["content_hash"]})
+    assert again["unchanged"] and again["articles"] == []
+
+def test_scheduler_parses_in_process_pool(feed_server, db_session):
+    """测试调度器在解析进程池中解析订阅源"""
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.parse_pool import ParsePool
+
+    for i in range(4):
+        feed_server.add_feed(f"/feed{i}", make_rss(f"feed{i}", items=5))
+        db_session.add(Feed(name=f"feed{i}", url=feed_server.url(f"/feed{i}")))
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    scheduler.parse_pool = ParsePool(workers=2)
+    try:
+        result = scheduler.fetch_all_feeds()
+    finally:
+        scheduler.parse_pool.shutdown()
+
+    assert result["success"] == 4
+    assert db_session.query(Article).count() == 20
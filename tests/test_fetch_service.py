@@ -0,0 +1,206 @@
+"""
+并发抓取引擎测试
+"""
+import time
+
+from tests.conftest import make_rss
+
+def test_fetch_many_runs_in_parallel(feed_server):
+    """测试多个订阅源并行下载"""
+    from app.services.fetch_service import FeedFetcher
+
+    for i in range(10):
+        feed_server.add_feed(f"/feed{i}", make_rss(f"feed{i}"), delay=0.3)
+
+    fetcher = FeedFetcher(concurrency=10, per_host_limit=10, timeout=5)
+    started = time.perf_counter()
+    results = fetcher.fetch_all(
+        {"feed_id": i, "url": feed_server.url(f"/feed{i}")} for i in range(10)
+    )
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 10
+    assert all(r["error"] is None and r["status"] == 200 for r in results)
+    assert all(r["latency_ms"] >= 300 for r in results)
+    assert "content" not in results[0]
+    # 串行需要 3 秒，并行应远小于此
+    assert elapsed < 1.5
+
+def test_per_host_limit(feed_server):
+    """测试单主机并发上限"""
+    from app.services.fetch_service import FeedFetcher
+
+    for i in range(8):
+        feed_server.add_feed(f"/feed{i}", make_rss(f"feed{i}"), delay=0.1)
+
+    fetcher = FeedFetcher(concurrency=20, per_host_limit=2, timeout=5)
+    fetcher.fetch_all({"feed_id": i, "url": feed_server.url(f"/feed{i}")} for i in range(8))
+
+    assert feed_server.max_active <= 2
+
+def test_timeout_and_http_errors(feed_server):
+    """测试超时和 HTTP 错误"""
+    from app.services.fetch_service import FeedFetcher
+
+    feed_server.add_feed("/slow", make_rss("slow"), delay=2)
+    feed_server.add_feed("/ok", make_rss("ok"))
+
+    fetcher = FeedFetcher(concurrency=5, per_host_limit=5, timeout=0.5)
+    results = {
+        r["feed_id"]: r
+        for r in fetcher.fetch_all([
+            {"feed_id": 1, "url": feed_server.url("/slow")},
+            {"feed_id": 2, "url": feed_server.url("/ok")},
+            {"feed_id": 3, "url": feed_server.url("/missing")},
+        ])
+    }
+
+    assert "超时" in results[1]["error"]
+    assert results[2]["error"] is None
+    assert results[3]["error"] == "HTTP 404"
+
+def test_handler_receives_content(feed_server):
+    """测试结果处理函数收到响应体"""
+    from app.services.fetch_service import FeedFetcher
+    from app.services.rss_service import RSSService
+
+    feed_server.add_feed("/feed", make_rss("podcast", items=3))
+    parsed = []
+
+    def handler(result):
+        parsed.append(RSSService.parse_feed_content(result["content"], result["url"]))
+
+    FeedFetcher(timeout=5).fetch_all([{"url": feed_server.url("/feed")}], handler=handler)
+
+    assert parsed[0]["title"] == "podcast"
+    assert len(parsed[0]["entries"]) == 3
+
+def test_scheduler_fetch_all_feeds(feed_server, db_session):
+    """测试调度器并发抓取并入库"""
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+
+    feed_server.add_feed("/a", make_rss("a", items=4))
+    feed_server.add_feed("/b", make_rss("b", items=2))
+    db_session.add_all([
+        Feed(name="a", url=feed_server.url("/a")),
+        Feed(name="b", url=feed_server.url("/b")),
+        Feed(name="broken", url=feed_server.url("/missing")),
+    ])
+    db_session.commit()
+
+    result = TaskScheduler().fetch_all_feeds()
+
+    assert result["total_feeds"] == 3
+    assert result["success"] == 2
+    assert result["error"] == 1
+    assert result["latency"]["max_ms"] > 0
+    assert db_session.query(Article).count() == 6
+    broken = db_session.query(Feed).filter(Feed.name == "broken").one()
+    assert broken.status == "error"
+    assert broken.failure_count == 1
+    assert broken.last_error
+    assert broken.next_retry_at is not None
+
+def test_failure_tracking_and_retry(feed_server, db_session):
+    """测试失败计数、退避重试，以及重试结果直接入库"""
+    from datetime import datetime, timedelta
+
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+
+    feed_server.add_feed("/back", make_rss("back", items=3))
+    db_session.add_all([
+        Feed(name="back", url=feed_server.url("/back"), status="error", failure_count=2),
+        Feed(name="dead", url=feed_server.url("/dead"), status="error", failure_count=3),
+        Feed(name="waiting", url=feed_server.url("/waiting"), status="error", failure_count=5,
+             next_retry_at=datetime.now() + timedelta(hours=1)),
+    ])
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    result = scheduler.update_feed_status()
+
+    assert result["retried"] == 2
+    assert result["recovered"] == 1
+    assert result["still_failing"] == 2
+
+    # 每个到期的订阅源只下载一次，未到重试时间的不发请求
+    paths = [path for path, _ in feed_server.requests]
+    assert sorted(paths) == ["/back", "/dead"]
+
+    db_session.expire_all()
+    back = db_session.query(Feed).filter(Feed.name == "back").one()
+    assert back.status == "active"
+    assert back.failure_count == 0
+    assert back.next_retry_at is None
+    assert db_session.query(Article).filter(Article.feed_id == back.id).count() == 3
+    assert back.article_count == 3
+
+    dead = db_session.query(Feed).filter(Feed.name == "dead").one()
+    assert dead.status == "error"
+    assert dead.failure_count == 4
+    assert "404" in dead.last_error
+    assert dead.next_retry_at > datetime.now()
+
+    # 退避期间不会重试
+    feed_server.requests.clear()
+    assert scheduler.update_feed_status()["retried"] == 0
+    assert feed_server.requests == []
+
+def _conditional_route(body: bytes, etag: str):
+    """支持 If-None-Match 的路由"""
+    def route(handler):
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b"", 0
+        return 200, {"ETag": etag, "Last-Modified": "Mon, 01 Jan 2024 10:00:00 GMT"}, body, 0
+    return route
+
+def test_conditional_get_skips_parsing(feed_server, db_session):
+    """测试 304 和响应体摘要未变化时跳过解析"""
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+
+    feed_server.routes["/etag"] = _conditional_route(make_rss("etag", items=3), '"v1"')
+    # 不支持校验器的服务器：每次都返回相同的完整响应体
+    feed_server.add_feed("/plain", make_rss("plain", items=2))
+    db_session.add_all([
+        Feed(name="etag", url=feed_server.url("/etag")),
+        Feed(name="plain", url=feed_server.url("/plain")),
+    ])
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    first = scheduler.fetch_all_feeds()
+    assert first["parsed"] == 2
+    assert first["skip_ratio"] == 0.0
+
+    etag_feed = db_session.query(Feed).filter(Feed.name == "etag").one()
+    assert etag_feed.etag == '"v1"'
+    assert etag_feed.last_modified == "Mon, 01 Jan 2024 10:00:00 GMT"
+    assert etag_feed.content_hash
+
+    second = scheduler.fetch_all_feeds(force=True)
+    assert second["not_modified"] == 1
+    assert second["unchanged"] == 1
+    assert second["parsed"] == 0
+    assert second["skip_ratio"] == 1.0
+    assert db_session.query(Article).count() == 5
+
+    conditional = [headers for path, headers in feed_server.requests if path == "/etag"][-1]
+    assert conditional.get("If-None-Match") == '"v1"'
+    assert conditional.get("If-Modified-Since") == "Mon, 01 Jan 2024 10:00:00 GMT"
+
+def test_rss_service_parse_feed_not_modified(feed_server):
+    """测试 RSSService.parse_feed 发送条件请求"""
+    from app.services.rss_service import RSSService
+
+    feed_server.routes["/etag"] = _conditional_route(make_rss("etag"), '"v1"')
+
+    fresh = RSSService.parse_feed(feed_server.url("/etag"))
+    assert fresh["not_modified"] is False
+    assert fresh["etag"] == '"v1"'
+
+    cached = RSSService.parse_feed(feed_server.url("/etag"), etag=fresh["etag"])
+    assert cached["not_modified"] is True
+    assert cached["entries"] == []
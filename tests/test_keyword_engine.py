@@ -0,0 +1,136 @@
+"""
+TF-IDF 关键词引擎测试
+"""
+import os
+
+CORPUS = [
+    "Welcome to the podcast episode. Today the podcast covers kubernetes operators and kubernetes upgrades.",
+    "Welcome to the podcast episode. This podcast episode is about sourdough baking and sourdough starters.",
+    "Welcome to the podcast episode. We talk about marathon training, marathon nutrition and podcast news.",
+]
+
+def test_idf_demotes_corpus_wide_terms(tmp_path):
+    """测试每篇文章都出现的词排在该文章特有的词之后，停用词被过滤"""
+    from app.services.keyword_engine import KeywordEngine
+
+    engine = KeywordEngine(idf_path=str(tmp_path / "idf.json"), top_k=3)
+    keywords = engine.extract(CORPUS)
+    assert [words[0] for words in keywords] == ["kubernetes", "sourdough", "marathon"]
+    assert all("welcome" not in words and "episode" not in words[:1] for words in keywords)
+    assert all("the" not in words and "about" not in words for words in engine.extract(CORPUS))
+    assert engine.extract([]) == []
+    assert engine.extract(["", "2024 1.0"]) == [[], []]
+
+def test_incremental_document_frequency_and_persistence(tmp_path):
+    """测试分批累积的文档频率与一次处理全部文章相同，并能跨实例保留"""
+    from app.services.keyword_engine import KeywordEngine
+
+    path = str(tmp_path / "idf.json")
+    whole = KeywordEngine(idf_path=str(tmp_path / "whole.json"))
+    whole.extract(CORPUS)
+
+    engine = KeywordEngine(idf_path=path)
+    engine.extract(CORPUS[:1])
+    engine.save()
+    engine = KeywordEngine(idf_path=path)
+    engine.extract(CORPUS[1:])
+    engine.save()
+
+    reloaded = KeywordEngine(idf_path=path)
+    assert reloaded.documents == 3
+    assert {term: reloaded.document_frequency[column] for term, column in reloaded.vocabulary.items()} == {
+        term: whole.document_frequency[column] for term, column in whole.vocabulary.items()
+    }
+
+    (tmp_path / "broken.json").write_text("{not json")
+    assert KeywordEngine(idf_path=str(tmp_path / "broken.json")).documents == 0
+
+def test_vocabulary_pruning(tmp_path):
+    """测试词表超过上限时保留文档频率最高的词"""
+    from app.services.keyword_engine import KeywordEngine
+
+    engine = KeywordEngine(idf_path=str(tmp_path / "idf.json"), max_terms=2)
+    engine.extract(["alpha beta gamma", "alpha beta", "alpha delta"])
+    assert engine.terms == ["alpha", "beta"]
+    assert engine.document_frequency.tolist() == [3, 2]
+    assert engine.extract(["gamma gamma alpha"]) == [["gamma", "alpha"]]
+    # gamma 的文档频率重新从 1 开始，低于 beta，再次被丢弃
+    assert engine.terms == ["alpha", "beta"]
+
+def test_batch_analyze_uses_keyword_engine(tmp_path):
+    """测试批量分析使用语料关键词并写入文档频率表"""
+    import os
+    from app.services.ai_service import AIService
+    from app.services.keyword_engine import KeywordEngine
+
+    path = str(tmp_path / "idf.json")
+    service = AIService(keyword_engine=KeywordEngine(idf_path=path))
+    results = service.batch_analyze([{"id": i, "title": "", "content": text} for i, text in enumerate(CORPUS)])
+    assert [result["keywords"][0] for result in results] == ["kubernetes", "sourdough", "marathon"]
+    assert [result["id"] for result in results] == [0, 1, 2]
+    assert os.path.exists(path)
+    assert KeywordEngine(idf_path=path).documents == 3
+
+def test_concurrent_saves_use_separate_temp_files(tmp_path):
+    """测试多个引擎同时保存时各自使用唯一的临时文件，不留下临时文件"""
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.keyword_engine import KeywordEngine
+
+    path = str(tmp_path / "idf.json")
+    engines = [KeywordEngine(idf_path=path) for _ in range(8)]
+    for engine in engines:
+        engine.extract(CORPUS)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda engine: [engine.save() for _ in range(20)], engines))
+
+    assert KeywordEngine(idf_path=path).documents == 3
+    assert os.listdir(tmp_path) == ["idf.json"]
+
+def test_analysis_worker_does_not_write_idf(tmp_path, monkeypatch):
+    """测试分析工作进程在没有传入关键词时按词频提取，不读写文档频率表"""
+    from app.core.config import settings
+    import app.services.analysis_pool as analysis_pool
+
+    path = tmp_path / "idf.json"
+    monkeypatch.setattr(settings, "KEYWORD_IDF_PATH", str(path))
+    monkeypatch.setattr(analysis_pool, "_service", None)
+    chunk = analysis_pool.analyze_chunk([{"id": i, "title": "", "content": text} for i, text in enumerate(CORPUS)])
+
+    assert chunk["results"][0]["keywords"].startswith("podcast")
+    assert analysis_pool._service._keyword_engine is None
+    assert not path.exists()
+
+def test_failed_chunks_are_not_counted(tmp_path, db_session, monkeypatch):
+    """测试分析失败的块不计入文档频率，重试成功后只计一次"""
+    from app.scheduler.tasks import TaskScheduler
+    from app.services import analysis_pool
+    from app.services.ai_service import AIService
+    from app.services.keyword_engine import KeywordEngine
+    from tests.test_analysis_pool import _seed
+
+    _seed(db_session, 6)
+    scheduler = TaskScheduler()
+    engine = KeywordEngine(idf_path=str(tmp_path / "idf.json"))
+    scheduler.ai_service = AIService(keyword_engine=engine)
+
+    analyze_chunk = analysis_pool.analyze_chunk
+    calls = []
+
+    def fail_first_chunk(articles, keywords=None, token_budget=None):
+        calls.append(len(articles))
+        if len(calls) == 1:
+            raise RuntimeError("worker crashed")
+        return analyze_chunk(articles, keywords, token_budget)
+
+    monkeypatch.setattr(analysis_pool, "analyze_chunk", fail_first_chunk)
+    result = scheduler.process_unprocessed_articles(chunk_size=4)
+    assert (result["total"], result["processed"]) == (6, 2)
+    assert engine.documents == 2
+    assert engine.document_frequency[engine.vocabulary["kubernetes"]] == 2
+
+    # 下一轮重新分析失败的块，只计入一次
+    result = scheduler.process_unprocessed_articles(chunk_size=4)
+    assert result["processed"] == 4
+    assert engine.documents == 6
+    assert engine.document_frequency[engine.vocabulary["kubernetes"]] == 6
+    assert KeywordEngine(idf_path=str(tmp_path / "idf.json")).documents == 6
@@ -0,0 +1,232 @@
+"""
+LLM 客户端测试（本地模拟的 OpenAI 兼容接口）
+"""
+import time
+
+def _prompt(text: str) -> list:
+    return [{"role": "user", "content": text}]
+
+def _client(llm_server, **kwargs):
+    from app.services.llm_client import LLMClient
+
+    options = {
+        "base_url": llm_server.base_url, "api_key": "test-key", "model": "mock-model", "max_tokens": 50,
+        "requests_per_minute": 0, "tokens_per_minute": 0, "retry_base": 0.01, "timeout": 5, "token_budget": 0,
+    }
+    options.update(kwargs)
+    return LLMClient(**options)
+
+def test_complete_many_returns_content_and_usage(llm_server):
+    """测试结果与请求一一对应，累计 token 用量"""
+    client = _client(llm_server)
+    results = client.complete_many([_prompt("first episode"), _prompt("second episode")])
+
+    assert [result["content"] for result in results] == ["summary: first episode", "summary: second episode"]
+    assert all(result["total_tokens"] == result["usage"]["prompt_tokens"] + 10 for result in results)
+    assert {request["model"] for request in llm_server.requests} == {"mock-model"}
+    stats = client.stats()
+    assert stats["requests"] == 2
+    assert stats["completion_tokens"] == 20
+    assert stats["total_tokens"] == sum(result["total_tokens"] for result in results)
+
+def test_concurrency_is_bounded(llm_server):
+    """测试同时在途的请求数不超过并发上限"""
+    llm_server.delay = 0.05
+    client = _client(llm_server, concurrency=3)
+    results = client.complete_many([_prompt(f"episode {i}") for i in range(12)])
+
+    assert all(result is not None for result in results)
+    assert 1 < llm_server.max_active <= 3
+
+def test_identical_prompts_are_coalesced(llm_server):
+    """测试同一轮中相同的请求只发送一次"""
+    llm_server.delay = 0.05
+    client = _client(llm_server)
+    results = client.complete_many([_prompt("same")] * 5 + [_prompt("other")])
+
+    assert len(llm_server.requests) == 2
+    assert [result["content"] for result in results] == ["summary: same"] * 5 + ["summary: other"]
+    assert client.stats()["coalesced"] == 4
+
+def test_retry_after_rate_limit_and_server_error(llm_server):
+    """测试 429 和 5xx 重试，遵守 Retry-After"""
+    llm_server.failures = [(429, {"Retry-After": "0.2"}), (503, {})]
+    client = _client(llm_server, max_retries=3)
+
+    started = time.perf_counter()
+    [result] = client.complete_many([_prompt("flaky")])
+    elapsed = time.perf_counter() - started
+
+    assert result["content"] == "summary: flaky"
+    assert len(llm_server.requests) == 3
+    assert elapsed >= 0.2
+    stats = client.stats()
+    assert (stats["requests"], stats["retries"], stats["failed"]) == (3, 2, 0)
+
+def test_client_errors_are_not_retried(llm_server):
+    """测试不可重试的错误直接失败，批量结果中为 None"""
+    llm_server.failures = [(400, {})]
+    client = _client(llm_server, max_retries=3)
+    results = client.complete_many([_prompt("bad request")])
+
+    assert results == [None]
+    assert len(llm_server.requests) == 1
+    assert client.stats()["failed"] == 1
+
+def test_retries_exhausted(llm_server):
+    """测试重试次数用完后失败"""
+    llm_server.failures = [(500, {})] * 3
+    client = _client(llm_server, max_retries=2)
+
+    assert client.complete_many([_prompt("down")]) == [None]
+    assert len(llm_server.requests) == 3
+
+def test_token_budget_rejects_requests(llm_server):
+    """测试超出本轮 token 预算的请求不发送"""
+    import asyncio
+    import pytest
+    from app.services.llm_client import TokenBudgetExceeded, estimate_tokens
+
+    estimate = estimate_tokens(_prompt("episode 0")) + 50
+    client = _client(llm_server, concurrency=1, token_budget=estimate + 5)
+    results = client.complete_many([_prompt(f"episode {i}") for i in range(4)])
+
+    assert results[0]["content"] == "summary: episode 0"
+    assert results[1:] == [None, None, None]
+    assert len(llm_server.requests) == 1
+    assert client.stats()["budget_rejected"] == 3
+
+    async def run():
+        async with client.run(token_budget=estimate - 1) as run:
+            with pytest.raises(TokenBudgetExceeded):
+                await run.complete(_prompt("episode 0"))
+
+    asyncio.run(run())
+    assert len(llm_server.requests) == 1
+
+def test_requests_per_minute_limit(llm_server):
+    """测试请求数限流：600 次/分钟，第 10 个之后每 0.1 秒放行一个"""
+    client = _client(llm_server, requests_per_minute=600)
+
+    started = time.perf_counter()
+    client.complete_many([_prompt(f"episode {i}") for i in range(15)])
+    elapsed = time.perf_counter() - started
+
+    assert elapsed >= 0.4
+    assert client.stats()["rate_limited_seconds"] > 0
+
+def test_rate_limit_spans_runs(llm_server):
+    """测试限流状态跨轮保留：连续两轮合计的请求数不超过限流速率"""
+    client = _client(llm_server, requests_per_minute=1200)  # 每秒 20 个，桶容量 20
+
+    started = time.perf_counter()
+    for run in range(2):
+        results = client.complete_many([_prompt(f"run {run} episode {i}") for i in range(15)])
+        assert all(result is not None for result in results)
+    elapsed = time.perf_counter() - started
+
+    # 第二轮只剩 5 个令牌，另外 10 个需要等待补充 0.5 秒
+    assert len(llm_server.requests) == 30
+    assert elapsed >= 0.45
+    assert len(llm_server.requests) <= 20 + 20 * elapsed
+
+def test_analysis_workers_split_rate_limits(monkeypatch):
+    """测试各分析工作进程平分 LLM 的请求数和 token 数限流"""
+    from app.core.config import settings
+    import app.services.analysis_pool as analysis_pool
+
+    monkeypatch.setattr(settings, "AI_LLM_ENABLED", True)
+    monkeypatch.setattr(settings, "AI_REQUESTS_PER_MINUTE", 600)
+    monkeypatch.setattr(settings, "AI_TOKENS_PER_MINUTE", 90000)
+    monkeypatch.setattr(analysis_pool, "_llm_share", 1)
+    analysis_pool._init_worker(3)
+
+    client = analysis_pool._create_service().llm_client
+    assert (client.requests_per_minute, client.tokens_per_minute) == (200, 30000)
+
+def test_tokens_per_minute_limit(llm_server):
+    """测试 token 数限流按估计量预扣"""
+    from app.services.llm_client import estimate_tokens
+
+    client = _client(llm_server, tokens_per_minute=6000)  # 每秒补充 100 个，桶容量 100
+    estimate = estimate_tokens(_prompt("episode 0")) + 50
+    assert 50 < estimate <= 100
+
+    # 第一个请求立即发送，后两个各需等待补充约 estimate 个 token（完成后多扣的部分归还）
+    started = time.perf_counter()
+    results = client.complete_many([_prompt(f"episode {i}") for i in range(3)])
+    elapsed = time.perf_counter() - started
+
+    assert all(result is not None for result in results)
+    assert elapsed >= 0.3
+    assert client.stats()["rate_limited_seconds"] >= 0.3
+
+def test_ai_service_uses_llm_summaries(llm_server, db_session):
+    """测试 AIService 批量请求 LLM 摘要，失败时退回规则摘要且不缓存"""
+    from app.services.ai_service import ANALYZER_VERSION, AIService
+    from app.services.analysis_cache import AnalysisCache
+
+    client = _client(llm_server, max_retries=0)
+    service = AIService(cache=AnalysisCache(), llm_client=client)
+    assert service.version != ANALYZER_VERSION and "mock-model" in service.version
+
+    articles = [
+        {"id": 1, "title": "first", "content": "Python tutorial about asyncio."},
+        {"id": 2, "title": "first", "content": "Python  tutorial about asyncio."},
+        {"id": 3, "title": "second", "content": "Kubernetes operator review."},
+    ]
+    results = service.batch_analyze(articles, keywords=[[], [], []])
+
+    # 内容相同的两篇只请求一次
+    assert len(llm_server.requests) == 2
+    assert results[0]["summary"] == results[1]["summary"]
+    assert results[0]["summary"].startswith("summary: first")
+    assert results[2]["summary"].startswith("summary: second")
+
+    # 缓存命中不再请求；LLM 失败的文章使用规则摘要，下次重新请求
+    llm_server.failures = [(500, {})]
+    article = {"id": 4, "title": "third", "content": "Startup market news."}
+    [fallback] = service.batch_analyze(articles[:1] + [article], keywords=[[], []])[1:]
+    assert len(llm_server.requests) == 3
+    assert fallback["summary"] == "Startup market news."
+    [retried] = service.batch_analyze([article], keywords=[[]])
+    assert len(llm_server.requests) == 4
+    assert retried["summary"].startswith("summary: third")
+
+def test_scheduler_splits_run_token_budget(llm_server, db_session, monkeypatch):
+    """测试调度器按本轮 token 预算分配各块的预算，用完后不再认领新的块"""
+    from app.core.config import settings
+    from app.models.database import Article, Feed
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.ai_service import AIService
+    from app.services.analysis_cache import AnalysisCache
+    from app.services.article_service import ArticleService
+    import app.services.analysis_pool as analysis_pool
+
+    feed = Feed(name="llm", url="https://example.com/llm")
+    db_session.add(feed)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feed, [
+        {"title": f"episode {i}", "url": f"https://example.com/llm/{i}", "content": f"Episode number {i}.",
+         "summary": "", "published_at": None}
+        for i in range(20)
+    ])
+    db_session.commit()
+
+    client = _client(llm_server)
+    monkeypatch.setattr(settings, "AI_RUN_TOKEN_BUDGET", 1000)
+    monkeypatch.setattr(analysis_pool, "_service", AIService(cache=AnalysisCache(), llm_client=client))
+    scheduler = TaskScheduler()
+    scheduler.ai_service = AIService(cache=AnalysisCache(), llm_client=client)
+
+    result = scheduler.process_unprocessed_articles(chunk_size=4)
+    llm = result["llm"]
+    assert llm["token_budget"] == 1000
+    assert 0 < llm["total_tokens"] <= 1000
+    assert llm["requests"] == len(llm_server.requests) < 20
+    assert llm["budget_rejected"] > 0
+    assert result["remaining"] == 20 - result["total"] > 0
+
+    db_session.expire_all()
+    summaries = [article.summary for article in db_session.query(Article).filter(Article.processed_status == True)]  # noqa: E712
+    assert sum(summary.startswith("summary: ") for summary in summaries) == llm["requests"]
@@ -0,0 +1,163 @@
+"""
+数据库迁移和查询计划测试
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+# 引入迁移之前的表结构
+LEGACY_SCHEMA = """
+CREATE TABLE feeds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    category TEXT DEFAULT '未分类',
+    interval INTEGER DEFAULT 3600,
+    status TEXT DEFAULT 'active',
+    last_fetch TIMESTAMP,
+    article_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    feed_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    content TEXT,
+    summary TEXT,
+    published_at TIMESTAMP,
+    read_status BOOLEAN DEFAULT 0,
+    processed_status BOOLEAN DEFAULT 0,
+    keywords TEXT,
+    sentiment TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (feed_id) REFERENCES feeds(id) ON DELETE CASCADE
+);
+INSERT INTO feeds (name, url) VALUES ('old', 'https://example.com/old');
+INSERT INTO articles (feed_id, title, url) VALUES (1, 'old article', 'https://example.com/old/1');
+"""
+
+@pytest.fixture
+def migrated_engine(tmp_path):
+    """在旧表结构上执行迁移后的引擎"""
+    import sqlite3
+    from app.core.database import create_db_engine
+    from app.core.migrations import run_migrations
+
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript(LEGACY_SCHEMA)
+    conn.close()
+
+    engine = create_db_engine(f"sqlite:///{db_path}", pool_size=1)
+    run_migrations(engine)
+    yield engine
+    engine.dispose()
+
+def test_migrations_upgrade_legacy_schema(migrated_engine):
+    """测试旧数据库升级：补齐列、创建索引、记录版本，重复执行无副作用"""
+    from sqlalchemy import inspect, text
+    from app.core.migrations import MIGRATIONS, run_migrations
+
+    latest = max(m.version for m in MIGRATIONS)
+    inspector = inspect(migrated_engine)
+    assert "next_fetch" in {c["name"] for c in inspector.get_columns("feeds")}
+    assert "enclosure_url" in {c["name"] for c in inspector.get_columns("articles")}
+    assert {"ix_articles_feed_published", "ix_articles_processed_id", "ix_articles_read_created"} <= {
+        index["name"] for index in inspector.get_indexes("articles")
+    }
+
+    assert run_migrations(migrated_engine) == latest
+    with migrated_engine.connect() as conn:
+        versions = [row[0] for row in conn.execute(text("SELECT version FROM schema_version ORDER BY version"))]
+        assert versions == sorted(m.version for m in MIGRATIONS)
+        # 原有数据保留
+        assert conn.execute(text("SELECT title FROM articles")).scalar() == "old article"
+        # 计数器按原有数据初始化，之后由触发器维护
+        counters = dict(conn.execute(text("SELECT name, value FROM stats_counters")).all())
+        assert counters["feeds_total"] == 1 and counters["articles_unread"] == 1
+        # 全文索引包含原有文章
+        match = text("SELECT rowid FROM articles_fts WHERE articles_fts MATCH :q")
+        assert conn.execute(match, {"q": "old"}).all() == [(1,)]
+    with migrated_engine.begin() as conn:
+        conn.execute(text("INSERT INTO articles (feed_id, title, url) VALUES (1, 'new', 'https://example.com/old/2')"))
+        assert conn.execute(text("SELECT value FROM stats_counters WHERE name = 'articles_total'")).scalar() == 2
+        assert conn.execute(match, {"q": "new"}).all() == [(2,)]
+
+def test_fresh_database_matches_migrated(tmp_path, migrated_engine):
+    """测试新建数据库和迁移后的数据库索引一致"""
+    from sqlalchemy import inspect
+    from app.core.database import create_db_engine
+    from app.core.migrations import run_migrations
+
+    fresh = create_db_engine(f"sqlite:///{tmp_path}/fresh.db", pool_size=1)
+    run_migrations(fresh)
+
+    def index_names(engine, table):
+        # 主键上 index=True 的冗余索引只在新建表时创建，不参与比较
+        return {index["name"] for index in inspect(engine).get_indexes(table)} - {f"ix_{table}_id"}
+
+    for table in ("feeds", "articles", "analysis_cache"):
+        assert index_names(fresh, table) == index_names(migrated_engine, table)
+    fresh.dispose()
+
+def _query_plan(engine, query) -> str:
+    """返回 ORM 查询的 EXPLAIN QUERY PLAN 结果"""
+    compiled = query.statement.compile(dialect=engine.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+    return "\n".join(row[-1] for row in rows)
+
+def test_hot_queries_use_indexes(migrated_engine):
+    """测试热点查询使用索引而不是全表扫描"""
+    from sqlalchemy.orm import sessionmaker
+    from app.models.database import Article
+
+    db = sessionmaker(bind=migrated_engine)()
+    cutoff = datetime.now() - timedelta(days=30)
+
+    cases = {
+        # 按订阅源列出文章
+        "ix_articles_feed_published": db.query(Article).filter(Article.feed_id == 1).order_by(
+            Article.published_at.desc()
+        ).limit(50),
+        # process_unprocessed_articles 按键集游标读取下一块
+        "ix_articles_processed_id": db.query(Article).filter(
+            Article.processed_status.is_(False),
+            Article.id > 1000,
+        ).order_by(Article.id).limit(200),
+        # cleanup_old_data
+        "ix_articles_read_created": db.query(Article).filter(
+            Article.created_at < cutoff,
+            Article.read_status == True,  # noqa: E712
+            Article.processed_status == True,  # noqa: E712
+        ),
+    }
+
+    for index, query in cases.items():
+        plan = _query_plan(migrated_engine, query)
+        assert index in plan, plan
+        assert "SCAN articles" not in plan.replace(f"SCAN articles USING INDEX {index}", ""), plan
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+    # 游标分页的深页查询
+    from sqlalchemy import literal, tuple_
+    after = tuple_(Article.published_at, Article.id) < tuple_(literal(cutoff, Article.published_at.type), literal(1000))
+    keyset_cases = {
+        "ix_articles_published": db.query(Article).filter(Article.published_at.isnot(None), after),
+        "ix_articles_feed_published": db.query(Article).filter(
+            Article.feed_id == 1, Article.published_at.isnot(None), after
+        ),
+    }
+    for index, query in keyset_cases.items():
+        plan = _query_plan(migrated_engine, query.order_by(Article.published_at.desc(), Article.id.desc()).limit(50))
+        assert index in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+    # 未读文章列表
+    plan = _query_plan(migrated_engine, db.query(Article).filter(Article.read_status == False))  # noqa: E712
+    assert "ix_articles_read_created" in plan, plan
+    db.close()
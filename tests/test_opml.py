@@ -0,0 +1,208 @@
+"""
+OPML 导入导出测试
+"""
+from tests.conftest import make_rss
+
+def make_opml(outlines: str) -> bytes:
+    """生成 OPML 文档"""
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<opml version="2.0">
+    <head><title>Subscriptions</title></head>
+    <body>{outlines}
+    </body>
+</opml>""".encode("utf-8")
+
+def test_stream_parser_in_small_chunks():
+    """测试按小块送入时增量解析，嵌套分类正确"""
+    from app.services.opml_service import OPMLStreamParser
+
+    document = make_opml("""
+        <outline text="Tech">
+            <outline text="Py" title="Python Weekly" type="rss" xmlUrl="https://example.com/py.xml"/>
+            <outline text="Nested">
+                <outline text="Deep" xmlUrl="https://example.com/deep.xml"/>
+            </outline>
+        </outline>
+        <outline text="Loose" xmlUrl="https://example.com/loose.xml" category="News"/>
+        <outline text="Bare" xmlUrl="https://example.com/bare.xml"/>""")
+
+    parser = OPMLStreamParser()
+    entries = []
+    for i in range(0, len(document), 7):
+        entries.extend(parser.feed(document[i:i + 7]))
+    entries.extend(parser.close())
+
+    assert entries == [
+        {"name": "Python Weekly", "url": "https://example.com/py.xml", "category": "Tech"},
+        {"name": "Deep", "url": "https://example.com/deep.xml", "category": "Nested"},
+        {"name": "Loose", "url": "https://example.com/loose.xml", "category": "News"},
+        {"name": "Bare", "url": "https://example.com/bare.xml", "category": "未分类"},
+    ]
+
+def test_stream_parser_rejects_invalid_document():
+    """测试非 OPML 文档报错"""
+    import pytest
+    from app.services.opml_service import OPMLParseError, OPMLStreamParser
+
+    parser = OPMLStreamParser()
+    with pytest.raises(OPMLParseError):
+        list(parser.feed(b"<opml><body><outline"))
+        list(parser.close())
+
+    parser = OPMLStreamParser()
+    list(parser.feed(b"<rss></rss>"))
+    with pytest.raises(OPMLParseError):
+        list(parser.close())
+
+def test_import_endpoint(feed_server, db_session, monkeypatch):
+    """测试导入：去重、并发验证、批量插入和任务进度"""
+    from fastapi.testclient import TestClient
+    from app.core.config import settings
+    from app.models.database import Feed
+    from main import app
+
+    # 测试订阅源在本机
+    monkeypatch.setattr(settings, "OPML_ALLOW_PRIVATE_HOSTS", True)
+
+    feed_server.add_feed("/a", make_rss("a"))
+    feed_server.add_feed("/b", make_rss("b"))
+    feed_server.add_feed("/html", b"<html><body>not a feed</body></html>", headers={"Content-Type": "text/html"})
+    db_session.add(Feed(name="existing", url=feed_server.url("/existing")))
+    db_session.commit()
+
+    document = make_opml(f"""
+        <outline text="Podcasts">
+            <outline text="A" xmlUrl="{feed_server.url('/a')}"/>
+            <outline text="B" xmlUrl="{feed_server.url('/b')}"/>
+            <outline text="A again" xmlUrl="{feed_server.url('/a')}"/>
+            <outline text="Existing" xmlUrl="{feed_server.url('/existing')}"/>
+            <outline text="Missing" xmlUrl="{feed_server.url('/missing')}"/>
+            <outline text="Html" xmlUrl="{feed_server.url('/html')}"/>
+        </outline>""")
+
+    client = TestClient(app)
+    response = client.post("/api/v1/feeds/opml/import", content=document)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["total"] == 6
+
+    progress = client.get(f"/api/v1/feeds/opml/import/{job['job_id']}").json()
+    assert progress["status"] == "completed"
+    assert progress["duplicates"] == 2
+    assert progress["validated"] == 4
+    assert progress["invalid"] == 2
+    assert progress["created"] == 2
+    assert {error["url"] for error in progress["errors"]} == {feed_server.url("/missing"), feed_server.url("/html")}
+
+    feeds = {feed.url: feed for feed in db_session.query(Feed).all()}
+    assert len(feeds) == 3
+    assert feeds[feed_server.url("/a")].name == "A"
+    assert feeds[feed_server.url("/a")].category == "Podcasts"
+    assert feeds[feed_server.url("/a")].status == "active"
+    # 已存在的订阅源不会被再次请求
+    assert "/existing" not in [path for path, _ in feed_server.requests]
+
+def test_import_rejects_unsafe_urls(feed_server, db_session):
+    """测试拒绝非 http(s) 协议，非公网地址在连接时被拒绝，不发出请求"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from main import app
+
+    feed_server.add_feed("/a", make_rss("a"))
+    unsafe = [
+        feed_server.url("/a"),
+        "file:///etc/passwd",
+        "ftp://example.com/feed.xml",
+        "http://localhost/feed.xml",
+        "http://10.0.0.1/feed.xml",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://[::1]/feed.xml",
+    ]
+    document = make_opml("".join(f'<outline text="f{i}" xmlUrl="{url}"/>' for i, url in enumerate(unsafe)))
+
+    client = TestClient(app)
+    job = client.post("/api/v1/feeds/opml/import", content=document).json()
+
+    progress = client.get(f"/api/v1/feeds/opml/import/{job['job_id']}").json()
+    assert progress["status"] == "completed"
+    assert progress["invalid"] == len(unsafe)
+    # 协议不支持的两条不进入验证
+    assert progress["validated"] == len(unsafe) - 2
+    assert progress["created"] == 0
+    assert {error["url"] for error in progress["errors"]} == set(unsafe)
+    assert feed_server.requests == []
+    assert db_session.query(Feed).count() == 0
+
+def test_public_only_fetch_rejects_redirect_to_loopback(feed_server, monkeypatch):
+    """测试只连接公网地址时，重定向后的每一跳也会检查目标地址"""
+    from app.services import fetch_service
+    from app.services.fetch_service import FeedFetcher
+
+    # 把测试服务器所在的 127.0.0.1 当作公网地址，其余回环地址仍然不是
+    monkeypatch.setattr(fetch_service, "_is_public_address", lambda address: address == "127.0.0.1")
+    port = feed_server.url("/").split(":")[2].split("/")[0]
+    feed_server.add_feed("/a", make_rss("a"))
+    feed_server.routes["/redirect"] = lambda handler: (
+        302, {"Location": f"http://127.0.0.2:{port}/a"}, b"", 0,
+    )
+
+    results = FeedFetcher(public_only=True).fetch_all([
+        {"url": feed_server.url("/a")},
+        {"url": feed_server.url("/redirect")},
+    ])
+    by_url = {result["url"]: result for result in results}
+    assert by_url[feed_server.url("/a")]["error"] is None
+    assert "不允许访问非公网地址: 127.0.0.2" in by_url[feed_server.url("/redirect")]["error"]
+    assert [path for path, _ in feed_server.requests].count("/a") == 1
+
+    # 主机名解析出非公网地址时在连接前拒绝
+    monkeypatch.setattr(fetch_service, "_is_public_address", lambda address: False)
+    result = FeedFetcher(public_only=True).fetch_all([{"url": f"http://localhost:{port}/a"}])[0]
+    assert "不允许访问非公网地址: localhost" in result["error"]
+    assert [path for path, _ in feed_server.requests].count("/a") == 1
+
+def test_import_without_validation_and_errors(db_session):
+    """测试跳过验证的导入和错误响应"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from main import app
+
+    client = TestClient(app)
+    document = make_opml("".join(
+        f'<outline text="f{i}" xmlUrl="https://example.com/{i}.xml"/>' for i in range(1200)
+    ))
+    job = client.post("/api/v1/feeds/opml/import?validate=false", content=document).json()
+
+    progress = client.get(f"/api/v1/feeds/opml/import/{job['job_id']}").json()
+    assert progress["status"] == "completed"
+    assert progress["created"] == 1200
+    assert db_session.query(Feed).count() == 1200
+
+    assert client.post("/api/v1/feeds/opml/import", content=b"<opml><body>").status_code == 400
+    assert client.get("/api/v1/feeds/opml/import/unknown").status_code == 404
+
+def test_export_round_trip(db_session):
+    """测试导出的 OPML 可以被重新解析"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from app.services.opml_service import OPMLStreamParser
+    from main import app
+
+    db_session.add_all([
+        Feed(name="Tech & Code", url="https://example.com/tech?a=1&b=2", category="技术"),
+        Feed(name="News", url="https://example.com/news", category="新闻"),
+        Feed(name="Plain", url="https://example.com/plain"),
+    ])
+    db_session.commit()
+
+    response = TestClient(app).get("/api/v1/feeds/opml/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/x-opml")
+
+    parser = OPMLStreamParser()
+    entries = list(parser.feed(response.content)) + list(parser.close())
+    assert sorted((e["name"], e["url"], e["category"]) for e in entries) == [
+        ("News", "https://example.com/news", "新闻"),
+        ("Plain", "https://example.com/plain", "未分类"),
+        ("Tech & Code", "https://example.com/tech?a=1&b=2", "技术"),
+    ]
@@ -0,0 +1,130 @@
+"""
+游标分页测试
+"""
+from datetime import datetime, timedelta
+
+def _seed(db_session, count: int = 230):
+    """创建一个订阅源和 count 篇文章，包括相同和缺失的发布时间"""
+    from app.models.database import Article, Feed
+    from app.services.article_service import ArticleService
+
+    feed = Feed(name="paged", url="https://example.com/paged")
+    other = Feed(name="other", url="https://example.com/other")
+    db_session.add_all([feed, other])
+    db_session.commit()
+
+    base = datetime(2024, 1, 1)
+    articles = []
+    for i in range(count):
+        if i % 10 == 0:
+            published_at = None
+        elif i % 7 == 0:
+            published_at = base  # 相同的发布时间，靠 id 区分
+        else:
+            published_at = base + timedelta(hours=i)
+        articles.append({
+            "title": f"article {i}",
+            "url": f"https://example.com/paged/{i}",
+            "content": "",
+            "summary": "",
+            "published_at": published_at,
+        })
+    ArticleService.bulk_insert(db_session, feed, articles)
+    db_session.add(Article(feed_id=other.id, title="other", url="https://example.com/other/1"))
+    db_session.commit()
+    return feed
+
+def _expected_order(db_session, feed_id=None):
+    """按 (published_at DESC, id DESC) 排列、NULL 在最后的期望顺序"""
+    from app.models.database import Article
+
+    query = db_session.query(Article)
+    if feed_id:
+        query = query.filter(Article.feed_id == feed_id)
+    rows = query.all()
+    dated = sorted((a for a in rows if a.published_at), key=lambda a: (a.published_at, a.id), reverse=True)
+    undated = sorted((a for a in rows if not a.published_at), key=lambda a: a.id, reverse=True)
+    return [a.id for a in dated + undated]
+
+def test_list_articles_cursor_walk(db_session):
+    """测试逐页遍历文章列表，结果完整、无重复且有序"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    _seed(db_session)
+    client = TestClient(app)
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 40}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/articles/", params=params)
+        assert response.status_code == 200
+        if pages == 0:
+            assert response.headers["X-Total-Count"] == "231"
+        else:
+            assert "X-Total-Count" not in response.headers
+        seen.extend(article["id"] for article in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert pages == 6
+    assert seen == _expected_order(db_session)
+
+def test_feed_articles_cursor_walk(db_session):
+    """测试订阅源文章列表的游标分页和维护的计数"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    feed = _seed(db_session)
+    client = TestClient(app)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 50}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get(f"/api/v1/feeds/{feed.id}/articles", params=params).json()
+        assert data["total"] == 230
+        seen.extend(article["id"] for article in data["articles"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == _expected_order(db_session, feed.id)
+
+def test_filters_and_invalid_cursor(db_session):
+    """测试过滤条件下的计数和无效游标"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Article
+    from main import app
+
+    feed = _seed(db_session, count=30)
+    db_session.query(Article).filter(Article.id <= 5).update({"read_status": True})
+    db_session.commit()
+    client = TestClient(app)
+
+    response = client.get("/api/v1/articles/", params={"read_status": "false", "limit": 10})
+    assert response.headers["X-Total-Count"] == "26"
+    assert all(not article["read_status"] for article in response.json())
+
+    response = client.get("/api/v1/articles/", params={"feed_id": feed.id, "limit": 100})
+    assert response.headers["X-Total-Count"] == "30"
+    assert "X-Next-Cursor" not in response.headers
+
+    assert client.get("/api/v1/articles/", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get(f"/api/v1/feeds/{feed.id}/articles", params={"cursor": "e30"}).status_code == 400
+
+def test_cursor_round_trip():
+    """测试游标编码解码"""
+    from app.core.pagination import decode_cursor, encode_cursor
+
+    moment = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    assert decode_cursor(encode_cursor(moment, 42)) == (moment, 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (None, 7)
@@ -0,0 +1,170 @@
+"""
+接口 SQL 查询次数测试
+"""
+import pytest
+
+def _seed(db_session, feeds: int, per_feed: int):
+    """创建 feeds 个订阅源，每个 per_feed 篇文章"""
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+
+    created = []
+    for f in range(feeds):
+        feed = Feed(name=f"feed {f}", url=f"https://example.com/feed/{f}")
+        db_session.add(feed)
+        db_session.commit()
+        ArticleService.bulk_insert(db_session, feed, [
+            {"title": f"article {f}-{i}", "url": f"https://example.com/feed/{f}/{i}", "content": "", "summary": "",
+             "published_at": None}
+            for i in range(per_feed)
+        ])
+        created.append(feed)
+    db_session.commit()
+    return created
+
+def _count(client, sql_counter, method: str, url: str, **kwargs):
+    sql_counter.reset()
+    response = client.request(method, url, **kwargs)
+    assert response.status_code < 400, response.text
+    return sql_counter.count, response
+
+@pytest.mark.parametrize("per_feed", [1, 10])
+def test_article_endpoints_constant_queries(db_session, sql_counter, per_feed):
+    """测试文章接口的查询次数与文章数和订阅源数无关"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    feeds = _seed(db_session, feeds=5, per_feed=per_feed)
+    total = 5 * per_feed
+
+    count, response = _count(client, sql_counter, "GET", "/api/v1/articles/", params={"limit": 500})
+    articles = response.json()
+    assert len(articles) == total
+    assert response.headers["X-Total-Count"] == str(total)
+    assert {a["feed_name"] for a in articles} == {f.name for f in feeds}
+    # 计数器读取 + 一次 JOIN 查询（非 NULL 段和 NULL 段各一次）
+    assert count <= 3, sql_counter.statements
+    assert not any("count(" in s.lower() for s in sql_counter.statements), sql_counter.statements
+
+    count, response = _count(client, sql_counter, "GET", "/api/v1/articles/", params={"limit": 500, "read_status": False})
+    assert len(response.json()) == total
+    assert response.headers["X-Total-Count"] == str(total)
+    assert count <= 3, sql_counter.statements
+    assert not any("count(" in s.lower() for s in sql_counter.statements), sql_counter.statements
+
+    article_id = articles[-1]["id"]
+    count, response = _count(client, sql_counter, "GET", f"/api/v1/articles/{article_id}")
+    assert response.json()["feed_name"] == articles[-1]["feed_name"]
+    assert count == 1, sql_counter.statements
+
+    # 第一次写请求缓存订阅源名称，之后的写请求不再查询订阅源
+    _count(client, sql_counter, "POST", f"/api/v1/articles/{article_id}/mark-read")
+    count, response = _count(client, sql_counter, "POST", f"/api/v1/articles/{article_id}/mark-unread")
+    assert response.json()["feed_name"] == articles[-1]["feed_name"]
+    assert not any("FROM feeds" in statement for statement in sql_counter.statements), sql_counter.statements
+
+def test_list_articles_query_count_does_not_grow(db_session, sql_counter):
+    """测试 5 篇和 50 篇文章的列表查询次数相同"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    client = TestClient(app)
+    _seed(db_session, feeds=5, per_feed=1)
+    small, _ = _count(client, sql_counter, "GET", "/api/v1/articles/", params={"limit": 500})
+
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+
+    ArticleService.bulk_insert(db_session, db_session.query(Feed).first(), [
+        {"title": f"more {i}", "url": f"https://example.com/more/{i}", "content": "", "summary": "", "published_at": None}
+        for i in range(45)
+    ])
+    db_session.commit()
+
+    large, response = _count(client, sql_counter, "GET", "/api/v1/articles/", params={"limit": 500})
+    assert len(response.json()) == 50
+    assert large == small
+
+def test_feed_meta_cache_invalidation(db_session):
+    """测试订阅源更新和删除后缓存失效"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from app.services.feed_cache import feed_meta_cache
+    from main import app
+
+    client = TestClient(app)
+    feed = client.post("/api/v1/feeds/", json={"name": "before", "url": "https://example.com/cached"}).json()
+    article = client.post("/api/v1/articles/", json={
+        "title": "cached", "url": "https://example.com/cached/1", "feed_id": feed["id"],
+    }).json()
+    assert db_session.get(Feed, feed["id"]).article_count == 1
+
+    assert client.post(f"/api/v1/articles/{article['id']}/mark-read").json()["feed_name"] == "before"
+    assert feed_meta_cache.name(db_session, feed["id"]) == "before"
+
+    client.put(f"/api/v1/feeds/{feed['id']}", json={"name": "after"})
+    assert client.post(f"/api/v1/articles/{article['id']}/mark-unread").json()["feed_name"] == "after"
+
+    client.delete(f"/api/v1/feeds/{feed['id']}")
+    assert feed_meta_cache.get(db_session, feed["id"]) is None
+
+def test_feed_meta_cache_batches_and_expires(db_session, sql_counter):
+    """测试缓存批量加载缺失条目并在过期后重新加载"""
+    from app.services.feed_cache import FeedMetaCache
+
+    feed_ids = [feed.id for feed in _seed(db_session, feeds=3, per_feed=0)]
+    cache = FeedMetaCache(ttl=60)
+
+    sql_counter.reset()
+    meta = cache.get_many(db_session, feed_ids + [9999])
+    assert {meta[feed_id]["name"] for feed_id in feed_ids} == {"feed 0", "feed 1", "feed 2"}
+    assert 9999 not in meta
+    assert sql_counter.count == 1
+
+    sql_counter.reset()
+    cache.get_many(db_session, feed_ids)
+    assert sql_counter.count == 0
+
+    cache.ttl = 0
+    cache.invalidate()
+    cache.get_many(db_session, feed_ids[:1])
+    sql_counter.reset()
+    cache.get_many(db_session, feed_ids[:1])
+    assert sql_counter.count == 1
+
+def test_list_articles_defers_bodies(db_session, sql_counter):
+    """测试文章列表默认不读取正文和摘要，详情和 include_content 时一次读取"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Article
+    from main import app
+
+    client = TestClient(app)
+    feed = _seed(db_session, feeds=1, per_feed=0)[0]
+    db_session.add_all(
+        Article(feed_id=feed.id, title=f"body {i}", url=f"https://example.com/body/{i}",
+                content=f"<p>content {i}</p>", summary=f"summary {i}")
+        for i in range(10)
+    )
+    db_session.commit()
+
+    count, response = _count(client, sql_counter, "GET", "/api/v1/articles/")
+    articles = response.json()
+    assert len(articles) == 10
+    assert all("content" not in article and "summary" not in article for article in articles)
+    assert articles[0]["feed_name"] == "feed 0"
+    assert not any("articles.content" in statement for statement in sql_counter.statements)
+    metadata_count = count
+
+    count, response = _count(client, sql_counter, "GET", "/api/v1/articles/", params={"include_content": "true"})
+    assert {article["content"] for article in response.json()} == {f"<p>content {i}</p>" for i in range(10)}
+    assert count == metadata_count
+
+    count, response = _count(client, sql_counter, "GET", f"/api/v1/articles/{articles[0]['id']}")
+    assert response.json()["summary"].startswith("summary ")
+    assert count == 1
+
+    data = client.get(f"/api/v1/feeds/{feed.id}/articles").json()
+    assert all("content" not in article for article in data["articles"])
+    data = client.get(f"/api/v1/feeds/{feed.id}/articles", params={"include_content": "true"}).json()
+    assert all(article["content"] for article in data["articles"])
@@ -0,0 +1,110 @@
+"""
+保留期清理测试
+"""
+from datetime import datetime, timedelta
+
+def _seed(db_session, total: int, expired_every: int):
+    """写入两个订阅源的文章，每 expired_every 篇中有一篇过期（已读、已处理、60 天前入库）"""
+    from sqlalchemy import update
+    from app.models.database import Article, Feed
+    from app.services.article_service import ArticleService
+
+    feeds = [Feed(name=f"feed {i}", url=f"https://example.com/feed/{i}") for i in range(2)]
+    db_session.add_all(feeds)
+    db_session.commit()
+    for n, feed in enumerate(feeds):
+        ArticleService.bulk_insert(db_session, feed, [
+            {"title": f"{n}-{i}", "url": f"https://example.com/{n}/{i}", "content": f"正文 {n}-{i}",
+             "summary": "", "published_at": None}
+            for i in range(total // 2)
+        ])
+    db_session.commit()
+
+    old = datetime.now() - timedelta(days=60)
+    db_session.execute(
+        update(Article)
+        .where(Article.id % expired_every == 0)
+        .values(read_status=True, processed_status=True, created_at=old)
+    )
+    # 已读但未处理的旧文章不删除
+    db_session.execute(update(Article).where(Article.id % expired_every == 1).values(read_status=True, created_at=old))
+    db_session.commit()
+    return [feed.id for feed in feeds]
+
+def test_retention_deletes_in_chunks(db_session):
+    """测试按主键分块删除，并增量维护文章计数和统计计数器"""
+    from app.models.database import Article, Feed
+    from app.services.retention_service import RetentionEngine
+    from app.services.stats_service import StatsService
+
+    feed_ids = _seed(db_session, total=1000, expired_every=4)
+    cutoff = datetime.now() - timedelta(days=30)
+
+    result = RetentionEngine(chunk_size=100, pause=0).run(cutoff)
+    assert result["deleted_articles"] == 250
+    assert result["chunks"] == 3
+    assert result["archived_articles"] == 0 and result["archive_file"] is None
+    assert result["rows_per_second"] > 0
+
+    db_session.expire_all()
+    assert db_session.query(Article).count() == 750
+    assert db_session.query(Article).filter(Article.id % 4 == 0).count() == 0
+    assert sum(db_session.get(Feed, feed_id).article_count for feed_id in feed_ids) == 750
+    assert StatsService.get_counters(db_session) == StatsService.count_live(db_session)
+
+    # 没有过期文章时不产生块
+    assert RetentionEngine(chunk_size=100, pause=0).run(cutoff)["chunks"] == 0
+
+def test_retention_archive(db_session, tmp_path):
+    """测试删除前追加写入 gzip 归档，多次运行追加为多个成员"""
+    import gzip
+    import json
+    from app.services.retention_service import RetentionEngine
+
+    _seed(db_session, total=200, expired_every=10)
+    engine = RetentionEngine(chunk_size=8, pause=0, archive_dir=str(tmp_path))
+
+    result = engine.run(datetime.now() - timedelta(days=30))
+    assert result["deleted_articles"] == result["archived_articles"] == 20
+    assert result["chunks"] == 3
+
+    with gzip.open(result["archive_file"], "rt", encoding="utf-8") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["id"] for row in rows] == list(range(10, 201, 10))
+    assert rows[0]["content"] == "正文 0-9"
+    assert rows[0]["read_status"] is True
+    datetime.fromisoformat(rows[0]["created_at"])
+
+    # 第二次运行追加到同一文件
+    from sqlalchemy import update
+    from app.models.database import Article
+    db_session.execute(
+        update(Article).where(Article.id % 10 == 5)
+        .values(read_status=True, processed_status=True, created_at=datetime.now() - timedelta(days=60))
+    )
+    db_session.commit()
+    assert engine.run(datetime.now() - timedelta(days=30))["archive_file"] == result["archive_file"]
+    with gzip.open(result["archive_file"], "rt", encoding="utf-8") as archive:
+        assert sum(1 for _ in archive) == 40
+
+def test_cleanup_runs_once_per_day():
+    """测试清理按每日计划运行，同一天内只运行一次"""
+    from app.scheduler.schedule import DailySchedule
+
+    start = datetime(2024, 5, 1, 1, 50)
+    schedule = DailySchedule(2, now=start)
+    assert schedule.next_run == datetime(2024, 5, 1, 2, 0)
+    assert not schedule.claim(start + timedelta(minutes=5))
+
+    # 2 点之后的第一轮运行，之后整天不再运行
+    assert schedule.claim(datetime(2024, 5, 1, 2, 7))
+    for minutes in range(10, 24 * 60 - 10, 10):
+        assert not schedule.claim(datetime(2024, 5, 1, 2, 7) + timedelta(minutes=minutes))
+    assert schedule.next_run == datetime(2024, 5, 2, 2, 0)
+
+    # 错过计划时刻时在之后的第一轮补跑
+    assert schedule.claim(datetime(2024, 5, 2, 9, 30))
+    assert schedule.next_run == datetime(2024, 5, 3, 2, 0)
+
+    # 在计划时刻之后启动的调度器等到第二天
+    assert DailySchedule(2, now=datetime(2024, 5, 1, 2, 0)).next_run == datetime(2024, 5, 2, 2, 0)
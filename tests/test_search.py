@@ -0,0 +1,170 @@
+"""
+文章全文搜索测试
+"""
+
+def _seed(db_session):
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+
+    feeds = [Feed(name="科技", url="https://example.com/tech"), Feed(name="other", url="https://example.com/other")]
+    db_session.add_all(feeds)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feeds[0], [
+        {"title": "Rust async runtime", "url": "https://example.com/1", "content": "tokio and futures",
+         "summary": "", "published_at": None},
+        {"title": "Python packaging", "url": "https://example.com/2",
+         "content": "A long post that mentions rust only once, deep in the body of the text.",
+         "summary": "", "published_at": None},
+        {"title": "Databases", "url": "https://example.com/3", "content": "SQLite full text search with FTS5",
+         "summary": "search engines", "published_at": None},
+    ])
+    ArticleService.bulk_insert(db_session, feeds[1], [
+        {"title": f"Rust weekly {i}", "url": f"https://example.com/weekly/{i}", "content": "newsletter",
+         "summary": "", "published_at": None}
+        for i in range(5)
+    ])
+    db_session.commit()
+    return [feed.id for feed in feeds]
+
+def test_build_match():
+    """测试用户输入被转换为安全的 MATCH 表达式"""
+    import pytest
+    from app.services.search_service import InvalidSearchQuery, SearchService
+
+    assert SearchService.build_match("rust  async") == '"rust" "async"'
+    assert SearchService.build_match('pyth* "AND" NEAR(') == '"pyth"* "AND" "NEAR("'
+    with pytest.raises(InvalidSearchQuery):
+        SearchService.build_match(' " * ')
+    # trigram 分词器下少于 3 个字符的词没有命中
+    with pytest.raises(InvalidSearchQuery):
+        SearchService.build_match("rust OR")
+
+def test_search_ranking_and_snippet(db_session):
+    """测试按 BM25 排序：标题命中排在正文命中之前，并返回命中片段"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    feed_id, _ = _seed(db_session)
+    client = TestClient(app)
+
+    data = client.get("/api/v1/articles/search", params={"q": "rust", "feed_id": feed_id}).json()
+    titles = [hit["title"] for hit in data["articles"]]
+    assert titles == ["Rust async runtime", "Python packaging"]
+    assert data["next_cursor"] is None
+    first, second = data["articles"]
+    assert first["score"] <= second["score"]
+    assert first["feed_name"] == "科技"
+    assert "<mark>rust</mark>" in second["snippet"]
+    assert "content" not in first
+
+    # 多个词同时命中，前缀匹配
+    data = client.get("/api/v1/articles/search", params={"q": "sear* fts5"}).json()
+    assert [hit["title"] for hit in data["articles"]] == ["Databases"]
+
+    assert client.get("/api/v1/articles/search", params={"q": '"'}).status_code == 400
+    assert client.get("/api/v1/articles/search", params={"q": "rust", "cursor": "bad"}).status_code == 400
+
+def test_search_chinese(db_session):
+    """测试默认的 trigram 分词器可以检索中文子串"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+    from main import app
+
+    feed = Feed(name="中文播客", url="https://example.com/zh")
+    db_session.add(feed)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feed, [
+        {"title": "人工智能周报", "url": "https://example.com/zh/1", "content": "本期讨论大语言模型的推理成本",
+         "summary": "", "published_at": None},
+        {"title": "创业故事", "url": "https://example.com/zh/2", "content": "一家做人工智能硬件的公司",
+         "summary": "", "published_at": None},
+        {"title": "旅行日记", "url": "https://example.com/zh/3", "content": "在京都的一周", "summary": "",
+         "published_at": None},
+    ])
+    db_session.commit()
+    client = TestClient(app)
+
+    data = client.get("/api/v1/articles/search", params={"q": "人工智能"}).json()
+    assert [hit["title"] for hit in data["articles"]] == ["人工智能周报", "创业故事"]
+    assert "<mark>人工智能</mark>" in data["articles"][1]["snippet"]
+
+    data = client.get("/api/v1/articles/search", params={"q": "语言模型 推理成本"}).json()
+    assert [hit["title"] for hit in data["articles"]] == ["人工智能周报"]
+
+    assert client.get("/api/v1/articles/search", params={"q": "京都"}).status_code == 400
+
+def test_search_keyset_pagination(db_session):
+    """测试游标分页遍历全部结果且不重复"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    _seed(db_session)
+    client = TestClient(app)
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "rust", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/api/v1/articles/search", params=params).json()
+        seen += [(hit["score"], hit["id"]) for hit in data["articles"]]
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 7
+    assert seen == sorted(seen)
+
+def test_search_index_follows_writes(db_session):
+    """测试触发器在插入、更新和删除时同步全文索引"""
+    from app.models.database import Article
+    from app.services.article_service import ArticleService
+    from app.services.search_service import SearchService
+
+    _seed(db_session)
+
+    def ids(query):
+        return [article.id for article in SearchService.search(db_session, query, limit=100)[0]]
+
+    article = db_session.query(Article).filter(Article.title == "Databases").one()
+    article.keywords = "postgres, indexing"
+    db_session.commit()
+    assert ids("indexing") == [article.id]
+
+    article.title = "Storage engines"
+    db_session.commit()
+    assert ids("databases") == []
+    assert ids("storage") == [article.id]
+
+    ArticleService.delete_articles(db_session, ids=[article.id])
+    db_session.commit()
+    assert ids("storage") == [] and ids("indexing") == []
+
+def test_search_candidate_window(db_session):
+    """测试高频词只在最新的命中文章中排序，翻页沿用第一页确定的候选范围"""
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+    from app.services.search_service import SearchService
+
+    _seed(db_session)
+    # "rust" 命中 ID 1、2 和 4-8，最新的 3 篇为 6-8
+    seen, cursor = [], None
+    while True:
+        page, cursor = SearchService.search(db_session, "rust", cursor=cursor, limit=2, max_candidates=3)
+        seen += [article.id for article in page]
+        if not cursor:
+            break
+    assert sorted(seen) == [6, 7, 8]
+
+    # 新的命中进入候选范围
+    feed = db_session.query(Feed).first()
+    ArticleService.bulk_insert(db_session, feed, [
+        {"title": "Rust rust rust", "url": "https://example.com/new", "content": "rust", "summary": "",
+         "published_at": None},
+    ])
+    db_session.commit()
+    page, _ = SearchService.search(db_session, "rust", limit=10, max_candidates=3)
+    assert sorted(article.id for article in page) == [7, 8, 9]
+
+    # 命中数不超过上限时全部参与排序
+    assert len(SearchService.search(db_session, "rust", limit=100, max_candidates=100)[0]) == 8
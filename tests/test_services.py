@@ -25,4 +25,41 @@ def test_scheduler_service():
     """测试调度器服务"""
     # 这里需要根据实际的 scheduler 创建测试
     # 示例：测试定时任务、任务调度等功能
-    pass
\ No newline at end of file
+    pass
+
+
+def test_article_service_bulk_insert(db_session):
+    """测试文章批量去重插入和增量计数"""
+    from sqlalchemy import event
+    from app.models.database import Article, Feed
+    from app.services.article_service import ArticleService
+
+    feed = Feed(name="bulk", url="https://example.com/bulk")
+    db_session.add(feed)
+    db_session.commit()
+
+    def articles(start, end):
+        return [
+            {"title": f"t{i}", "url": f"https://example.com/a/{i}", "content": "", "summary": "", "published_at": None}
+            for i in range(start, end)
+        ]
+
+    assert ArticleService.bulk_insert(db_session, feed, articles(0, 10)) == 10
+    db_session.commit()
+
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        # 与已有文章重叠，且批次内部有重复 URL
+        inserted = ArticleService.bulk_insert(db_session, feed, articles(5, 15) + articles(14, 15))
+        db_session.commit()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert inserted == 5
+    assert feed.article_count == 15
+    assert db_session.query(Article).count() == 15
+    # 文章表上只有一次存在性查询 + 一次批量插入，不随文章数增长
+    assert len([s for s in statements if "articles" in s]) == 2
@@ -0,0 +1,174 @@
+"""
+统计计数器测试
+"""
+
+def _articles(prefix: str, count: int):
+    return [
+        {"title": f"{prefix} {i}", "url": f"https://example.com/{prefix}/{i}", "content": "", "summary": "",
+         "published_at": None}
+        for i in range(count)
+    ]
+
+def test_counters_follow_writes(db_session):
+    """测试触发器在插入、状态变化和删除时维护计数器"""
+    from app.models.database import Article, Feed
+    from app.services.article_service import ArticleService
+    from app.services.stats_service import StatsService
+
+    assert StatsService.get_counters(db_session) == StatsService.count_live(db_session)
+
+    feeds = [Feed(name=f"feed {i}", url=f"https://example.com/feed/{i}") for i in range(3)]
+    db_session.add_all(feeds)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feeds[0], _articles("a", 20))
+    ArticleService.bulk_insert(db_session, feeds[1], _articles("b", 10))
+    # 重复的 URL 不会插入，也不计数
+    ArticleService.bulk_insert(db_session, feeds[1], _articles("b", 12))
+    db_session.commit()
+
+    db_session.query(Article).filter(Article.id <= 7).update({"read_status": True})
+    db_session.query(Article).filter(Article.id <= 4).update({"processed_status": True})
+    feeds[2].status = "error"
+    feeds[1].status = "paused"
+    db_session.commit()
+
+    counters = StatsService.get_counters(db_session)
+    assert counters == StatsService.count_live(db_session)
+    assert StatsService.article_stats(db_session) == {
+        "total": 32, "unread": 25, "read": 7, "processed": 4, "unprocessed": 28,
+    }
+    assert StatsService.feed_stats(db_session) == {"total": 3, "active": 1, "error": 1, "paused": 1}
+
+    # 删除订阅源级联删除文章
+    db_session.delete(feeds[0])
+    db_session.commit()
+    assert StatsService.get_counters(db_session) == StatsService.count_live(db_session)
+    assert StatsService.article_stats(db_session)["total"] == 12
+
+def test_stats_endpoints_single_query(db_session, sql_counter):
+    """测试统计接口只读取计数器表"""
+    from fastapi.testclient import TestClient
+    from app.models.database import Feed
+    from app.services.article_service import ArticleService
+    from main import app
+
+    feed = Feed(name="stats", url="https://example.com/stats")
+    db_session.add(feed)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feed, _articles("s", 15))
+    db_session.commit()
+    client = TestClient(app)
+
+    sql_counter.reset()
+    data = client.get("/api/v1/system/stats").json()
+    assert data["feeds"] == {"total": 1, "active": 1, "error": 0, "paused": 0}
+    assert data["articles"]["total"] == 15 and data["articles"]["unread"] == 15
+    assert sql_counter.count == 1, sql_counter.statements
+
+    sql_counter.reset()
+    summary = client.get("/api/v1/articles/stats/summary").json()
+    assert summary["unprocessed"] == 15
+    assert sql_counter.count == 1, sql_counter.statements
+    assert all("stats_counters" in statement for statement in sql_counter.statements)
+
+def test_reconcile_repairs_drift(db_session):
+    """测试校对任务修复绕过触发器造成的偏差"""
+    from sqlalchemy import text
+    from app.models.database import Feed
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.article_service import ArticleService
+    from app.services.stats_service import StatsService
+
+    feed = Feed(name="drift", url="https://example.com/drift")
+    db_session.add(feed)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feed, _articles("d", 5))
+    db_session.execute(text("UPDATE stats_counters SET value = 999 WHERE name = 'articles_unread'"))
+    db_session.execute(text("DELETE FROM stats_counters WHERE name = 'feeds_error'"))
+    db_session.commit()
+
+    result = TaskScheduler().reconcile_stats()
+    assert result["drift"] == {
+        "articles_unread": {"stored": 999, "actual": 5},
+        "feeds_error": {"stored": None, "actual": 0},
+    }
+
+    db_session.expire_all()
+    assert StatsService.get_counters(db_session)["articles_unread"] == 5
+    assert TaskScheduler().reconcile_stats()["drifted"] == 0
+
+def test_article_count_drift_is_left_to_reconcile(db_session, sql_counter):
+    """测试订阅源状态更新不再重新统计文章数，偏差由校对任务修复"""
+    from app.models.database import Feed
+    from app.scheduler.tasks import TaskScheduler
+    from app.services.article_service import ArticleService
+
+    feeds = [Feed(name=f"count {i}", url=f"https://example.com/count/{i}") for i in range(2)]
+    db_session.add_all(feeds)
+    db_session.commit()
+    ArticleService.bulk_insert(db_session, feeds[0], _articles("c", 4))
+    feeds[1].article_count = 7
+    db_session.commit()
+
+    scheduler = TaskScheduler()
+    sql_counter.reset()
+    result = scheduler.update_feed_status()
+    assert (result["total_feeds"], result["still_failing"], result["retried"]) == (2, 0, 0)
+    assert not any("group by" in statement.lower() for statement in sql_counter.statements)
+
+    assert scheduler.reconcile_stats()["article_count_drifted"] == 1
+    db_session.expire_all()
+    assert [feed.article_count for feed in db_session.query(Feed).order_by(Feed.id)] == [4, 0]
+    assert scheduler.reconcile_stats()["article_count_drifted"] == 0
+
+def test_reconcile_keeps_writes_made_while_counting(db_session, monkeypatch):
+    """测试统计在写事务之外进行，统计期间有写入的计数器不会被覆盖"""
+    from sqlalchemy import text
+    from app.core.database import SessionLocal
+    from app.models.database import Feed
+    from app.services.stats_service import StatsService
+
+    db_session.add(Feed(name="before", url="https://example.com/before"))
+    db_session.execute(text("UPDATE stats_counters SET value = 999 WHERE name = 'articles_unread'"))
+    db_session.commit()
+
+    count_live = StatsService.count_live
+
+    def count_then_write(db):
+        counters = count_live(db)
+        # 统计之后、修复之前另一个连接写入订阅源，需要写锁
+        other = SessionLocal()
+        try:
+            other.add(Feed(name="during", url="https://example.com/during"))
+            other.commit()
+        finally:
+            other.close()
+        return counters
+
+    monkeypatch.setattr(StatsService, "count_live", staticmethod(count_then_write))
+    reconcile_db = SessionLocal()
+    try:
+        drift = StatsService.reconcile(reconcile_db)
+    finally:
+        reconcile_db.close()
+    monkeypatch.undo()
+
+    assert drift == {"articles_unread": {"stored": 999, "actual": 0}}
+    db_session.expire_all()
+    assert StatsService.get_counters(db_session) == StatsService.count_live(db_session)
+    assert StatsService.get_counters(db_session)["feeds_total"] == 2
+
+def test_reconcile_runs_on_its_own_schedule(db_session, monkeypatch):
+    """测试定时任务每天只校对一次统计计数器"""
+    from datetime import datetime, timedelta
+    from app.core.config import settings
+    from app.scheduler.tasks import TaskScheduler
+
+    monkeypatch.setattr(settings, "AI_SERVICE_ENABLED", False)
+    monkeypatch.setattr(settings, "ENCLOSURE_DOWNLOAD_ENABLED", False)
+    scheduler = TaskScheduler()
+    assert "reconcile_stats" not in scheduler.run_all_tasks()["tasks"]
+
+    scheduler.reconcile_schedule.next_run = datetime.now() - timedelta(minutes=1)
+    assert "reconcile_stats" in scheduler.run_all_tasks()["tasks"]
+    assert "reconcile_stats" not in scheduler.run_all_tasks()["tasks"]
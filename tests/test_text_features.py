@@ -0,0 +1,53 @@
+"""
+单遍文本特征匹配测试
+"""
+
+SAMPLES = [
+    ("", ""),
+    ("", "Python how-to"),
+    ("Best practices", "This is a GOOD and great article. The problem is small."),
+    ("Somehow", "to learn nothing"),
+    ("How", "to train your dragon"),
+    ("news", "JavaScript: console.log('x') and Print(x) vs print(y)"),
+    ("", "DEF foo(): pass\nCLASS Bar"),
+    ("", "def foo():\n    import os\n    return os.sep"),
+    ("Café", "Ünïcode wörds, naïve café; ÉCOLE école — the the the and problems"),
+    ("", "badminton is not bad; happy-go-lucky, sadness, worst-case, unhappy"),
+    ("", "visit https://example.com/a?b=c or http://x.y"),
+    ("step", "by step guide, step  by step, stepbystep"),
+    ("Versus", "javas java javascript"),
+    ("", "abc abd abc xyz xyz xyz qq q the with when abc"),
+]
+
+def test_pattern_set_matches_substring_semantics():
+    """测试 PatternSet 与逐个 `pattern in text` 的结果一致"""
+    from app.services.text_features import PatternSet, TextScan
+
+    patterns = ["how to", "java", "vs", "print(", "console.", "step by step", "happy"]
+    for title, content in SAMPLES:
+        text = title + " " + content
+        scan = TextScan(title).merge(TextScan(content))
+        expected = [p for p in patterns if p in text.lower()]
+        assert PatternSet(patterns).matches(scan) == expected
+        assert PatternSet(patterns).any(scan) == bool(expected)
+        expected = [p for p in patterns if p in text]
+        assert PatternSet(patterns, case_sensitive=True).matches(scan) == expected
+
+def test_single_pass_matches_legacy_heuristics():
+    """测试单遍提取的特征与逐项计算的结果一致"""
+    from app.services.ai_service import AIService
+
+    service = AIService()
+    for title, content in SAMPLES:
+        features = service._match_features(content, title)
+        assert features == {
+            "keywords": service._extract_keywords(content),
+            "sentiment": service._analyze_sentiment(content),
+            "has_code": service._check_has_code(content),
+            "has_links": service._check_has_links(content),
+            "topic": service._identify_topic(content, title),
+        }, (title, content)
+
+    analysis = service.analyze_article(SAMPLES[2][1], SAMPLES[2][0])
+    assert analysis["sentiment"] == "positive"
+    assert analysis["topic"] == "review"